@@ -10,20 +10,36 @@ RunPod에서 실행 - 로컬에서 파일 업로드 후 분석
     https://yvfe7u20ltb89m-8888.proxy.runpod.net
 """
 
-from fastapi import FastAPI, HTTPException, UploadFile, File
+from fastapi import FastAPI, HTTPException, UploadFile, File, Request, Header
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import Dict, List, Optional
+from collections import OrderedDict
 import uvicorn
 import os
+import re
+import asyncio
+import json
 import shutil
+import hashlib
 import threading
-import uuid
-from datetime import datetime
+import weakref
+
+from llm_cache import get_llm_cache
+from llm_gateway import get_llm_gateway, llm_gateway_stats, close_llm_gateways
+from project_index import DEFAULT_PROJECT_ID, PROJECT_CACHE_SIZE, validate_project_id, add_eviction_listener
 
 # 설정
+# 프로젝트별 업로드 폴더 — 기본 프로젝트는 이전 버전과 같은 ./my_data, 그 밖에는 ./projects/<project_id>/my_data
+# (project_id 쿼리 파라미터를 생략하면 기본 프로젝트)
 DATA_DIR = "./my_data"
+PROJECTS_DIR = "./projects"
 os.makedirs(DATA_DIR, exist_ok=True)
+PARTIAL_DIR = "./upload_partial"     # 이어받기용 미완성 업로드 ({프로젝트}/{sha256}.partial, 프로젝트 용량에 포함)
+UPLOAD_INDEX_NAME = ".upload_index.json"  # 프로젝트 폴더마다 {파일명: {sha256, size}}
+PROJECT_DISK_QUOTA_MB = float(os.environ.get("PROJECT_DISK_QUOTA_MB", "1024"))  # 프로젝트당 업로드 용량 (0 이면 무제한)
+os.makedirs(PARTIAL_DIR, exist_ok=True)
 
 # FastAPI 앱 생성
 app = FastAPI(
@@ -44,11 +60,20 @@ app.add_middleware(
 # ===== 요청/응답 모델 =====
 class ChatRequest(BaseModel):
     question: str
+    refresh: bool = False  # True면 캐시된 LLM 응답을 쓰지 않고 새로 생성
 
 class ChatResponse(BaseModel):
     answer: str
     success: bool
 
+class ManifestFile(BaseModel):
+    name: str
+    sha256: str
+    size: int
+
+class UploadManifestRequest(BaseModel):
+    files: List[ManifestFile]
+
 class DraftRequest(BaseModel):
     reference_content: str = ""
     reference_name: str = ""
@@ -60,24 +85,28 @@ class DraftRequest(BaseModel):
     extra: str = ""
 
 # ===== 전역 변수 =====
-analyzer = None
 analyzer_ready = False
-rag_engine = None
-uploaded_files = []
+uploaded_files: Dict[str, List[str]] = {}  # {project_id: [이번 실행에서 업로드된 파일명]}
+
+# 프로젝트별 RAG 엔진 (최근에 쓴 PROJECT_CACHE_SIZE 개, 색인을 메모리에서 내리면 함께 해제)
+rag_engines: "OrderedDict[str, object]" = OrderedDict()
+_rag_lock = threading.Lock()
+_rag_init_locks: Dict[str, threading.Lock] = {}
 
-# 비동기 작업 저장소
-tasks = {}  # {task_id: {"status": "pending"|"running"|"done"|"error", "result": ..., "error": ...}}
+# 분석 작업 큐 (워커 풀 + SQLite 작업 저장소, 첫 사용 때 시작)
+job_queue = None
+_job_queue_lock = threading.Lock()
 
 # ===== 서버 시작 시 analyzer 초기화 =====
 @app.on_event("startup")
 def startup_init():
-    """서버 시작 시 DocumentAnalyzer를 미리 초기화 (Ko-SBERT, ChromaDB 로드)"""
-    global analyzer, analyzer_ready
+    """서버 시작 시 작업 큐를 띄우고 DocumentAnalyzer를 한 번 준비 (Ko-SBERT, ChromaDB 로드)"""
+    global analyzer_ready
+    _get_job_queue()
     try:
         from auto_analyzer import DocumentAnalyzer
         print("[Startup] DocumentAnalyzer 초기화 중...")
-        analyzer = DocumentAnalyzer()
-        if analyzer.setup():
+        if DocumentAnalyzer().setup():
             analyzer_ready = True
             print("[Startup] DocumentAnalyzer 준비 완료!")
         else:
@@ -86,117 +115,508 @@ def startup_init():
         print(f"[Startup] DocumentAnalyzer 초기화 오류: {e}")
         print("[Startup] /analyze 요청 시 재시도합니다")
 
+
+@app.on_event("shutdown")
+def shutdown_jobs():
+    """실행 중인 분석에 취소 신호를 보내고 워커 종료, LLM 연결 풀 정리"""
+    if job_queue is not None:
+        job_queue.shutdown(timeout=5)
+    close_llm_gateways()
+
 # ===== API 엔드포인트 =====
 
 @app.get("/")
 def root():
     """서버 상태 확인"""
+    jobs = _get_job_queue().stats()
     return {
         "status": "running",
         "analyzer_ready": analyzer_ready,
         "message": "🏛️ 공공기관 인수인계 시스템 API",
-        "uploaded_files": len(uploaded_files),
-        "active_tasks": sum(1 for t in tasks.values() if t["status"] in ("pending", "running")),
+        "uploaded_files": sum(len(files) for files in uploaded_files.values()),
+        "active_tasks": jobs["pending"] + jobs["running"],
         "endpoints": {
             "파일업로드": "POST /upload",
+            "업로드 핸드셰이크": "POST /upload/manifest → 없는 파일 목록",
+            "청크 업로드": "PUT /upload/{sha256}?name=&offset=&total=",
             "분석(비동기)": "POST /analyze → task_id 반환",
             "분석상태": "GET /analyze/status/{task_id}",
-            "채팅": "POST /chat"
-        }
+            "분석진행(SSE)": "GET /analyze/events/{task_id}",
+            "분석취소": "POST /analyze/cancel/{task_id}",
+            "작업 큐 통계": "GET /jobs/stats",
+            "프로젝트 목록": "GET /projects",
+            "프로젝트 삭제": "DELETE /projects/{project_id}",
+            "채팅": "POST /chat",
+            "채팅(SSE)": "POST /chat/stream",
+            "LLM 캐시 통계": "GET /cache/llm",
+            "LLM 호출 통계": "GET /llm/stats",
+            "임베딩 캐시 통계": "GET /cache/embeddings",
+            "질의 캐시 통계": "GET /cache/query"
+        },
+        "note": "업로드·분석·채팅은 ?project_id= 로 프로젝트 구분 (생략 시 default)"
     }
 
-@app.post("/upload")
-async def upload_files(files: List[UploadFile] = File(...)):
-    """파일 업로드 (로컬 → 서버)"""
-    global uploaded_files
+# ===== 업로드 인덱스 (파일명 → 내용 해시) =====
+_upload_lock = threading.Lock()
+_SHA256_RE = re.compile(r"^[0-9a-f]{64}$")
+UPLOAD_COPY_BUFSIZE = 1024 * 1024
+
+
+def _project_id(project_id: str) -> str:
+    try:
+        return validate_project_id(project_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _project_dir(project_id: str) -> str:
+    """프로젝트 업로드 폴더 (없으면 생성)"""
+    if project_id == DEFAULT_PROJECT_ID:
+        data_dir = DATA_DIR
+    else:
+        data_dir = os.path.join(PROJECTS_DIR, _project_id(project_id), "my_data")
+    os.makedirs(data_dir, exist_ok=True)
+    return data_dir
+
+
+def _project_ids() -> List[str]:
+    """업로드 폴더가 있는 프로젝트 id (기본 프로젝트 포함)"""
+    ids = [DEFAULT_PROJECT_ID]
+    if os.path.isdir(PROJECTS_DIR):
+        ids += sorted(p for p in os.listdir(PROJECTS_DIR)
+                      if p != DEFAULT_PROJECT_ID and os.path.isdir(os.path.join(PROJECTS_DIR, p, "my_data")))
+    return ids
+
+
+def _data_files(data_dir: str) -> List[str]:
+    return [f for f in os.listdir(data_dir) if not f.startswith(".")] if os.path.exists(data_dir) else []
+
+
+def _disk_usage(project_id: str) -> int:
+    """프로젝트 업로드 폴더 + 받는 중인 미완성 업로드 크기"""
+    data_dir = _project_dir(project_id)
+    partial_dir = _partial_dir(project_id)
+    return (sum(os.path.getsize(os.path.join(data_dir, f)) for f in _data_files(data_dir))
+            + sum(os.path.getsize(os.path.join(partial_dir, f)) for f in _data_files(partial_dir)))
+
+
+def _check_quota(project_id: str, growth: int):
+    """업로드 후 프로젝트 용량이 PROJECT_DISK_QUOTA_MB 를 넘으면 413"""
+    quota = int(PROJECT_DISK_QUOTA_MB * 1024 * 1024)
+    if quota <= 0 or growth <= 0:
+        return
+    used = _disk_usage(project_id)
+    if used + growth > quota:
+        raise HTTPException(
+            status_code=413,
+            detail=f"프로젝트 용량 초과: 사용 {used / 1e6:.1f}MB + 추가 {growth / 1e6:.1f}MB > 한도 {PROJECT_DISK_QUOTA_MB:.0f}MB",
+        )
+
+
+def _load_upload_index(data_dir: str) -> dict:
+    try:
+        with open(os.path.join(data_dir, UPLOAD_INDEX_NAME), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_upload_index(data_dir: str, index: dict):
+    path = os.path.join(data_dir, UPLOAD_INDEX_NAME)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(index, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def _file_sha256(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(UPLOAD_COPY_BUFSIZE), b""):
+            h.update(block)
+    return h.hexdigest()
 
+
+def _safe_filename(name: str) -> str:
+    filename = os.path.basename(name.replace("\\", "/"))
+    if not filename or filename.startswith("."):
+        raise HTTPException(status_code=400, detail=f"잘못된 파일명: {name}")
+    return filename
+
+
+def _register_upload(project_id: str, filename: str, sha256: str, size: int):
+    """업로드 완료된 파일을 프로젝트 인덱스에 기록"""
+    data_dir = _project_dir(project_id)
+    with _upload_lock:
+        index = _load_upload_index(data_dir)
+        index[filename] = {"sha256": sha256, "size": size}
+        _save_upload_index(data_dir, index)
+        files = uploaded_files.setdefault(project_id, [])
+        if filename not in files:
+            files.append(filename)
+
+
+def _corpus_fingerprint(project_id: str) -> str:
+    """
+    프로젝트 업로드 폴더의 파일 구성 지문 (파일명 + 내용 sha256) — 같은 지문이면 분석 결과도 같으므로 /analyze 를 합침
+    업로드 인덱스의 해시를 쓰고, 인덱스에 없거나 크기가 다른 파일만 직접 해시 (다음부터는 인덱스에서)
+    """
+    data_dir = _project_dir(project_id)
+    with _upload_lock:
+        index = _load_upload_index(data_dir)
+    h = hashlib.sha256()
+    for name in sorted(_data_files(data_dir)):
+        path = os.path.join(data_dir, name)
+        if not os.path.isfile(path):
+            continue
+        size = os.path.getsize(path)
+        info = index.get(name)
+        if info is None or info.get("size") != size:
+            info = {"sha256": _file_sha256(path), "size": size}
+            _register_upload(project_id, name, info["sha256"], size)
+        h.update(f"{name}\0{info['sha256']}\n".encode("utf-8"))
+    return h.hexdigest()
+
+
+# 미완성 업로드 파일별 잠금 — 같은 파일에 겹친 PUT(클라이언트 재시도 등)이 동시에 이어 쓰지 않도록
+_partial_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+
+def _partial_lock(partial: str) -> asyncio.Lock:
+    lock = _partial_locks.get(partial)
+    if lock is None:
+        lock = _partial_locks[partial] = asyncio.Lock()
+    return lock
+
+
+def _file_size(path: str) -> int:
+    return os.path.getsize(path) if os.path.exists(path) else 0
+
+
+def _partial_dir(project_id: str) -> str:
+    return os.path.join(PARTIAL_DIR, _project_id(project_id))
+
+
+def _partial_path(project_id: str, sha256: str) -> str:
+    """프로젝트별 미완성 업로드 파일 (폴더가 없으면 생성)"""
+    if not _SHA256_RE.match(sha256):
+        raise HTTPException(status_code=400, detail="sha256 형식이 올바르지 않습니다.")
+    partial_dir = _partial_dir(project_id)
+    os.makedirs(partial_dir, exist_ok=True)
+    return os.path.join(partial_dir, f"{sha256}.partial")
+
+
+@app.post("/upload/manifest")
+def upload_manifest(request: UploadManifestRequest, project_id: str = DEFAULT_PROJECT_ID):
+    """
+    업로드 전 핸드셰이크: 클라이언트 파일 목록(이름, sha256, 크기)을 받아
+    프로젝트 폴더에 없는 파일만 돌려준다. 같은 내용이 다른 이름으로 있으면 서버에서 복사.
+    받은 뒤 프로젝트 용량이 PROJECT_DISK_QUOTA_MB 를 넘게 되면 413.
+
+    Returns:
+        {"missing": [{"name", "sha256", "size", "offset"}], "present": int}
+    """
+    data_dir = _project_dir(project_id)
+    missing = []
+    present = 0
+    with _upload_lock:
+        index = _load_upload_index(data_dir)
+    by_hash = {info["sha256"]: name for name, info in index.items()}
+
+    # 용량 확인: 이미 같은 내용으로 있는 파일을 빼고, 덮어쓸 파일은 기존 크기만큼,
+    # 이어받을 파일은 이미 받은 만큼(미완성 업로드로 사용량에 들어 있음) 뺀 증가분
+    growth = 0
+    for item in request.files:
+        target = os.path.join(data_dir, _safe_filename(item.name))
+        info = index.get(os.path.basename(target))
+        if info and info["sha256"] == item.sha256.lower() and os.path.exists(target):
+            continue
+        growth += item.size - _file_size(target) - _file_size(_partial_path(project_id, item.sha256.lower()))
+    _check_quota(project_id, growth)
+
+    for item in request.files:
+        filename = _safe_filename(item.name)
+        sha256 = item.sha256.lower()
+        target = os.path.join(data_dir, filename)
+
+        info = index.get(filename)
+        if info and info["sha256"] == sha256 and os.path.exists(target):
+            present += 1
+            continue
+
+        # 인덱스에 없지만 파일이 있으면(서버 재시작 전 업로드 등) 직접 해시 비교
+        if info is None and os.path.exists(target) and os.path.getsize(target) == item.size:
+            if _file_sha256(target) == sha256:
+                _register_upload(project_id, filename, sha256, item.size)
+                present += 1
+                continue
+
+        # 같은 내용의 다른 파일이 있으면 네트워크 전송 없이 복사
+        source = by_hash.get(sha256)
+        if source and os.path.exists(os.path.join(data_dir, source)):
+            shutil.copyfile(os.path.join(data_dir, source), target)
+            _register_upload(project_id, filename, sha256, item.size)
+            present += 1
+            continue
+
+        partial = _partial_path(project_id, sha256)
+        offset = _file_size(partial)
+        missing.append({"name": filename, "sha256": sha256, "size": item.size, "offset": offset})
+
+    print(f"[Upload] manifest ({project_id}): {len(request.files)}개 중 {present}개 보유, {len(missing)}개 업로드 필요")
+    return {"missing": missing, "present": present}
+
+
+@app.get("/upload/{sha256}")
+def upload_status(sha256: str, project_id: str = DEFAULT_PROJECT_ID):
+    """이어받기 위치 조회 (지금까지 받은 바이트 수)"""
+    partial = _partial_path(project_id, sha256.lower())
+    return {"sha256": sha256, "offset": _file_size(partial)}
+
+
+@app.put("/upload/{sha256}")
+async def upload_chunk(sha256: str, request: Request, name: str, offset: int, total: int,
+                       project_id: str = DEFAULT_PROJECT_ID):
+    """
+    청크 업로드 (이어받기 지원)
+    요청 본문을 스트리밍으로 받아 {sha256}.partial 에 offset 위치부터 이어 쓴다.
+    total 바이트를 모두 받으면 해시를 검증하고 프로젝트 업로드 폴더로 옮긴다.
+    용량은 청크마다 확인 (다른 파일의 미완성 업로드도 사용량에 포함 → 동시 업로드로 한도를 넘지 않음).
+    같은 파일의 PUT 은 잠금으로 하나씩 처리 (늦게 온 재시도는 위치가 달라져 409), 파일 I/O 는 스레드에서.
+    """
+    sha256 = sha256.lower()
+    filename = _safe_filename(name)
+    partial = _partial_path(project_id, sha256)
+    data_dir = _project_dir(project_id)
+    target = os.path.join(data_dir, filename)
+
+    async with _partial_lock(partial):
+        current = await asyncio.to_thread(_file_size, partial)
+        if offset != current:
+            # 클라이언트가 알고 있는 위치와 다르면 현재 위치를 알려주고 다시 보내게 함
+            return JSONResponse(status_code=409, content={"sha256": sha256, "offset": current})
+        # 사용량에 이미 받은 만큼(current)이 들어 있으므로 남은 바이트만 증가분
+        await asyncio.to_thread(_check_quota, project_id, total - current - _file_size(target))
+
+        written = current
+        f = await asyncio.to_thread(open, partial, "ab")
+        try:
+            # 작은 조각마다 스레드를 오가지 않도록 UPLOAD_COPY_BUFSIZE 만큼 모아서 기록
+            buffer = bytearray()
+            async for chunk in request.stream():
+                if written + len(buffer) + len(chunk) > total:
+                    raise HTTPException(status_code=400, detail="total 보다 많은 데이터가 전송되었습니다.")
+                buffer += chunk
+                if len(buffer) >= UPLOAD_COPY_BUFSIZE:
+                    await asyncio.to_thread(f.write, bytes(buffer))
+                    written += len(buffer)
+                    buffer.clear()
+            if buffer:
+                await asyncio.to_thread(f.write, bytes(buffer))
+                written += len(buffer)
+        finally:
+            await asyncio.to_thread(f.close)
+
+        if written < total:
+            return {"sha256": sha256, "offset": written, "complete": False}
+
+        if await asyncio.to_thread(_file_sha256, partial) != sha256:
+            await asyncio.to_thread(os.remove, partial)
+            raise HTTPException(status_code=422, detail=f"{filename} 해시 불일치 — 처음부터 다시 업로드하세요.")
+
+        await asyncio.to_thread(os.replace, partial, target)
+    _register_upload(project_id, filename, sha256, total)
+    print(f"[Upload] 완료 ({project_id}): {filename} ({total:,} bytes)")
+    return {"sha256": sha256, "offset": written, "complete": True}
+
+
+@app.post("/upload")
+async def upload_files(files: List[UploadFile] = File(...), project_id: str = DEFAULT_PROJECT_ID):
+    """파일 업로드 (로컬 → 서버, 구버전 클라이언트용 multipart)"""
+    data_dir = _project_dir(project_id)
+    quota = int(PROJECT_DISK_QUOTA_MB * 1024 * 1024)
     saved = []
     for file in files:
         try:
-            file_path = os.path.join(DATA_DIR, file.filename)
+            filename = _safe_filename(file.filename)
+            file_path = os.path.join(data_dir, filename)
+            # 파일 전체를 메모리에 올리지 않고 1MB 단위로 복사하면서 해시 계산
+            h = hashlib.sha256()
+            size = 0
             with open(file_path, "wb") as f:
-                content = await file.read()
-                f.write(content)
-            saved.append(file.filename)
-            uploaded_files.append(file.filename)
+                for block in iter(lambda: file.file.read(UPLOAD_COPY_BUFSIZE), b""):
+                    h.update(block)
+                    f.write(block)
+                    size += len(block)
+            if quota > 0 and _disk_usage(project_id) > quota:
+                os.remove(file_path)
+                raise HTTPException(status_code=413, detail=f"프로젝트 용량 초과 (한도 {PROJECT_DISK_QUOTA_MB:.0f}MB)")
+            _register_upload(project_id, filename, h.hexdigest(), size)
+            saved.append(filename)
+        except HTTPException:
+            raise
         except Exception as e:
             return {"error": f"{file.filename} 업로드 실패: {e}"}
 
     return {
         "success": True,
         "uploaded": saved,
-        "total_files": len(uploaded_files),
+        "total_files": len(uploaded_files.get(project_id, [])),
         "message": f"✅ {len(saved)}개 파일 업로드 완료!"
     }
 
 @app.get("/files")
-def list_files():
-    """업로드된 파일 목록"""
-    files = os.listdir(DATA_DIR) if os.path.exists(DATA_DIR) else []
-    return {"files": files, "count": len(files)}
+def list_files(project_id: str = DEFAULT_PROJECT_ID):
+    """프로젝트에 업로드된 파일 목록"""
+    files = _data_files(_project_dir(project_id))
+    return {"files": files, "count": len(files), "project_id": project_id}
 
 @app.delete("/files")
-def clear_files():
-    """모든 파일 삭제"""
-    global uploaded_files
-    if os.path.exists(DATA_DIR):
-        shutil.rmtree(DATA_DIR)
-        os.makedirs(DATA_DIR)
-    uploaded_files = []
-    return {"success": True, "message": "모든 파일이 삭제되었습니다."}
+def clear_files(project_id: str = DEFAULT_PROJECT_ID):
+    """프로젝트의 업로드 파일 모두 삭제 (다른 프로젝트는 그대로)"""
+    data_dir = _project_dir(project_id)
+    with _upload_lock:
+        shutil.rmtree(data_dir)
+        os.makedirs(data_dir)
+        uploaded_files.pop(project_id, None)
+    return {"success": True, "message": f"프로젝트 '{project_id}'의 파일이 삭제되었습니다."}
+
+# ===== 분석 작업 큐 =====
+def _run_analyze_job(job) -> dict:
+    """
+    분석 작업 하나 (워커 스레드) — 작업마다 새 DocumentAnalyzer 라 동시에 돌아도 files_data 가 섞이지 않음
+    프로젝트마다 업로드 폴더·색인 컬렉션이 따로라 다른 프로젝트 분석과는 나란히 실행됨
+    """
+    global analyzer_ready
+    from auto_analyzer import DocumentAnalyzer
+    project_id = job.params.get("project_id", DEFAULT_PROJECT_ID)
+    analyzer = DocumentAnalyzer(cancel_event=job.cancel_event, project_id=project_id,
+                                data_dir=_project_dir(project_id))
+    if not analyzer.setup():
+        raise RuntimeError("분석 시스템 초기화 실패")
+    analyzer_ready = True
+    analyzer.refresh_llm_cache = job.params.get("refresh", False)
+    return analyzer.analyze_all(on_progress=lambda event: job.emit("progress", event))
+
+
+def _get_job_queue():
+    """작업 큐 (첫 사용 때 워커 시작, 이전 실행에서 끝나지 못한 작업은 오류로 정리)"""
+    global job_queue
+    with _job_queue_lock:
+        if job_queue is None:
+            from job_queue import JobQueue
+            job_queue = JobQueue({"analyze": _run_analyze_job})
+            job_queue.start()
+        return job_queue
+
 
 @app.post("/analyze")
-def analyze_documents():
+def analyze_documents(refresh: bool = False, idempotency_key: Optional[str] = Header(None),
+                      project_id: str = DEFAULT_PROJECT_ID):
     """
-    문서 자동 분석 (비동기)
-    즉시 task_id를 반환하고, 백그라운드에서 분석 수행.
+    문서 자동 분석 (비동기, 프로젝트 단위)
+    refresh=true 면 캐시된 LLM 응답(요약·개요)을 쓰지 않고 새로 생성.
+    즉시 task_id를 반환하고, 작업 큐의 워커가 분석 수행 (대기열이 가득 차면 429).
+    GET /analyze/events/{task_id} (SSE) 로 진행 상황과 결과를 받거나
     GET /analyze/status/{task_id} 로 결과 조회.
 
+    중복 실행 합치기 (attached=true 로 표시):
+    - 같은 프로젝트에서 Idempotency-Key 헤더가 같은 요청(클라이언트 재시도)은 처음 만든 작업의 task_id
+    - 같은 프로젝트에서 파일 구성 지문이 같은 작업이 대기·실행 중이면 그 작업, refresh 가 아니면 최근(JOB_COALESCE_SECONDS)에
+      성공한 작업도 재사용 (그 프로젝트에서 가장 최근에 끝난 분석이고 진행 중인 분석이 없을 때만)
+
     기존 동기 방식도 호환: 결과에 task_id가 있으면 폴링, 없으면 직접 결과.
     """
-    global analyzer, analyzer_ready
-
-    task_id = str(uuid.uuid4())[:8]
-    tasks[task_id] = {"status": "pending", "result": None, "error": None, "created": datetime.now().isoformat()}
-
-    def run_analysis():
-        global analyzer, analyzer_ready
-        tasks[task_id]["status"] = "running"
-        try:
-            # analyzer가 아직 초기화 안 됐으면 여기서 초기화
-            if not analyzer_ready:
-                from auto_analyzer import DocumentAnalyzer
-                analyzer = DocumentAnalyzer()
-                if not analyzer.setup():
-                    tasks[task_id]["status"] = "error"
-                    tasks[task_id]["error"] = "분석 시스템 초기화 실패"
-                    return
-                analyzer_ready = True
-
-            result = analyzer.analyze_all()
-            tasks[task_id]["status"] = "done"
-            tasks[task_id]["result"] = result if result else {}
-            print(f"[Analyze] 작업 완료: {task_id}")
-
-        except Exception as e:
-            tasks[task_id]["status"] = "error"
-            tasks[task_id]["error"] = str(e)
-            print(f"[Analyze] 작업 실패: {task_id} — {e}")
-
-    threading.Thread(target=run_analysis, daemon=True).start()
+    from job_queue import QueueFull, JOB_COALESCE_SECONDS
+    queue = _get_job_queue()
+    fingerprint = _corpus_fingerprint(project_id)
+    dedupe_key = f"{project_id}:{fingerprint}" + (":refresh" if refresh else "")
+    try:
+        task_id, attached = queue.submit(
+            "analyze", {"project_id": project_id, "refresh": refresh, "fingerprint": fingerprint},
+            dedupe_key=dedupe_key,
+            idempotency_key=f"{project_id}:{idempotency_key}" if idempotency_key else None,
+            scope=project_id,
+            reuse_seconds=0 if refresh else JOB_COALESCE_SECONDS,
+        )
+    except QueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "30"})
+    if attached:
+        print(f"[Analyze] 같은 파일 구성의 기존 작업에 연결: {task_id}")
+    else:
+        print(f"[Analyze] 작업 등록: {task_id} (프로젝트 {project_id}, 지문 {fingerprint[:12]})")
 
     # 즉시 반환 — 524 방지
     return {
         "success": True,
         "async": True,
         "task_id": task_id,
-        "message": "분석이 시작되었습니다. GET /analyze/status/{task_id}로 결과를 조회하세요."
+        "project_id": project_id,
+        "attached": attached,
+        "queue_position": queue.position(task_id),
+        "events_url": f"/analyze/events/{task_id}",
+        "message": "분석이 시작되었습니다. GET /analyze/events/{task_id}(SSE) 또는 /analyze/status/{task_id}로 결과를 조회하세요."
     }
 
+# ===== 분석 진행 이벤트 (SSE) =====
+SSE_HEARTBEAT_SEC = 15  # 프록시 유휴 타임아웃 방지용 주석 라인 주기
+
+
+@app.get("/analyze/events/{task_id}")
+async def stream_analyze_events(task_id: str, request: Request):
+    """
+    분석 진행 상황 Server-Sent Events 스트림
+
+    - event: status / progress (파일 단위) / done (result 포함) / error (취소 포함, status 로 구분)
+    - 재연결 시 Last-Event-ID 헤더 이후 이벤트부터 다시 전송
+    - done/error 이벤트 후 스트림 종료
+    - 진행 이벤트가 메모리에 없는 오래된 작업(재시작 전 등)은 저장된 최종 상태만 한 번 전송
+    """
+    queue = _get_job_queue()
+    job = queue.get_job(task_id)
+    stored = None if job else queue.get_status(task_id)
+    if not job and not stored:
+        raise HTTPException(status_code=404, detail=f"작업 '{task_id}'을 찾을 수 없습니다.")
+    try:
+        last_id = int(request.headers.get("last-event-id", 0))
+    except ValueError:
+        last_id = 0
+
+    async def event_stream():
+        nonlocal last_id
+        yield "retry: 3000\n\n"
+        if job is None:
+            if stored["status"] == "done":
+                event_type, data = "done", {"status": "done", "result": stored["result"]}
+            else:
+                event_type, data = "error", {"status": stored["status"], "error": stored["error"]}
+            yield f"event: {event_type}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+            return
+        while True:
+            events = await asyncio.to_thread(job.wait_events, last_id, SSE_HEARTBEAT_SEC)
+            if not events:
+                if await request.is_disconnected():
+                    return
+                yield ": keep-alive\n\n"
+                continue
+            for event_id, event_type, data in events:
+                last_id = event_id
+                payload = json.dumps(data, ensure_ascii=False)
+                yield f"id: {event_id}\nevent: {event_type}\ndata: {payload}\n\n"
+                if event_type in ("done", "error"):
+                    return
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 @app.get("/analyze/status/{task_id}")
 def get_analyze_status(task_id: str):
-    """분석 작업 상태 조회"""
-    task = tasks.get(task_id)
+    """분석 작업 상태 조회 (끝난 작업은 서버 재시작 후에도 JOB_TTL_HOURS 동안 조회 가능)"""
+    queue = _get_job_queue()
+    task = queue.get_status(task_id)
     if not task:
         raise HTTPException(status_code=404, detail=f"작업 '{task_id}'을 찾을 수 없습니다.")
 
@@ -205,31 +625,118 @@ def get_analyze_status(task_id: str):
         "status": task["status"],
     }
 
-    if task["status"] == "done":
+    if task["status"] == "pending":
+        response["queue_position"] = queue.position(task_id)
+    elif task["status"] == "done":
         response["success"] = True
         response["result"] = task["result"]
-    elif task["status"] == "error":
+    elif task["status"] in ("error", "cancelled"):
         response["success"] = False
         response["error"] = task["error"]
 
     return response
 
-@app.post("/chat")
-def chat(request: ChatRequest):
-    """챗봇 질문/답변"""
-    global rag_engine
-
-    try:
-        if rag_engine is None:
+@app.post("/analyze/cancel/{task_id}")
+def cancel_analyze(task_id: str):
+    """분석 작업 취소 (대기 중이면 바로, 실행 중이면 다음 파일·항목 경계에서 중단)"""
+    status = _get_job_queue().cancel(task_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail=f"작업 '{task_id}'을 찾을 수 없습니다.")
+    return {"task_id": task_id, "status": status}
+
+@app.get("/jobs/stats")
+def job_queue_stats():
+    """작업 큐 통계 (워커 수, 대기·실행 중 작업 수, 최대 대기열 길이, 평균 대기·실행 시간)"""
+    return _get_job_queue().stats()
+
+# ===== 프로젝트 =====
+def _active_project_jobs() -> Dict[str, int]:
+    counts: Dict[str, int] = {}
+    for job in _get_job_queue().active_jobs("analyze"):
+        project_id = job.params.get("project_id", DEFAULT_PROJECT_ID)
+        counts[project_id] = counts.get(project_id, 0) + 1
+    return counts
+
+
+@app.get("/projects")
+def list_projects():
+    """프로젝트 목록 (파일 수, 업로드 용량, 색인이 메모리에 있는지, 진행 중인 분석 수)"""
+    from project_index import loaded_projects
+    loaded = set(loaded_projects())
+    active = _active_project_jobs()
+    projects = []
+    for project_id in _project_ids():
+        data_dir = _project_dir(project_id)
+        projects.append({
+            "project_id": project_id,
+            "files": len(_data_files(data_dir)),
+            "bytes": _disk_usage(project_id),
+            "loaded": project_id in loaded,
+            "active_jobs": active.get(project_id, 0),
+        })
+    return {"projects": projects, "quota_mb": PROJECT_DISK_QUOTA_MB, "cache_size": PROJECT_CACHE_SIZE}
+
+
+@app.delete("/projects/{project_id}")
+def delete_project(project_id: str):
+    """프로젝트 삭제 (업로드 파일 + 미완성 업로드 + 색인 컬렉션 + 채팅 엔진) — 분석 중이면 409"""
+    from project_index import drop_project
+    _project_id(project_id)
+    if _active_project_jobs().get(project_id):
+        raise HTTPException(status_code=409, detail=f"프로젝트 '{project_id}'의 분석이 진행 중입니다. 취소 후 다시 시도하세요.")
+    drop_project(project_id)
+    _drop_rag_engine(project_id)
+    _get_job_queue().forget("analyze", project_id)  # 색인이 사라졌으니 끝난 분석을 재사용하지 않음
+    with _upload_lock:
+        if project_id == DEFAULT_PROJECT_ID:
+            shutil.rmtree(DATA_DIR, ignore_errors=True)
+            os.makedirs(DATA_DIR, exist_ok=True)
+        else:
+            shutil.rmtree(os.path.join(PROJECTS_DIR, project_id), ignore_errors=True)
+        shutil.rmtree(_partial_dir(project_id), ignore_errors=True)
+        uploaded_files.pop(project_id, None)
+    print(f"[Project] 삭제: {project_id}")
+    return {"success": True, "project_id": project_id}
+
+def _get_rag_engine(project_id: str = DEFAULT_PROJECT_ID):
+    """프로젝트 RAG 엔진 (프로젝트별 첫 채팅 요청 때 초기화, 최근에 쓴 PROJECT_CACHE_SIZE 개만 유지)"""
+    _project_id(project_id)
+    with _rag_lock:
+        engine = rag_engines.get(project_id)
+        if engine is not None:
+            rag_engines.move_to_end(project_id)
+            return engine
+        init_lock = _rag_init_locks.setdefault(project_id, threading.Lock())
+    with init_lock:  # 같은 프로젝트는 한 번만 초기화, 다른 프로젝트 초기화는 기다리지 않음
+        with _rag_lock:
+            engine = rag_engines.get(project_id)
+        if engine is None:
             from handover_rag_v3 import HandoverRAGEngine
+            engine = HandoverRAGEngine(project_id=project_id)
+            if not engine.setup():
+                raise HTTPException(status_code=500, detail="RAG 엔진 초기화 실패")
+        with _rag_lock:
+            rag_engines[project_id] = engine
+            rag_engines.move_to_end(project_id)
+            while len(rag_engines) > PROJECT_CACHE_SIZE:
+                rag_engines.popitem(last=False)
+    return engine
 
-            rag_engine = HandoverRAGEngine()
 
-            if not rag_engine.setup():
-                raise HTTPException(status_code=500, detail="RAG 엔진 초기화 실패")
+def _drop_rag_engine(project_id: str):
+    """프로젝트 색인을 메모리에서 내리거나 삭제할 때 채팅 엔진도 해제"""
+    with _rag_lock:
+        rag_engines.pop(project_id, None)
+
 
+add_eviction_listener(_drop_rag_engine)
+
+@app.post("/chat")
+def chat(request: ChatRequest, project_id: str = DEFAULT_PROJECT_ID):
+    """챗봇 질문/답변 (프로젝트 색인에서 검색)"""
+    try:
         # 질문에서 응답 받기
-        result = rag_engine.ask(request.question)
+        result = _get_rag_engine(project_id).ask(request.question, refresh_cache=request.refresh)
 
         # result가 dict인 경우 처리
         if isinstance(result, dict):
@@ -251,17 +758,43 @@ def chat(request: ChatRequest):
 
         return {"answer": answer, "success": True}
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/chat/stream")
+def chat_stream(request: ChatRequest, project_id: str = DEFAULT_PROJECT_ID):
+    """
+    챗봇 질문/답변 Server-Sent Events 스트림 (vLLM 토큰을 바로 중계)
+
+    - event: meta (검색 완료, 출처) / start (첫 토큰, ttftMs) / token (생성 조각)
+             / field (답변 JSON 필드 완성, 표시용 text 포함) / done (최종 응답 + timing) / error
+    - done/error 이벤트 후 스트림 종료
+    """
+    engine = _get_rag_engine(project_id)
+
+    def event_stream():
+        # 동기 generator → Starlette 가 스레드풀에서 돌림 (LLM 스트림 읽기가 이벤트 루프를 막지 않음)
+        try:
+            for event_type, data in engine.ask_stream(request.question, refresh_cache=request.refresh):
+                payload = json.dumps(data, ensure_ascii=False)
+                yield f"event: {event_type}\ndata: {payload}\n\n"
+        except Exception as e:
+            payload = json.dumps({"error": str(e)}, ensure_ascii=False)
+            yield f"event: error\ndata: {payload}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 @app.post("/draft")
 def generate_draft(request: DraftRequest):
     """참고 문서 기반 공문 초안 생성 (LLM)"""
     try:
-        from openai import OpenAI
-
-        client = OpenAI(base_url="http://localhost:8000/v1", api_key="EMPTY")
-        model = "mistralai/Mistral-Nemo-Instruct-2407"
+        llm = get_llm_gateway()
 
         # 참고 문서 컨텍스트 구성
         ref_context = ""
@@ -288,23 +821,22 @@ def generate_draft(request: DraftRequest):
 
 답:"""
 
-        type_resp = client.chat.completions.create(
-            model=model,
+        type_text = llm.chat(
+            "draft_type",
             messages=[
                 {"role": "system", "content": "공문서 유형 분류기입니다. GOV_ELECTRONIC 또는 PLANNING_REPORT 중 하나만 답하세요."},
                 {"role": "user", "content": type_prompt}
             ],
             max_tokens=20,
             temperature=0.0
-        )
-        type_text = type_resp.choices[0].message.content.strip()
+        ).strip()
         template_type = "PLANNING_REPORT" if "PLANNING" in type_text.upper() else "GOV_ELECTRONIC"
 
         # 2단계: 문서 내용 생성
         if template_type == "GOV_ELECTRONIC":
-            structured = _generate_electronic_doc(client, model, request, ref_context, formatted_amount)
+            structured = _generate_electronic_doc(llm, request, ref_context, formatted_amount)
         else:
-            structured = _generate_planning_report(client, model, request, ref_context, formatted_amount, amount_num)
+            structured = _generate_planning_report(llm, request, ref_context, formatted_amount, amount_num)
 
         return {
             "success": True,
@@ -318,7 +850,7 @@ def generate_draft(request: DraftRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
-def _generate_electronic_doc(client, model, req, ref_context, formatted_amount):
+def _generate_electronic_doc(llm, req, ref_context, formatted_amount):
     """전자결재 공문 구조 생성"""
     prompt = f"""다음 정보를 바탕으로 전자결재 공문(시행문)의 본문을 작성하세요.
 
@@ -334,16 +866,15 @@ def _generate_electronic_doc(client, model, req, ref_context, formatted_amount):
 
 간결하고 공식적인 행정 문체로 한국어로 작성하세요."""
 
-    resp = client.chat.completions.create(
-        model=model,
+    generated = llm.chat(
+        "draft_electronic",
         messages=[
             {"role": "system", "content": "공공기관 행정문서 작성 전문가입니다. 간결하고 정확한 공문을 작성합니다."},
             {"role": "user", "content": prompt}
         ],
         max_tokens=600,
         temperature=0.2
-    )
-    generated = resp.choices[0].message.content.strip()
+    ).strip()
 
     # 생성된 텍스트를 구조화
     lines = generated.split('\n')
@@ -399,7 +930,7 @@ def _generate_electronic_doc(client, model, req, ref_context, formatted_amount):
     }
 
 
-def _generate_planning_report(client, model, req, ref_context, formatted_amount, amount_num):
+def _generate_planning_report(llm, req, ref_context, formatted_amount, amount_num):
     """계획서/보고서 구조 생성"""
     prompt = f"""다음 정보를 바탕으로 사업 기본계획서의 본문을 작성하세요.
 
@@ -417,16 +948,15 @@ def _generate_planning_report(client, model, req, ref_context, formatted_amount,
 
 간결하고 공식적인 행정 문체로 한국어로 작성하세요."""
 
-    resp = client.chat.completions.create(
-        model=model,
+    generated = llm.chat(
+        "draft_planning",
         messages=[
             {"role": "system", "content": "공공기관 사업계획서 작성 전문가입니다. 구조화된 계획서를 작성합니다."},
             {"role": "user", "content": prompt}
         ],
         max_tokens=800,
         temperature=0.2
-    )
-    generated = resp.choices[0].message.content.strip()
+    ).strip()
 
     # 목적 항목 추출
     purpose_items = []
@@ -483,6 +1013,32 @@ def _generate_planning_report(client, model, req, ref_context, formatted_amount,
 def health_check():
     return {"status": "healthy", "analyzer_ready": analyzer_ready}
 
+@app.get("/cache/llm")
+def llm_cache_stats():
+    """LLM 응답 캐시 통계 (호출 위치별 적중률, 절약 시간)"""
+    cache = get_llm_cache()
+    return cache.stats() if cache else {"enabled": False}
+
+@app.get("/llm/stats")
+def llm_stats():
+    """LLM 게이트웨이 통계 (호출 위치별 요청·재시도·오류, 토큰 수, 지연, 슬롯 대기)"""
+    return llm_gateway_stats()
+
+@app.get("/cache/embeddings")
+def embedding_cache_stats():
+    """임베딩 공유 캐시 통계 (모델별 적중률, 저장된 청크 수)"""
+    from embedding_cache import get_embedding_function, CachedEmbeddingFunction
+    ef = get_embedding_function()
+    return ef.stats() if isinstance(ef, CachedEmbeddingFunction) else {"enabled": False}
+
+@app.get("/cache/query")
+def query_cache_stats(project_id: str = DEFAULT_PROJECT_ID):
+    """질의 임베딩·검색 결과 캐시 통계 (프로젝트 색인별, 적중률은 PerformanceMonitor 누적)"""
+    from project_index import get_project_collection
+    from query_cache import get_query_cache
+    cache = get_query_cache(get_project_collection(_project_id(project_id)))
+    return cache.stats() if cache else {"enabled": False}
+
 
 if __name__ == "__main__":
     print("\n" + "=" * 70)
@@ -492,10 +1048,14 @@ if __name__ == "__main__":
     print("   URL: https://yvfe7u20ltb89m-8888.proxy.runpod.net")
     print("   API 문서: https://yvfe7u20ltb89m-8888.proxy.runpod.net/docs")
     print("\n💡 사용법:")
+    print("   0. 모든 요청에 ?project_id= 로 프로젝트 구분 (생략 시 default)")
     print("   1. POST /upload - 파일 업로드")
     print("   2. POST /analyze - 분석 시작 (비동기, task_id 반환)")
-    print("   3. GET  /analyze/status/{task_id} - 분석 결과 조회")
+    print("   3. GET  /analyze/events/{task_id} - 분석 진행 스트림 (SSE)")
+    print("      GET  /analyze/status/{task_id} - 분석 결과 조회")
+    print("      POST /analyze/cancel/{task_id} - 분석 취소")
     print("   4. POST /chat - 질문하기")
+    print("      POST /chat/stream - 답변 토큰 스트림 (SSE)")
     print("=" * 70 + "\n")
 
     uvicorn.run(app, host="0.0.0.0", port=8888)
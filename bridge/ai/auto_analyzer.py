@@ -7,24 +7,37 @@
 import json
 import os
 import glob
+import hashlib
 import re
+import sys
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import Callable, Iterator, List, Dict, Optional
 
-import chromadb
-from chromadb.utils import embedding_functions
-from openai import OpenAI
 from rank_bm25 import BM25Okapi
 import numpy as np
 
-# ============== 설정 ==============
-BASE_URL = "http://localhost:8000/v1"
-API_KEY = "EMPTY"
-MODEL_NAME = "mistralai/Mistral-Nemo-Instruct-2407"
+from llm_gateway import get_llm_gateway
+from chunk_writer import ChunkBatchWriter, ChunkWriteError
+from project_index import (
+    get_project_collection, chunk_metadata, mark_updated, delete_chunks, index_write_lock,
+    DEFAULT_PROJECT_ID
+)
+
+# 상위 디렉토리(bridge)를 sys.path에 추가하여 core.manifest 접근
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core.manifest import ProjectManifest
 
-CHROMA_DB_PATH = "./chroma_db_auto"
+# ============== 설정 ==============
 DATA_DIR = "./my_data"
 OUTPUT_DIR = "./outputs"
+
+# 요약 생성 동시성 (vLLM은 동시에 들어온 요청을 내부에서 배치 처리)
+SUMMARY_CONCURRENCY = 8          # 동시에 보내는 요약 요청 수 상한 (1이면 순차)
+SUMMARY_TIMEOUT = 60             # 요청당 타임아웃(초)
+SUMMARY_MAX_RETRIES = 2          # 실패 시 재시도 횟수 (백오프는 llm_gateway.LLM_RETRY_BACKOFF)
 # =================================
 
 
@@ -59,8 +72,12 @@ PUBLIC_INSTITUTION_GUIDELINES = """
 """
 
 
+class AnalysisCancelled(Exception):
+    """cancel_event 로 분석이 중단됨"""
+
+
 class DocumentAnalyzer:
-    """문서 자동 분석기"""
+    """문서 자동 분석기 (분석 한 건마다 새로 만들어 쓰면 files_data 등 상태가 섞이지 않음)"""
     
     # 문서 유형별 페이즈 매핑
     DOC_TYPE_TO_PHASE = {
@@ -77,12 +94,23 @@ class DocumentAnalyzer:
         "결산": "close"
     }
     
-    def __init__(self, base_url: Optional[str] = None):
-        self.base_url = base_url or BASE_URL
-        self.client = OpenAI(base_url=self.base_url, api_key=API_KEY)
+    def __init__(self, base_url: Optional[str] = None, summary_concurrency: Optional[int] = None,
+                 cancel_event: Optional[threading.Event] = None,
+                 project_id: str = DEFAULT_PROJECT_ID, data_dir: Optional[str] = None):
+        self.llm = get_llm_gateway(base_url)  # 서버별 공유 LLM 게이트웨이 (연결 풀·동시성 상한 공유)
+        self.base_url = self.llm.base_url
+        self.project_id = project_id  # 색인할 프로젝트 컬렉션
+        self.data_dir = data_dir or DATA_DIR  # 분석할 문서 폴더
+        self.summary_concurrency = max(1, summary_concurrency or SUMMARY_CONCURRENCY)
+        self.refresh_llm_cache = False  # True면 LLM 응답 캐시를 읽지 않고 새로 생성 (결과는 캐시 갱신)
         self.collection = None
         self.files_data = []
+        self.cancel_event = cancel_event  # 세워지면 다음 파일·항목 경계에서 AnalysisCancelled
         
+    def _check_cancelled(self):
+        if self.cancel_event is not None and self.cancel_event.is_set():
+            raise AnalysisCancelled("분석이 취소되었습니다.")
+    
     def setup(self):
         """시스템 초기화"""
         print("=" * 70)
@@ -92,21 +120,15 @@ class DocumentAnalyzer:
         # 서버 연결 확인
         print("[1/3] vLLM 서버 연결 확인...", end="", flush=True)
         try:
-            self.client.models.list()
+            self.llm.list_models()
             print(" ✅")
         except Exception as e:
             print(f" ❌\n{e}")
             return False
         
-        # ChromaDB 설정
+        # ChromaDB 설정 (채팅과 같은 프로젝트 색인에 기록)
         print("[2/3] ChromaDB 초기화...", end="", flush=True)
-        ko_embedding = embedding_functions.SentenceTransformerEmbeddingFunction(
-            model_name="jhgan/ko-sroberta-multitask"
-        )
-        db_client = chromadb.PersistentClient(path=CHROMA_DB_PATH)
-        self.collection = db_client.get_or_create_collection(
-            "auto_analysis", embedding_function=ko_embedding
-        )
+        self.collection = get_project_collection(self.project_id)
         print(" ✅")
         
         # 출력 폴더 생성
@@ -115,33 +137,71 @@ class DocumentAnalyzer:
         print("[3/3] 준비 완료!")
         return True
     
-    def analyze_all(self) -> Dict:
-        """모든 문서 자동 분석하여 JSON 생성"""
+    def analyze_all(self, on_progress: Optional[Callable[[Dict], None]] = None) -> Dict:
+        """
+        모든 문서 자동 분석하여 JSON 생성
+
+        Args:
+            on_progress: 진행 이벤트 콜백 (선택) — iter_analysis() 의 이벤트 중 "result" 를 제외하고 전달
+        """
+        project_data = {}
+        events = self.iter_analysis()
+        try:
+            for event in events:
+                if event["stage"] == "result":
+                    project_data = event["result"]
+                elif on_progress:
+                    on_progress(event)
+        finally:
+            events.close()  # 중간에 예외가 나도 색인 쓰기 잠금·요약 풀을 바로 정리
+        return project_data
+    
+    def iter_analysis(self) -> Iterator[Dict]:
+        """
+        분석 결과를 준비되는 대로 내보내는 스트리밍 모드
+
+        Yields:
+            - {"stage": "file", "index", "total", "name", "ok", "file"?}
+                파일 하나 분석 완료. 성공 시 file 에 요약·키워드·당사자 등 파일 정보
+            - {"stage": "build", "fileCount"}: 프로젝트 구조 생성 시작
+            - {"stage": "section", "key", "value"}: summary 항목 하나 완성
+                (timeline → issues → decisions → guidelines → keyFiles → overview 순)
+            - {"stage": "result", "result"}: 최종 프로젝트 JSON (analyze_all 반환값과 동일, 마지막에 한 번)
+        """
         print("\n📂 문서 분석 시작...")
         
-        # 1. 문서 로드 및 파싱
-        self._load_and_parse_documents()
+        # 1. 문서 로드 및 파싱 (파일마다 바로 전달)
+        yield from self._iter_parse_documents()
         
         if not self.files_data:
             print("⚠️ 분석할 문서가 없습니다. my_data/ 폴더에 파일을 넣어주세요.")
-            return {}
+            yield {"stage": "result", "result": {}}
+            return
         
-        # 2. 구조화된 데이터 생성
-        project_data = self._build_project_structure()
+        # 2. 구조화된 데이터 생성 (항목마다 바로 전달)
+        yield {"stage": "build", "fileCount": len(self.files_data)}
+        project_data = None
+        for key, value in self._iter_project_structure():
+            self._check_cancelled()
+            if key == "project":
+                project_data = value
+            else:
+                yield {"stage": "section", "key": key, "value": value}
         
         # 3. JSON 저장
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        filename = f"{OUTPUT_DIR}/analysis_{timestamp}.json"
+        prefix = "analysis" if self.project_id == DEFAULT_PROJECT_ID else f"analysis_{self.project_id}"
+        filename = f"{OUTPUT_DIR}/{prefix}_{timestamp}.json"
         
         with open(filename, 'w', encoding='utf-8') as f:
             json.dump(project_data, f, ensure_ascii=False, indent=2)
         
         print(f"\n✅ 분석 완료! JSON 저장됨: {filename}")
         
-        return project_data
+        yield {"stage": "result", "result": project_data}
     
-    def _load_and_parse_documents(self):
-        """문서 로드 및 파싱"""
+    def _iter_parse_documents(self) -> Iterator[Dict]:
+        """문서 로드 및 파싱 (파일 하나 끝날 때마다 "file" 이벤트)"""
         from local_rag import (
             read_pdf, read_docx, read_excel, read_hwp, read_hwpx,
             read_text_file, split_text
@@ -153,50 +213,139 @@ class DocumentAnalyzer:
             ".txt": read_text_file, ".md": read_text_file
         }
         
-        if not os.path.exists(DATA_DIR):
-            os.makedirs(DATA_DIR)
+        if not os.path.exists(self.data_dir):
+            os.makedirs(self.data_dir)
             return
         
-        all_files = glob.glob(os.path.join(DATA_DIR, "*.*"))
+        all_files = sorted(
+            p for p in glob.glob(os.path.join(self.data_dir, "*.*"))
+            if os.path.splitext(p)[1].lower() in loaders
+        )
         self.files_data = []
-        
-        for idx, file_path in enumerate(all_files):
-            ext = os.path.splitext(file_path)[1].lower()
-            if ext not in loaders:
-                continue
-            
-            try:
-                content = loaders[ext](file_path)
-                if not content or len(content.strip()) < 10:
-                    continue
-                
-                filename = os.path.basename(file_path)
-                file_id = f"file-{idx + 1}"
+        total = len(all_files)
+        done = 0
+        
+        def file_event(name: str, doc_info: Optional[Dict] = None) -> Dict:
+            nonlocal done
+            done += 1
+            event = {"stage": "file", "index": done, "total": total, "name": name, "ok": doc_info is not None}
+            if doc_info is not None:
+                event["file"] = doc_info
+            return event
+        
+        def finish(name: str, doc_info: Optional[Dict], summary_future) -> Dict:
+            if doc_info is None:
+                return file_event(name)
+            if summary_future is not None:
+                doc_info["summary"] = summary_future.result()
+            self.files_data.append(doc_info)
+            print(f"   ✅ {name}")
+            return file_event(name, doc_info)
+        
+        # 같은 프로젝트 색인에 쓰는 다른 분석이 있으면 끝날 때까지 대기 (프로젝트 구조 생성은 잠금 밖)
+        with index_write_lock(self.collection):
+            # 매니페스트와 비교해 추가/수정된 파일만 다시 읽고 색인, 나머지는 기록된 분석 결과 재사용
+            manifest = ProjectManifest.load(self.data_dir, namespace=self.collection.name)
+            if manifest.entries and self.collection.count() == 0:
+                manifest.entries = {}  # 컬렉션이 비워졌으면 매니페스트도 무효
+            first_run = not manifest.entries
+            diff = manifest.diff(all_files)
+            if self.refresh_llm_cache:
+                # 요약을 새로 만들어야 하므로 전부 다시 분석
+                diff["modified"] += diff["unchanged"]
+                diff["unchanged"] = []
+            unchanged = set(diff["unchanged"])
+            added = set(diff["added"])
+            print(f"   매니페스트 비교: 추가 {len(diff['added'])}, 수정 {len(diff['modified'])}, "
+                  f"삭제 {len(diff['removed'])}, 유지 {len(diff['unchanged'])}")
+
+            # 수정/삭제된 파일의 기존 청크만 id 로 제거
+            stale_ids = []
+            for file_path in diff["modified"] + diff["removed"]:
+                stale_ids.extend(manifest.forget(file_path))
+            delete_chunks(self.collection, ids=stale_ids)
+
+            # 파일 읽기·규칙 기반 추출은 순서대로, LLM 요약은 풀에서 최대 summary_concurrency 개씩 동시에.
+            # 청크 임베딩·저장은 writer 가 여러 파일분을 모아 백그라운드에서.
+            # 결과는 파일 순서대로 내보내되, 앞 파일의 요약이 끝나는 즉시 내보낸다.
+            pending = deque()  # (파일명, doc_info | None, 요약 future | None)
+            indexed = {}       # 이번에 다시 분석한 파일 경로 → (청크 id, doc_info | None)
+            with self._summary_pool() as pool, ChunkBatchWriter(self.collection) as writer:
+                for file_path in all_files:
+                    try:
+                        self._check_cancelled()
+                    except AnalysisCancelled:
+                        for _, _, future in pending:
+                            if future is not None:
+                                future.cancel()  # 아직 시작하지 않은 요약 요청은 보내지 않음
+                        raise
+                    ext = os.path.splitext(file_path)[1].lower()
+                    filename = os.path.basename(file_path)
+                    if file_path in unchanged:
+                        info = manifest.info(file_path)
+                        pending.append((filename, dict(info) if info else None, None))
+                    else:
+                        try:
+                            content = loaders[ext](file_path)
+                            if not content or len(content.strip()) < 10:
+                                indexed[file_path] = ([], None)
+                                pending.append((filename, None, None))
+                            else:
+                                # 파일 이름 기반 id — 다른 파일이 추가/삭제돼도 기존 청크의 fileId 가 그대로 유효
+                                file_id = "file-" + hashlib.sha1(filename.encode("utf-8")).hexdigest()[:8]
+
+                                # 문서 분석 (요약은 비동기)
+                                doc_info = self._analyze_single_document(
+                                    file_id, filename, content, summarize=False
+                                )
+                                future = self._submit_summary(pool, content)
+
+                                # 프로젝트 색인에 저장 (검색·채팅용)
+                                chunks = split_text(content, chunk_size=1500, overlap=300)
+                                chunk_ids = [f"{filename}_chunk_{j}" for j in range(len(chunks))]
+                                if file_path in added:
+                                    # 매니페스트에 없던 파일 — 이전 방식으로 남은 같은 이름의 청크 먼저 삭제
+                                    writer.delete_source(filename)
+                                writer.add(
+                                    ids=chunk_ids,
+                                    documents=chunks,
+                                    metadatas=[chunk_metadata(file_id, filename, j, c) for j, c in enumerate(chunks)]
+                                )
+                                indexed[file_path] = (chunk_ids, doc_info)
+                                pending.append((filename, doc_info, future))
+
+                        except ChunkWriteError:
+                            raise  # 색인 기록 실패는 파일 하나가 아니라 분석 전체 실패 (이전 청크가 이미 지워졌을 수 있음)
+                        except Exception as e:
+                            print(f"   ❌ {filename}: {e}")
+                            pending.append((filename, None, None))  # 기록하지 않아 다음 분석에서 재시도
                 
-                # 문서 분석
-                doc_info = self._analyze_single_document(
-                    file_id, filename, content
-                )
-                
-                self.files_data.append(doc_info)
-                print(f"   ✅ {filename}")
-                
-                # ChromaDB에 저장 (검색용)
-                chunks = split_text(content, chunk_size=1500, overlap=300)
-                for j, chunk in enumerate(chunks):
-                    self.collection.upsert(
-                        documents=[chunk],
-                        metadatas=[{"fileId": file_id, "source": filename}],
-                        ids=[f"{filename}_chunk_{j}"]
-                    )
-                    
-            except Exception as e:
-                print(f"   ❌ {os.path.basename(file_path)}: {e}")
+                    while pending and (pending[0][2] is None or pending[0][2].done()):
+                        yield finish(*pending.popleft())
+            
+                # 남은 요약은 순서대로 기다리며 내보내기
+                while pending:
+                    yield finish(*pending.popleft())
+            # (with 종료 시 남은 청크까지 기록 완료 → 이제 매니페스트에 청크 id 기록)
+
+            for file_path, (chunk_ids, doc_info) in indexed.items():
+                manifest.record(file_path, chunk_ids, doc_info)
+            if first_run:
+                # 매니페스트가 없던 색인 — 폴더에 없는 파일의 청크가 남아 있을 수 있으므로 한 번 정리
+                sources = sorted(os.path.basename(p) for p in all_files)
+                if sources:
+                    delete_chunks(self.collection, where={"source": {"$nin": sources}})
+                else:
+                    delete_chunks(self.collection, ids=self.collection.get(include=[])["ids"])
+            manifest.save()
+            if indexed or stale_ids:
+                mark_updated(self.collection)
         
         print(f"\n   📚 총 {len(self.files_data)}개 파일 분석 완료")
     
-    def _analyze_single_document(self, file_id: str, filename: str, content: str) -> Dict:
-        """단일 문서 분석"""
+    def _analyze_single_document(self, file_id: str, filename: str, content: str,
+                                 summarize: bool = True) -> Dict:
+        """단일 문서 분석 (summarize=False 면 summary 는 None — 호출자가 따로 채움)"""
         
         # 문서 유형 추론
         doc_type = self._infer_doc_type(filename, content)
@@ -214,7 +363,7 @@ class DocumentAnalyzer:
         keywords = self._extract_keywords(content)
         
         # 요약 생성 (content는 포함하지 않음 - 프론트엔드 스펙)
-        summary = self._generate_summary(content[:2000])
+        summary = self._generate_summary(content[:2000]) if summarize else None
         
         return {
             "id": file_id,
@@ -319,50 +468,77 @@ class DocumentAnalyzer:
         return keywords[:10]
     
     def _generate_summary(self, content: str) -> str:
-        """AI 요약 생성"""
+        """AI 요약 생성 (요청당 타임아웃, 재시도는 게이트웨이가 지수 백오프로, 최종 실패 시 앞부분 발췌)"""
         try:
-            response = self.client.chat.completions.create(
-                model=MODEL_NAME,
+            return self.llm.chat(
+                "summary",
                 messages=[
                     {"role": "system", "content": "문서의 핵심 내용을 1-2문장으로 요약하세요. 금액이 있으면 포함하세요."},
                     {"role": "user", "content": content}
                 ],
+                timeout=SUMMARY_TIMEOUT,
+                max_retries=SUMMARY_MAX_RETRIES,
+                bypass=self.refresh_llm_cache,
                 max_tokens=100,
                 temperature=0.0
-            )
-            return response.choices[0].message.content.strip()
-        except:
+            ).strip()
+        except Exception as e:
+            print(f"   ⚠️ 요약 실패 ({type(e).__name__}) → 발췌로 대체")
             return content[:100] + "..."
     
-    def _build_project_structure(self) -> Dict:
-        """프론트엔드 스펙에 맞는 구조 생성"""
+    def _summary_pool(self) -> ThreadPoolExecutor:
+        """요약 요청용 풀 (최대 summary_concurrency 개씩 동시에)"""
+        return ThreadPoolExecutor(max_workers=self.summary_concurrency, thread_name_prefix="summary")
+    
+    def _submit_summary(self, pool: ThreadPoolExecutor, content: str) -> Future:
+        """문서 앞부분 요약을 풀에 제출"""
+        return pool.submit(self._generate_summary, content[:2000])
+    
+    def summarize_many(self, contents: List[str]) -> List[str]:
+        """
+        여러 문서 요약을 분석과 같은 풀·제출 경로로 생성 (입력 순서대로 반환)
+        bench_summary.py 가 분석 경로의 요약 동시성을 재는 데 쓴다.
+        """
+        with self._summary_pool() as pool:
+            futures = [self._submit_summary(pool, c) for c in contents]
+            return [future.result() for future in futures]
+    
+    def _iter_project_structure(self) -> Iterator[tuple]:
+        """
+        프론트엔드 스펙에 맞는 구조 생성 — summary 항목을 만드는 즉시 (key, value) 로 내보내고
+        마지막에 ("project", 전체 구조) 를 내보낸다. LLM 을 쓰는 overview 는 가장 나중에 생성.
+        """
 
         # 1. 파일을 폴더 구조로 그룹화
         folders = self._group_files_by_phase()
 
         # 2. 타임라인 생성
         timeline = self._build_timeline()
+        yield "timeline", timeline
 
         # 3. 이슈 분석
         issues = self._analyze_issues()
+        yield "issues", issues
 
-        # 4. 프로젝트명 추론
-        project_name = self._infer_project_name()
-
-        # 5. overview 생성
-        overview = self._build_overview(project_name)
-
-        # 6. 의사결정 추출
+        # 4. 의사결정 추출
         decisions = self._extract_decisions()
+        yield "decisions", decisions
 
-        # 7. 가이드라인 생성
+        # 5. 가이드라인 생성
         guidelines = self._build_guidelines()
+        yield "guidelines", guidelines
 
-        # 8. 주요 문서 선정
+        # 6. 주요 문서 선정
         key_files = self._select_key_files()
+        yield "keyFiles", key_files
+
+        # 7. 프로젝트명 추론 + overview 생성 (LLM)
+        project_name = self._infer_project_name()
+        overview = self._build_overview(project_name)
+        yield "overview", overview
 
         # 최종 구조 (프론트엔드 전체 스펙 준수)
-        return {
+        yield "project", {
             "id": f"proj-{datetime.now().strftime('%Y%m%d%H%M%S')}",
             "name": project_name,
             "fileCount": len(self.files_data),
@@ -469,16 +645,16 @@ class DocumentAnalyzer:
                 f"- {f['name']} ({f.get('docType', '일반')}): {f.get('summary', '')[:60]}"
                 for f in self.files_data[:10]
             )
-            response = self.client.chat.completions.create(
-                model=MODEL_NAME,
+            description = self.llm.chat(
+                "overview",
                 messages=[
                     {"role": "system", "content": "문서 목록을 보고 이 업무/프로젝트를 2~3문장으로 설명하세요. 한국어로 답하세요."},
                     {"role": "user", "content": f"프로젝트: {project_name}\n\n문서 목록:\n{file_list}"}
                 ],
+                bypass=self.refresh_llm_cache,
                 max_tokens=150,
                 temperature=0.0
-            )
-            description = response.choices[0].message.content.strip()
+            ).strip()
         except Exception:
             description = f"{len(self.files_data)}개 문서로 구성된 업무입니다."
 
@@ -629,8 +805,8 @@ class DocumentAnalyzer:
         
         # AI 응답
         try:
-            response = self.client.chat.completions.create(
-                model=MODEL_NAME,
+            answer = self.llm.chat(
+                "query",
                 messages=[
                     {"role": "system", "content": f"인수인계 전문가입니다.\n{PUBLIC_INSTITUTION_GUIDELINES}"},
                     {"role": "user", "content": f"참고:\n{context}\n\n질문: {question}"}
@@ -640,7 +816,7 @@ class DocumentAnalyzer:
             
             return {
                 "question": question,
-                "answer": response.choices[0].message.content,
+                "answer": answer,
                 "sources": [m.get("source") for m in results['metadatas'][0]]
             }
         except Exception as e:
@@ -0,0 +1,150 @@
+"""
+검색 결과 조립 벤치마크 (DocStore vs 리스트 + list.index)
+
+가짜 공공기관 문서 청크를 N 개 만들어
+- 메모리: id/본문/메타데이터를 리스트로 들고 있을 때와 DocStore 에 넣었을 때 (tracemalloc)
+- 조립 시간: 상위 k 개 id → (본문, 메타데이터) 를 list.index 로 찾을 때와 DocStore 로 찾을 때
+를 비교한다.
+
+실행:
+    python bench_doc_store.py
+    python bench_doc_store.py --sizes 1000,10000,100000 --chars 1500 --k 10
+"""
+import argparse
+import gc
+import itertools
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from doc_store import DocStore
+
+COMMON_WORDS = [
+    "예산", "집행", "계약", "용역", "결산", "사업", "추진", "계획", "보고", "검토", "승인", "변경",
+    "담당자", "인수인계", "규정", "지침", "공고", "입찰", "낙찰", "정산", "회계", "감사", "민원", "처리",
+]
+DOC_TYPES = ["budget", "contract", "regulation", "general"]
+JOSA = ["을", "를", "은", "는", "의", "에", "에서", "으로", "과", ""]
+
+
+def make_vocabulary(size: int = 3000):
+    """자주 쓰는 업무 용어 + 무작위 음절 조합 단어 (앞쪽일수록 자주 등장, Zipf)"""
+    rng = random.Random(42)
+    syllables = [chr(0xAC00 + rng.randrange(11172)) for _ in range(400)]
+    words = list(COMMON_WORDS)
+    while len(words) < size:
+        words.append("".join(rng.choice(syllables) for _ in range(rng.randint(2, 4))))
+    cum_weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(words))))
+    return words, cum_weights
+
+
+WORDS, CUM_WEIGHTS = make_vocabulary()
+
+
+def make_chunk(rng: random.Random, i: int, chars: int):
+    parts, length = [], 0
+    while length < chars:
+        word = rng.choices(WORDS, cum_weights=CUM_WEIGHTS)[0] + rng.choice(JOSA)
+        if rng.random() < 0.15:
+            word = f"{rng.randint(1, 999):,}원"
+        parts.append(word)
+        length += len(word) + 1
+    text = " ".join(parts)[:chars]
+    file_no = i // 8  # 파일 하나에 청크 8개
+    meta = {
+        "fileId": f"file-{file_no + 1}",
+        "source": f"문서_{file_no:05d}.hwp",
+        "docType": DOC_TYPES[file_no % 4],
+        "chunk": i % 8,
+        "date": f"2024-{file_no % 12 + 1:02d}-{file_no % 28 + 1:02d}" if file_no % 3 else "",
+    }
+    return f"문서_{file_no:05d}.hwp_chunk_{i % 8}", text, meta
+
+
+def fresh(value):
+    """collection.get() 이 돌려주는 것처럼 새 객체로 복사 (같은 문자열 객체를 공유하지 않도록)"""
+    if isinstance(value, str):
+        return value.encode("utf-8").decode("utf-8")
+    if isinstance(value, dict):
+        return {k: fresh(v) for k, v in value.items()}
+    return value
+
+
+def measure(build):
+    gc.collect()
+    tracemalloc.start()
+    obj = build()
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return obj, size
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="1000,10000,100000")
+    parser.add_argument("--chars", type=int, default=1500, help="청크 하나의 글자 수")
+    parser.add_argument("--k", type=int, default=10, help="검색 결과 개수")
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    print("=" * 78)
+    print(f"📊 문서 저장소 벤치마크 (청크 {args.chars}자, 결과 {args.k}개)")
+    print("=" * 78)
+    print(f"{'청크 수':>8} | {'리스트 MB':>9} | {'DocStore MB':>11} | {'절감':>5} | "
+          f"{'list.index ms':>13} | {'DocStore ms':>11}")
+
+    for n in [int(x) for x in args.sizes.split(",")]:
+        rng = random.Random(0)
+        corpus = [make_chunk(rng, i, args.chars) for i in range(n)]
+
+        def build_lists():
+            ids, docs, metas = [], [], []
+            for doc_id, text, meta in corpus:
+                ids.append(fresh(doc_id))
+                docs.append(fresh(text))
+                metas.append(fresh(meta))
+            return ids, docs, metas
+
+        def build_store():
+            store = DocStore()
+            for doc_id, text, meta in corpus:
+                store.add([fresh(doc_id)], [fresh(text)], [fresh(meta)])
+            return store
+
+        (ids, docs, metas), list_bytes = measure(build_lists)
+        store, store_bytes = measure(build_store)
+
+        rng = random.Random(1)
+        queries = [rng.sample(ids, args.k) for _ in range(args.queries)]
+
+        t0 = time.perf_counter()
+        for hits in queries:
+            list_results = []
+            for doc_id in hits:
+                idx = ids.index(doc_id)
+                list_results.append((docs[idx], metas[idx]))
+        list_ms = (time.perf_counter() - t0) / args.queries * 1000
+
+        t0 = time.perf_counter()
+        for hits in queries:
+            store_results = [store.get(doc_id) for doc_id in hits]
+        store_ms = (time.perf_counter() - t0) / args.queries * 1000
+
+        # 같은 결과인지 확인 (빈 date 는 DocStore 에서도 "" 로 보존)
+        assert store_results == list_results, "조립 결과 불일치"
+
+        print(f"{n:>8} | {list_bytes / 1048576:>9.1f} | {store_bytes / 1048576:>11.1f} | "
+              f"{1 - store_bytes / list_bytes:>5.0%} | {list_ms:>13.3f} | {store_ms:>11.3f}")
+
+        del corpus, ids, docs, metas, store
+
+    print("\n✅ 두 방식의 조립 결과 동일")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+"""
+하이브리드 병합 방식 × 후보 깊이 벤치마크
+
+가짜 공공기관 문서 청크와 세 종류의 질의로 벡터·BM25 가 서로 다른 질의에 강하도록 만든다.
+- 어휘 질의   : 청크의 주제어를 다른 조사로 ("정산보고서는 …")  → 둘 다 잘 찾음
+- 복합어 질의 : 복합명사의 뒷부분만 ("보고서 관련 …")         → BM25(bigram) 만 찾음
+- 동의어 질의 : 주제어의 동의어 ("결산서류 …")                → 벡터만 찾음
+임베딩은 단어 벡터의 idf 가중 합 (동의어는 거의 같은 벡터), 벡터 검색은 실제 Chroma(HNSW) 컬렉션.
+
+병합 방식(legacy / rrf / weighted / distance / 단독) × 소스별 후보 깊이를 바꿔가며
+recall@n 과 검색 전체(벡터 질의 + BM25 + 병합) p50/p95 지연을 출력하고,
+최고 재현율에서 0.01 이내인 설정 중 가장 빠른 것을 추천한다.
+
+실행:
+    python bench_fusion.py
+    python bench_fusion.py --docs 20000 --depths 5,10,20,40,80
+"""
+import argparse
+import itertools
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+import chromadb
+
+from bm25_index import BM25Index
+from bm25_tokenizer import TOKENIZERS, strip_josa
+from fusion import fuse
+
+JOSA = ["을", "를", "은", "는", "이", "가", "의", "에", "에서", "으로", "과", "와", "도", ""]
+DIM = 64
+
+
+def make_words(rng: random.Random, size: int):
+    syllables = [chr(0xAC00 + rng.randrange(11172)) for _ in range(600)]
+    words, seen = [], set()
+    while len(words) < size:
+        word = "".join(rng.choice(syllables) for _ in range(rng.randint(2, 3)))
+        if word not in seen:
+            seen.add(word)
+            words.append(word)
+    return words
+
+
+class Corpus:
+    def __init__(self, n_docs: int, words_per_doc: int, seed: int = 0):
+        rng = random.Random(seed)
+        words = make_words(rng, 3000 + n_docs * 8)
+        common, rare = words[:3000], words[3000:]
+        cum = list(itertools.accumulate(1 / (r + 1) for r in range(len(common))))
+
+        self.docs, self.queries, self.answers, self.kinds = [], [], [], []
+        self.synonyms = {}
+        for d in range(n_docs):
+            topic = rare[d * 8:d * 8 + 4]
+            syn = rare[d * 8 + 4:d * 8 + 6]  # 동의어: 이 청크에는 나오지 않는 단어
+            self.synonyms[syn[0]], self.synonyms[syn[1]] = topic[0], topic[1]
+            compound = topic[2] + topic[3]
+            parts = []
+            for _ in range(words_per_doc):
+                r = rng.random()
+                if r < 0.03:
+                    word = rng.choice(topic[:2])
+                elif r < 0.05:
+                    word = compound
+                else:
+                    word = rng.choices(common, cum_weights=cum)[0]
+                parts.append(word + rng.choice(JOSA))
+            self.docs.append(" ".join(parts))
+
+            for kind, text in (
+                ("어휘", f"{topic[0]}{rng.choice(JOSA)} {topic[1]}{rng.choice(JOSA)} 알려줘"),
+                ("복합어", f"{topic[3]}{rng.choice(JOSA)} 관련 내용 정리해줘"),
+                ("동의어", f"{syn[0]}{rng.choice(JOSA)} {syn[1]}{rng.choice(JOSA)} 설명해줘"),
+            ):
+                self.queries.append(text)
+                self.answers.append(d)
+                self.kinds.append(kind)
+
+        # 단어 벡터 (동의어는 원래 단어 벡터 + 작은 잡음)
+        self._rng = np.random.default_rng(seed)
+        self._vectors = {}
+        df = {}
+        for doc in self.docs:
+            for stem in set(self.stems(doc)):
+                df[stem] = df.get(stem, 0) + 1
+        self._idf = {w: np.log(1 + n_docs / c) for w, c in df.items()}
+        self._default_idf = np.log(1 + n_docs)
+
+    def stems(self, text: str):
+        return [strip_josa(w) for w in text.split()]
+
+    def _vector(self, word: str) -> np.ndarray:
+        vec = self._vectors.get(word)
+        if vec is None:
+            if word in self.synonyms:
+                base = self._vector(self.synonyms[word])
+                vec = base + 0.3 * self._rng.standard_normal(DIM) / np.sqrt(DIM)
+            else:
+                vec = self._rng.standard_normal(DIM) / np.sqrt(DIM)
+            self._vectors[word] = vec
+        return vec
+
+    def embed(self, text: str) -> list:
+        total = np.zeros(DIM)
+        for stem in self.stems(text):
+            total += self._idf.get(stem, self._default_idf) * self._vector(stem)
+        norm = np.linalg.norm(total)
+        return (total / norm if norm else total).astype(np.float32).tolist()
+
+
+def legacy_v3(vector_hits, bm25_hits, n):
+    """기존 v3 병합: 벡터 0.7/(1+순위) + BM25 최댓값 정규화 0.3"""
+    combined = {doc_id: 0.7 / (1 + i) for i, (doc_id, _) in enumerate(vector_hits)}
+    top = max((s for _, s in bm25_hits), default=0)
+    for doc_id, s in bm25_hits:
+        combined[doc_id] = combined.get(doc_id, 0) + 0.3 * s / top
+    return sorted(combined.items(), key=lambda x: x[1], reverse=True)[:n]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--docs", type=int, default=5000)
+    parser.add_argument("--words", type=int, default=200)
+    parser.add_argument("--queries", type=int, default=600)
+    parser.add_argument("--n", type=int, default=5, help="최종 결과 개수 (recall@n)")
+    parser.add_argument("--depths", default="5,10,20,40")
+    args = parser.parse_args()
+
+    print("⏳ 코퍼스·색인 준비 중...")
+    corpus = Corpus(args.docs, args.words)
+    ids = [f"chunk_{i}" for i in range(len(corpus.docs))]
+
+    client = chromadb.EphemeralClient()
+    collection = client.create_collection("bench_fusion")
+    for i in range(0, len(ids), 2000):
+        collection.add(
+            ids=ids[i:i + 2000],
+            embeddings=[corpus.embed(doc) for doc in corpus.docs[i:i + 2000]],
+        )
+    bm25 = BM25Index(tokenizer=TOKENIZERS["ko_bigram"])
+    bm25.add(ids, corpus.docs)
+
+    rng = random.Random(1)
+    picked = rng.sample(range(len(corpus.queries)), min(args.queries, len(corpus.queries)))
+    query_vectors = {q: corpus.embed(corpus.queries[q]) for q in picked}
+
+    strategies = [("vector", None), ("bm25", None), ("legacy", None),
+                  ("rrf", "rrf"), ("weighted", "weighted"), ("distance", "distance")]
+    depths = [int(x) for x in args.depths.split(",")]
+
+    print("=" * 92)
+    print(f"📊 병합 벤치마크 (청크 {len(ids)}개, 질의 {len(picked)}개, recall@{args.n})")
+    print("=" * 92)
+    print(f"{'방식':>9} | {'깊이':>4} | {'전체':>5} | {'어휘':>5} | {'복합어':>5} | {'동의어':>5} | "
+          f"{'p50 ms':>7} | {'p95 ms':>7}")
+
+    rows = []
+    for (label, method), depth in itertools.product(strategies, depths):
+        if label == "legacy" and depth != depths[0]:
+            continue  # 기존 방식은 깊이 2n 고정
+        vector_k = 2 * args.n if label == "legacy" else max(args.n, depth)
+        bm25_k = 2 * args.n if label == "legacy" else max(args.n, depth)
+
+        hits_by_kind, total_by_kind, latencies = {}, {}, []
+        for q in picked:
+            t0 = time.perf_counter()
+            vector_hits, bm25_hits = [], []
+            if label != "bm25":
+                res = collection.query(query_embeddings=[query_vectors[q]], n_results=vector_k,
+                                       include=["distances"])
+                vector_hits = list(zip(res["ids"][0], res["distances"][0]))
+            if label != "vector":
+                bm25_hits = bm25.search(corpus.queries[q], bm25_k)
+
+            if label == "vector":
+                ranked = [d for d, _ in vector_hits[:args.n]]
+            elif label == "bm25":
+                ranked = [d for d, _ in bm25_hits[:args.n]]
+            elif label == "legacy":
+                ranked = [d for d, _ in legacy_v3(vector_hits, bm25_hits, args.n)]
+            else:
+                ranked = [d for d, _ in fuse(vector_hits, bm25_hits, args.n, method)]
+            latencies.append((time.perf_counter() - t0) * 1000)
+
+            kind = corpus.kinds[q]
+            total_by_kind[kind] = total_by_kind.get(kind, 0) + 1
+            hits_by_kind[kind] = hits_by_kind.get(kind, 0) + (ids[corpus.answers[q]] in ranked)
+
+        recall = sum(hits_by_kind.values()) / len(picked)
+        p50, p95 = np.percentile(latencies, 50), np.percentile(latencies, 95)
+        per_kind = [hits_by_kind.get(k, 0) / total_by_kind[k] for k in ("어휘", "복합어", "동의어")]
+        shown_depth = "2n" if label == "legacy" else str(depth)
+        print(f"{label:>9} | {shown_depth:>4} | {recall:>5.2f} | {per_kind[0]:>5.2f} | {per_kind[1]:>5.2f} | "
+              f"{per_kind[2]:>5.2f} | {p50:>7.2f} | {p95:>7.2f}")
+        rows.append((label, shown_depth, recall, p50))
+
+    best = max(r[2] for r in rows)
+    ok = [r for r in rows if r[2] >= best - 0.01]
+    label, depth, recall, p50 = min(ok, key=lambda r: r[3])
+    print(f"\n✅ 추천: {label} (깊이 {depth}) — recall@{args.n} {recall:.2f} "
+          f"(최고 {best:.2f}), p50 {p50:.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+요약 동시성 벤치마크 (DocumentAnalyzer.summarize_many — 분석 경로와 같은 요약 풀·제출 함수 사용)
+
+로컬에 OpenAI 호환 가짜 서버(fake_llm.FakeLLMServer)를 띄워 vLLM처럼 동작시킨다.
+- 요청 하나당 고정 지연 (--latency)
+- 동시에 처리할 수 있는 요청 수 상한 (--batch, vLLM max_num_seqs 흉내)
+- N번째 요청마다 503 (--fail-every, 게이트웨이 재시도 경로 확인용)
+동시성 상한을 바꿔가며 처리량(docs/s)을 비교한다.
+(전체 동시 요청은 llm_gateway 의 LLM_MAX_CONCURRENCY 를 넘지 않음)
+
+실행:
+    python bench_summary.py
+    python bench_summary.py --docs 64 --latency 0.2 --batch 16 --fail-every 10
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import llm_cache
+import llm_gateway
+from auto_analyzer import DocumentAnalyzer
+from fake_llm import FakeLLMServer
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--docs", type=int, default=48)
+    parser.add_argument("--latency", type=float, default=0.2, help="요청당 지연(초)")
+    parser.add_argument("--batch", type=int, default=16, help="서버 동시 처리 상한")
+    parser.add_argument("--fail-every", type=int, default=10, help="N번째 요청마다 503 (0이면 끔)")
+    parser.add_argument("--levels", default="1,2,4,8,16,32")
+    args = parser.parse_args()
+
+    # 재시도 대기를 짧게 (벤치 시간 단축), 같은 문서를 반복 요약하므로 LLM 응답 캐시는 끔
+    llm_gateway.LLM_RETRY_BACKOFF = 0.05
+    llm_cache.LLM_CACHE_ENABLED = False
+
+    server = FakeLLMServer(args.latency, args.batch, args.fail_every)
+    contents = [f"문서 {i:03d} 본문입니다. 계약금액 {i * 1000}원." for i in range(args.docs)]
+
+    print("=" * 60)
+    print(f"📊 요약 동시성 벤치마크 (문서 {args.docs}개, 지연 {args.latency}s, "
+          f"서버 상한 {args.batch}, 실패 1/{args.fail_every or '∞'})")
+    print("=" * 60)
+    print(f"{'동시성':>6} | {'시간(s)':>8} | {'docs/s':>8} | {'배율':>6} | 요청/실패")
+
+    baseline = None
+    for level in [int(x) for x in args.levels.split(",")]:
+        analyzer = DocumentAnalyzer(base_url=server.url, summary_concurrency=level)
+        before, before_fail = server.requests, server.failures
+
+        t0 = time.perf_counter()
+        summaries = analyzer.summarize_many(contents)
+        elapsed = time.perf_counter() - t0
+
+        # 순서 보존 + 재시도로 모두 실제 요약을 받았는지 확인
+        assert summaries == [f"요약: {c[:20]}" for c in contents], "순서 또는 내용 불일치"
+
+        rate = args.docs / elapsed
+        baseline = baseline or rate
+        print(f"{level:>6} | {elapsed:>8.2f} | {rate:>8.1f} | {rate / baseline:>5.1f}x | "
+              f"{server.requests - before}/{server.failures - before_fail}")
+
+    server.close()
+    print("\n✅ 모든 동시성에서 입력 순서대로 실제 요약 반환 (503은 재시도로 복구)")
+
+
+if __name__ == "__main__":
+    main()
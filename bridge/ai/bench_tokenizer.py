@@ -0,0 +1,140 @@
+"""
+BM25 토크나이저 벤치마크 (simple vs ko_bigram)
+
+가짜 공공기관 문서 청크를 만들고, 청크마다 그 청크의 주제어를 "다른 조사"로 붙인 질의를 던진다.
+(문서: "정산보고서를 제출", 질의: "정산보고서는" / 복합명사 일부만: "보고서")
+- 재현율: 정답 청크가 상위 k 안에 드는 비율 (recall@1/5/10)
+- 지연: 토큰화 처리량(chunks/s), 질의 p50/p95 (ms), 어휘 크기
+- 토큰 캐시: 같은 청크를 다시 색인할 때 (캐시 없음 / 빈 캐시 / 채워진 캐시) 색인 시간
+
+실행:
+    python bench_tokenizer.py
+    python bench_tokenizer.py --docs 20000 --queries 500
+"""
+import argparse
+import itertools
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+
+from bm25_index import BM25Index
+from bm25_tokenizer import TOKENIZERS, TokenCache
+
+JOSA = ["을", "를", "은", "는", "이", "가", "의", "에", "에서", "으로", "과", "와", "도", "에게", ""]
+COMMON_WORDS = [
+    "예산", "집행", "계약", "용역", "결산", "사업", "추진", "계획", "보고", "검토", "승인", "변경",
+    "담당자", "인수인계", "규정", "지침", "공고", "입찰", "낙찰", "정산", "회계", "감사", "민원", "처리",
+]
+
+
+def make_words(rng: random.Random, size: int):
+    syllables = [chr(0xAC00 + rng.randrange(11172)) for _ in range(600)]
+    words = list(COMMON_WORDS)
+    seen = set(words)
+    while len(words) < size:
+        word = "".join(rng.choice(syllables) for _ in range(rng.randint(2, 3)))
+        if word not in seen:
+            seen.add(word)
+            words.append(word)
+    return words
+
+
+def make_corpus(n_docs: int, words_per_doc: int, seed: int = 0):
+    """(청크들, 질의들, 정답 청크 번호들)"""
+    rng = random.Random(seed)
+    words = make_words(rng, 4000)
+    common, rare = words[:1000], words[1000:]
+    cum = list(itertools.accumulate(1 / (r + 1) for r in range(len(common))))
+
+    docs, queries, answers = [], [], []
+    for d in range(n_docs):
+        # 청크의 주제어: 드문 단어 2개 + 드문 단어 두 개를 붙인 복합명사 1개
+        topic = rng.sample(rare, 4)
+        compound = topic[2] + topic[3]
+        parts = []
+        for _ in range(words_per_doc):
+            r = rng.random()
+            if r < 0.03:
+                word = rng.choice(topic[:2])
+            elif r < 0.05:
+                word = compound
+            elif r < 0.12:
+                word = f"{rng.randint(1, 999):,}원"
+                parts.append(word)
+                continue
+            else:
+                word = rng.choices(common, cum_weights=cum)[0]
+            parts.append(word + rng.choice(JOSA))
+        docs.append(" ".join(parts))
+
+        # 질의 1: 주제어 두 개를 다른 조사로 / 질의 2: 복합명사의 뒷부분만
+        queries.append(f"{topic[0]}{rng.choice(JOSA)} {topic[1]}{rng.choice(JOSA)} 알려줘")
+        answers.append(d)
+        queries.append(f"{topic[3]}{rng.choice(JOSA)} 관련 {topic[0]}{rng.choice(JOSA)} 정리해줘")
+        answers.append(d)
+    return docs, queries, answers
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--docs", type=int, default=5000)
+    parser.add_argument("--words", type=int, default=250, help="청크 하나의 어절 수")
+    parser.add_argument("--queries", type=int, default=400)
+    args = parser.parse_args()
+
+    docs, queries, answers = make_corpus(args.docs, args.words)
+    ids = [f"chunk_{i}" for i in range(len(docs))]
+    rng = random.Random(1)
+    picked = rng.sample(range(len(queries)), min(args.queries, len(queries)))
+
+    print("=" * 86)
+    print(f"📊 BM25 토크나이저 벤치마크 (청크 {len(docs)}개 × {args.words}어절, 질의 {len(picked)}개)")
+    print("=" * 86)
+    print(f"{'토크나이저':>10} | {'토큰화 ch/s':>11} | {'어휘 수':>8} | {'R@1':>5} | {'R@5':>5} | "
+          f"{'R@10':>5} | {'p50 ms':>7} | {'p95 ms':>7}")
+
+    for name in ("simple", "ko_bigram"):
+        tokenizer = TOKENIZERS[name]
+        t0 = time.perf_counter()
+        for doc in docs:
+            tokenizer(doc)
+        tok_rate = len(docs) / (time.perf_counter() - t0)
+
+        index = BM25Index(tokenizer=tokenizer)
+        index.add(ids, docs)
+
+        hits = {1: 0, 5: 0, 10: 0}
+        latencies = []
+        for q in picked:
+            t0 = time.perf_counter()
+            results = index.search(queries[q], 10)
+            latencies.append((time.perf_counter() - t0) * 1000)
+            ranked = [doc_id for doc_id, _ in results]
+            target = ids[answers[q]]
+            for k in hits:
+                hits[k] += target in ranked[:k]
+
+        n = len(picked)
+        print(f"{name:>10} | {tok_rate:>11.0f} | {len(index._df):>8} | {hits[1] / n:>5.2f} | "
+              f"{hits[5] / n:>5.2f} | {hits[10] / n:>5.2f} | {np.percentile(latencies, 50):>7.2f} | "
+              f"{np.percentile(latencies, 95):>7.2f}")
+
+    # 토큰 캐시: 같은 청크 재색인 (분석 재실행 / 색인 재구성 상황)
+    print(f"\n토큰 캐시 (ko_bigram, 청크 {len(docs)}개 색인 시간)")
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = TokenCache(os.path.join(tmp, "tokens.db"))
+        for label, token_cache in (("캐시 없음", None), ("빈 캐시", cache), ("채워진 캐시", cache)):
+            t0 = time.perf_counter()
+            BM25Index(tokenizer=TOKENIZERS["ko_bigram"], token_cache=token_cache).add(ids, docs)
+            print(f"   {label:<8}: {time.perf_counter() - t0:.2f}s")
+        print(f"   캐시 적중률: {cache.stats()['hitRate']:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,348 @@
+"""
+역색인 BM25 (HybridSearcher 키워드 검색용)
+rank_bm25.BM25Okapi 는 질의마다 모든 문서 점수를 계산하고, 문서가 하나만 바뀌어도 전체를 다시 만들어야 한다.
+여기서는 단어 → (문서 슬롯, tf) 포스팅 배열을 두고 질의 단어의 포스팅만 훑는다.
+
+- 추가/삭제는 증분: add() 는 포스팅 끝에 붙이고, remove() 는 슬롯을 죽은 것으로 표시만
+  (죽은 포스팅이 살아있는 포스팅보다 많아지면 compact() 로 정리)
+- 상위 k 는 argpartition 으로 부분 선택 후 k 개만 정렬
+- save()/load() 로 npz 파일에 저장 → 시작할 때 컬렉션 전체를 다시 읽고 토큰화하지 않음
+- 점수: Okapi BM25 (k1=1.5, b=0.75), idf = log(1 + (N - df + 0.5) / (df + 0.5)) — 항상 양수
+- 스레드 안전 (색인기 스레드가 추가하는 동안 채팅 스레드가 검색)
+- 토크나이저는 bm25_tokenizer 에서 선택, token_cache 를 주면 같은 청크는 다시 토큰화하지 않음
+- 메타데이터 필터: 슬롯별 docType·source 코드와 날짜(YYYYMMDD)를 열로 들고,
+  값별 슬롯 비트맵을 한 번 만들어 두고 재사용 → search(filters=...) 는 필터에 맞는 슬롯만 점수 계산
+  (필터 형식은 query_filter 참고)
+"""
+import os
+import json
+import math
+import threading
+from array import array
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from bm25_tokenizer import get_tokenizer, tokenizer_name, count_tokens, TokenCache
+
+INDEX_FORMAT_VERSION = 2
+FACETS = ("docType", "source")  # 문자열 필터 열 (값 → 코드)
+
+
+class BM25Index:
+    def __init__(self, tokenizer: Optional[Callable[[str], List[str]]] = None,
+                 k1: float = 1.5, b: float = 0.75, token_cache: Optional[TokenCache] = None):
+        self.tokenizer = tokenizer or get_tokenizer()
+        self.token_cache = token_cache
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.RLock()
+        # 슬롯 = 문서 하나 (삭제해도 compact 전까지 재사용하지 않음)
+        self._ids: List[Optional[str]] = []
+        self._slot: Dict[str, int] = {}
+        self._terms: List[Optional[Tuple[str, ...]]] = []  # 슬롯별 고유 단어 (삭제 시 df 갱신용)
+        self._lengths = array("f")
+        self._alive = array("b")
+        # 단어 → (슬롯 배열, tf 배열). array 는 append 가 싸고 np.frombuffer 로 복사 없이 읽힌다
+        self._postings: Dict[str, Tuple[array, array]] = {}
+        self._df: Dict[str, int] = {}
+        self._n_alive = 0
+        self._total_len = 0.0
+        self._dead_postings = 0
+        # 필터용 열: 슬롯별 값 코드 / 날짜, (열, 코드) → 슬롯 비트맵 (슬롯이 늘거나 번호가 바뀌면 비움)
+        self._facet_codes: Dict[str, array] = {f: array("i") for f in FACETS}
+        self._facet_values: Dict[str, List[str]] = {f: [] for f in FACETS}
+        self._facet_lookup: Dict[str, Dict[str, int]] = {f: {} for f in FACETS}
+        self._dates = array("i")
+        self._bitmaps: Dict[Tuple[str, int], np.ndarray] = {}
+        self.dirty = False  # 마지막 save/load 이후 변경 여부
+
+    def __len__(self) -> int:
+        return self._n_alive
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._slot
+
+    def ids(self) -> List[str]:
+        with self._lock:
+            return [i for i in self._ids if i is not None]
+
+    def facet_values(self, field: str) -> List[str]:
+        """필터 열에 나온 값들 (예: 색인된 파일명 목록, 빈 값 제외)"""
+        with self._lock:
+            return [v for v in self._facet_values[field] if v]
+
+    def _facet_code(self, field: str, value: str) -> int:
+        code = self._facet_lookup[field].get(value)
+        if code is None:
+            code = self._facet_lookup[field][value] = len(self._facet_values[field])
+            self._facet_values[field].append(value)
+        return code
+
+    # ============== 추가 / 삭제 ==============
+    def add(self, ids: Iterable[str], texts: Iterable[str], metadatas: Optional[Iterable[Dict]] = None):
+        """문서 추가 (이미 있는 id 는 교체) — metadatas 의 docType / source / dateNum 은 필터용으로 보관"""
+        ids = list(ids)
+        texts = [text or "" for text in texts]
+        metadatas = list(metadatas) if metadatas is not None else [None] * len(ids)
+        # 토큰화는 잠금 밖에서 (캐시에 있으면 건너뜀)
+        if self.token_cache is not None:
+            all_counts = self.token_cache.counts_many(self.tokenizer, texts)
+        else:
+            all_counts = [count_tokens(self.tokenizer(text)) for text in texts]
+
+        with self._lock:
+            for doc_id, counts, meta in zip(ids, all_counts, metadatas):
+                if doc_id in self._slot:
+                    self._remove_one(doc_id)
+                meta = meta or {}
+                for field in FACETS:
+                    self._facet_codes[field].append(self._facet_code(field, str(meta.get(field) or "")))
+                self._dates.append(int(meta.get("dateNum") or 0))
+                length = sum(counts.values())
+
+                slot = len(self._ids)
+                self._ids.append(doc_id)
+                self._slot[doc_id] = slot
+                self._terms.append(tuple(counts))
+                self._lengths.append(length)
+                self._alive.append(1)
+                for term, tf in counts.items():
+                    posting = self._postings.get(term)
+                    if posting is None:
+                        posting = self._postings[term] = (array("i"), array("f"))
+                    posting[0].append(slot)
+                    posting[1].append(tf)
+                    self._df[term] = self._df.get(term, 0) + 1
+                self._n_alive += 1
+                self._total_len += length
+            self._bitmaps.clear()
+            self.dirty = True
+
+    def remove(self, ids: Iterable[str]):
+        """문서 삭제 (없는 id 는 무시)"""
+        with self._lock:
+            for doc_id in ids:
+                if doc_id in self._slot:
+                    self._remove_one(doc_id)
+            if self._dead_postings > max(1024, sum(self._df.values())):
+                self.compact()
+            self.dirty = True
+
+    def _remove_one(self, doc_id: str):
+        slot = self._slot.pop(doc_id)
+        terms = self._terms[slot]
+        for term in terms:
+            df = self._df[term] - 1
+            if df:
+                self._df[term] = df
+            else:
+                del self._df[term]
+        self._dead_postings += len(terms)
+        self._n_alive -= 1
+        self._total_len -= self._lengths[slot]
+        self._ids[slot] = None
+        self._terms[slot] = None
+        self._alive[slot] = 0
+
+    def compact(self):
+        """죽은 슬롯을 빼고 슬롯 번호를 다시 매김"""
+        with self._lock:
+            alive = np.frombuffer(self._alive, dtype=np.int8).astype(bool)
+            remap = np.cumsum(alive, dtype=np.int64) - 1
+            lengths = np.frombuffer(self._lengths, dtype=np.float32)[alive]
+
+            postings = {}
+            for term, (slots, tfs) in self._postings.items():
+                if term not in self._df:
+                    continue
+                s = np.frombuffer(slots, dtype=np.int32)
+                keep = alive[s]
+                postings[term] = (
+                    array("i", remap[s[keep]].astype(np.int32).tobytes()),
+                    array("f", np.frombuffer(tfs, dtype=np.float32)[keep].tobytes()),
+                )
+
+            self._ids = [i for i in self._ids if i is not None]
+            self._terms = [t for t in self._terms if t is not None]
+            self._slot = {doc_id: slot for slot, doc_id in enumerate(self._ids)}
+            self._lengths = array("f", lengths.tobytes())
+            self._alive = array("b", b"\x01" * len(self._ids))
+            self._postings = postings
+            self._dead_postings = 0
+            for field in FACETS:
+                codes = np.frombuffer(self._facet_codes[field], dtype=np.int32)[alive]
+                self._facet_codes[field] = array("i", codes.tobytes())
+            self._dates = array("i", np.frombuffer(self._dates, dtype=np.int32)[alive].tobytes())
+            self._bitmaps.clear()
+
+    # ============== 필터 ==============
+    def _bitmap(self, field: str, value: str) -> np.ndarray:
+        """값이 value 인 슬롯 비트맵 (처음 쓸 때 만들고 색인이 바뀔 때까지 재사용)"""
+        code = self._facet_lookup[field].get(value)
+        if code is None:
+            return np.zeros(len(self._ids), dtype=bool)
+        bitmap = self._bitmaps.get((field, code))
+        if bitmap is None:
+            bitmap = np.frombuffer(self._facet_codes[field], dtype=np.int32) == code
+            self._bitmaps[(field, code)] = bitmap
+        return bitmap
+
+    def _mask(self, filters: Dict) -> np.ndarray:
+        """필터에 맞는 살아있는 슬롯"""
+        mask = np.frombuffer(self._alive, dtype=np.int8).astype(bool)
+        if "docType" in filters:
+            mask &= self._bitmap("docType", filters["docType"])
+        if "source" in filters:
+            sources = np.zeros(len(self._ids), dtype=bool)
+            for source in filters["source"]:
+                sources |= self._bitmap("source", source)
+            mask &= sources
+        if "date" in filters:
+            start, end = filters["date"]
+            dates = np.frombuffer(self._dates, dtype=np.int32)
+            mask &= (dates >= start) & (dates <= end)
+        return mask
+
+    def count(self, filters: Optional[Dict] = None) -> int:
+        """필터에 맞는 문서 수 (필터 완화 판단용)"""
+        with self._lock:
+            if not filters:
+                return self._n_alive
+            return int(np.count_nonzero(self._mask(filters)))
+
+    # ============== 검색 ==============
+    def search(self, query: str, k: int = 10, filters: Optional[Dict] = None) -> List[Tuple[str, float]]:
+        """질의 상위 k 개 (id, 점수) — 점수가 0 인 문서는 제외, filters 가 있으면 맞는 문서만"""
+        return self.search_tokens(self.tokenizer(query), k, filters)
+
+    def search_tokens(self, tokens: List[str], k: int = 10,
+                      filters: Optional[Dict] = None) -> List[Tuple[str, float]]:
+        with self._lock:
+            if not self._n_alive or k <= 0:
+                return []
+            avgdl = self._total_len / self._n_alive or 1.0
+            lengths = np.frombuffer(self._lengths, dtype=np.float32)
+            alive = np.frombuffer(self._alive, dtype=np.int8)
+            # idf·avgdl 은 전체 색인 기준 (필터와 무관하게 점수 척도 유지), 포스팅만 필터 슬롯으로 줄임
+            mask = self._mask(filters) if filters else None
+
+            # 질의 단어의 포스팅만 모아서 (슬롯, 기여도) 를 만든 뒤 슬롯별로 합산
+            slot_parts, score_parts = [], []
+            for term in tokens:  # 질의에 같은 단어가 두 번 나오면 두 번 더함 (BM25Okapi 와 동일)
+                df = self._df.get(term)
+                if not df:
+                    continue
+                slots_buf, tfs_buf = self._postings[term]
+                slots = np.frombuffer(slots_buf, dtype=np.int32)
+                tfs = np.frombuffer(tfs_buf, dtype=np.float32)
+                if mask is not None:
+                    keep = mask[slots]
+                    slots, tfs = slots[keep], tfs[keep]
+                    if not len(slots):
+                        continue
+                idf = math.log(1.0 + (self._n_alive - df + 0.5) / (df + 0.5))
+                norm = self.k1 * (1.0 - self.b + self.b * lengths[slots] / avgdl)
+                slot_parts.append(slots)
+                score_parts.append(idf * tfs * (self.k1 + 1.0) / (tfs + norm))
+            if not slot_parts:
+                return []
+
+            all_slots = np.concatenate(slot_parts)
+            all_scores = np.concatenate(score_parts)
+            all_scores[alive[all_slots] == 0] = 0.0
+            cand, inverse = np.unique(all_slots, return_inverse=True)
+            totals = np.bincount(inverse, weights=all_scores)
+
+            if len(cand) > k:
+                top = np.argpartition(-totals, k - 1)[:k]
+            else:
+                top = np.arange(len(cand))
+            top = top[np.argsort(-totals[top], kind="stable")]
+            return [(self._ids[cand[i]], float(totals[i])) for i in top if totals[i] > 0]
+
+    # ============== 저장 / 로드 ==============
+    def save(self, path: str):
+        """npz 하나로 저장 (임시 파일에 쓴 뒤 교체)"""
+        with self._lock:
+            if self._dead_postings:
+                self.compact()
+            terms = list(self._postings)
+            offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+            for i, term in enumerate(terms):
+                offsets[i + 1] = offsets[i] + len(self._postings[term][0])
+            slots = np.concatenate(
+                [np.frombuffer(self._postings[t][0], dtype=np.int32) for t in terms]
+            ) if terms else np.zeros(0, dtype=np.int32)
+            tfs = np.concatenate(
+                [np.frombuffer(self._postings[t][1], dtype=np.float32) for t in terms]
+            ) if terms else np.zeros(0, dtype=np.float32)
+            meta = {"version": INDEX_FORMAT_VERSION, "k1": self.k1, "b": self.b,
+                    "tokenizer": tokenizer_name(self.tokenizer)}
+
+            if os.path.dirname(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = path + ".tmp.npz"
+            np.savez(
+                tmp_path,
+                meta=np.array(json.dumps(meta)),
+                ids=np.array(self._ids, dtype=str),
+                lengths=np.frombuffer(self._lengths, dtype=np.float32),
+                terms=np.array(terms, dtype=str),
+                offsets=offsets,
+                slots=slots,
+                tfs=tfs,
+                dates=np.frombuffer(self._dates, dtype=np.int32),
+                **{f"facet_{f}": np.frombuffer(self._facet_codes[f], dtype=np.int32) for f in FACETS},
+                **{f"facet_{f}_values": np.array(self._facet_values[f], dtype=str) for f in FACETS},
+            )
+            os.replace(tmp_path, path)
+            self.dirty = False
+
+    @classmethod
+    def load(cls, path: str, tokenizer: Optional[Callable[[str], List[str]]] = None,
+             token_cache: Optional[TokenCache] = None) -> Optional["BM25Index"]:
+        """저장된 색인 (형식·토크나이저가 다르거나 읽을 수 없으면 None)"""
+        tokenizer = tokenizer or get_tokenizer()
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                meta = json.loads(str(data["meta"]))
+                if (meta.get("version") != INDEX_FORMAT_VERSION
+                        or meta.get("tokenizer") != tokenizer_name(tokenizer)):
+                    return None
+                index = cls(tokenizer=tokenizer, k1=meta["k1"], b=meta["b"], token_cache=token_cache)
+                ids = data["ids"].tolist()
+                terms = data["terms"].tolist()
+                offsets = data["offsets"]
+                slots = data["slots"].astype(np.int32)
+                tfs = data["tfs"].astype(np.float32)
+                lengths = data["lengths"].astype(np.float32)
+                dates = data["dates"].astype(np.int32)
+                facet_codes = {f: data[f"facet_{f}"].astype(np.int32) for f in FACETS}
+                facet_values = {f: data[f"facet_{f}_values"].tolist() for f in FACETS}
+        except Exception as e:
+            print(f"[BM25] 저장된 색인을 읽을 수 없음 ({path}): {e}")
+            return None
+
+        doc_terms: List[List[str]] = [[] for _ in ids]
+        for i, term in enumerate(terms):
+            start, end = int(offsets[i]), int(offsets[i + 1])
+            index._postings[term] = (array("i", slots[start:end].tobytes()),
+                                     array("f", tfs[start:end].tobytes()))
+            index._df[term] = end - start
+            for slot in slots[start:end].tolist():
+                doc_terms[slot].append(term)
+
+        index._ids = ids
+        index._slot = {doc_id: slot for slot, doc_id in enumerate(ids)}
+        index._terms = [tuple(t) for t in doc_terms]
+        index._lengths = array("f", lengths.tobytes())
+        index._alive = array("b", b"\x01" * len(ids))
+        index._n_alive = len(ids)
+        index._total_len = float(lengths.sum())
+        index._dates = array("i", dates.tobytes())
+        for field in FACETS:
+            index._facet_codes[field] = array("i", facet_codes[field].tobytes())
+            index._facet_values[field] = facet_values[field]
+            index._facet_lookup[field] = {v: code for code, v in enumerate(facet_values[field])}
+        return index
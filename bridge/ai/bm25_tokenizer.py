@@ -0,0 +1,252 @@
+"""
+BM25 토크나이저 (교체 가능) + 청크별 토큰 캐시
+
+공백 분리만 하면 "예산을/예산은/예산의" 가 전부 다른 단어가 되어 재현율이 낮고 어휘가 커진다.
+기본 토크나이저 ko_bigram:
+  1. 한글 어절 / 영문 / 숫자(쉼표 제거) 로 분리
+  2. 한글 어절 끝의 조사 제거 (긴 조사부터, 남는 어간이 2글자 이상일 때만)
+  3. 어간 + 어간의 글자 bigram (3글자 이상일 때) — 복합명사 "인수인계서" 로 "인계" 검색 가능
+
+- 토크나이저 선택: 환경변수 BM25_TOKENIZER (기본 "ko_bigram", 기존 방식은 "simple")
+  새 토크나이저는 @register_tokenizer("이름") 로 등록
+- 토큰 캐시: (토크나이저, 청크 해시) → 단어별 빈도를 SQLite 에 저장
+  재분석·색인 재구성 때 같은 청크는 토큰화를 건너뜀. 끄기: TOKEN_CACHE_ENABLED=0
+  전체 크기가 TOKEN_CACHE_MAX_MB 를 넘으면 오래 안 쓴 항목부터 삭제 (LRU)
+"""
+import os
+import re
+import zlib
+import hashlib
+import sys
+import threading
+import time
+from array import array
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Tuple
+
+# 상위 디렉토리(bridge)를 sys.path에 추가하여 sqlite_lru 접근
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sqlite_lru import evict_lru, wal_connection
+
+# ============== 설정 ==============
+BM25_TOKENIZER = os.environ.get("BM25_TOKENIZER", "ko_bigram")
+TOKEN_CACHE_ENABLED = os.environ.get("TOKEN_CACHE_ENABLED", "1") != "0"
+TOKEN_CACHE_PATH = os.environ.get("TOKEN_CACHE_PATH", "./cache/tokens.db")
+TOKEN_CACHE_MAX_MB = float(os.environ.get("TOKEN_CACHE_MAX_MB", "256"))
+# =================================
+
+_SQL_BATCH = 500  # IN (...) 절 하나에 넣을 키 수 (SQLite 변수 개수 제한)
+
+TOKENIZERS: Dict[str, Callable[[str], List[str]]] = {}
+
+
+def register_tokenizer(name: str):
+    """토크나이저 등록 데코레이터 (색인 파일에 이름이 기록되므로 바꾸면 색인 재구성)"""
+    def decorator(func):
+        func.tokenizer_name = name
+        TOKENIZERS[name] = func
+        return func
+    return decorator
+
+
+def tokenizer_name(tokenizer: Callable[[str], List[str]]) -> str:
+    """토큰 캐시 키·색인 파일에 쓰는 이름 (등록 이름, 등록되지 않은 함수는 함수 이름)"""
+    return getattr(tokenizer, "tokenizer_name", None) or getattr(tokenizer, "__name__", "")
+
+
+def get_tokenizer(name: Optional[str] = None) -> Callable[[str], List[str]]:
+    name = name or BM25_TOKENIZER
+    if name not in TOKENIZERS:
+        print(f"[Tokenizer] 알 수 없는 토크나이저 '{name}' → ko_bigram 사용")
+        name = "ko_bigram"
+    return TOKENIZERS[name]
+
+
+# ============== 토크나이저 ==============
+_PUNCT_RE = re.compile(r'[^\w\s]')
+
+
+@register_tokenizer("simple")
+def simple_tokenize(text: str) -> List[str]:
+    """구두점 제거 후 공백 분리, 한 글자 토큰 제외"""
+    text = _PUNCT_RE.sub(' ', text)
+    return [t for t in text.split() if len(t) > 1]
+
+
+# 어절 끝 조사 (길이별로 나눠 긴 것부터 확인)
+_JOSA = [
+    "에서부터", "으로부터", "에서는", "에게서", "으로는", "으로써", "으로서", "이라는", "이라고",
+    "까지는", "부터는", "에서도", "에서의", "에게는", "에서", "에게", "으로", "까지", "부터", "보다",
+    "처럼", "마다", "이나", "이며", "이란", "라는", "에는", "에도", "에의", "와의", "과의", "로서",
+    "로써", "로는", "하고", "께서", "은", "는", "이", "가", "을", "를", "의", "에", "와", "과",
+    "도", "로", "만", "및",
+]
+_JOSA_BY_LEN = {n: frozenset(j for j in _JOSA if len(j) == n) for n in (4, 3, 2, 1)}
+_WORD_RE = re.compile(r'[가-힣]+|[a-z]+|\d[\d,]*(?:\.\d+)?')
+
+
+def strip_josa(word: str) -> str:
+    """한글 어절 끝 조사 하나 제거 (어간이 2글자 미만이 되면 그대로)"""
+    for n in (4, 3, 2, 1):
+        if len(word) - n >= 2 and word[-n:] in _JOSA_BY_LEN[n]:
+            return word[:-n]
+    return word
+
+
+@lru_cache(maxsize=1 << 18)
+def _word_tokens(word: str) -> Tuple[str, ...]:
+    """어절 하나의 토큰 (어절 종류가 많지 않아 메모이즈하면 토큰화가 ~1.5배 빨라짐)"""
+    first = word[0]
+    if "가" <= first <= "힣":
+        stem = strip_josa(word)
+        if len(stem) < 2:
+            return ()
+        if len(stem) > 2:
+            return (stem,) + tuple(stem[i:i + 2] for i in range(len(stem) - 1))
+        return (stem,)
+    if first.isdigit():
+        number = word.replace(",", "")
+        return (number,) if len(number) > 1 else ()
+    return (word,) if len(word) > 1 else ()
+
+
+@register_tokenizer("ko_bigram")
+def ko_bigram_tokenize(text: str) -> List[str]:
+    """조사 제거한 어간 + 글자 bigram (영문은 소문자, 숫자는 쉼표 제거)"""
+    tokens: List[str] = []
+    extend = tokens.extend
+    for word in _WORD_RE.findall(text.lower()):
+        extend(_word_tokens(word))
+    return tokens
+
+
+# ============== 토큰 캐시 ==============
+# 저장 형식: 단어들을 \x1f 로 이어 zlib 압축 + 빈도는 같은 순서의 uint16 배열 (한 줄씩 파싱하지 않아 빠름)
+_SEP = "\x1f"
+
+
+def _encode_counts(counts: Dict[str, int]) -> Tuple[bytes, bytes]:
+    terms = zlib.compress(_SEP.join(counts).encode("utf-8"), 1)
+    return terms, array("H", (min(c, 0xFFFF) for c in counts.values())).tobytes()
+
+
+def _decode_counts(terms: bytes, freqs: bytes) -> Dict[str, int]:
+    if not freqs:
+        return {}
+    return dict(zip(zlib.decompress(terms).decode("utf-8").split(_SEP), array("H", freqs)))
+
+
+def count_tokens(tokens: List[str]) -> Dict[str, int]:
+    counts: Dict[str, int] = {}
+    for t in tokens:
+        counts[t] = counts.get(t, 0) + 1
+    return counts
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tokens (
+    key BLOB PRIMARY KEY,
+    terms BLOB NOT NULL,
+    freqs BLOB NOT NULL,
+    nbytes INTEGER NOT NULL DEFAULT 0,
+    last_access REAL NOT NULL DEFAULT 0
+);
+"""
+
+# 크기·접근 시각 컬럼이 없던 캐시 파일용 (기존 항목은 가장 오래된 것으로 취급)
+_MIGRATIONS = (
+    ("nbytes", "INTEGER NOT NULL DEFAULT 0"),
+    ("last_access", "REAL NOT NULL DEFAULT 0"),
+)
+
+
+class TokenCache:
+    """(토크나이저 이름, 청크 텍스트) 해시 → 단어별 빈도"""
+
+    def __init__(self, db_path: str, max_bytes: int = int(TOKEN_CACHE_MAX_MB * 1024 * 1024)):
+        self.db_path = db_path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        if os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(tokens)")}
+            for column, kind in _MIGRATIONS:
+                if column not in columns:
+                    conn.execute(f"ALTER TABLE tokens ADD COLUMN {column} {kind}")
+            if "nbytes" not in columns:
+                conn.execute("UPDATE tokens SET nbytes = length(terms) + length(freqs)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_tokens_access ON tokens(last_access)")
+
+    def _connect(self):
+        return wal_connection(self.db_path, timeout=30)
+
+    @staticmethod
+    def key(tokenizer_name: str, text: str) -> bytes:
+        return hashlib.blake2b(f"{tokenizer_name}\x00{text}".encode("utf-8"), digest_size=16).digest()
+
+    def counts_many(self, tokenizer: Callable[[str], List[str]], texts: List[str]) -> List[Dict[str, int]]:
+        """텍스트별 단어 빈도 (캐시에 없으면 토큰화 후 저장)"""
+        name = tokenizer_name(tokenizer)
+        keys = [self.key(name, t) for t in texts]
+        found: Dict[bytes, Tuple[bytes, bytes]] = {}
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            unique = list(dict.fromkeys(keys))
+            for i in range(0, len(unique), _SQL_BATCH):
+                batch = unique[i:i + _SQL_BATCH]
+                placeholders = ",".join("?" * len(batch))
+                found.update(
+                    (key, (terms, freqs)) for key, terms, freqs in conn.execute(
+                        f"SELECT key, terms, freqs FROM tokens WHERE key IN ({placeholders})", batch
+                    )
+                )
+            if found:
+                conn.executemany("UPDATE tokens SET last_access = ? WHERE key = ?", [(now, k) for k in found])
+
+        results, fresh = [], {}
+        for key, text in zip(keys, texts):
+            if key in found:
+                results.append(_decode_counts(*found[key]))
+                self.hits += 1
+            else:
+                counts = count_tokens(tokenizer(text))
+                fresh[key] = _encode_counts(counts)
+                found[key] = fresh[key]
+                results.append(counts)
+                self.misses += 1
+        if fresh:
+            with self._lock, self._connect() as conn:
+                conn.executemany(
+                    "INSERT OR IGNORE INTO tokens (key, terms, freqs, nbytes, last_access) VALUES (?, ?, ?, ?, ?)",
+                    [(key, terms, freqs, len(terms) + len(freqs), now) for key, (terms, freqs) in fresh.items()]
+                )
+                evict_lru(conn, "tokens", ("key",), self.max_bytes, "TokenCache")
+        return results
+
+    def stats(self) -> Dict:
+        total = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses,
+                "hitRate": round(self.hits / total, 3) if total else 0.0}
+
+
+_cache: Optional[TokenCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_token_cache() -> Optional[TokenCache]:
+    """프로세스 전역 토큰 캐시 (비활성화되었거나 열 수 없으면 None)"""
+    global _cache
+    if not TOKEN_CACHE_ENABLED:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            try:
+                _cache = TokenCache(TOKEN_CACHE_PATH, int(TOKEN_CACHE_MAX_MB * 1024 * 1024))
+            except Exception as e:
+                print(f"[TokenCache] 캐시 사용 불가: {e}")
+                return None
+        return _cache
@@ -0,0 +1,151 @@
+"""
+청크 일괄 색인기 (파일 경계를 넘어 모아서 upsert)
+파일마다 upsert 하면 작은 파일은 청크 몇 개짜리 임베딩 배치가 되어 GPU/CPU 를 다 못 쓴다.
+여러 파일의 청크를 모아 INDEX_BATCH_CHUNKS 개 또는 INDEX_BATCH_CHARS 글자가 차면 한 번에 기록한다.
+
+- 기록(임베딩 + upsert)은 백그라운드 스레드 하나에서 → 그동안 호출자는 다음 파일을 파싱
+- 대기 중인 배치는 최대 INDEX_PENDING_BATCHES 개 (파싱이 훨씬 빠르면 여기서 기다리며 메모리 제한)
+- 파일의 이전 청크 삭제(delete_source)는 그 파일 첫 청크가 들어갈 배치의 upsert 직전에 실행 → 순서 보장
+- 기록한 청크는 컬렉션의 BM25 색인에도 바로 반영하고 세대 번호를 올림 (검색 결과 캐시 무효화)
+- 배치 기록이 한 번 실패하면 오류는 계속 유지 → 이후 add() 와 close() 가 모두 ChunkWriteError
+  (실패한 배치는 이전 청크가 이미 지워졌을 수 있으므로 호출자는 분석 전체를 실패로 처리해야 함)
+- 처리량(chunks/s)은 PerformanceMonitor 에 기록
+    INDEX_UPSERT   : 임베딩 + 쓰기에 걸린 시간 기준
+    INDEX_PIPELINE : 색인기를 연 뒤 close() 까지 전체 시간 기준 (파싱 포함)
+"""
+import os
+import sys
+import time
+import queue
+import threading
+from typing import Dict, List, Optional
+
+# 상위 디렉토리(bridge)를 sys.path에 추가하여 performance 접근
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from performance import global_monitor
+from project_index import get_bm25_index, delete_chunks, bump_generation
+
+# ============== 설정 ==============
+INDEX_BATCH_CHUNKS = int(os.environ.get("INDEX_BATCH_CHUNKS", "256"))
+INDEX_BATCH_CHARS = int(os.environ.get("INDEX_BATCH_CHARS", "400000"))
+INDEX_PENDING_BATCHES = 2
+# =================================
+
+_STOP = object()
+
+
+class ChunkWriteError(RuntimeError):
+    """백그라운드 배치 기록 실패 (한 번 나면 같은 색인기에서 계속 발생)"""
+
+
+class ChunkBatchWriter:
+    """
+    사용법:
+        with ChunkBatchWriter(collection) as writer:
+            for 파일:
+                writer.delete_source(filename)
+                writer.add(ids, documents, metadatas)
+        # with 를 빠져나오면 남은 배치까지 기록 완료 (기록 중 오류는 여기서 ChunkWriteError)
+    """
+
+    def __init__(self, collection, max_chunks: int = INDEX_BATCH_CHUNKS,
+                 max_chars: int = INDEX_BATCH_CHARS, monitor=global_monitor):
+        self.collection = collection
+        self.max_chunks = max(1, max_chunks)
+        self.max_chars = max(1, max_chars)
+        self.monitor = monitor
+        self.bm25 = get_bm25_index(collection)
+        self.chunks_written = 0
+        self.batches_written = 0
+
+        self._sources: List[str] = []
+        self._ids: List[str] = []
+        self._docs: List[str] = []
+        self._metas: List[Dict] = []
+        self._chars = 0
+
+        self._queue: "queue.Queue" = queue.Queue(maxsize=INDEX_PENDING_BATCHES)
+        self._error: Optional[BaseException] = None
+        self._started = time.perf_counter()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="chunk-writer", daemon=True)
+        self._thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # 다른 예외로 빠져나가는 중이면 그 예외를 그대로 두고, 아니면 기록 오류를 올림
+        self.close(raise_errors=exc_type is None)
+
+    # ----- 호출자 스레드 -----
+    def delete_source(self, source: str):
+        """source 메타데이터가 같은 기존 청크 삭제 (이후 add 한 청크보다 먼저 실행)"""
+        self._sources.append(source)
+
+    def add(self, ids: List[str], documents: List[str], metadatas: List[Dict]):
+        self._raise_pending_error()
+        for i, doc, meta in zip(ids, documents, metadatas):
+            self._ids.append(i)
+            self._docs.append(doc)
+            self._metas.append(meta)
+            self._chars += len(doc)
+            if len(self._ids) >= self.max_chunks or self._chars >= self.max_chars:
+                self.flush()
+
+    def flush(self):
+        """모인 청크를 기록 스레드로 넘김 (대기 배치가 가득 차면 자리가 날 때까지 대기)"""
+        if not self._ids and not self._sources:
+            return
+        batch = (self._sources, self._ids, self._docs, self._metas)
+        self._sources, self._ids, self._docs, self._metas = [], [], [], []
+        self._chars = 0
+        self._queue.put(batch)
+
+    def close(self, raise_errors: bool = True):
+        """남은 청크 기록 후 스레드 종료 → 총 처리량 기록"""
+        if self._closed:
+            return
+        self._closed = True
+        if self._error is None:
+            self.flush()
+        self._queue.put(_STOP)
+        self._thread.join()
+
+        if self.chunks_written:
+            self.monitor.record_throughput(
+                "INDEX_PIPELINE", self.chunks_written, time.perf_counter() - self._started, "chunks"
+            )
+        if raise_errors:
+            self._raise_pending_error()
+
+    def _raise_pending_error(self):
+        # 오류는 지우지 않음 → 실패 뒤에 들어온 청크가 조용히 버려지지 않도록 close() 까지 계속 보고
+        if self._error is not None:
+            raise ChunkWriteError(f"청크 색인 실패: {self._error}") from self._error
+
+    # ----- 기록 스레드 -----
+    def _run(self):
+        while True:
+            batch = self._queue.get()
+            if batch is _STOP:
+                return
+            if self._error is not None:
+                continue  # 앞 배치가 실패했으면 나머지는 버림 (close 에서 오류 보고)
+            sources, ids, docs, metas = batch
+            try:
+                t0 = time.perf_counter()
+                if sources:
+                    delete_chunks(self.collection, where={"source": {"$in": sources}})
+                if ids:
+                    self.collection.upsert(ids=ids, documents=docs, metadatas=metas)
+                    self.bm25.add(ids, docs, metas)
+                    bump_generation(self.collection)  # 이전 세대의 캐시된 검색 결과 무효화
+                    self.monitor.record_throughput(
+                        "INDEX_UPSERT", len(ids), time.perf_counter() - t0, "chunks"
+                    )
+                    self.chunks_written += len(ids)
+                    self.batches_written += 1
+            except BaseException as e:
+                print(f"[ChunkWriter] 배치 기록 실패 ({len(ids)}개 청크): {e}")
+                self._error = e
@@ -0,0 +1,200 @@
+"""
+청크 문서 저장소 (검색 결과 조립용)
+id·본문·메타데이터를 파이썬 리스트/딕셔너리로 들고 있으면 청크마다 str 객체 + dict 객체가 생겨
+10만 청크에서 수백 MB 가 되고, 결과마다 list.index() 로 선형 탐색하게 된다.
+
+- id → 행 번호 딕셔너리 (조회 O(1))
+- 본문: 행별로 zlib(레벨 1) 압축한 UTF-8 바이트를 bytearray 하나에 이어붙이고 시작 위치만 배열로
+  (한글은 UTF-8 로 3바이트라 압축 없이는 파이썬 str(2바이트/글자)보다 커짐. 결과 k 개만 풀면 되므로 조회 비용은 미미)
+- 메타데이터: 키별 열(column)
+    문자열 → 값 사전 + 행별 코드 (source/docType/fileId 처럼 반복이 많은 값은 한 번만 저장)
+    정수   → array('q')
+    그 외/혼합 → 일반 리스트
+- 삭제는 표시만 하고, 죽은 행이 살아있는 행보다 많아지면 compact()
+"""
+import zlib
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple
+
+_MISSING = -1  # 문자열 열에서 값이 없는 행의 코드
+
+
+class _StrColumn:
+    def __init__(self):
+        self.values: List[str] = []
+        self.lookup: Dict[str, int] = {}
+        self.codes = array("i")
+
+    def append(self, value):
+        if value is None:
+            self.codes.append(_MISSING)
+            return
+        code = self.lookup.get(value)
+        if code is None:
+            code = self.lookup[value] = len(self.values)
+            self.values.append(value)
+        self.codes.append(code)
+
+    def get(self, row: int):
+        code = self.codes[row]
+        return None if code == _MISSING else self.values[code]
+
+
+class _IntColumn:
+    def __init__(self):
+        self.data = array("q")
+        self.present = array("b")
+
+    def append(self, value):
+        self.data.append(0 if value is None else value)
+        self.present.append(value is not None)
+
+    def get(self, row: int):
+        return self.data[row] if self.present[row] else None
+
+
+class _ListColumn:
+    def __init__(self):
+        self.data: List = []
+
+    def append(self, value):
+        self.data.append(value)
+
+    def get(self, row: int):
+        return self.data[row]
+
+
+def _column_for(value):
+    if isinstance(value, str):
+        return _StrColumn()
+    if isinstance(value, int) and not isinstance(value, bool):
+        return _IntColumn()
+    return _ListColumn()
+
+
+def _fits(column, value) -> bool:
+    if value is None:
+        return True
+    if isinstance(column, _StrColumn):
+        return isinstance(value, str)
+    if isinstance(column, _IntColumn):
+        return isinstance(value, int) and not isinstance(value, bool)
+    return True
+
+
+class DocStore:
+    def __init__(self, compress: bool = True):
+        self.compress = compress
+        self._ids: List[Optional[str]] = []
+        self._row: Dict[str, int] = {}
+        self._text = bytearray()
+        self._offsets = array("q", [0])  # 행 i 의 본문 = _text[_offsets[i]:_offsets[i + 1]]
+        self._columns: Dict[str, object] = {}
+        self._dead = 0
+
+    def __len__(self) -> int:
+        return len(self._row)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._row
+
+    @classmethod
+    def from_collection(cls, collection, page: int = 5000) -> "DocStore":
+        """Chroma 컬렉션 전체를 페이지 단위로 읽어 구성 (반환 순서 = 행 순서)"""
+        store = cls()
+        total = collection.count()
+        for offset in range(0, total, page):
+            batch = collection.get(include=["documents", "metadatas"], limit=page, offset=offset)
+            store.add(batch["ids"], batch["documents"], batch["metadatas"])
+        return store
+
+    # ============== 추가 / 삭제 ==============
+    def add(self, ids: Iterable[str], texts: Iterable[str], metadatas: Iterable[Optional[Dict]]):
+        """행 추가 (이미 있는 id 는 교체 — 새 행이 뒤에 붙음)"""
+        for doc_id, text, meta in zip(ids, texts, metadatas):
+            if doc_id in self._row:
+                self._remove_one(doc_id)
+            row = len(self._ids)
+            self._ids.append(doc_id)
+            self._row[doc_id] = row
+            data = (text or "").encode("utf-8")
+            self._text += zlib.compress(data, 1) if self.compress else data
+            self._offsets.append(len(self._text))
+
+            meta = meta or {}
+            for key, value in meta.items():
+                column = self._columns.get(key)
+                if column is None:
+                    column = self._columns[key] = _column_for(value)
+                    for _ in range(row):
+                        column.append(None)
+                elif not _fits(column, value):
+                    column = self._columns[key] = self._widen(column, row)
+                column.append(value)
+            # 이 행에 없는 키는 빈 값으로 채워 열 길이를 맞춤
+            for key, column in self._columns.items():
+                if key not in meta:
+                    column.append(None)
+
+    def _widen(self, column, rows: int) -> _ListColumn:
+        """타입이 섞인 열은 일반 리스트 열로 바꿈"""
+        widened = _ListColumn()
+        widened.data = [column.get(r) for r in range(rows)]
+        return widened
+
+    def remove(self, ids: Iterable[str]):
+        for doc_id in ids:
+            if doc_id in self._row:
+                self._remove_one(doc_id)
+        if self._dead > max(1024, len(self._row)):
+            self.compact()
+
+    def _remove_one(self, doc_id: str):
+        row = self._row.pop(doc_id)
+        self._ids[row] = None
+        self._dead += 1
+
+    def compact(self):
+        """삭제된 행을 빼고 다시 채움"""
+        rows = [(doc_id, row) for row, doc_id in enumerate(self._ids) if doc_id is not None]
+        texts = [self.text(row) for _, row in rows]
+        metas = [self.metadata(row) for _, row in rows]
+        self.__init__(compress=self.compress)
+        self.add([doc_id for doc_id, _ in rows], texts, metas)
+
+    # ============== 조회 ==============
+    def row_of(self, doc_id: str) -> Optional[int]:
+        return self._row.get(doc_id)
+
+    def id_at(self, row: int) -> Optional[str]:
+        return self._ids[row]
+
+    def text(self, row: int) -> str:
+        data = self._text[self._offsets[row]:self._offsets[row + 1]]
+        return (zlib.decompress(data) if self.compress else data).decode("utf-8")
+
+    def metadata(self, row: int) -> Dict:
+        meta = {}
+        for key, column in self._columns.items():
+            value = column.get(row)
+            if value is not None:
+                meta[key] = value
+        return meta
+
+    def get(self, doc_id: str) -> Optional[Tuple[str, Dict]]:
+        """(본문, 메타데이터) — 없으면 None"""
+        row = self._row.get(doc_id)
+        if row is None:
+            return None
+        return self.text(row), self.metadata(row)
+
+    def nbytes(self) -> int:
+        """본문 버퍼 + 숫자 배열 크기 (파이썬 객체 오버헤드 제외한 대략치)"""
+        size = len(self._text) + self._offsets.itemsize * len(self._offsets)
+        for column in self._columns.values():
+            if isinstance(column, _StrColumn):
+                size += column.codes.itemsize * len(column.codes)
+                size += sum(len(v.encode("utf-8")) for v in column.values)
+            elif isinstance(column, _IntColumn):
+                size += column.data.itemsize * len(column.data) + len(column.present)
+        return size
@@ -0,0 +1,244 @@
+"""
+임베딩 공유 캐시
+(모델, 청크 텍스트 해시) → 벡터를 디스크에 저장해 두고 모든 Chroma 컬렉션이 같이 쓴다.
+auto_analysis / handover_v3 / my_documents_ko 에 같은 청크가 들어가도 임베딩은 머신당 한 번만 계산.
+
+- 저장 형식: 모델별 디렉토리에
+    vectors.f16 : float16 행렬 (행 = 청크 하나, 이어붙이기만 함) → np.memmap 으로 읽기
+    index.db    : SQLite (key BLOB → row), 여러 프로세스가 동시에 써도 안전하도록 쓰기는 트랜잭션 안에서
+- float16 으로 저장해 float32 대비 크기 절반 (코사인 유사도 차이 ~1e-3 수준)
+- 모델은 처음으로 캐시 미스가 났을 때만 로드 → 전부 캐시에 있으면 sentence-transformers 로딩도 생략
+- 끄기: 환경변수 EMBEDDING_CACHE_ENABLED=0 (일반 SentenceTransformerEmbeddingFunction 과 동일하게 동작)
+"""
+import os
+import re
+import hashlib
+import sys
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+from chromadb.api.types import Documents, EmbeddingFunction
+from chromadb.utils.embedding_functions import SentenceTransformerEmbeddingFunction
+
+# 상위 디렉토리(bridge)를 sys.path에 추가하여 sqlite_lru 접근
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sqlite_lru import wal_connection
+
+# ============== 설정 ==============
+EMBEDDING_CACHE_ENABLED = os.environ.get("EMBEDDING_CACHE_ENABLED", "1") != "0"
+EMBEDDING_CACHE_DIR = os.environ.get("EMBEDDING_CACHE_DIR", "./cache/embeddings")
+KO_EMBEDDING_MODEL = "jhgan/ko-sroberta-multitask"
+# =================================
+
+_SQL_BATCH = 500  # IN (...) 절 하나에 넣을 키 수 (SQLite 변수 개수 제한)
+
+
+def chunk_key(text: str) -> bytes:
+    """청크 텍스트 해시 (16바이트)"""
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+
+class EmbeddingStore:
+    """모델 하나의 임베딩 저장소 (key → float16 벡터)"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.vectors_path = os.path.join(directory, "vectors.f16")
+        self.db_path = os.path.join(directory, "index.db")
+        self._lock = threading.Lock()
+        self._mmap: Optional[np.memmap] = None
+        self.dim: Optional[int] = None
+        with self._connect() as conn:
+            conn.executescript(
+                "CREATE TABLE IF NOT EXISTS keys (key BLOB PRIMARY KEY, row INTEGER NOT NULL);"
+                "CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value INTEGER NOT NULL);"
+            )
+            row = conn.execute("SELECT value FROM meta WHERE name = 'dim'").fetchone()
+            self.dim = row[0] if row else None
+
+    def _connect(self):
+        return wal_connection(self.db_path, timeout=30)
+
+    def _matrix(self, rows_needed: int) -> np.memmap:
+        """rows_needed 행까지 읽을 수 있는 memmap (다른 프로세스가 파일을 늘렸으면 다시 매핑)"""
+        if self._mmap is None or self._mmap.shape[0] < rows_needed:
+            rows = os.path.getsize(self.vectors_path) // (self.dim * 2)
+            self._mmap = np.memmap(self.vectors_path, dtype=np.float16, mode="r", shape=(rows, self.dim))
+        return self._mmap
+
+    def get_many(self, keys: List[bytes]) -> Dict[bytes, np.ndarray]:
+        """저장된 벡터 조회 (없는 키는 결과에서 빠짐)"""
+        if self.dim is None or not keys:
+            return {}
+        rows: Dict[bytes, int] = {}
+        with self._lock, self._connect() as conn:
+            for i in range(0, len(keys), _SQL_BATCH):
+                batch = keys[i:i + _SQL_BATCH]
+                placeholders = ",".join("?" * len(batch))
+                rows.update(conn.execute(
+                    f"SELECT key, row FROM keys WHERE key IN ({placeholders})", batch
+                ).fetchall())
+            if not rows:
+                return {}
+            matrix = self._matrix(max(rows.values()) + 1)
+            return {key: np.asarray(matrix[row], dtype=np.float32) for key, row in rows.items()}
+
+    def put_many(self, items: Dict[bytes, np.ndarray]):
+        """새 벡터 추가 (이미 있는 키는 무시)"""
+        if not items:
+            return
+        with self._lock, self._connect() as conn:
+            # 파일 끝 위치 확보와 키 등록을 한 트랜잭션으로 (다른 프로세스와 행 번호 충돌 방지)
+            conn.execute("BEGIN IMMEDIATE")
+            if self.dim is None:
+                row = conn.execute("SELECT value FROM meta WHERE name = 'dim'").fetchone()
+                self.dim = row[0] if row else len(next(iter(items.values())))
+                conn.execute("INSERT OR IGNORE INTO meta (name, value) VALUES ('dim', ?)", (self.dim,))
+
+            keys = list(items)
+            existing = set()
+            for i in range(0, len(keys), _SQL_BATCH):
+                batch = keys[i:i + _SQL_BATCH]
+                placeholders = ",".join("?" * len(batch))
+                existing.update(k for (k,) in conn.execute(
+                    f"SELECT key FROM keys WHERE key IN ({placeholders})", batch
+                ))
+            new_keys = [k for k in keys if k not in existing]
+            if not new_keys:
+                conn.commit()
+                return
+
+            count = conn.execute("SELECT value FROM meta WHERE name = 'rows'").fetchone()
+            start = count[0] if count else 0
+            block = np.stack([np.asarray(items[k], dtype=np.float16) for k in new_keys])
+            with open(self.vectors_path, "r+b" if os.path.exists(self.vectors_path) else "wb") as f:
+                f.seek(start * self.dim * 2)
+                f.write(block.tobytes())
+            conn.executemany(
+                "INSERT INTO keys (key, row) VALUES (?, ?)",
+                [(k, start + i) for i, k in enumerate(new_keys)],
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO meta (name, value) VALUES ('rows', ?)", (start + len(new_keys),)
+            )
+            conn.commit()
+
+    def __len__(self) -> int:
+        with self._connect() as conn:
+            row = conn.execute("SELECT value FROM meta WHERE name = 'rows'").fetchone()
+        return row[0] if row else 0
+
+
+class CachedEmbeddingFunction(EmbeddingFunction[Documents]):
+    """
+    SentenceTransformerEmbeddingFunction 을 감싼 디스크 캐시
+
+    Chroma 에는 기존과 같은 "sentence_transformer" 임베딩 함수로 보이므로
+    이미 만들어진 컬렉션도 그대로 열린다. 실제 임베딩은 감싼 함수의 공개 호출만 쓴다.
+    """
+
+    def __init__(self, model_name: str = KO_EMBEDDING_MODEL, device: str = "cpu",
+                 normalize_embeddings: bool = False, cache_dir: str = EMBEDDING_CACHE_DIR, **kwargs):
+        self.model_name = model_name
+        self.device = device
+        self.normalize_embeddings = normalize_embeddings
+        self.kwargs = kwargs
+        # 감싼 함수는 생성 시 모델을 바로 로드하므로 첫 캐시 미스 때 만든다
+        self._function: Optional[SentenceTransformerEmbeddingFunction] = None
+        self._function_lock = threading.Lock()
+
+        safe_name = re.sub(r"[^0-9A-Za-z._-]", "_", model_name)
+        suffix = "_norm" if normalize_embeddings else ""
+        self.store = EmbeddingStore(os.path.join(cache_dir, safe_name + suffix))
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def name() -> str:
+        return SentenceTransformerEmbeddingFunction.name()
+
+    def get_config(self) -> Dict:
+        return {
+            "model_name": self.model_name,
+            "device": self.device,
+            "normalize_embeddings": self.normalize_embeddings,
+            "kwargs": self.kwargs,
+        }
+
+    @staticmethod
+    def build_from_config(config: Dict) -> "CachedEmbeddingFunction":
+        return CachedEmbeddingFunction(
+            model_name=config["model_name"], device=config["device"],
+            normalize_embeddings=config["normalize_embeddings"], **config.get("kwargs", {})
+        )
+
+    @staticmethod
+    def validate_config(config: Dict) -> None:
+        SentenceTransformerEmbeddingFunction.validate_config(config)
+
+    def default_space(self):
+        return "cosine"  # SentenceTransformerEmbeddingFunction 과 같은 기본 거리
+
+    def _encode(self, texts: List[str]) -> List[np.ndarray]:
+        with self._function_lock:
+            if self._function is None:
+                self._function = SentenceTransformerEmbeddingFunction(
+                    model_name=self.model_name, device=self.device,
+                    normalize_embeddings=self.normalize_embeddings, **self.kwargs
+                )
+        return self._function(texts)
+
+    def __call__(self, input):
+        texts = list(input)
+        keys = [chunk_key(t) for t in texts]
+        found = self.store.get_many(list(dict.fromkeys(keys)))
+
+        # 캐시에 없는 텍스트만 (중복 제거 후) 한 번에 임베딩
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in found and key not in missing:
+                missing[key] = text
+        if missing:
+            vectors = self._encode(list(missing.values()))
+            fresh = dict(zip(missing.keys(), vectors))
+            self.store.put_many(fresh)
+            found.update((k, np.asarray(v, dtype=np.float32)) for k, v in fresh.items())
+
+        self.hits += len(texts) - len(missing)
+        self.misses += len(missing)
+        return [found[k] for k in keys]
+
+    def stats(self) -> Dict:
+        total = self.hits + self.misses
+        return {
+            "model": self.model_name,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hitRate": round(self.hits / total, 3) if total else 0.0,
+            "stored": len(self.store),
+        }
+
+
+_functions: Dict[str, EmbeddingFunction] = {}
+_functions_lock = threading.Lock()
+
+
+def get_embedding_function(model_name: str = KO_EMBEDDING_MODEL) -> EmbeddingFunction:
+    """
+    프로세스 전역 임베딩 함수 (모델별 하나) — 모든 컬렉션이 이걸 쓰면 캐시를 공유한다.
+    캐시가 꺼져 있거나 열 수 없으면 일반 SentenceTransformerEmbeddingFunction.
+    """
+    with _functions_lock:
+        ef = _functions.get(model_name)
+        if ef is None:
+            if EMBEDDING_CACHE_ENABLED:
+                try:
+                    ef = CachedEmbeddingFunction(model_name=model_name)
+                except Exception as e:
+                    print(f"[EmbeddingCache] 캐시 사용 불가: {e}")
+            if ef is None:
+                ef = SentenceTransformerEmbeddingFunction(model_name=model_name)
+            _functions[model_name] = ef
+        return ef
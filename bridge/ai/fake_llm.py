@@ -0,0 +1,110 @@
+"""
+로컬 가짜 vLLM 서버 (벤치마크·테스트용)
+
+OpenAI 호환 /v1/models, /v1/chat/completions 만 흉내 낸다.
+- 요청 하나당 고정 지연 (latency)
+- 동시에 처리할 수 있는 요청 수 상한 (batch, vLLM max_num_seqs 흉내)
+- N번째 요청마다 503 (fail_every, 재시도 경로 확인용)
+- stream=True 면 SSE 로 글자 몇 개씩 나눠 보내고, stream_options.include_usage 면 마지막에 usage 조각
+응답은 "요약: " + 마지막 메시지 앞 20글자.
+
+사용법:
+    server = FakeLLMServer(latency=0.1, batch=4)
+    llm = get_llm_gateway(server.url)   # llm_gateway 가 이 서버를 가리키게
+    ...
+    server.close()
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FakeLLMServer:
+    """/v1/models, /v1/chat/completions 만 흉내 내는 최소 서버"""
+
+    def __init__(self, latency: float = 0.0, batch: int = 16, fail_every: int = 0):
+        self.latency = latency
+        self.slots = threading.BoundedSemaphore(batch)
+        self.fail_every = fail_every
+        self.requests = 0
+        self.failures = 0
+        self.active = 0       # 지금 처리 중인 요청 수
+        self.peak_active = 0  # 동시에 처리한 최대 요청 수 (클라이언트 동시성 상한 확인용)
+        self._lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                # client.models.list() (setup 시 연결 확인)
+                self._reply(200, {"object": "list", "data": [{"id": "fake", "object": "model"}]})
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+                with server._lock:
+                    server.requests += 1
+                    fail = server.fail_every and server.requests % server.fail_every == 0
+                    if fail:
+                        server.failures += 1
+                if fail:
+                    self._reply(503, {"error": {"message": "overloaded"}})
+                    return
+                with server.slots:
+                    with server._lock:
+                        server.active += 1
+                        server.peak_active = max(server.peak_active, server.active)
+                    time.sleep(server.latency)
+                    with server._lock:
+                        server.active -= 1
+                text = f"요약: {body['messages'][-1]['content'][:20]}"
+                usage = {"prompt_tokens": 1, "completion_tokens": len(text), "total_tokens": 1 + len(text)}
+                if body.get("stream"):
+                    self._reply_stream(body, text, usage)
+                    return
+                self._reply(200, {
+                    "id": "cmpl-fake", "object": "chat.completion", "created": int(time.time()),
+                    "model": body.get("model", "fake"),
+                    "choices": [{"index": 0, "finish_reason": "stop",
+                                 "message": {"role": "assistant", "content": text}}],
+                    "usage": usage,
+                })
+
+            def _reply_stream(self, body, text, usage):
+                base = {"id": "cmpl-fake", "object": "chat.completion.chunk",
+                        "created": int(time.time()), "model": body.get("model", "fake")}
+                chunks = [
+                    dict(base, choices=[{"index": 0, "delta": {"content": text[i:i + 4]}, "finish_reason": None}])
+                    for i in range(0, len(text), 4)
+                ]
+                chunks.append(dict(base, choices=[{"index": 0, "delta": {}, "finish_reason": "stop"}]))
+                if (body.get("stream_options") or {}).get("include_usage"):
+                    chunks.append(dict(base, choices=[], usage=usage))
+                data = "".join(f"data: {json.dumps(c, ensure_ascii=False)}\n\n" for c in chunks)
+                data = (data + "data: [DONE]\n\n").encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _reply(self, status, payload):
+                data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.httpd.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}/v1"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
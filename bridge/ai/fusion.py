@@ -0,0 +1,113 @@
+"""
+하이브리드 검색 점수 병합 (벡터 + BM25)
+
+- rrf      : Reciprocal Rank Fusion — 점수 크기는 보지 않고 순위만 사용 (score = Σ w / (k + rank))
+             소스마다 점수 분포가 달라도 보정이 필요 없음 (기본값)
+- weighted : 소스별 점수를 후보 안에서 min-max 정규화한 뒤 가중 합 (가중치는 합이 1 이 되도록 맞춤)
+- distance : 벡터는 거리 → 유사도 1/(1+d) 를 그대로, BM25 는 최댓값으로 나눠 가중 합 (v2 방식)
+
+후보 깊이: 소스별로 몇 개까지 가져와 병합할지 (FUSION_VECTOR_DEPTH / FUSION_BM25_DEPTH, 최소 n_results)
+어느 설정이 빠르면서 재현율을 유지하는지는 bench_fusion.py 로 확인.
+"""
+import os
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# ============== 설정 ==============
+FUSION_METHOD = os.environ.get("FUSION_METHOD", "rrf")
+FUSION_VECTOR_DEPTH = int(os.environ.get("FUSION_VECTOR_DEPTH", "10"))
+FUSION_BM25_DEPTH = int(os.environ.get("FUSION_BM25_DEPTH", "10"))
+RRF_K = int(os.environ.get("RRF_K", "60"))
+# =================================
+
+METHODS = ("rrf", "weighted", "distance")
+# 방식별 기본 가중치 (벡터, BM25). RRF 는 순위 점수라 0.7/0.3 처럼 치우치면
+# 벡터 40위(0.7/100)가 BM25 1위(0.3/61)보다 높아져 BM25 결과가 거의 들어오지 못함 → 동일 가중
+DEFAULT_WEIGHTS = {"rrf": (1.0, 1.0), "weighted": (0.7, 0.3), "distance": (0.7, 0.3)}
+# 키워드 매칭이 중요한 질문(금액·품목 등)용 BM25 우선 가중치.
+# RRF 는 k=60 이라 조금만 기울여도 순위가 크게 바뀜 — 1.1 이면 BM25 7위까지가 벡터 1위보다 앞섬
+KEYWORD_WEIGHTS = {"rrf": (1.0, 1.1), "weighted": (0.5, 0.5), "distance": (0.5, 0.5)}
+
+
+def keyword_weights(method: Optional[str] = None) -> Tuple[float, float]:
+    """방식별 BM25 우선 가중치 (벡터, BM25) — None 이면 FUSION_METHOD 기준"""
+    return KEYWORD_WEIGHTS[method or FUSION_METHOD]
+
+
+def candidate_depths(n_results: int, vector_depth: Optional[int] = None,
+                     bm25_depth: Optional[int] = None) -> Tuple[int, int]:
+    """소스별 후보 개수 (설정값, 최소 n_results)"""
+    return (max(n_results, vector_depth or FUSION_VECTOR_DEPTH),
+            max(n_results, bm25_depth or FUSION_BM25_DEPTH))
+
+
+def rrf(rankings: Dict[str, Sequence[str]], weights: Optional[Dict[str, float]] = None,
+        k: int = RRF_K) -> Dict[str, float]:
+    """순위 목록들 → id 별 RRF 점수"""
+    scores: Dict[str, float] = {}
+    for source, ranked in rankings.items():
+        w = 1.0 if weights is None else weights.get(source, 1.0)
+        for rank, doc_id in enumerate(ranked):
+            scores[doc_id] = scores.get(doc_id, 0.0) + w / (k + rank + 1)
+    return scores
+
+
+def _min_max(hits: Sequence[Tuple[str, float]]) -> Dict[str, float]:
+    if not hits:
+        return {}
+    values = [s for _, s in hits]
+    low, high = min(values), max(values)
+    if high == low:
+        return {doc_id: 1.0 for doc_id, _ in hits}
+    return {doc_id: (s - low) / (high - low) for doc_id, s in hits}
+
+
+def weighted(scored: Dict[str, Sequence[Tuple[str, float]]],
+             weights: Dict[str, float]) -> Dict[str, float]:
+    """(id, 점수) 목록들 → 소스별 min-max 정규화 후 가중 합 (후보에 없으면 그 소스 점수 0)"""
+    total = sum(weights.get(source, 0.0) for source in scored) or 1.0
+    scores: Dict[str, float] = {}
+    for source, hits in scored.items():
+        w = weights.get(source, 0.0) / total
+        for doc_id, s in _min_max(hits).items():
+            scores[doc_id] = scores.get(doc_id, 0.0) + w * s
+    return scores
+
+
+def distance_to_similarity(distance: float) -> float:
+    return 1.0 / (1.0 + distance)
+
+
+def fuse(vector_hits: Sequence[Tuple[str, float]], bm25_hits: Sequence[Tuple[str, float]],
+         n_results: int, method: Optional[str] = None,
+         vector_weight: Optional[float] = None, bm25_weight: Optional[float] = None) -> List[Tuple[str, float]]:
+    """
+    벡터 결과와 BM25 결과를 병합해 상위 n_results 개 (id, 점수)
+
+    Args:
+        vector_hits: 거리 오름차순 (id, 거리) — Chroma query 결과 순서 그대로
+        bm25_hits: 점수 내림차순 (id, BM25 점수)
+        method: "rrf" | "weighted" | "distance" (None 이면 FUSION_METHOD)
+        vector_weight, bm25_weight: None 이면 방식별 기본값 (DEFAULT_WEIGHTS)
+    """
+    method = method or FUSION_METHOD
+    if method not in METHODS:
+        raise ValueError(f"알 수 없는 병합 방식: {method} (가능: {', '.join(METHODS)})")
+    default_vector, default_bm25 = DEFAULT_WEIGHTS[method]
+    vector_weight = default_vector if vector_weight is None else vector_weight
+    bm25_weight = default_bm25 if bm25_weight is None else bm25_weight
+    weights = {"vector": vector_weight, "bm25": bm25_weight}
+    if method == "rrf":
+        scores = rrf({"vector": [d for d, _ in vector_hits], "bm25": [d for d, _ in bm25_hits]}, weights)
+    elif method == "weighted":
+        # 거리는 작을수록 좋으므로 부호를 바꿔 정규화
+        scores = weighted({"vector": [(d, -dist) for d, dist in vector_hits], "bm25": bm25_hits}, weights)
+    else:  # distance
+        scores = {}
+        for doc_id, dist in vector_hits:
+            scores[doc_id] = vector_weight * distance_to_similarity(dist)
+        top = max((s for _, s in bm25_hits), default=0.0)
+        if top > 0:
+            for doc_id, s in bm25_hits:
+                scores[doc_id] = scores.get(doc_id, 0.0) + bm25_weight * s / top
+
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:n_results]
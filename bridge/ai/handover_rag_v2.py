@@ -6,11 +6,9 @@
 """
 
 import chromadb
-from chromadb.utils import embedding_functions
 from openai import OpenAI
 import os
 import glob
-import re
 from typing import List, Dict, Tuple
 from collections import Counter
 
@@ -27,6 +25,11 @@ import zlib
 import zipfile
 import xml.etree.ElementTree as ET
 
+from embedding_cache import get_embedding_function
+from doc_store import DocStore
+from bm25_tokenizer import get_tokenizer
+from fusion import fuse, candidate_depths, keyword_weights
+
 # ============== 설정 ==============
 BASE_URL = "http://localhost:8000/v1"
 API_KEY = "EMPTY"
@@ -71,93 +74,70 @@ class HybridSearcher:
     
     def __init__(self, collection):
         self.collection = collection
-        self.documents = []
-        self.doc_ids = []
+        self.store = DocStore()  # 행 번호 = BM25 문서 번호
         self.bm25 = None
         self._build_bm25_index()
     
     def _tokenize(self, text: str) -> List[str]:
-        """한국어 토크나이징 (간단 버전)"""
-        # 특수문자 제거 및 공백 분리
-        text = re.sub(r'[^\w\s]', ' ', text)
-        tokens = text.split()
-        return [t for t in tokens if len(t) > 1]
+        """한국어 토크나이징 (BM25_TOKENIZER 설정, 기본은 조사 제거 + bigram)"""
+        return get_tokenizer()(text)
     
     def _build_bm25_index(self):
         """BM25 인덱스 구축"""
-        # ChromaDB에서 모든 문서 가져오기
-        all_docs = self.collection.get(include=["documents", "metadatas"])
+        # ChromaDB에서 모든 문서를 읽어 압축 저장소에 적재
+        self.store = DocStore.from_collection(self.collection)
         
-        if not all_docs['documents']:
+        if not len(self.store):
             return
         
-        self.documents = all_docs['documents']
-        self.doc_ids = all_docs['ids']
-        self.metadatas = all_docs['metadatas']
-        
         # 토크나이징
-        tokenized_docs = [self._tokenize(doc) for doc in self.documents]
+        tokenized_docs = [self._tokenize(self.store.text(row)) for row in range(len(self.store))]
         
         # BM25 인덱스 생성
         self.bm25 = BM25Okapi(tokenized_docs)
-        print(f"   📊 BM25 인덱스 구축 완료: {len(self.documents)}개 문서")
+        print(f"   📊 BM25 인덱스 구축 완료: {len(self.store)}개 문서")
     
     def search(self, query: str, n_results: int = 5, 
-               bm25_weight: float = 0.3, vector_weight: float = 0.7) -> Dict:
-        """하이브리드 검색 수행"""
+               bm25_weight: float = None, vector_weight: float = None,
+               method: str = None) -> Dict:
+        """하이브리드 검색 수행 (병합 방식·가중치·후보 깊이 기본값은 fusion 설정)"""
+        vector_k, bm25_k = candidate_depths(n_results)
         
         # 1. 벡터 검색
         vector_results = self.collection.query(
             query_texts=[query],
-            n_results=n_results * 2  # 더 많이 가져와서 병합
+            n_results=vector_k,
+            include=["distances"]
         )
+        vector_hits = list(zip(vector_results['ids'][0], vector_results['distances'][0]))
         
         # 2. BM25 검색
-        bm25_scores = {}
+        bm25_hits = []
         if self.bm25:
             query_tokens = self._tokenize(query)
             scores = self.bm25.get_scores(query_tokens)
             
-            # 상위 n_results * 2개 선택
-            top_indices = np.argsort(scores)[::-1][:n_results * 2]
+            # 상위 bm25_k 개만 부분 정렬
+            top_indices = np.argpartition(-scores, bm25_k - 1)[:bm25_k] if len(scores) > bm25_k \
+                else np.arange(len(scores))
+            top_indices = top_indices[np.argsort(-scores[top_indices])]
             
-            for idx in top_indices:
-                if scores[idx] > 0:
-                    bm25_scores[self.doc_ids[idx]] = scores[idx]
-        
-        # 3. 점수 병합
-        combined_scores = {}
-        
-        # 벡터 검색 결과 점수화 (거리 기반)
-        for i, doc_id in enumerate(vector_results['ids'][0]):
-            # ChromaDB는 거리를 반환하므로 역수로 변환
-            distance = vector_results['distances'][0][i] if 'distances' in vector_results else 0
-            vector_score = 1 / (1 + distance)  # 거리가 작을수록 높은 점수
-            combined_scores[doc_id] = vector_score * vector_weight
-        
-        # BM25 점수 추가
-        if bm25_scores:
-            max_bm25 = max(bm25_scores.values())
-            for doc_id, score in bm25_scores.items():
-                normalized_score = score / max_bm25 if max_bm25 > 0 else 0
-                if doc_id in combined_scores:
-                    combined_scores[doc_id] += normalized_score * bm25_weight
-                else:
-                    combined_scores[doc_id] = normalized_score * bm25_weight
-        
-        # 4. 상위 n_results 선택
-        sorted_ids = sorted(combined_scores.keys(), 
-                           key=lambda x: combined_scores[x], 
-                           reverse=True)[:n_results]
+            bm25_hits = [(self.store.id_at(idx), scores[idx]) for idx in top_indices if scores[idx] > 0]
+        
+        # 3. 점수 병합 → 4. 상위 n_results 선택
+        sorted_ids = [doc_id for doc_id, _ in fuse(
+            vector_hits, bm25_hits, n_results, method,
+            vector_weight=vector_weight, bm25_weight=bm25_weight
+        )]
         
         # 5. 결과 구성
         result_docs = []
         result_metas = []
         
         for doc_id in sorted_ids:
-            idx = self.doc_ids.index(doc_id)
-            result_docs.append(self.documents[idx])
-            result_metas.append(self.metadatas[idx])
+            row = self.store.row_of(doc_id)
+            result_docs.append(self.store.text(row))
+            result_metas.append(self.store.metadata(row))
         
         return {
             'documents': [result_docs],
@@ -254,9 +234,7 @@ class HandoverRAG:
         
         # 임베딩 및 DB 설정
         print("\n[1/4] 한국어 임베딩 엔진 로드 중...")
-        ko_embedding = embedding_functions.SentenceTransformerEmbeddingFunction(
-            model_name="jhgan/ko-sroberta-multitask"
-        )
+        ko_embedding = get_embedding_function("jhgan/ko-sroberta-multitask")
         
         print("[2/4] ChromaDB 초기화 중...")
         db_client = chromadb.PersistentClient(path=CHROMA_DB_PATH)
@@ -359,13 +337,13 @@ class HandoverRAG:
         
         # 질문 유형에 따라 검색 가중치 조정
         if query_type == "budget":
-            # 예산 질문은 키워드 매칭 중요 (청크가 작아서 5개 가능)
-            results = self.searcher.search(query, n_results=5, 
-                                          bm25_weight=0.5, vector_weight=0.5)
-        else:
-            # 일반적인 경우 의미론적 검색 우선
+            # 예산 질문은 키워드 매칭 중요 → 병합 방식별 BM25 우선 가중치 (청크가 작아서 5개 가능)
+            vector_weight, bm25_weight = keyword_weights()
             results = self.searcher.search(query, n_results=5,
-                                          bm25_weight=0.3, vector_weight=0.7)
+                                          bm25_weight=bm25_weight, vector_weight=vector_weight)
+        else:
+            # 일반적인 경우 병합 방식별 기본 가중치 (점수 병합이면 의미론적 검색 0.7 우선)
+            results = self.searcher.search(query, n_results=5)
         
         print(" 완료!")
         
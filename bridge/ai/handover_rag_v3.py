@@ -6,24 +6,25 @@
 """
 
 import json
-import os
-import glob
 import re
+import time
 from datetime import datetime
-from typing import List, Dict, Any, Optional, TypedDict
+from typing import List, Dict, Any, Iterator, Optional, Tuple, TypedDict
 from dataclasses import dataclass, asdict
 
-import chromadb
-from chromadb.utils import embedding_functions
-from openai import OpenAI
-from rank_bm25 import BM25Okapi
-import numpy as np
-
 # LangGraph
 from langgraph.graph import StateGraph, END
 
 # ============== 설정 (중앙 config 연동) ==============
-import config
+from llm_gateway import get_llm_gateway
+from project_index import (
+    get_project_collection, project_embedding_function, index_generation, get_bm25_index, DEFAULT_PROJECT_ID,
+)
+from fusion import fuse, candidate_depths
+from query_filter import extract_filters, relaxations, chroma_where, FILTER_MIN_MATCHES
+from query_cache import get_query_cache
+from json_stream import JSONFieldStream
+from performance import global_monitor
 # =================================
 
 
@@ -69,6 +70,7 @@ class ProjectState(TypedDict):
     """LangGraph 상태 정의"""
     query: str
     query_type: str
+    filters: Dict  # 검색에 실제 적용한 메타데이터 필터 (완화 후)
     files: List[Dict]
     retrieved_docs: List[Dict]
     timeline: Dict
@@ -76,6 +78,7 @@ class ProjectState(TypedDict):
     summary: Dict
     response_json: Dict
     final_answer: str
+    refresh_cache: bool  # True면 LLM 응답 캐시를 읽지 않고 새로 생성
 
 
 @dataclass
@@ -130,70 +133,142 @@ class QueryClassifier:
 class HybridSearcher:
     def __init__(self, collection):
         self.collection = collection
-        self.documents = []
-        self.doc_ids = []
-        self.metadatas = []
-        self.bm25 = None
-        self._build_index()
+        # 컬렉션과 함께 갱신되는 공유 역색인 (색인기가 청크를 쓰거나 지울 때 바로 반영)
+        self.bm25 = get_bm25_index(collection)
+        self.generation = index_generation(collection)  # 이 세대의 색인을 기준으로 만든 검색기
+        # 질의 임베딩·순위 캐시 (컬렉션별로 공유, 결과는 색인 세대가 바뀌면 무효)
+        self.cache = get_query_cache(collection)
+        self.embedding_function = project_embedding_function()
     
-    def _tokenize(self, text: str) -> List[str]:
-        text = re.sub(r'[^\w\s]', ' ', text)
-        return [t for t in text.split() if len(t) > 1]
+    @property
+    def is_stale(self) -> bool:
+        """분석/색인이 컬렉션을 바꿨으면 True"""
+        return self.generation != index_generation(self.collection)
     
-    def _build_index(self):
-        all_docs = self.collection.get(include=["documents", "metadatas"])
-        if not all_docs['documents']:
-            return
-        self.documents = all_docs['documents']
-        self.doc_ids = all_docs['ids']
-        self.metadatas = all_docs['metadatas']
-        tokenized = [self._tokenize(doc) for doc in self.documents]
-        self.bm25 = BM25Okapi(tokenized)
+    def resolve_filters(self, filters: Dict, n_results: int = 5) -> Dict:
+        """
+        필터에 맞는 청크가 max(n_results, FILTER_MIN_MATCHES) 개 미만이면 조건을 하나씩 풀어
+        충분히 남는 가장 좁은 필터 반환 (BM25 비트맵으로 세므로 Chroma 질의 없이 판단)
+        """
+        if not filters:
+            return {}
+        needed = max(n_results, FILTER_MIN_MATCHES)
+        for level in relaxations(filters):
+            if not level or self.bm25.count(level) >= needed:
+                if level != filters:
+                    print(f"[Filter] 필터 완화: {filters} → {level or '없음'}")
+                return level
+        return {}
     
-    def search(self, query: str, n_results: int = 5) -> List[Dict]:
-        # 벡터 검색
-        vector_results = self.collection.query(query_texts=[query], n_results=n_results * 2)
-        
-        # BM25 검색
-        bm25_scores = {}
-        if self.bm25:
-            scores = self.bm25.get_scores(self._tokenize(query))
-            for idx in np.argsort(scores)[::-1][:n_results * 2]:
-                if scores[idx] > 0:
-                    bm25_scores[self.doc_ids[idx]] = scores[idx]
-        
-        # 점수 병합
-        combined = {}
-        for i, doc_id in enumerate(vector_results['ids'][0]):
-            combined[doc_id] = 0.7 * (1 / (1 + i))
+    def search(self, query: str, n_results: int = 5, method: Optional[str] = None,
+               vector_depth: Optional[int] = None, bm25_depth: Optional[int] = None,
+               filters: Optional[Dict] = None) -> List[Dict]:
+        """
+        벡터·BM25 후보를 소스별 깊이만큼 가져와 병합 (병합 방식·깊이 기본값은 fusion 설정)
+        filters 가 있으면 Chroma 에는 where 절로, BM25 에는 슬롯 비트맵으로 같은 범위만 검색
+        (완화는 하지 않음 — resolve_filters 로 먼저 정할 것)
+        같은 (정규화한) 질의·옵션이 같은 세대에 다시 오면 캐시된 순위를 그대로 씀
+        """
+        vector_k, bm25_k = candidate_depths(n_results, vector_depth, bm25_depth)
+        generation = index_generation(self.collection)
+        key = None
+        sorted_ids = None
+        if self.cache is not None:
+            key = self.cache.result_key(query, n_results=n_results, method=method, vector_k=vector_k,
+                                        bm25_k=bm25_k, filters=filters or {})
+            sorted_ids = self.cache.get_results(key, generation)
+        
+        if sorted_ids is None:
+            sorted_ids = self._rank(query, n_results, method, vector_k, bm25_k, filters)
+            if self.cache is not None:
+                self.cache.put_results(key, generation, sorted_ids)
+        if not sorted_ids:
+            return []
+        fetched = self.collection.get(ids=sorted_ids, include=["documents", "metadatas"])
+        found = dict(zip(fetched['ids'], zip(fetched['documents'], fetched['metadatas'])))
+        
+        return [
+            {"id": doc_id, "content": found[doc_id][0], "metadata": found[doc_id][1]}
+            for doc_id in sorted_ids if doc_id in found
+        ]
+    
+    def _embed_query(self, query: str):
+        if self.cache is not None:
+            return self.cache.embedding(query, self.embedding_function)
+        return self.embedding_function([query])[0]
+    
+    def _rank(self, query: str, n_results: int, method: Optional[str], vector_k: int, bm25_k: int,
+              filters: Optional[Dict]) -> List[str]:
+        """벡터·BM25 검색 후 병합한 상위 id 목록"""
+        where = chroma_where(filters or {})
         
-        if bm25_scores:
-            max_bm25 = max(bm25_scores.values())
-            for doc_id, score in bm25_scores.items():
-                combined[doc_id] = combined.get(doc_id, 0) + 0.3 * (score / max_bm25)
+        # 벡터 검색 (후보는 id·거리만, 본문은 최종 결과만 가져옴)
+        query_args = {"where": where} if where else {}
+        vector_results = self.collection.query(query_embeddings=[self._embed_query(query)], n_results=vector_k,
+                                               include=["distances"], **query_args)
+        vector_hits = list(zip(vector_results['ids'][0], vector_results['distances'][0]))
         
-        # 상위 결과 반환
-        sorted_ids = sorted(combined.keys(), key=lambda x: combined[x], reverse=True)[:n_results]
+        # BM25 검색 (질의 단어의 포스팅만 훑고 상위 k 개만 부분 정렬)
+        bm25_hits = self.bm25.search(query, bm25_k, filters)
         
-        results = []
-        for doc_id in sorted_ids:
-            idx = self.doc_ids.index(doc_id)
-            results.append({
-                "id": doc_id,
-                "content": self.documents[idx],
-                "metadata": self.metadatas[idx]
-            })
-        return results
+        # 점수 병합
+        return [doc_id for doc_id, _ in fuse(vector_hits, bm25_hits, n_results, method)]
+
+
+# ============== 답변 JSON ==============
+def parse_answer_json(answer: str) -> Dict:
+    """LLM 응답에서 JSON 객체 추출 (실패하면 {"raw": 응답})"""
+    json_match = re.search(r'\{[\s\S]*\}', answer)
+    if json_match:
+        try:
+            return json.loads(json_match.group())
+        except ValueError:
+            pass
+    return {"raw": answer}
+
+
+def _won(amount) -> str:
+    return f"{amount:,}원" if isinstance(amount, int) else str(amount)
+
+
+def format_answer_field(key: str, value: Any) -> str:
+    """답변 JSON 필드 하나 → 채팅 창에 보여줄 텍스트 (스트리밍 중 필드가 완성될 때마다 사용)"""
+    if key in ("greeting", "closing", "raw", "error"):
+        return str(value)
+    if key == "summary" and isinstance(value, dict):
+        lines = [f"📋 {value.get('title', '요약')}"]
+        if value.get("totalAmount"):
+            lines.append(f"💰 총액: {_won(value['totalAmount'])}")
+        if value.get("period"):
+            lines.append(f"📅 기간: {value['period']}")
+        lines += [f"• {point}" for point in value.get("keyPoints", [])]
+        return "\n".join(lines)
+    if key == "details" and isinstance(value, dict):
+        lines = [value["description"]] if value.get("description") else []
+        for item in value.get("items", []):
+            if isinstance(item, dict):
+                lines.append(f"- {item.get('name', '')} | {item.get('calculation', '')} | {_won(item.get('amount', 0))}")
+        return "\n".join(lines)
+    if key == "regulations" and isinstance(value, list):
+        return "\n".join(["📜 관련 규정"] + [f"• {v}" for v in value])
+    if key == "tips" and isinstance(value, list):
+        return "\n".join(["💡 인수인계 팁"] + [f"• {v}" for v in value])
+    return ""
+
+
+def format_answer(response_json: Dict) -> str:
+    """답변 JSON 전체 → 텍스트 (필드 순서대로 format_answer_field 를 이어붙임)"""
+    parts = [format_answer_field(key, value) for key, value in response_json.items()]
+    return "\n\n".join(p for p in parts if p)
 
 
 # ============== RAG 엔진 ==============
 class HandoverRAGEngine:
-    def __init__(self, base_url: Optional[str] = None):
-        import httpx
-        self.base_url = base_url or config.LLM_API_URL
-        # SSL 검증 무시 (RunPod 프록시 대응)
-        http_client = httpx.Client(verify=False)
-        self.client = OpenAI(base_url=self.base_url, api_key=config.API_KEY, http_client=http_client)
+    def __init__(self, base_url: Optional[str] = None, project_id: str = DEFAULT_PROJECT_ID):
+        # 서버별 공유 LLM 게이트웨이 (연결 풀·동시성 상한을 분석 작업과 공유, SSL 검증은 LLM_VERIFY_SSL)
+        self.llm = get_llm_gateway(base_url)
+        self.base_url = self.llm.base_url
+        self.project_id = project_id  # 검색할 프로젝트 색인
         self.collection = None
         self.searcher = None
         self.graph = None
@@ -207,25 +282,17 @@ class HandoverRAGEngine:
         # 서버 연결 확인
         print("[1/4] vLLM 서버 연결 확인...", end="", flush=True)
         try:
-            self.client.models.list()
+            self.llm.list_models()
             print(" ✅")
         except Exception as e:
             print(f" ❌\n{e}")
             return False
         
-        # ChromaDB 설정
+        # ChromaDB 설정 — /analyze 가 만든 프로젝트 색인에 연결 (다시 임베딩하지 않음)
         print("[2/4] ChromaDB 초기화...", end="", flush=True)
-        ko_embedding = embedding_functions.SentenceTransformerEmbeddingFunction(
-            model_name="jhgan/ko-sroberta-multitask"
-        )
-        db_client = chromadb.PersistentClient(path=config.CHROMA_DB_PATH)
-        self.collection = db_client.get_or_create_collection(
-            "handover_v3", embedding_function=ko_embedding
-        )
-        print(" ✅")
+        self.collection = get_project_collection(self.project_id)
+        print(f" ✅ (청크 {self.collection.count()}개)")
         
-        # 문서 로드
-        print("[3/4] 문서 로드 중...")
         # 검색 엔진 초기화
         print("[3/4] 하이브리드 검색 엔진 초기화...", end="", flush=True)
         self.searcher = HybridSearcher(self.collection)
@@ -237,77 +304,59 @@ class HandoverRAGEngine:
         print("\n✅ 시스템 준비 완료!")
         return True
     
-    def load_directory(self, path: str):
-        """
-        [동적 로드] 사용자가 선택한 폴더의 문서를 색인합니다.
-        가장 최신 정보를 유지하기 위해 기존 DB를 밀고 새로 만듭니다.
-        """
-        print(f"\n📂 AI 엔진 색인 업데이트: {path}")
-        
-        from local_rag import read_pdf, read_docx, read_excel, read_hwp, read_hwpx, read_text_file, split_text
-        
-        loaders = {
-            ".pdf": read_pdf, ".docx": read_docx, ".xlsx": read_excel,
-            ".xls": read_excel, ".hwp": read_hwp, ".hwpx": read_hwpx,
-            ".txt": read_text_file, ".md": read_text_file
-        }
-        
-        if not os.path.exists(path):
-            return
-        
-        # 하위 디렉토리까지 재귀 검색
-        all_files = glob.glob(os.path.join(path, "**", "*.*"), recursive=True)
-        docs, metas, ids = [], [], []
+    def _answer_messages(self, state: ProjectState) -> List[Dict]:
+        """답변 생성 프롬프트 (검색된 문서 + 질문, JSON 형식 지시)"""
+        context = "\n\n".join([
+            f"[{doc['metadata'].get('source', 'unknown')}]\n{doc['content']}"
+            for doc in state["retrieved_docs"]
+        ])
         
-        for file_path in all_files:
-            ext = os.path.splitext(file_path)[1].lower()
-            if ext not in loaders: continue
-            
-            try:
-                content = loaders[ext](file_path)
-                if content and len(content.strip()) > 10:
-                    chunks = split_text(content, chunk_size=1500, overlap=300)
-                    for j, chunk in enumerate(chunks):
-                        docs.append(chunk)
-                        metas.append({
-                            "fileId": f"file-{len(docs)}",
-                            "source": os.path.basename(file_path),
-                            "docType": self._infer_doc_type(file_path, chunk),
-                            "chunk": j,
-                            "date": self._extract_date(chunk)
-                        })
-                        ids.append(f"{os.path.basename(file_path)}_{j}")
-            except Exception as e:
-                print(f"   ! AI 색인 오류 ({os.path.basename(file_path)}): {e}")
+        system_prompt = f"""당신은 공공기관 업무 인수인계 AI 전문가입니다.
 
-        # 기존 데이터 초기화 (항상 최신 상태 보장)
-        try:
-            self.collection.delete(where={})
-        except:
-            pass
+{PUBLIC_INSTITUTION_GUIDELINES}
 
-        if docs:
-            self.collection.upsert(documents=docs, metadatas=metas, ids=ids)
-            print(f"   📚 AI 엔진 색인 완료 (총 {len(docs)}개 청크)")
-            self.searcher = HybridSearcher(self.collection)
-    
-    def _infer_doc_type(self, path: str, content: str) -> str:
-        name = os.path.basename(path).lower()
-        if any(kw in name for kw in ["예산", "결산", "산출"]):
-            return "budget"
-        elif any(kw in name for kw in ["계약", "용역"]):
-            return "contract"
-        elif any(kw in name for kw in ["규정", "지침"]):
-            return "regulation"
-        elif "원" in content and re.search(r'\d{1,3}(,\d{3})+', content):
-            return "budget"
-        return "general"
-    
-    def _extract_date(self, content: str) -> str:
-        match = re.search(r'(\d{4})[-./](\d{1,2})[-./](\d{1,2})', content)
-        if match:
-            return f"{match.group(1)}-{match.group(2).zfill(2)}-{match.group(3).zfill(2)}"
-        return ""
+## 응답 규칙
+1. 반드시 JSON 형식으로 응답하세요.
+2. 금액은 천 단위 쉼표 포함 (예: 20,377,728원)
+3. 표 데이터는 items 배열로 구조화
+4. 친절하고 상세하게 안내
+
+## JSON 응답 형식
+```json
+{{
+  "greeting": "안녕하세요! [질문 주제]에 대해 안내드리겠습니다.",
+  "summary": {{
+    "title": "제목",
+    "totalAmount": 0,
+    "period": "기간",
+    "keyPoints": ["핵심 포인트 1", "핵심 포인트 2"]
+  }},
+  "details": {{
+    "description": "상세 설명",
+    "items": [
+      {{"name": "항목명", "calculation": "산출식", "amount": 0}}
+    ]
+  }},
+  "regulations": ["관련 규정 1", "관련 규정 2"],
+  "tips": ["인수인계 팁 1", "실무 노하우"],
+  "closing": "추가 질문이 있으시면 말씀해 주세요!"
+}}
+```"""
+
+        user_prompt = f"""다음 문서를 참고하여 질문에 JSON 형식으로 답변하세요.
+
+[참고 문서]
+{context}
+
+[질문]
+{state["query"]}
+
+반드시 위 JSON 형식을 지켜주세요."""
+        
+        return [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt}
+        ]
     
     def _build_graph(self):
         """LangGraph 워크플로우 구성"""
@@ -320,7 +369,15 @@ class HandoverRAGEngine:
         
         def retrieve_documents(state: ProjectState) -> ProjectState:
             """Step 2: 문서 검색"""
-            results = self.searcher.search(state["query"], n_results=5)
+            if self.searcher.is_stale:
+                # 채팅 엔진 준비 후 분석이 색인을 갱신한 경우
+                self.searcher = HybridSearcher(self.collection)
+            # 질문 유형·날짜·파일명으로 범위를 좁히고, 남는 청크가 적으면 필터 완화
+            filters = extract_filters(state["query"], state["query_type"],
+                                      self.searcher.bm25.facet_values("source"))
+            filters = self.searcher.resolve_filters(filters, n_results=5)
+            results = self.searcher.search(state["query"], n_results=5, filters=filters)
+            state["filters"] = filters
             state["retrieved_docs"] = results
             return state
         
@@ -386,76 +443,14 @@ class HandoverRAGEngine:
         
         def generate_response(state: ProjectState) -> ProjectState:
             """Step 4: AI 응답 생성 (JSON 형식)"""
-            context = "\n\n".join([
-                f"[{doc['metadata'].get('source', 'unknown')}]\n{doc['content']}"
-                for doc in state["retrieved_docs"]
-            ])
-            
-            system_prompt = f"""당신은 공공기관 업무 인수인계 AI 전문가입니다.
-
-{PUBLIC_INSTITUTION_GUIDELINES}
-
-## 응답 규칙
-1. 반드시 JSON 형식으로 응답하세요.
-2. 금액은 천 단위 쉼표 포함 (예: 20,377,728원)
-3. 표 데이터는 items 배열로 구조화
-4. 친절하고 상세하게 안내
-
-## JSON 응답 형식
-```json
-{{
-  "greeting": "안녕하세요! [질문 주제]에 대해 안내드리겠습니다.",
-  "summary": {{
-    "title": "제목",
-    "totalAmount": 0,
-    "period": "기간",
-    "keyPoints": ["핵심 포인트 1", "핵심 포인트 2"]
-  }},
-  "details": {{
-    "description": "상세 설명",
-    "items": [
-      {{"name": "항목명", "calculation": "산출식", "amount": 0}}
-    ]
-  }},
-  "regulations": ["관련 규정 1", "관련 규정 2"],
-  "tips": ["인수인계 팁 1", "실무 노하우"],
-  "closing": "추가 질문이 있으시면 말씀해 주세요!"
-}}
-```"""
-
-            user_prompt = f"""다음 문서를 참고하여 질문에 JSON 형식으로 답변하세요.
-
-[참고 문서]
-{context}
-
-[질문]
-{state["query"]}
-
-반드시 위 JSON 형식을 지켜주세요."""
-
             try:
-                response = self.client.chat.completions.create(
-                    model=config.MODEL_NAME,
-                    messages=[
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": user_prompt}
-                    ],
+                answer = self.llm.chat(
+                    "chat",
+                    messages=self._answer_messages(state),
+                    bypass=state.get("refresh_cache", False),
                     temperature=0.0
                 )
-                
-                answer = response.choices[0].message.content
-                
-                # JSON 추출 시도
-                json_match = re.search(r'\{[\s\S]*\}', answer)
-                if json_match:
-                    try:
-                        response_json = json.loads(json_match.group())
-                        state["response_json"] = response_json
-                    except:
-                        state["response_json"] = {"raw": answer}
-                else:
-                    state["response_json"] = {"raw": answer}
-                
+                state["response_json"] = parse_answer_json(answer)
                 state["final_answer"] = answer
                 
             except Exception as e:
@@ -479,42 +474,28 @@ class HandoverRAGEngine:
         workflow.add_edge("generate", END)
         
         self.graph = workflow.compile()
+        
+        # 스트리밍 답변용: 검색·구조화까지만 실행하고 생성은 ask_stream 에서 토큰 단위로
+        prepare = StateGraph(ProjectState)
+        prepare.add_node("classify", classify_query)
+        prepare.add_node("retrieve", retrieve_documents)
+        prepare.add_node("structure", build_structure)
+        prepare.set_entry_point("classify")
+        prepare.add_edge("classify", "retrieve")
+        prepare.add_edge("retrieve", "structure")
+        prepare.add_edge("structure", END)
+        self.prepare_graph = prepare.compile()
     
-    def ask(self, query: str) -> Dict:
-        """질문 처리 및 구조화된 응답 반환"""
+    def ask(self, query: str, refresh_cache: bool = False) -> Dict:
+        """질문 처리 및 구조화된 응답 반환 (refresh_cache=True 면 캐시된 LLM 응답 무시)"""
         print(f"\n📝 질문: {query}")
         print("=" * 50)
         
-        initial_state = {
-            "query": query,
-            "query_type": "",
-            "files": [],
-            "retrieved_docs": [],
-            "timeline": {},
-            "issues": [],
-            "summary": {},
-            "response_json": {},
-            "final_answer": ""
-        }
-        
         print("🔄 처리 중...")
-        result = self.graph.invoke(initial_state)
+        result = self.graph.invoke(self._initial_state(query, refresh_cache))
         
         # 최종 응답 구성
-        final_response = {
-            "project": {
-                "id": f"proj-{datetime.now().strftime('%Y%m%d%H%M%S')}",
-                "name": query[:30],
-                "fileCount": len(result["files"]),
-                "files": result["files"]
-            },
-            "summary": {
-                "timeline": result["timeline"],
-                "issues": result["issues"]
-            },
-            "answer": result["response_json"],
-            "sources": [f["name"] for f in result["files"]]
-        }
+        final_response = self._final_response(query, result)
         
         # 결과 출력
         print("\n" + "=" * 50)
@@ -558,6 +539,101 @@ class HandoverRAGEngine:
         
         return final_response
     
+    def ask_stream(self, query: str, refresh_cache: bool = False) -> Iterator[Tuple[str, Dict]]:
+        """
+        ask 의 스트리밍 버전 — (이벤트, 데이터) 를 차례로 yield
+        
+        - meta  : 검색 완료 {queryType, filters, sources, retrieveMs}
+        - start : 첫 토큰 도착 {ttftMs} (질문 수신 ~ 첫 토큰, PerformanceMonitor CHAT_TTFT)
+        - token : 생성 텍스트 조각 {text}
+        - field : 답변 JSON 최상위 필드 완성 {key, value, text} (text 는 화면 표시용)
+        - done  : ask 와 같은 최종 응답 + answerText, timing {retrieveMs, ttftMs, totalMs}
+        """
+        print(f"\n📝 질문 (스트리밍): {query}")
+        started = time.perf_counter()
+        state = self.prepare_graph.invoke(self._initial_state(query, refresh_cache))
+        retrieve_ms = (time.perf_counter() - started) * 1000
+        yield "meta", {
+            "queryType": state["query_type"],
+            "filters": state["filters"],
+            "sources": [f["name"] for f in state["files"]],
+            "retrieveMs": round(retrieve_ms, 1),
+        }
+        
+        fields = JSONFieldStream()
+        parts = []
+        ttft_ms = None
+        try:
+            for delta in self.llm.chat_stream(
+                "chat",
+                messages=self._answer_messages(state),
+                bypass=refresh_cache,
+                temperature=0.0
+            ):
+                if ttft_ms is None:
+                    ttft = time.perf_counter() - started
+                    ttft_ms = ttft * 1000
+                    global_monitor.record("CHAT_TTFT", ttft)
+                    yield "start", {"ttftMs": round(ttft_ms, 1)}
+                parts.append(delta)
+                yield "token", {"text": delta}
+                for key, value in fields.feed(delta):
+                    yield "field", {"key": key, "value": value, "text": format_answer_field(key, value)}
+            
+            answer = "".join(parts)
+            response_json = parse_answer_json(answer)
+            if "raw" in response_json and fields.fields:
+                response_json = fields.fields  # 전체 파싱은 실패했지만 완성된 필드는 있음
+            state["response_json"] = response_json
+            state["final_answer"] = answer
+        except Exception as e:
+            state["final_answer"] = f"오류 발생: {e}"
+            state["response_json"] = {"error": str(e)}
+        
+        total = time.perf_counter() - started
+        global_monitor.record("CHAT_TOTAL", total)
+        final_response = self._final_response(query, state)
+        final_response["answerText"] = format_answer(state["response_json"])
+        final_response["timing"] = {
+            "retrieveMs": round(retrieve_ms, 1),
+            "ttftMs": round(ttft_ms, 1) if ttft_ms is not None else None,
+            "totalMs": round(total * 1000, 1),
+        }
+        yield "done", final_response
+    
+    @staticmethod
+    def _initial_state(query: str, refresh_cache: bool) -> Dict:
+        return {
+            "query": query,
+            "query_type": "",
+            "filters": {},
+            "files": [],
+            "retrieved_docs": [],
+            "timeline": {},
+            "issues": [],
+            "summary": {},
+            "response_json": {},
+            "final_answer": "",
+            "refresh_cache": refresh_cache
+        }
+    
+    @staticmethod
+    def _final_response(query: str, result: Dict) -> Dict:
+        return {
+            "project": {
+                "id": f"proj-{datetime.now().strftime('%Y%m%d%H%M%S')}",
+                "name": query[:30],
+                "fileCount": len(result["files"]),
+                "files": result["files"]
+            },
+            "summary": {
+                "timeline": result["timeline"],
+                "issues": result["issues"]
+            },
+            "answer": result["response_json"],
+            "sources": [f["name"] for f in result["files"]]
+        }
+    
     def run(self):
         """대화형 실행"""
         print("\n" + "=" * 70)
@@ -594,12 +670,6 @@ def main():
         print("⚠️ langgraph 설치 필요: pip install langgraph")
         return
     
-    try:
-        from rank_bm25 import BM25Okapi
-    except ImportError:
-        print("⚠️ rank_bm25 설치 필요: pip install rank-bm25")
-        return
-    
     engine = HandoverRAGEngine()
     if engine.setup():
         engine.run()
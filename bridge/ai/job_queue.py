@@ -0,0 +1,480 @@
+"""
+분석 작업 큐 (api_server /analyze 용)
+요청마다 스레드를 띄우고 전역 dict 에 쌓아두던 방식 대신, 크기 제한 큐 + 고정 워커 풀 + SQLite 작업 저장소.
+
+- 큐: 대기 작업은 최대 JOB_QUEUE_SIZE 개, 넘치면 submit() 이 QueueFull (→ HTTP 429)
+- 워커: JOB_WORKERS 개 스레드가 큐에서 꺼내 handler(job) 실행
+  (분석은 대부분 vLLM 응답 대기라 프로세스 대신 스레드 — Ko-SBERT 모델·Chroma 클라이언트를 공유)
+- 저장소: 상태·결과·오류를 JOB_DB_PATH(SQLite)에 기록 → 서버를 재시작해도 /analyze/status 조회 가능
+  재시작 시 pending/running 이던 작업은 "서버 재시작으로 중단" 오류로 정리
+- 이벤트: 진행 이벤트(SSE 용)는 메모리에만, 끝난 작업은 최근 JOB_MEMORY_KEEP 개만 메모리에 유지
+- 만료: 끝난 지 JOB_TTL_HOURS 가 지난 작업은 정리 스레드가 삭제
+- 합치기: 같은 dedupe_key(예: 분석할 파일들의 지문)로 대기·실행 중인 작업이 있거나
+  JOB_COALESCE_SECONDS 안에 성공한 작업이 있으면 새로 실행하지 않고 그 작업 id 를 돌려줌
+  끝난 작업은 같은 scope(예: 프로젝트)에서 가장 최근에 끝난 작업이고 그 scope 에 대기·실행 중인 작업이 없을 때만
+  재사용 (F → G → F 처럼 그 사이에 다른 분석이 색인을 바꿨으면 다시 실행), forget(scope) 로 재사용 대상에서 제외
+  같은 idempotency_key 로 다시 들어온 요청(클라이언트 재시도)은 상태와 관계없이 처음 작업 id
+- 취소: cancel() → 대기 중이면 바로 cancelled, 실행 중이면 job.cancel_event 를 세우고 handler 가 멈추길 기다림
+- 지표: 대기열 길이(JOB_QUEUE_DEPTH)·실행 중 작업 수(JOB_RUNNING)를 PerformanceMonitor 게이지로,
+  완료 처리량은 JOB_<종류> 로 기록 → GET /jobs/stats
+
+handler 규칙:
+    def handler(job) -> dict:      # 반환값이 결과
+        job.emit("progress", {...})
+        if job.cancelled: ...      # 예외를 던지면 cancel_event 가 세워져 있을 때 cancelled, 아니면 error
+"""
+import os
+import sys
+import json
+import time
+import uuid
+import zlib
+import queue
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+# 상위 디렉토리(bridge)를 sys.path에 추가하여 performance 접근
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from performance import global_monitor
+from sqlite_lru import wal_connection
+
+# ============== 설정 ==============
+JOB_WORKERS = int(os.environ.get("JOB_WORKERS", "2"))              # 동시에 실행하는 작업 수
+JOB_QUEUE_SIZE = int(os.environ.get("JOB_QUEUE_SIZE", "16"))       # 대기 작업 상한
+JOB_DB_PATH = os.environ.get("JOB_DB_PATH", "./cache/jobs.db")
+JOB_TTL_HOURS = float(os.environ.get("JOB_TTL_HOURS", "24"))       # 끝난 작업 보관 시간
+JOB_CLEANUP_INTERVAL = float(os.environ.get("JOB_CLEANUP_INTERVAL", "600"))  # 만료 정리 주기(초)
+JOB_MEMORY_KEEP = int(os.environ.get("JOB_MEMORY_KEEP", "32"))     # 메모리에 남길 끝난 작업 수 (SSE 재연결용)
+JOB_COALESCE_SECONDS = float(os.environ.get("JOB_COALESCE_SECONDS", "600"))  # 끝난 작업을 재사용하는 시간
+# =================================
+
+FINAL_STATUSES = ("done", "error", "cancelled")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    status TEXT NOT NULL,
+    params TEXT NOT NULL,
+    dedupe_key TEXT,
+    idempotency_key TEXT,
+    scope TEXT,
+    result BLOB,
+    error TEXT,
+    created REAL NOT NULL,
+    started REAL,
+    finished REAL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_finished ON jobs(finished);
+"""
+# 합치기 키가 없던 저장소에 추가할 열 + 색인
+_MIGRATIONS = (("dedupe_key", "TEXT"), ("idempotency_key", "TEXT"), ("scope", "TEXT"))
+_KEY_INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_jobs_dedupe ON jobs(dedupe_key, finished);
+CREATE INDEX IF NOT EXISTS idx_jobs_scope ON jobs(kind, scope, finished);
+CREATE INDEX IF NOT EXISTS idx_jobs_idempotency ON jobs(idempotency_key);
+"""
+
+
+class QueueFull(Exception):
+    """대기 작업이 JOB_QUEUE_SIZE 개를 넘음"""
+
+
+class Job:
+    """실행 중인 작업 하나 (진행 이벤트 + 취소 신호)"""
+
+    def __init__(self, job_id: str, kind: str, params: Dict, created: float,
+                 dedupe_key: Optional[str] = None, idempotency_key: Optional[str] = None,
+                 scope: Optional[str] = None):
+        self.id = job_id
+        self.kind = kind
+        self.params = params
+        self.created = created
+        self.dedupe_key = dedupe_key
+        self.idempotency_key = idempotency_key
+        self.scope = scope  # 같은 대상(프로젝트 색인)을 바꾸는 작업 묶음
+        self.status = "pending"
+        self.result: Optional[Dict] = None
+        self.error: Optional[str] = None
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self.events: List[tuple] = []  # (id, type, data)
+        self.cond = threading.Condition()
+        self.cancel_event = threading.Event()
+
+    @property
+    def cancelled(self) -> bool:
+        return self.cancel_event.is_set()
+
+    def emit(self, event_type: str, data: Dict):
+        """이벤트 기록 후 대기 중인 스트림 깨우기"""
+        with self.cond:
+            self.events.append((len(self.events) + 1, event_type, data))
+            self.cond.notify_all()
+
+    def wait_events(self, last_id: int, timeout: float) -> list:
+        """last_id 이후 이벤트가 생길 때까지 최대 timeout 초 대기"""
+        with self.cond:
+            self.cond.wait_for(lambda: len(self.events) > last_id, timeout=timeout)
+            return self.events[last_id:]
+
+    def to_dict(self) -> Dict:
+        return {
+            "id": self.id, "kind": self.kind, "status": self.status,
+            "result": self.result, "error": self.error,
+            "created": self.created, "started": self.started, "finished": self.finished,
+        }
+
+
+class JobStore:
+    """작업 상태 SQLite 저장소 (결과 JSON 은 zlib 압축)"""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        if os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(jobs)")}
+            for column, kind in _MIGRATIONS:
+                if column not in columns:
+                    conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {kind}")
+            conn.executescript(_KEY_INDEXES)
+
+    def _connect(self):
+        return wal_connection(self.db_path, timeout=10)
+
+    def insert(self, job: Job):
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, kind, status, params, dedupe_key, idempotency_key, scope, created) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (job.id, job.kind, job.status, json.dumps(job.params, ensure_ascii=False),
+                 job.dedupe_key, job.idempotency_key, job.scope, job.created),
+            )
+
+    def update(self, job: Job):
+        result = None
+        if job.result is not None:
+            result = zlib.compress(json.dumps(job.result, ensure_ascii=False).encode("utf-8"), 1)
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, started = ?, finished = ? WHERE id = ?",
+                (job.status, result, job.error, job.started, job.finished, job.id),
+            )
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        with self._lock, self._connect() as conn:
+            row = conn.execute(
+                "SELECT id, kind, status, result, error, created, started, finished FROM jobs WHERE id = ?",
+                (job_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            "id": row[0], "kind": row[1], "status": row[2],
+            "result": json.loads(zlib.decompress(row[3]).decode("utf-8")) if row[3] else None,
+            "error": row[4], "created": row[5], "started": row[6], "finished": row[7],
+        }
+
+    def find_idempotent(self, kind: str, idempotency_key: str) -> Optional[str]:
+        """같은 멱등 키로 등록된 작업 id"""
+        with self._lock, self._connect() as conn:
+            row = conn.execute(
+                "SELECT id FROM jobs WHERE kind = ? AND idempotency_key = ? ORDER BY created DESC LIMIT 1",
+                (kind, idempotency_key),
+            ).fetchone()
+        return row[0] if row else None
+
+    def find_recent_done(self, kind: str, scope: str, dedupe_key: str, since: float) -> Optional[str]:
+        """scope 에서 가장 최근에 끝난 작업이 since 이후에 성공한 같은 dedupe_key 작업이면 그 id"""
+        with self._lock, self._connect() as conn:
+            row = conn.execute(
+                "SELECT id, dedupe_key, status, finished FROM jobs "
+                "WHERE kind = ? AND scope = ? AND finished IS NOT NULL ORDER BY finished DESC LIMIT 1",
+                (kind, scope),
+            ).fetchone()
+        if row is None or row[1] != dedupe_key or row[2] != "done" or row[3] < since:
+            return None
+        return row[0]
+
+    def forget_scope(self, kind: str, scope: str) -> int:
+        """scope 의 끝난 작업을 합치기 대상에서 제외 (dedupe_key 지움)"""
+        with self._lock, self._connect() as conn:
+            cur = conn.execute(
+                "UPDATE jobs SET dedupe_key = NULL WHERE kind = ? AND scope = ? AND finished IS NOT NULL",
+                (kind, scope),
+            )
+            return cur.rowcount
+
+    def interrupt_unfinished(self) -> int:
+        """이전 프로세스에서 끝나지 못한 작업 → error (재시작 직후 한 번)"""
+        with self._lock, self._connect() as conn:
+            cur = conn.execute(
+                "UPDATE jobs SET status = 'error', error = ?, finished = ? WHERE status IN ('pending', 'running')",
+                ("서버 재시작으로 중단된 작업입니다.", time.time()),
+            )
+            return cur.rowcount
+
+    def delete_expired(self, ttl_seconds: float) -> int:
+        with self._lock, self._connect() as conn:
+            cur = conn.execute(
+                "DELETE FROM jobs WHERE finished IS NOT NULL AND finished < ?", (time.time() - ttl_seconds,)
+            )
+            return cur.rowcount
+
+    def count_by_status(self) -> Dict[str, int]:
+        with self._lock, self._connect() as conn:
+            return dict(conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+
+
+class JobQueue:
+    """크기 제한 작업 큐 + 워커 스레드 풀"""
+
+    def __init__(self, handlers: Dict[str, Callable[[Job], Dict]], workers: int = JOB_WORKERS,
+                 max_pending: int = JOB_QUEUE_SIZE, store: Optional[JobStore] = None,
+                 ttl_hours: float = JOB_TTL_HOURS, monitor=global_monitor):
+        self.handlers = handlers
+        self.workers = max(1, workers)
+        self.max_pending = max(1, max_pending)
+        self.store = store or JobStore(JOB_DB_PATH)
+        self.ttl_seconds = ttl_hours * 3600
+        self.monitor = monitor
+        # 상한은 submit() 에서 대기 작업 수로 확인 (대기 중 취소된 작업이 자리를 차지하지 않도록)
+        self._queue: "queue.Queue[Optional[Job]]" = queue.Queue()
+        self._jobs: Dict[str, Job] = {}                     # 대기·실행 중
+        self._finished: "OrderedDict[str, Job]" = OrderedDict()  # 최근에 끝난 작업
+        self._lock = threading.Lock()
+        self._running = 0
+        self._wait_seconds = 0.0
+        self._run_seconds = 0.0
+        self._completed = 0
+        self._threads: List[threading.Thread] = []
+        self._stop = threading.Event()
+
+    # ----- 수명 -----
+    def start(self):
+        interrupted = self.store.interrupt_unfinished()
+        if interrupted:
+            print(f"[Jobs] 이전 실행에서 중단된 작업 {interrupted}개 정리")
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._worker, name=f"job-worker-{i + 1}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        cleaner = threading.Thread(target=self._cleanup_loop, name="job-cleanup", daemon=True)
+        cleaner.start()
+        self._threads.append(cleaner)
+        print(f"[Jobs] 워커 {self.workers}개 시작 (대기열 최대 {self.max_pending}개)")
+
+    def shutdown(self, timeout: Optional[float] = None):
+        """새 작업을 받지 않고 워커 종료 (실행 중인 작업에는 취소 신호)"""
+        self._stop.set()
+        with self._lock:
+            for job in self._jobs.values():
+                job.cancel_event.set()
+        for _ in range(self.workers):
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join(timeout)
+
+    # ----- 요청 스레드 -----
+    def submit(self, kind: str, params: Optional[Dict] = None, dedupe_key: Optional[str] = None,
+               idempotency_key: Optional[str] = None, scope: Optional[str] = None,
+               reuse_seconds: float = JOB_COALESCE_SECONDS) -> Tuple[str, bool]:
+        """
+        작업 등록 → (작업 id, 기존 작업에 합쳐졌는지)
+        대기열이 가득 차면 QueueFull (합쳐지는 요청은 자리를 차지하지 않으므로 항상 성공)
+
+        Args:
+            dedupe_key: 같은 키로 대기·실행 중이거나 reuse_seconds 안에 성공한 작업이 있으면 그 작업으로
+                (끝난 작업은 scope 의 가장 최근 작업이고 scope 에 진행 중인 작업이 없을 때만)
+            idempotency_key: 같은 키로 이미 등록된 작업이 있으면 상태와 관계없이 그 작업으로 (재시도 안전)
+            scope: 같은 대상을 바꾸는 작업 묶음 (None 이면 dedupe_key)
+        """
+        scope = scope or dedupe_key
+        if kind not in self.handlers:
+            raise ValueError(f"알 수 없는 작업 종류: {kind}")
+        now = time.time()
+        with self._lock:
+            existing = self._find_existing(kind, dedupe_key, idempotency_key, scope,
+                                           now - reuse_seconds if reuse_seconds > 0 else None)
+            self.monitor.record_cache(f"JOB_{kind.upper()}", existing is not None)
+            if existing is not None:
+                return existing, True
+            if self._stop.is_set():
+                raise QueueFull("작업 큐가 종료되었습니다.")
+            if self._pending_count() >= self.max_pending:
+                raise QueueFull(f"대기 중인 작업이 {self.max_pending}개로 가득 찼습니다.")
+            job = Job(uuid.uuid4().hex[:12], kind, params or {}, now, dedupe_key, idempotency_key, scope)
+            self._jobs[job.id] = job
+            # 워커가 상태를 갱신하기 전에 행이 있어야 하고, 같은 키로 동시에 들어온 요청이 이 행을 봐야 함
+            self.store.insert(job)
+        self._queue.put(job)
+        self._record_depth()
+        return job.id, False
+
+    def _find_existing(self, kind: str, dedupe_key: Optional[str], idempotency_key: Optional[str],
+                       scope: Optional[str], reuse_since: Optional[float]) -> Optional[str]:
+        """합칠 작업 id (self._lock 안에서 호출)"""
+        if idempotency_key:
+            for job in list(self._jobs.values()) + list(self._finished.values()):
+                if job.kind == kind and job.idempotency_key == idempotency_key:
+                    return job.id
+            job_id = self.store.find_idempotent(kind, idempotency_key)
+            if job_id:
+                return job_id
+        if dedupe_key:
+            for job in self._jobs.values():
+                if job.kind == kind and job.dedupe_key == dedupe_key and not job.cancelled:
+                    return job.id
+            if reuse_since is not None:
+                if any(job.kind == kind and job.scope == scope for job in self._jobs.values()):
+                    return None  # 다른 분석이 곧 색인을 바꿈 → 끝난 작업 결과는 낡음
+                # 끝난 작업은 _finish 가 저장소에 먼저 기록하므로 저장소만 보면 됨
+                return self.store.find_recent_done(kind, scope, dedupe_key, reuse_since)
+        return None
+
+    def forget(self, kind: str, scope: str):
+        """scope 의 끝난 작업을 더는 재사용하지 않음 (예: 프로젝트를 삭제해 색인이 사라졌을 때)"""
+        with self._lock:
+            for job in self._finished.values():
+                if job.kind == kind and job.scope == scope:
+                    job.dedupe_key = None
+            self.store.forget_scope(kind, scope)
+
+    def get_job(self, job_id: str) -> Optional[Job]:
+        """메모리에 있는 작업 (대기·실행 중이거나 최근에 끝난 것)"""
+        with self._lock:
+            return self._jobs.get(job_id) or self._finished.get(job_id)
+
+    def get_status(self, job_id: str) -> Optional[Dict]:
+        """작업 상태 (메모리에 없으면 저장소에서)"""
+        job = self.get_job(job_id)
+        return job.to_dict() if job else self.store.get(job_id)
+
+    def active_jobs(self, kind: Optional[str] = None) -> List[Job]:
+        """대기·실행 중인 작업 목록"""
+        with self._lock:
+            return [j for j in self._jobs.values() if kind is None or j.kind == kind]
+
+    def position(self, job_id: str) -> int:
+        """대기열에서 앞에 있는 작업 수 (대기 중이 아니면 0)"""
+        with self._lock:
+            pending = [j for j in self._jobs.values() if j.status == "pending"]
+        pending.sort(key=lambda j: j.created)
+        for i, job in enumerate(pending):
+            if job.id == job_id:
+                return i
+        return 0
+
+    def cancel(self, job_id: str) -> Optional[str]:
+        """취소 요청 → 요청 후 상태 (없는 작업이면 None, 이미 끝났으면 그 상태)"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None:
+            status = self.get_status(job_id)
+            return status["status"] if status else None
+        job.cancel_event.set()
+        if job.status == "pending":
+            # 큐에서 꺼내지 않고 표시만 — 워커가 꺼낼 때 건너뜀
+            self._finish(job, status="cancelled", error="작업이 취소되었습니다.")
+        return job.status
+
+    def stats(self) -> Dict:
+        with self._lock:
+            pending = self._pending_count()
+            running = self._running
+            completed = self._completed
+            avg_wait = self._wait_seconds / completed if completed else 0.0
+            avg_run = self._run_seconds / completed if completed else 0.0
+        depth_gauge = self.monitor.gauges.get("JOB_QUEUE_DEPTH", {})
+        return {
+            "workers": self.workers,
+            "maxPending": self.max_pending,
+            "pending": pending,
+            "running": running,
+            "peakPending": depth_gauge.get("peak", pending),
+            "completed": completed,
+            "avgWaitSec": round(avg_wait, 2),
+            "avgRunSec": round(avg_run, 2),
+            "stored": self.store.count_by_status(),
+        }
+
+    # ----- 워커 스레드 -----
+    def _worker(self):
+        while not self._stop.is_set():
+            job = self._queue.get()
+            if job is None:
+                return
+            self._run(job)
+
+    def _run(self, job: Job):
+        with self._lock:
+            if job.status != "pending":
+                return  # 대기 중에 취소됨
+            self._running += 1
+            job.status, job.started = "running", time.time()
+        self.store.update(job)
+        self._record_depth()
+        job.emit("status", {"status": "running"})
+        try:
+            result = self.handlers[job.kind](job)
+        except Exception as e:
+            if job.cancelled:
+                self._finish(job, status="cancelled", error="작업이 취소되었습니다.")
+                print(f"[Jobs] 작업 취소: {job.id}")
+            else:
+                self._finish(job, status="error", error=str(e))
+                print(f"[Jobs] 작업 실패: {job.id} — {e}")
+        else:
+            self._finish(job, status="done", result=result if result else {})
+            print(f"[Jobs] 작업 완료: {job.id}")
+        finally:
+            with self._lock:
+                self._running -= 1
+            self._record_depth()
+
+    def _finish(self, job: Job, status: str, result: Optional[Dict] = None, error: Optional[str] = None):
+        """종료 상태 기록 + 마지막 이벤트(done/error) 발행 → 메모리에서는 최근 작업 목록으로"""
+        with self._lock:
+            if job.status in FINAL_STATUSES:
+                return
+            job.status, job.result, job.error, job.finished = status, result, error, time.time()
+            if job.started is not None:
+                self._completed += 1
+                self._wait_seconds += job.started - job.created
+                self._run_seconds += job.finished - job.started
+            # 합치기 판단(submit)이 작업이 빠진 뒤 저장소의 옛 상태를 보지 않도록 잠금 안에서 기록
+            self.store.update(job)
+            self._jobs.pop(job.id, None)
+            self._finished[job.id] = job
+            while len(self._finished) > JOB_MEMORY_KEEP:
+                self._finished.popitem(last=False)
+        if status == "done":
+            job.emit("done", {"status": "done", "result": result})
+        else:
+            # 취소도 클라이언트에는 종료 이벤트 error 로 (status 로 구분)
+            job.emit("error", {"status": status, "error": error})
+        if job.started is not None:
+            self.monitor.record_throughput(f"JOB_{job.kind.upper()}", 1, job.finished - job.started, "jobs")
+
+    def _pending_count(self) -> int:
+        return sum(1 for j in self._jobs.values() if j.status == "pending")
+
+    def _record_depth(self):
+        with self._lock:
+            pending = self._pending_count()
+            running = self._running
+        self.monitor.record_gauge("JOB_QUEUE_DEPTH", pending)
+        self.monitor.record_gauge("JOB_RUNNING", running)
+
+    def _cleanup_loop(self):
+        while not self._stop.wait(JOB_CLEANUP_INTERVAL):
+            try:
+                removed = self.store.delete_expired(self.ttl_seconds)
+                if removed:
+                    print(f"[Jobs] 만료된 작업 {removed}개 삭제")
+            except Exception as e:
+                print(f"[Jobs] 만료 정리 실패: {e}")
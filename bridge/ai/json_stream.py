@@ -0,0 +1,93 @@
+"""
+스트리밍 JSON 필드 파서
+LLM 이 토큰 단위로 내보내는 JSON 객체에서 최상위 필드가 끝날 때마다 (키, 값) 을 돌려준다.
+→ 답변 전체를 기다리지 않고 greeting / summary / details ... 순서대로 FE 에 먼저 보여줄 수 있음
+
+- 첫 '{' 앞의 텍스트(```json 코드 펜스, 머리말)는 건너뜀
+- 문자열 안의 괄호·쉼표·이스케이프는 무시하고 깊이만 추적 → 최상위 ',' 또는 '}' 에서 값 하나 완료
+- 값은 json.loads 로 해석, 해석할 수 없는 필드는 건너뜀 (끝난 뒤 전체 응답으로 다시 파싱하므로 손실 없음)
+- 최상위 객체가 닫히면 done=True, 이후 텍스트는 무시
+
+사용법:
+    stream = JSONFieldStream()
+    for delta in 토큰들:
+        for key, value in stream.feed(delta):
+            ...
+"""
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class JSONFieldStream:
+    def __init__(self):
+        self.fields: Dict[str, Any] = {}  # 지금까지 완료된 필드
+        self.done = False
+        self._text = ""
+        self._pos = 0  # 다음에 볼 글자 위치
+        self._started = False
+        self._depth = 0
+        self._in_str = False
+        self._escape = False
+        self._phase = "key"  # key → colon → value → (',' 에서) key
+        self._key_start = 0
+        self._key: Optional[str] = None
+        self._value_start = 0
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        """텍스트 조각 추가 → 이번에 완료된 (키, 값) 목록"""
+        if self.done or not chunk:
+            return []
+        self._text += chunk
+        completed: List[Tuple[str, Any]] = []
+        text = self._text
+        i = self._pos
+        while i < len(text):
+            ch = text[i]
+            if not self._started:
+                if ch == "{":
+                    self._started, self._depth, self._phase = True, 1, "key"
+                i += 1
+                continue
+
+            if self._in_str:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_str = False
+                    if self._depth == 1 and self._phase == "key":
+                        self._key = json.loads(text[self._key_start:i + 1])
+                        self._phase = "colon"
+            elif ch == '"':
+                self._in_str = True
+                if self._depth == 1 and self._phase == "key":
+                    self._key_start = i
+            elif ch == ":" and self._depth == 1 and self._phase == "colon":
+                self._phase, self._value_start = "value", i + 1
+            elif ch in "{[":
+                self._depth += 1
+            elif ch in "}]":
+                if self._depth == 1:
+                    self._complete(text[self._value_start:i], completed)
+                    self.done = True
+                    break
+                self._depth -= 1
+            elif ch == "," and self._depth == 1:
+                self._complete(text[self._value_start:i], completed)
+                self._phase = "key"
+            i += 1
+
+        self._pos = i  # 다음 조각은 여기부터 이어서 스캔 (앞부분을 다시 보지 않음)
+        return completed
+
+    def _complete(self, raw: str, completed: List[Tuple[str, Any]]):
+        if self._phase != "value" or self._key is None:
+            return
+        try:
+            value = json.loads(raw)
+        except ValueError:
+            return
+        self.fields[self._key] = value
+        completed.append((self._key, value))
+        self._key = None
@@ -0,0 +1,234 @@
+"""
+LLM 응답 영구 캐시
+(모델명, 정규화된 messages, 생성 파라미터) 해시를 키로 chat completion 응답 텍스트를 SQLite에 저장
+
+- temperature=0 호출만 캐시 (같은 입력 → 같은 출력). 그 외 호출은 그대로 전달하고 통계만 기록
+- 용량 제한: 전체 크기가 LLM_CACHE_MAX_MB 를 넘으면 오래 안 쓴 항목부터 삭제 (LRU)
+- 만료: 저장 후 LLM_CACHE_TTL_DAYS 가 지나면 다시 생성 (모델 교체·프롬프트 튜닝 대비)
+- 호출 위치(site)별 적중/미스/우회 횟수와 절약한 생성 시간 집계 → GET /cache/llm
+- 스트리밍 호출은 cached_chat_stream (같은 캐시 공유, 적중이면 응답 전체를 한 조각으로)
+- 끄기: 환경변수 LLM_CACHE_ENABLED=0, 호출 단위로는 bypass=True (새로 생성해 캐시 갱신)
+"""
+import os
+import json
+import time
+import zlib
+import hashlib
+import sys
+import threading
+from typing import Dict, Iterator, List, Optional
+
+# 상위 디렉토리(bridge)를 sys.path에 추가하여 sqlite_lru 접근
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sqlite_lru import evict_lru, wal_connection
+
+# ============== 설정 ==============
+LLM_CACHE_ENABLED = os.environ.get("LLM_CACHE_ENABLED", "1") != "0"
+LLM_CACHE_PATH = os.environ.get("LLM_CACHE_PATH", "./cache/llm_cache.db")
+LLM_CACHE_MAX_MB = float(os.environ.get("LLM_CACHE_MAX_MB", "256"))
+LLM_CACHE_TTL_DAYS = float(os.environ.get("LLM_CACHE_TTL_DAYS", "30"))
+# =================================
+
+# 키 포맷이 바뀌면 올려서 기존 캐시를 무효화
+CACHE_SCHEMA_VERSION = 1
+
+# 응답 내용에 영향을 주는 파라미터만 키에 포함 (timeout 등 전송 옵션 제외)
+_KEY_PARAMS = (
+    "temperature", "top_p", "max_tokens", "stop", "seed", "n",
+    "presence_penalty", "frequency_penalty", "response_format",
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    site TEXT NOT NULL,
+    response BLOB NOT NULL,
+    nbytes INTEGER NOT NULL,
+    gen_ms REAL NOT NULL,
+    created REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_responses_access ON responses(last_access);
+"""
+
+
+def _normalize_messages(messages: List[Dict]) -> List[List[str]]:
+    """줄바꿈·앞뒤 공백 차이로 키가 달라지지 않도록 정규화"""
+    return [
+        [m.get("role", ""), str(m.get("content", "")).replace("\r\n", "\n").strip()]
+        for m in messages
+    ]
+
+
+def make_key(model: str, messages: List[Dict], params: Dict) -> str:
+    payload = {
+        "v": CACHE_SCHEMA_VERSION,
+        "model": model,
+        "messages": _normalize_messages(messages),
+        "params": {k: params[k] for k in _KEY_PARAMS if params.get(k) is not None},
+    }
+    raw = json.dumps(payload, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """content-addressed LLM 응답 캐시"""
+
+    def __init__(self, db_path: str, max_bytes: int, ttl_seconds: float):
+        self.db_path = db_path
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, float]] = {}
+        if os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connect(self):
+        return wal_connection(self.db_path, timeout=10)
+
+    def _count(self, site: str, field: str, amount: float = 1):
+        stats = self._stats.setdefault(site, {"hits": 0, "misses": 0, "bypass": 0, "saved_ms": 0.0})
+        stats[field] += amount
+
+    def get(self, key: str, site: str) -> Optional[str]:
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            row = conn.execute(
+                "SELECT response, gen_ms, created FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or now - row[2] > self.ttl_seconds:
+                if row is not None:
+                    conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._count(site, "misses")
+                return None
+            conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+            self._count(site, "hits")
+            self._count(site, "saved_ms", row[1])
+        return zlib.decompress(row[0]).decode("utf-8")
+
+    def put(self, key: str, site: str, text: str, gen_ms: float):
+        blob = zlib.compress(text.encode("utf-8"), 1)
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, site, response, nbytes, gen_ms, created, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, site, blob, len(blob), gen_ms, now, now),
+            )
+            evict_lru(conn, "responses", ("key",), self.max_bytes, "LLMCache")
+
+    def count_bypass(self, site: str):
+        with self._lock:
+            self._count(site, "bypass")
+
+    def stats(self) -> Dict:
+        """호출 위치별 통계 + 저장 항목 수/크기"""
+        with self._lock, self._connect() as conn:
+            entries, nbytes = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(nbytes), 0) FROM responses"
+            ).fetchone()
+            sites = {}
+            for site, s in self._stats.items():
+                lookups = s["hits"] + s["misses"]
+                sites[site] = {
+                    "hits": int(s["hits"]),
+                    "misses": int(s["misses"]),
+                    "bypass": int(s["bypass"]),
+                    "hitRate": round(s["hits"] / lookups, 3) if lookups else 0.0,
+                    "savedSeconds": round(s["saved_ms"] / 1000, 1),
+                }
+        return {"enabled": True, "entries": entries, "bytes": nbytes, "sites": sites}
+
+    def clear(self):
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM responses")
+
+
+_cache: Optional[LLMCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> Optional[LLMCache]:
+    """프로세스 전역 캐시 (비활성화되었거나 열 수 없으면 None)"""
+    global _cache
+    if not LLM_CACHE_ENABLED:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            try:
+                _cache = LLMCache(
+                    LLM_CACHE_PATH,
+                    int(LLM_CACHE_MAX_MB * 1024 * 1024),
+                    LLM_CACHE_TTL_DAYS * 86400,
+                )
+            except Exception as e:
+                print(f"[LLMCache] 캐시 사용 불가: {e}")
+                return None
+        return _cache
+
+
+def cached_chat(client, site: str, model: str, messages: List[Dict],
+                bypass: bool = False, **params) -> str:
+    """
+    client.chat.completions.create 대신 호출 — 응답 텍스트(choices[0].message.content) 반환
+
+    Args:
+        client: OpenAI 클라이언트 (with_options 로 만든 것도 가능)
+        site: 통계용 호출 위치 이름 (예: "summary", "overview", "chat")
+        bypass: True 면 캐시를 읽지 않고 새로 생성 (결과는 캐시에 덮어씀)
+        **params: create() 에 그대로 전달 (temperature=0 일 때만 캐시)
+    """
+    cache = get_llm_cache()
+    cacheable = cache is not None and params.get("temperature") == 0
+    key = make_key(model, messages, params) if cacheable else None
+
+    if cacheable and not bypass:
+        text = cache.get(key, site)
+        if text is not None:
+            return text
+    elif cache is not None:
+        cache.count_bypass(site)
+
+    t0 = time.perf_counter()
+    response = client.chat.completions.create(model=model, messages=messages, **params)
+    text = response.choices[0].message.content or ""
+    if cacheable:
+        cache.put(key, site, text, (time.perf_counter() - t0) * 1000)
+    return text
+
+
+def cached_chat_stream(client, site: str, model: str, messages: List[Dict],
+                       bypass: bool = False, **params) -> Iterator[str]:
+    """
+    cached_chat 의 스트리밍 버전 — 생성되는 텍스트 조각(delta)을 차례로 yield
+
+    캐시 적중이면 저장된 응답 전체를 한 조각으로 돌려주고,
+    아니면 stream=True 로 생성하면서 조각을 바로 넘긴 뒤 끝까지 받은 응답만 캐시에 저장
+    (중간에 소비를 멈추면 저장하지 않음). 키는 cached_chat 과 같아서 두 함수가 캐시를 공유한다.
+    """
+    cache = get_llm_cache()
+    cacheable = cache is not None and params.get("temperature") == 0
+    key = make_key(model, messages, params) if cacheable else None
+
+    if cacheable and not bypass:
+        text = cache.get(key, site)
+        if text is not None:
+            yield text
+            return
+    elif cache is not None:
+        cache.count_bypass(site)
+
+    t0 = time.perf_counter()
+    parts = []
+    stream = client.chat.completions.create(model=model, messages=messages, stream=True, **params)
+    for chunk in stream:
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta.content
+        if delta:
+            parts.append(delta)
+            yield delta
+    if cacheable:
+        cache.put(key, site, "".join(parts), (time.perf_counter() - t0) * 1000)
@@ -0,0 +1,293 @@
+"""
+LLM 게이트웨이 (모든 AI 모듈이 공유하는 vLLM 클라이언트)
+api_server(/draft), DocumentAnalyzer, HandoverRAGEngine 이 각자 OpenAI·httpx 클라이언트를 만들고
+URL·모델명을 따로 적던 것을 한 곳으로 모았다.
+
+- 연결 풀  : httpx.Client 하나를 keep-alive 로 공유 (최대 LLM_POOL_SIZE 연결)
+- 동시성   : 서버(base_url)별 동시 요청을 LLM_MAX_CONCURRENCY 개로 제한
+             분석 작업 여러 개 + 채팅이 겹쳐도 vLLM 대기열을 넘치게 하지 않음 (슬롯 대기 시간도 집계)
+- 타임아웃 : 기본 LLM_TIMEOUT, 호출마다 timeout= 으로 변경
+- 재시도   : 연결 오류·타임아웃·429·5xx 만 최대 LLM_MAX_RETRIES 번, 지수 백오프 + 지터
+             (스트리밍은 응답이 시작되기 전 실패만 재시도, 재시도 대기 중에는 슬롯을 반납)
+- 응답 캐시: llm_cache 를 그대로 사용 (temperature=0 호출만, bypass=True 면 새로 생성)
+             캐시 적중은 슬롯·연결을 쓰지 않음
+- 지표     : 호출 위치(site)별 요청·오류·재시도 수, 입력/출력 토큰, 지연(평균·최대), 슬롯 대기 → GET /llm/stats
+             진행 중인 요청 수는 PerformanceMonitor 지표 LLM_INFLIGHT
+- 교체     : get_llm_gateway(base_url) 로 다른 서버(fake_llm.FakeLLMServer 등)를 가리키는 게이트웨이를 얻음
+             기본 서버·모델은 환경변수 LLM_BASE_URL / LLM_MODEL (없으면 bridge/config.py 값)
+
+사용법:
+    llm = get_llm_gateway()
+    text = llm.chat("summary", messages, timeout=30, max_tokens=100, temperature=0.0)
+    for delta in llm.chat_stream("chat", messages, temperature=0.0):
+        ...
+"""
+import os
+import sys
+import time
+import random
+import threading
+from types import SimpleNamespace
+from typing import Dict, Iterator, List, Optional
+
+import httpx
+import openai
+from openai import OpenAI
+
+from llm_cache import cached_chat, cached_chat_stream
+
+# 상위 디렉토리(bridge)를 sys.path에 추가하여 performance·config 접근
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from performance import global_monitor
+
+try:
+    import config as _config  # bridge/config.py (있으면 중앙 설정을 기본값으로)
+except ImportError:
+    _config = None
+
+# ============== 설정 ==============
+LLM_BASE_URL = os.environ.get("LLM_BASE_URL", getattr(_config, "LLM_API_URL", "http://localhost:8000/v1"))
+LLM_API_KEY = os.environ.get("LLM_API_KEY", getattr(_config, "API_KEY", "EMPTY"))
+LLM_MODEL = os.environ.get("LLM_MODEL", getattr(_config, "MODEL_NAME", "mistralai/Mistral-Nemo-Instruct-2407"))
+LLM_MAX_CONCURRENCY = int(os.environ.get("LLM_MAX_CONCURRENCY", "32"))  # 서버별 동시 요청 상한
+LLM_POOL_SIZE = int(os.environ.get("LLM_POOL_SIZE", "32"))              # keep-alive 연결 수
+LLM_TIMEOUT = float(os.environ.get("LLM_TIMEOUT", "120"))               # 요청 기본 타임아웃(초)
+LLM_CONNECT_TIMEOUT = float(os.environ.get("LLM_CONNECT_TIMEOUT", "10"))
+LLM_MAX_RETRIES = int(os.environ.get("LLM_MAX_RETRIES", "2"))           # 실패 시 재시도 횟수
+LLM_RETRY_BACKOFF = float(os.environ.get("LLM_RETRY_BACKOFF", "1.0"))   # 첫 재시도 대기(초), 이후 2배씩 + 지터
+LLM_VERIFY_SSL = os.environ.get("LLM_VERIFY_SSL", "0") != "0"           # RunPod 프록시는 인증서 검증 끔
+# =================================
+
+
+def _is_retryable(error: Exception) -> bool:
+    """일시적인 실패만 재시도 (연결·타임아웃·429·5xx), 400 같은 요청 오류는 바로 실패"""
+    if isinstance(error, openai.APIConnectionError):  # APITimeoutError 포함
+        return True
+    if isinstance(error, openai.APIStatusError):
+        return error.status_code == 429 or error.status_code >= 500
+    return False
+
+
+class _GatedStream:
+    """스트리밍 응답 래퍼 — 끝까지 읽거나 닫거나 버려지면 슬롯 반납 + 지표 기록"""
+
+    def __init__(self, gateway: "LLMGateway", site: str, stream, t0: float, wait_ms: float):
+        self._gateway = gateway
+        self._site = site
+        self._stream = stream
+        self._t0 = t0
+        self._wait_ms = wait_ms
+        self._usage = None
+        self._error = False
+        self._closed = False
+
+    def __iter__(self):
+        try:
+            for chunk in self._stream:
+                if getattr(chunk, "usage", None):
+                    self._usage = chunk.usage  # stream_options.include_usage 의 마지막 조각
+                yield chunk
+        except Exception:
+            self._error = True
+            raise
+        finally:
+            self.close()
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self._stream.close()
+        finally:
+            self._gateway._release()
+            self._gateway._record(self._site, (time.perf_counter() - self._t0) * 1000,
+                                  self._wait_ms, self._usage, self._error)
+
+    def __del__(self):
+        self.close()
+
+
+class LLMGateway:
+    """OpenAI 호환 서버 하나에 대한 공유 클라이언트 (연결 풀 + 동시성 제한 + 재시도 + 지표)"""
+
+    def __init__(self, base_url: Optional[str] = None, model: Optional[str] = None,
+                 api_key: Optional[str] = None, max_concurrency: Optional[int] = None,
+                 timeout: Optional[float] = None, max_retries: Optional[int] = None,
+                 retry_backoff: Optional[float] = None, monitor=global_monitor):
+        self.base_url = base_url or LLM_BASE_URL
+        self.model = model or LLM_MODEL
+        self.max_concurrency = max(1, max_concurrency or LLM_MAX_CONCURRENCY)
+        self.timeout = timeout or LLM_TIMEOUT
+        self.max_retries = LLM_MAX_RETRIES if max_retries is None else max_retries
+        self.retry_backoff = LLM_RETRY_BACKOFF if retry_backoff is None else retry_backoff
+        self.monitor = monitor
+        self.http_client = httpx.Client(
+            verify=LLM_VERIFY_SSL,
+            timeout=httpx.Timeout(self.timeout, connect=LLM_CONNECT_TIMEOUT),
+            limits=httpx.Limits(max_connections=max(LLM_POOL_SIZE, self.max_concurrency),
+                                max_keepalive_connections=LLM_POOL_SIZE),
+        )
+        # 재시도는 게이트웨이가 직접 (SDK 재시도는 슬롯을 쥔 채로 기다리므로 끔)
+        self.client = OpenAI(base_url=self.base_url, api_key=api_key or LLM_API_KEY,
+                             http_client=self.http_client, timeout=self.timeout, max_retries=0)
+        self._slots = threading.BoundedSemaphore(self.max_concurrency)
+        self._inflight = 0
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, float]] = {}
+
+    # ---------- 호출 ----------
+    def chat(self, site: str, messages: List[Dict], model: Optional[str] = None,
+             timeout: Optional[float] = None, max_retries: Optional[int] = None,
+             bypass: bool = False, **params) -> str:
+        """
+        chat completion 응답 텍스트 (llm_cache 경유)
+
+        Args:
+            site: 통계용 호출 위치 이름 (예: "summary", "chat", "draft_type")
+            timeout: 요청 타임아웃(초), None 이면 LLM_TIMEOUT
+            max_retries: 재시도 횟수, None 이면 LLM_MAX_RETRIES
+            bypass: True 면 캐시를 읽지 않고 새로 생성 (결과는 캐시에 덮어씀)
+            **params: create() 에 그대로 전달 (temperature=0 일 때만 캐시)
+        """
+        return cached_chat(self._site_client(site, timeout, max_retries), site,
+                           model=model or self.model, messages=messages, bypass=bypass, **params)
+
+    def chat_stream(self, site: str, messages: List[Dict], model: Optional[str] = None,
+                    timeout: Optional[float] = None, max_retries: Optional[int] = None,
+                    bypass: bool = False, **params) -> Iterator[str]:
+        """chat 의 스트리밍 버전 — 텍스트 조각(delta)을 차례로 yield (캐시 적중이면 한 조각)"""
+        params.setdefault("stream_options", {"include_usage": True})  # 토큰 수 집계용 (캐시 키에는 안 들어감)
+        return cached_chat_stream(self._site_client(site, timeout, max_retries), site,
+                                  model=model or self.model, messages=messages, bypass=bypass, **params)
+
+    def list_models(self, timeout: float = 10) -> List[str]:
+        """서버가 제공하는 모델 id 목록 (setup 시 연결 확인용, 실패하면 예외)"""
+        return [m.id for m in self.client.with_options(timeout=timeout).models.list()]
+
+    def _site_client(self, site: str, timeout: Optional[float], max_retries: Optional[int]):
+        """cached_chat 에 넘길 client 대역 — 캐시 미스일 때만 chat.completions.create 가 게이트웨이로 옴"""
+        def create(**kwargs):
+            return self._create(site, timeout, max_retries, kwargs)
+        return SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+    def _create(self, site: str, timeout: Optional[float], max_retries: Optional[int], kwargs: Dict):
+        retries = self.max_retries if max_retries is None else max_retries
+        client = self.client.with_options(timeout=timeout) if timeout else self.client
+        for attempt in range(retries + 1):
+            wait_ms = self._acquire()
+            t0 = time.perf_counter()
+            try:
+                response = client.chat.completions.create(**kwargs)
+            except Exception as e:
+                self._release()
+                if attempt == retries or not _is_retryable(e):
+                    self._record(site, (time.perf_counter() - t0) * 1000, wait_ms, error=True)
+                    raise
+                self._count(site, "retries")
+                delay = self.retry_backoff * (2 ** attempt)
+                time.sleep(delay + random.uniform(0, delay / 2))
+                continue
+            if kwargs.get("stream"):
+                return _GatedStream(self, site, response, t0, wait_ms)
+            self._release()
+            self._record(site, (time.perf_counter() - t0) * 1000, wait_ms, response.usage)
+            return response
+
+    # ---------- 동시성 슬롯 ----------
+    def _acquire(self) -> float:
+        """슬롯 하나 얻기 → 기다린 시간(ms)"""
+        t0 = time.perf_counter()
+        self._slots.acquire()
+        with self._lock:
+            self._inflight += 1
+            self.monitor.record_gauge("LLM_INFLIGHT", self._inflight)
+        return (time.perf_counter() - t0) * 1000
+
+    def _release(self):
+        with self._lock:
+            self._inflight -= 1
+            self.monitor.record_gauge("LLM_INFLIGHT", self._inflight)
+        self._slots.release()
+
+    # ---------- 지표 ----------
+    def _site_stats(self, site: str) -> Dict[str, float]:
+        return self._stats.setdefault(site, {
+            "requests": 0, "errors": 0, "retries": 0, "prompt_tokens": 0, "completion_tokens": 0,
+            "total_ms": 0.0, "max_ms": 0.0, "wait_ms": 0.0,
+        })
+
+    def _count(self, site: str, field: str, amount: float = 1):
+        with self._lock:
+            self._site_stats(site)[field] += amount
+
+    def _record(self, site: str, elapsed_ms: float, wait_ms: float, usage=None, error: bool = False):
+        with self._lock:
+            s = self._site_stats(site)
+            s["requests"] += 1
+            s["errors"] += int(error)
+            s["total_ms"] += elapsed_ms
+            s["max_ms"] = max(s["max_ms"], elapsed_ms)
+            s["wait_ms"] += wait_ms
+            if usage is not None:
+                s["prompt_tokens"] += getattr(usage, "prompt_tokens", 0) or 0
+                s["completion_tokens"] += getattr(usage, "completion_tokens", 0) or 0
+
+    def stats(self) -> Dict:
+        """호출 위치별 요청 통계 (캐시 적중은 GET /cache/llm)"""
+        with self._lock:
+            sites = {}
+            for site, s in self._stats.items():
+                n = s["requests"] or 1
+                sites[site] = {
+                    "requests": int(s["requests"]),
+                    "errors": int(s["errors"]),
+                    "retries": int(s["retries"]),
+                    "promptTokens": int(s["prompt_tokens"]),
+                    "completionTokens": int(s["completion_tokens"]),
+                    "avgMs": round(s["total_ms"] / n, 1),
+                    "maxMs": round(s["max_ms"], 1),
+                    "avgWaitMs": round(s["wait_ms"] / n, 1),
+                    "tokensPerSecond": round(s["completion_tokens"] / (s["total_ms"] / 1000), 1)
+                    if s["total_ms"] else 0.0,
+                }
+            return {
+                "baseUrl": self.base_url,
+                "model": self.model,
+                "maxConcurrency": self.max_concurrency,
+                "inFlight": self._inflight,
+                "sites": sites,
+            }
+
+    def close(self):
+        self.http_client.close()
+
+
+_gateways: Dict[str, LLMGateway] = {}
+_gateways_lock = threading.Lock()
+
+
+def get_llm_gateway(base_url: Optional[str] = None) -> LLMGateway:
+    """서버(base_url)별 공유 게이트웨이 (None 이면 LLM_BASE_URL, 처음 요청될 때 생성)"""
+    url = (base_url or LLM_BASE_URL).rstrip("/")
+    with _gateways_lock:
+        gateway = _gateways.get(url)
+        if gateway is None:
+            gateway = _gateways[url] = LLMGateway(base_url=url)
+        return gateway
+
+
+def llm_gateway_stats() -> Dict:
+    """만들어진 모든 게이트웨이 통계 → GET /llm/stats"""
+    with _gateways_lock:
+        gateways = list(_gateways.values())
+    return {"gateways": [g.stats() for g in gateways]}
+
+
+def close_llm_gateways():
+    """연결 풀 정리 (서버 종료 시)"""
+    with _gateways_lock:
+        gateways = list(_gateways.values())
+        _gateways.clear()
+    for gateway in gateways:
+        gateway.close()
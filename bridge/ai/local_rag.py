@@ -1,5 +1,4 @@
 import chromadb
-from chromadb.utils import embedding_functions
 from openai import OpenAI
 import os
 import glob
@@ -15,6 +14,7 @@ import xml.etree.ElementTree as ET
 import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 import config
+from embedding_cache import get_embedding_function
 
 
 # [설정] config에서 가져오기
@@ -223,9 +223,7 @@ def main():
 
     # [추가] 한국어 전용 임베딩 엔진
     print("\n[1/3] 한국어 정밀 검색 엔진 로드 중...")
-    ko_embedding_ef = embedding_functions.SentenceTransformerEmbeddingFunction(
-        model_name="jhgan/ko-sroberta-multitask"
-    )
+    ko_embedding_ef = get_embedding_function("jhgan/ko-sroberta-multitask")
 
     print(f"[2/3] ChromaDB 로드 중... ({CHROMA_DB_PATH})")
     db_client = chromadb.PersistentClient(path=CHROMA_DB_PATH)
@@ -0,0 +1,273 @@
+"""
+프로젝트 검색 색인 (분석·채팅 공용)
+DocumentAnalyzer 가 /analyze 중에 청크를 기록하고, HandoverRAGEngine(/chat)은 같은 컬렉션에 붙기만 한다.
+→ 분석이 끝나는 즉시 채팅 가능, 채팅용으로 다시 임베딩하지 않음
+
+- 컬렉션: PROJECT_INDEX_PATH 의 "project_<project_id>" (기본 project_id = "default")
+  프로젝트마다 컬렉션·BM25·질의 캐시가 따로라 여러 프로젝트를 동시에 분석·검색해도 섞이지 않음
+- 메모리에는 최근에 쓴 PROJECT_CACHE_SIZE 개 프로젝트의 색인 상태(BM25 역색인, 질의 캐시)만 유지하고
+  오래 안 쓴 프로젝트는 해제 (BM25 는 디스크에 저장해 두었다가 다음에 쓸 때 다시 읽음, 분석 중인 프로젝트는 제외)
+- 청크 메타데이터 스키마는 chunk_metadata() 한 곳에서 정의 (쓰는 쪽이 둘이어도 형식이 같도록)
+- 색인이 바뀔 때마다 (upsert 배치·삭제마다) 세대(generation) 번호를 올려
+  HybridSearcher 와 질의 결과 캐시(query_cache)가 이전 세대의 결과를 버릴 시점을 알 수 있게 함
+- BM25 역색인은 컬렉션별로 하나를 공유하고 청크 추가·삭제 때 함께 갱신 (ChunkBatchWriter, delete_chunks)
+  mark_updated() 때 PROJECT_INDEX_PATH/bm25_<컬렉션>.npz 로 저장 → 다음 시작 때 컬렉션을 다시 토큰화하지 않음
+"""
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List
+
+import chromadb
+
+from embedding_cache import get_embedding_function, KO_EMBEDDING_MODEL
+from bm25_index import BM25Index
+from bm25_tokenizer import get_token_cache
+from query_filter import date_number
+from query_cache import drop_query_cache
+
+# ============== 설정 ==============
+PROJECT_INDEX_PATH = os.environ.get("PROJECT_INDEX_PATH", "./chroma_db_project")
+DEFAULT_PROJECT_ID = "default"
+PROJECT_CACHE_SIZE = int(os.environ.get("PROJECT_CACHE_SIZE", "8"))  # 메모리에 색인 상태를 둘 프로젝트 수
+# =================================
+
+# Chroma 컬렉션 이름 규칙(영숫자로 시작·끝, 영숫자·_·-)에 맞는 프로젝트 id
+_PROJECT_ID_RE = re.compile(r'^[A-Za-z0-9](?:[A-Za-z0-9_-]{0,62}[A-Za-z0-9])?$')
+
+_client = None
+_collections: Dict[str, object] = {}
+_generations: Dict[str, int] = {}
+_bm25: Dict[str, BM25Index] = {}
+_write_locks: Dict[str, threading.Lock] = {}
+_last_used: "OrderedDict[str, str]" = OrderedDict()  # 컬렉션 이름 → project_id (오래 안 쓴 순)
+_eviction_listeners: List[Callable[[str], None]] = []
+_lock = threading.Lock()
+_bm25_lock = threading.Lock()
+_REBUILD_PAGE = 5000  # BM25 재구성 시 컬렉션에서 한 번에 읽을 청크 수
+
+
+def validate_project_id(project_id: str) -> str:
+    """프로젝트 id 형식 확인 (영숫자·_·-, 64자 이내, 영숫자로 시작·끝) — 아니면 ValueError"""
+    if not isinstance(project_id, str) or not _PROJECT_ID_RE.match(project_id):
+        raise ValueError(f"잘못된 프로젝트 id: {project_id!r}")
+    return project_id
+
+
+def collection_name(project_id: str = DEFAULT_PROJECT_ID) -> str:
+    return f"project_{validate_project_id(project_id)}"
+
+
+def _get_client():
+    global _client
+    if _client is None:
+        _client = chromadb.PersistentClient(path=PROJECT_INDEX_PATH)
+    return _client
+
+
+def project_embedding_function():
+    """프로젝트 색인 컬렉션의 임베딩 함수 (질의 임베딩도 같은 함수로 — 캐시 공유)"""
+    return get_embedding_function(KO_EMBEDDING_MODEL)
+
+
+def get_project_collection(project_id: str = DEFAULT_PROJECT_ID):
+    """프로젝트 색인 컬렉션 (프로세스 안에서 같은 객체 공유, 쓸 때마다 최근 사용으로 표시)"""
+    name = collection_name(project_id)
+    with _lock:
+        collection = _collections.get(name)
+        if collection is None:
+            collection = _get_client().get_or_create_collection(
+                name, embedding_function=project_embedding_function()
+            )
+            _collections[name] = collection
+        _last_used[name] = project_id
+        _last_used.move_to_end(name)
+    _evict_idle()
+    return collection
+
+
+def loaded_projects() -> List[str]:
+    """메모리에 색인 상태가 올라와 있는 프로젝트 id (오래 안 쓴 순)"""
+    with _lock:
+        return list(_last_used.values())
+
+
+def add_eviction_listener(listener: Callable[[str], None]):
+    """프로젝트 색인 상태를 메모리에서 내릴 때 호출할 함수 등록 (인자: project_id) — 예: 채팅 엔진 해제"""
+    _eviction_listeners.append(listener)
+
+
+def _evict_idle():
+    """PROJECT_CACHE_SIZE 를 넘으면 오래 안 쓴 프로젝트부터 해제 (색인 쓰기 중인 프로젝트는 건너뜀)"""
+    with _lock:
+        excess = len(_last_used) - PROJECT_CACHE_SIZE
+        if excess <= 0:
+            return
+        victims = []
+        for name in _last_used:
+            lock = _write_locks.get(name)
+            if lock is not None and lock.locked():
+                continue
+            victims.append(name)
+            if len(victims) == excess:
+                break
+    for name in victims:
+        _release(name)
+        print(f"[Index] 오래 안 쓴 프로젝트 색인을 메모리에서 해제: {name}")
+
+
+def _release(name: str, save: bool = True):
+    """컬렉션 하나의 메모리 상태 해제 (세대 번호·쓰기 잠금은 유지 — 다시 올라와도 이어서 증가)"""
+    with _lock:
+        _collections.pop(name, None)
+        project_id = _last_used.pop(name, None)
+    with _bm25_lock:
+        bm25 = _bm25.pop(name, None)
+    if save and bm25 is not None and bm25.dirty:
+        try:
+            bm25.save(_bm25_path(name))
+        except Exception as e:
+            print(f"[BM25] 색인 저장 실패: {e}")
+    drop_query_cache(name)
+    if project_id is not None:
+        for listener in _eviction_listeners:
+            listener(project_id)
+
+
+def drop_project(project_id: str):
+    """프로젝트 색인 삭제 (Chroma 컬렉션 + 저장된 BM25 + 메모리 상태)"""
+    name = collection_name(project_id)
+    with index_write_lock_by_name(name):
+        _release(name, save=False)
+        with _lock:
+            _last_used.pop(name, None)
+        try:
+            _get_client().delete_collection(name)
+        except Exception:
+            pass  # 아직 만들어진 적 없는 컬렉션
+        if os.path.exists(_bm25_path(name)):
+            os.remove(_bm25_path(name))
+        with _lock:
+            _generations[name] = _generations.get(name, 0) + 1
+
+
+def bump_generation(collection) -> int:
+    """세대 번호만 올림 (upsert 배치·삭제마다) → 새 세대 번호"""
+    with _lock:
+        _generations[collection.name] = _generations.get(collection.name, 0) + 1
+        return _generations[collection.name]
+
+
+def mark_updated(collection) -> int:
+    """색인 변경 알림 (분석·색인이 끝난 뒤 호출) → 새 세대 번호, 바뀐 BM25 색인은 디스크에 저장"""
+    with _bm25_lock:
+        bm25 = _bm25.get(collection.name)
+    if bm25 is not None and bm25.dirty:
+        try:
+            bm25.save(bm25_index_path(collection))
+        except Exception as e:
+            print(f"[BM25] 색인 저장 실패: {e}")
+    return bump_generation(collection)
+
+
+def index_write_lock(collection) -> threading.Lock:
+    """컬렉션별 색인 쓰기 잠금 — 같은 프로젝트를 동시에 분석해도 청크 삭제·기록이 뒤섞이지 않게"""
+    return index_write_lock_by_name(collection.name)
+
+
+def index_write_lock_by_name(name: str) -> threading.Lock:
+    with _lock:
+        return _write_locks.setdefault(name, threading.Lock())
+
+
+def index_generation(collection) -> int:
+    with _lock:
+        return _generations.get(collection.name, 0)
+
+
+# ============== BM25 역색인 ==============
+def bm25_index_path(collection) -> str:
+    return _bm25_path(collection.name)
+
+
+def _bm25_path(name: str) -> str:
+    return os.path.join(PROJECT_INDEX_PATH, f"bm25_{name}.npz")
+
+
+def get_bm25_index(collection) -> BM25Index:
+    """
+    컬렉션의 BM25 색인 (프로세스 안에서 공유)
+    저장된 파일이 있고 청크 id 목록이 컬렉션과 같으면 그대로 쓰고, 아니면 컬렉션에서 한 번 재구성.
+    """
+    with _bm25_lock:
+        bm25 = _bm25.get(collection.name)
+        if bm25 is not None:
+            return bm25
+
+        path = bm25_index_path(collection)
+        current_ids = set(collection.get(include=[])["ids"])
+        if os.path.exists(path):
+            bm25 = BM25Index.load(path, token_cache=get_token_cache())
+            if bm25 is not None and set(bm25.ids()) != current_ids:
+                print(f"[BM25] 저장된 색인이 컬렉션과 달라 재구성: {collection.name}")
+                bm25 = None
+
+        if bm25 is None:
+            bm25 = BM25Index(token_cache=get_token_cache())
+            for offset in range(0, len(current_ids), _REBUILD_PAGE):
+                page = collection.get(include=["documents", "metadatas"], limit=_REBUILD_PAGE, offset=offset)
+                bm25.add(page["ids"], page["documents"], page["metadatas"])
+            try:
+                bm25.save(path)
+            except Exception as e:
+                print(f"[BM25] 색인 저장 실패: {e}")
+            print(f"[BM25] 색인 구성: {collection.name} ({len(bm25)}개 청크)")
+
+        _bm25[collection.name] = bm25
+        return bm25
+
+
+def delete_chunks(collection, ids=None, where=None):
+    """청크 삭제 (Chroma 와 BM25 색인 모두) — ids 또는 where 중 하나"""
+    if where is not None:
+        ids = collection.get(where=where, include=[])["ids"]
+    if not ids:
+        return
+    collection.delete(ids=ids)
+    get_bm25_index(collection).remove(ids)
+    bump_generation(collection)
+
+
+# ============== 청크 메타데이터 ==============
+def infer_chunk_doc_type(filename: str, content: str) -> str:
+    """검색 필터용 문서 분류 (budget / contract / regulation / general)"""
+    name = filename.lower()
+    if any(kw in name for kw in ["예산", "결산", "산출"]):
+        return "budget"
+    elif any(kw in name for kw in ["계약", "용역"]):
+        return "contract"
+    elif any(kw in name for kw in ["규정", "지침"]):
+        return "regulation"
+    elif "원" in content and re.search(r'\d{1,3}(,\d{3})+', content):
+        return "budget"
+    return "general"
+
+
+def extract_chunk_date(content: str) -> str:
+    match = re.search(r'(\d{4})[-./](\d{1,2})[-./](\d{1,2})', content)
+    if match:
+        return f"{match.group(1)}-{match.group(2).zfill(2)}-{match.group(3).zfill(2)}"
+    return ""
+
+
+def chunk_metadata(file_id: str, filename: str, index: int, chunk: str) -> Dict:
+    date = extract_chunk_date(chunk)
+    return {
+        "fileId": file_id,
+        "source": filename,
+        "docType": infer_chunk_doc_type(filename, chunk),
+        "chunk": index,
+        "date": date,
+        "dateNum": date_number(date),  # 날짜 범위 필터용 YYYYMMDD (Chroma 는 숫자만 범위 비교)
+    }
@@ -0,0 +1,165 @@
+"""
+질의 캐시 (HybridSearcher 용, 컬렉션별)
+FE 추천 질문처럼 같은 질문이 반복되면 질의 임베딩(CPU)과 벡터·BM25 검색을 매번 다시 하지 않는다.
+
+- 임베딩 캐시: 정규화한 질의 → 질의 벡터 (색인 내용과 무관하므로 세대가 바뀌어도 유지)
+- 결과 캐시  : (정규화한 질의, 검색 옵션) → 최종 순위 id 목록
+  저장할 때의 색인 세대(project_index.index_generation)를 같이 기록, 세대가 바뀌면 통째로 비움
+  (본문·메타데이터는 캐시하지 않고 id 로 다시 가져옴)
+- 둘 다 LRU (QUERY_EMBEDDING_CACHE_SIZE / QUERY_RESULT_CACHE_SIZE 개)
+- 적중률은 캐시(컬렉션)마다 따로 세고, PerformanceMonitor 에도 QUERY_EMBEDDING / QUERY_RESULT 로 기록
+- 끄기: 환경변수 QUERY_CACHE_ENABLED=0
+"""
+import os
+import re
+import sys
+import json
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, Hashable, List, Optional
+
+# 상위 디렉토리(bridge)를 sys.path에 추가하여 performance 접근
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from performance import global_monitor
+
+# ============== 설정 ==============
+QUERY_CACHE_ENABLED = os.environ.get("QUERY_CACHE_ENABLED", "1") != "0"
+QUERY_EMBEDDING_CACHE_SIZE = int(os.environ.get("QUERY_EMBEDDING_CACHE_SIZE", "1024"))
+QUERY_RESULT_CACHE_SIZE = int(os.environ.get("QUERY_RESULT_CACHE_SIZE", "512"))
+# =================================
+
+_SPACE_RE = re.compile(r'\s+')
+_TRAILING_RE = re.compile(r'[\s?!.。？！~]+$')
+
+
+def normalize_query(query: str) -> str:
+    """유니코드 정규화(NFKC) + 소문자 + 공백 정리 + 끝의 물음표·마침표 제거"""
+    text = unicodedata.normalize("NFKC", query).lower()
+    return _TRAILING_RE.sub("", _SPACE_RE.sub(" ", text).strip())
+
+
+class LRUCache:
+    """크기 제한 LRU (스레드 안전)"""
+
+    def __init__(self, max_size: int):
+        self.max_size = max(0, max_size)
+        self._items: "OrderedDict[Hashable, object]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def get(self, key: Hashable):
+        with self._lock:
+            value = self._items.get(key)
+            if value is not None:
+                self._items.move_to_end(key)
+            return value
+
+    def put(self, key: Hashable, value):
+        if not self.max_size:
+            return
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+
+class QueryCache:
+    """컬렉션 하나의 질의 임베딩 + 검색 결과 캐시"""
+
+    def __init__(self, embedding_size: int = QUERY_EMBEDDING_CACHE_SIZE,
+                 result_size: int = QUERY_RESULT_CACHE_SIZE, monitor=global_monitor):
+        self.embeddings = LRUCache(embedding_size)
+        self.results = LRUCache(result_size)
+        self.monitor = monitor
+        self._generation: Optional[int] = None
+        self._lock = threading.Lock()
+        # 이 캐시의 적중/미스 (monitor 는 모든 컬렉션 합산이라 stats 에는 이쪽을 씀)
+        self.hits = {"QUERY_EMBEDDING": 0, "QUERY_RESULT": 0}
+        self.misses = {"QUERY_EMBEDDING": 0, "QUERY_RESULT": 0}
+
+    def _record(self, kind: str, hit: bool):
+        with self._lock:
+            if hit:
+                self.hits[kind] += 1
+            else:
+                self.misses[kind] += 1
+        self.monitor.record_cache(kind, hit)
+
+    def _hit_rate(self, kind: str) -> float:
+        total = self.hits[kind] + self.misses[kind]
+        return round(self.hits[kind] / total, 3) if total else 0.0
+
+    def embedding(self, query: str, embed) -> List[float]:
+        """정규화한 질의의 임베딩 (없으면 embed([질의])[0] 로 계산해 저장)"""
+        key = normalize_query(query)
+        vector = self.embeddings.get(key)
+        self._record("QUERY_EMBEDDING", vector is not None)
+        if vector is None:
+            vector = embed([key])[0]
+            self.embeddings.put(key, vector)
+        return vector
+
+    @staticmethod
+    def result_key(query: str, **options) -> tuple:
+        """(정규화한 질의, 검색 옵션) — 필터처럼 dict/tuple 이 섞인 옵션도 JSON 으로 고정"""
+        return normalize_query(query), json.dumps(options, sort_keys=True, ensure_ascii=False)
+
+    def _sync(self, generation: int):
+        with self._lock:
+            if self._generation != generation:
+                self.results.clear()
+                self._generation = generation
+
+    def get_results(self, key: tuple, generation: int) -> Optional[List[str]]:
+        self._sync(generation)
+        ids = self.results.get(key)
+        self._record("QUERY_RESULT", ids is not None)
+        return ids
+
+    def put_results(self, key: tuple, generation: int, ids: List[str]):
+        with self._lock:
+            if self._generation != generation:
+                return  # 검색하는 동안 색인이 바뀜 → 이미 낡은 결과
+        self.results.put(key, list(ids))
+
+    def stats(self) -> Dict:
+        return {
+            "embeddings": len(self.embeddings),
+            "results": len(self.results),
+            "generation": self._generation,
+            "embeddingHits": self.hits["QUERY_EMBEDDING"],
+            "embeddingMisses": self.misses["QUERY_EMBEDDING"],
+            "embeddingHitRate": self._hit_rate("QUERY_EMBEDDING"),
+            "resultHits": self.hits["QUERY_RESULT"],
+            "resultMisses": self.misses["QUERY_RESULT"],
+            "resultHitRate": self._hit_rate("QUERY_RESULT"),
+        }
+
+
+_caches: Dict[str, QueryCache] = {}
+_caches_lock = threading.Lock()
+
+
+def drop_query_cache(collection_name: str):
+    """컬렉션 캐시 해제 (프로젝트 색인을 메모리에서 내리거나 삭제할 때)"""
+    with _caches_lock:
+        _caches.pop(collection_name, None)
+
+
+def get_query_cache(collection) -> Optional[QueryCache]:
+    """컬렉션별 질의 캐시 (검색기를 새로 만들어도 유지, 비활성화면 None)"""
+    if not QUERY_CACHE_ENABLED:
+        return None
+    with _caches_lock:
+        cache = _caches.get(collection.name)
+        if cache is None:
+            cache = _caches[collection.name] = QueryCache()
+        return cache
@@ -0,0 +1,123 @@
+"""
+질의 → 검색 필터 (메타데이터 사전 필터링)
+
+QueryClassifier 가 구한 질문 유형과 질의에 적힌 날짜·파일명으로 검색 범위를 좁힌다.
+- docType : 질문 유형 → 청크 분류 (budget / contract / regulation, 그 외 유형은 필터 없음)
+- date    : "2024년", "2024년 3월", "2024년 상반기", "2023~2024년", "2024-03-05" → (시작, 끝) YYYYMMDD
+- source  : 질의에 색인된 파일명(또는 확장자 뺀 이름)이 그대로 나오면 그 파일만
+
+필터 형식은 {"docType": str, "date": (int, int), "source": [str, ...]} (키는 있는 것만).
+Chroma 에는 chroma_where() 로 where 절을 넘기고, BM25 는 같은 필터로 만든 슬롯 비트맵 안에서만 점수를 낸다.
+필터로 남는 청크가 너무 적으면 relaxations() 순서대로 (docType → date → source) 하나씩 풀어서 다시 시도.
+"""
+import os
+import re
+from typing import Dict, Iterable, List, Optional
+
+# ============== 설정 ==============
+QUERY_FILTER_ENABLED = os.environ.get("QUERY_FILTER_ENABLED", "1") != "0"
+FILTER_MIN_MATCHES = int(os.environ.get("FILTER_MIN_MATCHES", "5"))  # 필터 후 최소 청크 수 (미만이면 완화)
+# =================================
+
+# 질문 유형 → 청크 docType (project_index.infer_chunk_doc_type 분류)
+QUERY_TYPE_DOC_TYPES = {
+    "budget": "budget",
+    "contract": "contract",
+    "regulation": "regulation",
+}
+# 완화 순서: 키워드로 추정한 것부터 풀고, 사용자가 직접 적은 파일명은 마지막까지 유지
+RELAX_ORDER = ("docType", "date", "source")
+
+_FULL_DATE_RE = re.compile(r'(\d{4})[-./](\d{1,2})[-./](\d{1,2})')
+_MONTH_RE = re.compile(r'(\d{4})\s*년\s*(\d{1,2})\s*월')
+_HALF_RE = re.compile(r'(\d{4})\s*년?\s*(상반기|하반기)')
+_YEAR_RE = re.compile(r'((?:19|20)\d{2})\s*년')
+_YEAR_RANGE_RE = re.compile(r'((?:19|20)\d{2})\s*년?\s*(?:~|-|부터)\s*((?:19|20)\d{2})\s*년')
+
+
+def date_number(date: str) -> int:
+    """"YYYY-MM-DD" → YYYYMMDD (Chroma where 는 숫자만 범위 비교 가능, 날짜 없으면 0)"""
+    return int(date.replace("-", "")) if date else 0
+
+
+def extract_date_range(query: str) -> Optional[tuple]:
+    """질의에 적힌 날짜 → (시작, 끝) YYYYMMDD, 없으면 None"""
+    match = _FULL_DATE_RE.search(query)
+    if match:
+        day = int(f"{match.group(1)}{int(match.group(2)):02d}{int(match.group(3)):02d}")
+        return day, day
+    match = _MONTH_RE.search(query)
+    if match:
+        month = int(match.group(1)) * 100 + int(match.group(2))
+        return month * 100 + 1, month * 100 + 31
+    match = _HALF_RE.search(query)
+    if match:
+        year = int(match.group(1)) * 10000
+        return (year + 101, year + 630) if match.group(2) == "상반기" else (year + 701, year + 1231)
+    match = _YEAR_RANGE_RE.search(query)
+    if match:
+        start, end = sorted((int(match.group(1)), int(match.group(2))))
+        return start * 10000 + 101, end * 10000 + 1231
+    years = sorted({int(y) for y in _YEAR_RE.findall(query)})
+    if years:
+        return years[0] * 10000 + 101, years[-1] * 10000 + 1231
+    return None
+
+
+def match_sources(query: str, sources: Iterable[str]) -> List[str]:
+    """질의에 파일명(또는 3글자 이상인 확장자 뺀 이름)이 나오는 색인 파일들"""
+    text = query.lower()
+    matched = []
+    for source in sources:
+        name = source.lower()
+        stem = os.path.splitext(name)[0]
+        if name in text or (len(stem) >= 3 and stem in text):
+            matched.append(source)
+    return matched
+
+
+def extract_filters(query: str, query_type: str, sources: Iterable[str] = ()) -> Dict:
+    """질의 → 검색 필터 (QUERY_FILTER_ENABLED=0 이면 항상 빈 필터)"""
+    if not QUERY_FILTER_ENABLED:
+        return {}
+    filters = {}
+    doc_type = QUERY_TYPE_DOC_TYPES.get(query_type)
+    if doc_type:
+        filters["docType"] = doc_type
+    date_range = extract_date_range(query)
+    if date_range:
+        filters["date"] = date_range
+    matched = match_sources(query, sources)
+    if matched:
+        filters["source"] = matched
+    return filters
+
+
+def relaxations(filters: Dict) -> List[Dict]:
+    """주어진 필터부터 RELAX_ORDER 순서로 하나씩 뺀 필터들 (마지막은 항상 빈 필터)"""
+    levels = [dict(filters)]
+    current = dict(filters)
+    for key in RELAX_ORDER:
+        if key in current:
+            current = {k: v for k, v in current.items() if k != key}
+            levels.append(current)
+    if levels[-1]:
+        levels.append({})
+    return levels
+
+
+def chroma_where(filters: Dict) -> Optional[Dict]:
+    """필터 → Chroma where 절 (조건이 둘 이상이면 $and, 없으면 None)"""
+    clauses = []
+    if "docType" in filters:
+        clauses.append({"docType": filters["docType"]})
+    if "date" in filters:
+        start, end = filters["date"]
+        clauses.append({"dateNum": {"$gte": start}})
+        clauses.append({"dateNum": {"$lte": end}})
+    if "source" in filters:
+        sources = list(filters["source"])
+        clauses.append({"source": sources[0]} if len(sources) == 1 else {"source": {"$in": sources}})
+    if not clauses:
+        return None
+    return clauses[0] if len(clauses) == 1 else {"$and": clauses}
@@ -0,0 +1,86 @@
+import sys
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from bm25_index import BM25Index
+from bm25_tokenizer import TOKENIZERS
+
+DOCS = {
+    "a": ("예산 집행 계획 예산", {"docType": "budget", "source": "예산.hwp", "dateNum": 20240115}),
+    "b": ("계약 체결 예산 검토", {"docType": "contract", "source": "계약.pdf", "dateNum": 20240610}),
+    "c": ("인사 발령 공문", {"docType": "general", "source": "인사.txt", "dateNum": 20231201}),
+}
+
+
+def make_index(**kwargs) -> BM25Index:
+    index = BM25Index(tokenizer=TOKENIZERS["simple"], **kwargs)
+    index.add(list(DOCS), [text for text, _ in DOCS.values()], [meta for _, meta in DOCS.values()])
+    return index
+
+
+def test_add_and_search():
+    index = make_index()
+    assert len(index) == 3
+    hits = index.search("예산", k=5)
+    assert [doc_id for doc_id, _ in hits] == ["a", "b"]  # tf 가 큰 a 가 먼저, 단어가 없는 c 는 제외
+    assert hits[0][1] > hits[1][1] > 0
+
+
+def test_add_same_id_replaces():
+    index = make_index()
+    index.add(["a"], ["인사 이동"], [{"docType": "general"}])
+    assert len(index) == 3
+    assert [doc_id for doc_id, _ in index.search("예산")] == ["b"]
+    assert {doc_id for doc_id, _ in index.search("인사")} == {"a", "c"}
+
+
+def test_remove():
+    index = make_index()
+    index.remove(["b", "없는id"])
+    assert len(index) == 2 and "b" not in index
+    assert [doc_id for doc_id, _ in index.search("예산")] == ["a"]
+    assert index.search("계약") == []
+
+
+def test_filters():
+    index = make_index()
+    assert [d for d, _ in index.search("예산", filters={"docType": "contract"})] == ["b"]
+    assert [d for d, _ in index.search("예산", filters={"source": ["예산.hwp", "인사.txt"]})] == ["a"]
+    assert [d for d, _ in index.search("예산", filters={"date": (20240501, 20241231)})] == ["b"]
+    assert index.count({"date": (20230101, 20231231)}) == 1
+    assert index.count({"docType": "없는유형"}) == 0
+
+
+def test_filter_score_uses_whole_index():
+    """필터는 후보만 줄이고 점수 척도(idf)는 그대로"""
+    index = make_index()
+    full = dict(index.search("예산"))
+    filtered = dict(index.search("예산", filters={"docType": "contract"}))
+    assert filtered["b"] == full["b"]
+
+
+def test_save_load_round_trip(tmp_path):
+    index = make_index()
+    index.remove(["c"])
+    path = str(tmp_path / "bm25.npz")
+    index.save(path)
+    assert not index.dirty
+
+    loaded = BM25Index.load(path, tokenizer=TOKENIZERS["simple"])
+    assert loaded is not None
+    assert sorted(loaded.ids()) == ["a", "b"]
+    assert loaded.search("예산") == index.search("예산")
+    assert loaded.search("예산", filters={"docType": "budget"}) == [index.search("예산")[0]]
+
+    # 로드한 색인에도 그대로 추가/삭제
+    loaded.add(["d"], ["예산 예산 예산"], [{"docType": "budget"}])
+    loaded.remove(["a"])
+    assert [d for d, _ in loaded.search("예산")] == ["d", "b"]
+
+
+def test_load_rejects_other_tokenizer(tmp_path):
+    path = str(tmp_path / "bm25.npz")
+    make_index().save(path)
+    assert BM25Index.load(path, tokenizer=TOKENIZERS["ko_bigram"]) is None
@@ -0,0 +1,72 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from fusion import candidate_depths, fuse, keyword_weights, rrf
+
+# 벡터: 거리 오름차순, BM25: 점수 내림차순
+VECTOR = [("v1", 0.1), ("both", 0.2), ("v2", 0.3)]
+BM25 = [("b1", 9.0), ("both", 5.0), ("b2", 1.0)]
+
+
+def ids(hits):
+    return [doc_id for doc_id, _ in hits]
+
+
+def test_rrf_scores():
+    scores = rrf({"vector": ["a", "b"], "bm25": ["b"]}, k=60)
+    assert scores["a"] == pytest.approx(1 / 61)
+    assert scores["b"] == pytest.approx(1 / 62 + 1 / 61)
+
+
+def test_rrf_prefers_docs_in_both_lists():
+    hits = fuse(VECTOR, BM25, 6, method="rrf")
+    assert ids(hits)[0] == "both"
+    # 동일 가중 → 같은 순위의 벡터·BM25 문서는 점수가 같음
+    scores = dict(hits)
+    assert scores["v1"] == pytest.approx(scores["b1"])
+    assert scores["v2"] == pytest.approx(scores["b2"])
+
+
+def test_rrf_keyword_weights_favor_bm25():
+    vector_weight, bm25_weight = keyword_weights("rrf")
+    hits = fuse(VECTOR, BM25, 6, method="rrf", vector_weight=vector_weight, bm25_weight=bm25_weight)
+    order = ids(hits)
+    assert order.index("b1") < order.index("v1")
+    assert order.index("b2") < order.index("v2")
+
+
+def test_weighted_normalizes_each_source():
+    hits = fuse(VECTOR, BM25, 6, method="weighted", vector_weight=0.5, bm25_weight=0.5)
+    scores = dict(hits)
+    assert scores["both"] == pytest.approx(0.5 * 0.5 + 0.5 * 0.5)  # 두 소스 모두 중간값
+    assert scores["v1"] == pytest.approx(0.5) and scores["b1"] == pytest.approx(0.5)
+    assert scores["v2"] == pytest.approx(0.0) and scores["b2"] == pytest.approx(0.0)
+
+
+def test_weighted_default_favors_vector():
+    hits = fuse(VECTOR, BM25, 6, method="weighted")
+    order = ids(hits)
+    assert order.index("v1") < order.index("b1")
+
+
+def test_distance_method():
+    scores = dict(fuse(VECTOR, BM25, 6, method="distance", vector_weight=0.7, bm25_weight=0.3))
+    assert scores["v1"] == pytest.approx(0.7 / 1.1)
+    assert scores["b1"] == pytest.approx(0.3)
+    assert scores["both"] == pytest.approx(0.7 / 1.2 + 0.3 * 5 / 9)
+
+
+def test_truncates_and_rejects_unknown_method():
+    assert len(fuse(VECTOR, BM25, 2, method="rrf")) == 2
+    with pytest.raises(ValueError):
+        fuse(VECTOR, BM25, 2, method="max")
+
+
+def test_candidate_depths_at_least_n_results():
+    assert candidate_depths(5, 10, 20) == (10, 20)
+    assert candidate_depths(30, 10, 20) == (30, 30)
@@ -0,0 +1,218 @@
+import sys
+import time
+import threading
+from pathlib import Path
+
+import pytest
+
+# ai 폴더와 그 상위(bridge, performance 모듈)를 Python path에 추가
+ai_root = Path(__file__).parent.parent
+sys.path.insert(0, str(ai_root))
+sys.path.insert(0, str(ai_root.parent))
+
+from job_queue import Job, JobQueue, JobStore, QueueFull, FINAL_STATUSES
+from performance import PerformanceMonitor
+
+
+def wait_final(q: JobQueue, job_id: str, timeout: float = 5.0) -> dict:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        status = q.get_status(job_id)
+        if status and status["status"] in FINAL_STATUSES:
+            return status
+        time.sleep(0.01)
+    raise AssertionError(f"작업이 끝나지 않음: {job_id}")
+
+
+@pytest.fixture
+def make_queue(tmp_path):
+    """handlers 로 큐를 만들어 시작 (테스트가 끝나면 종료)"""
+    queues = []
+
+    def make(handlers, workers=1, max_pending=4, db_name="jobs.db"):
+        q = JobQueue(handlers, workers=workers, max_pending=max_pending,
+                     store=JobStore(str(tmp_path / db_name)), monitor=PerformanceMonitor())
+        q.start()
+        queues.append(q)
+        return q
+
+    yield make
+    for q in queues:
+        q.shutdown(timeout=5)
+
+
+def blocking_handler():
+    """release 가 세워지거나 취소될 때까지 멈춰 있는 handler"""
+    started = threading.Event()
+    release = threading.Event()
+
+    def handler(job: Job) -> dict:
+        started.set()
+        while not release.is_set():
+            if job.cancelled:
+                raise RuntimeError("cancelled")
+            time.sleep(0.01)
+        return {"ok": True}
+
+    return handler, started, release
+
+
+def test_submit_runs_handler_and_stores_result(make_queue):
+    """작업 결과가 메모리와 저장소 양쪽에 남음"""
+    q = make_queue({"echo": lambda job: {"value": job.params["value"]}})
+    job_id, attached = q.submit("echo", {"value": 3})
+    assert not attached
+
+    status = wait_final(q, job_id)
+    assert status["status"] == "done"
+    assert status["result"] == {"value": 3}
+    assert q.store.get(job_id)["result"] == {"value": 3}
+
+
+def test_unknown_kind_rejected(make_queue):
+    q = make_queue({"echo": lambda job: {}})
+    with pytest.raises(ValueError):
+        q.submit("nope")
+
+
+def test_queue_limit(make_queue):
+    """실행 중 1개 + 대기 max_pending 개를 넘으면 QueueFull, 대기 작업을 취소하면 자리가 남"""
+    handler, started, release = blocking_handler()
+    q = make_queue({"block": handler}, workers=1, max_pending=2)
+
+    q.submit("block")
+    assert started.wait(2)
+    pending = [q.submit("block")[0] for _ in range(2)]
+    with pytest.raises(QueueFull):
+        q.submit("block")
+
+    assert q.cancel(pending[0]) == "cancelled"
+    q.submit("block")  # 취소된 대기 작업은 자리를 차지하지 않음
+    release.set()
+
+
+def test_cancel_pending(make_queue):
+    """대기 중 취소 → 바로 cancelled, handler 는 실행되지 않음"""
+    handler, started, release = blocking_handler()
+    calls = []
+    q = make_queue({"block": handler, "record": lambda job: calls.append(job.id) or {}}, workers=1)
+
+    q.submit("block")
+    assert started.wait(2)
+    job_id, _ = q.submit("record")
+    assert q.cancel(job_id) == "cancelled"
+    release.set()
+
+    status = wait_final(q, job_id)
+    assert status["status"] == "cancelled"
+    time.sleep(0.1)
+    assert calls == []
+    assert q.store.get(job_id)["status"] == "cancelled"
+
+
+def test_cancel_running(make_queue):
+    """실행 중 취소 → cancel_event 를 보고 handler 가 멈추면 cancelled (error 아님)"""
+    handler, started, release = blocking_handler()
+    q = make_queue({"block": handler})
+
+    job_id, _ = q.submit("block")
+    assert started.wait(2)
+    q.cancel(job_id)
+
+    status = wait_final(q, job_id)
+    assert status["status"] == "cancelled"
+    job = q.get_job(job_id)
+    assert job.events[-1][1] == "error"
+    assert job.events[-1][2]["status"] == "cancelled"
+
+
+def test_handler_error(make_queue):
+    def fail(job):
+        raise RuntimeError("boom")
+
+    q = make_queue({"fail": fail})
+    job_id, _ = q.submit("fail")
+    status = wait_final(q, job_id)
+    assert status["status"] == "error"
+    assert "boom" in status["error"]
+
+
+def test_interrupt_unfinished(tmp_path):
+    """재시작 전에 pending/running 이던 작업은 error 로 정리, 끝난 작업은 그대로"""
+    store = JobStore(str(tmp_path / "jobs.db"))
+    pending = Job("pending1", "analyze", {}, time.time())
+    running = Job("running1", "analyze", {}, time.time())
+    done = Job("done1", "analyze", {}, time.time())
+    for job in (pending, running, done):
+        store.insert(job)
+    running.status, running.started = "running", time.time()
+    store.update(running)
+    done.status, done.result, done.finished = "done", {"ok": True}, time.time()
+    store.update(done)
+
+    assert store.interrupt_unfinished() == 2
+    assert store.get("pending1")["status"] == "error"
+    assert store.get("running1")["status"] == "error"
+    assert store.get("running1")["finished"] is not None
+    assert store.get("done1")["status"] == "done"
+    assert store.interrupt_unfinished() == 0
+
+
+def test_restart_reports_interrupted_jobs(tmp_path):
+    """큐를 새로 시작하면 이전 프로세스의 미완료 작업을 조회할 때 error"""
+    store = JobStore(str(tmp_path / "jobs.db"))
+    store.insert(Job("left1", "echo", {}, time.time()))
+
+    q = JobQueue({"echo": lambda job: {}}, workers=1, store=JobStore(str(tmp_path / "jobs.db")),
+                 monitor=PerformanceMonitor())
+    q.start()
+    try:
+        assert q.get_status("left1")["status"] == "error"
+    finally:
+        q.shutdown(timeout=5)
+
+
+def test_delete_expired(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.db"))
+    old = Job("old1", "echo", {}, time.time() - 7200)
+    old.status, old.finished = "done", time.time() - 3600
+    store.insert(old)
+    store.update(old)
+    store.insert(Job("live1", "echo", {}, time.time()))
+
+    assert store.delete_expired(ttl_seconds=60) == 1
+    assert store.get("old1") is None
+    assert store.get("live1") is not None
+
+
+def test_idempotency_key_returns_same_job(make_queue):
+    q = make_queue({"echo": lambda job: {}})
+    first, attached = q.submit("echo", idempotency_key="k1")
+    assert not attached
+    wait_final(q, first)
+    again, attached = q.submit("echo", idempotency_key="k1")
+    assert again == first and attached
+
+
+def test_recent_done_reused_only_if_latest_in_scope(make_queue):
+    """F → G → F: 세 번째 F 는 사이에 G 가 색인을 바꿨으므로 새로 실행, 바로 다시 F 는 재사용"""
+    runs = []
+    q = make_queue({"analyze": lambda job: runs.append(job.params["fp"]) or {}})
+
+    def analyze(fp):
+        job_id, attached = q.submit("analyze", {"fp": fp}, dedupe_key=f"p:{fp}", scope="p")
+        wait_final(q, job_id)
+        return job_id, attached
+
+    first, _ = analyze("F")
+    analyze("G")
+    third, attached = analyze("F")
+    assert not attached and third != first
+    fourth, attached = analyze("F")
+    assert attached and fourth == third
+    assert runs == ["F", "G", "F"]
+
+    q.forget("analyze", "p")
+    _, attached = analyze("F")
+    assert not attached
+    assert runs == ["F", "G", "F", "F"]
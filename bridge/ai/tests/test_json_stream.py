@@ -0,0 +1,59 @@
+import sys
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from json_stream import JSONFieldStream
+
+
+def feed_all(text: str, size: int):
+    stream = JSONFieldStream()
+    fields = []
+    for i in range(0, len(text), size):
+        fields.extend(stream.feed(text[i:i + size]))
+    return stream, fields
+
+
+def test_fields_complete_in_order():
+    """필드가 끝날 때마다 하나씩, 조각 크기와 관계없이 같은 결과"""
+    text = '{"greeting": "안녕하세요", "summary": {"total": 1200, "items": [1, 2]}, "tips": ["a", "b"]}'
+    expected = [("greeting", "안녕하세요"), ("summary", {"total": 1200, "items": [1, 2]}), ("tips", ["a", "b"])]
+    for size in (1, 3, 7, len(text)):
+        stream, fields = feed_all(text, size)
+        assert fields == expected
+        assert stream.done
+
+
+def test_field_emitted_before_object_closes():
+    stream = JSONFieldStream()
+    assert stream.feed('{"greeting": "hi", "summ') == [("greeting", "hi")]
+    assert not stream.done
+    assert stream.feed('ary": 1}') == [("summary", 1)]
+    assert stream.done
+
+
+def test_skips_preamble_and_code_fence():
+    text = '응답입니다.\n```json\n{"a": 1, "b": "x"}\n```'
+    stream, fields = feed_all(text, 4)
+    assert fields == [("a", 1), ("b", "x")]
+    assert stream.done
+
+
+def test_brackets_commas_and_escapes_inside_strings():
+    text = r'{"text": "a, {b} [c] \"quoted\" \\", "n": 2}'
+    _, fields = feed_all(text, 2)
+    assert fields == [("text", 'a, {b} [c] "quoted" \\'), ("n", 2)]
+
+
+def test_invalid_value_skipped():
+    """해석할 수 없는 값은 건너뛰고 다음 필드는 계속"""
+    _, fields = feed_all('{"bad": tru, "good": true}', 5)
+    assert fields == [("good", True)]
+
+
+def test_text_after_close_ignored():
+    stream = JSONFieldStream()
+    assert stream.feed('{"a": 1}') == [("a", 1)]
+    assert stream.feed(', "b": 2}') == []
+    assert stream.fields == {"a": 1}
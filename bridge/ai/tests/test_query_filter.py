@@ -0,0 +1,56 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from query_filter import chroma_where, extract_date_range, extract_filters, relaxations
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("2024-03-05 회의록", (20240305, 20240305)),
+    ("2024.3.5 공문", (20240305, 20240305)),
+    ("2024년 3월 계약", (20240301, 20240331)),
+    ("2024년 상반기 집행", (20240101, 20240630)),
+    ("2024 하반기 집행", (20240701, 20241231)),
+    ("2023~2024년 예산", (20230101, 20241231)),
+    ("2024년부터 2022년", (20220101, 20241231)),
+    ("2022년과 2024년 비교", (20220101, 20241231)),
+    ("2024년 예산", (20240101, 20241231)),
+    ("예산 얼마야", None),
+    ("1500원 지급", None),
+])
+def test_extract_date_range(query, expected):
+    assert extract_date_range(query) == expected
+
+
+def test_extract_filters():
+    filters = extract_filters("2024년 계약서.pdf 계약 금액", "contract", ["계약서.pdf", "예산.hwp"])
+    assert filters == {"docType": "contract", "date": (20240101, 20241231), "source": ["계약서.pdf"]}
+    assert extract_filters("담당자 누구", "general") == {}
+
+
+def test_relaxations_order():
+    """docType → date → source 순서로 풀고 마지막은 빈 필터"""
+    filters = {"source": ["a.txt"], "date": (20240101, 20241231), "docType": "budget"}
+    assert relaxations(filters) == [
+        filters,
+        {"source": ["a.txt"], "date": (20240101, 20241231)},
+        {"source": ["a.txt"]},
+        {},
+    ]
+
+
+def test_relaxations_skips_missing_keys():
+    assert relaxations({"date": (1, 2)}) == [{"date": (1, 2)}, {}]
+    assert relaxations({}) == [{}]
+
+
+def test_chroma_where():
+    assert chroma_where({}) is None
+    assert chroma_where({"docType": "budget"}) == {"docType": "budget"}
+    assert chroma_where({"date": (1, 2), "source": ["a", "b"]}) == {"$and": [
+        {"dateNum": {"$gte": 1}}, {"dateNum": {"$lte": 2}}, {"source": {"$in": ["a", "b"]}},
+    ]}
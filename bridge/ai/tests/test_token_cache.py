@@ -0,0 +1,58 @@
+import sqlite3
+import sys
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from bm25_tokenizer import TOKENIZERS, TokenCache, tokenizer_name, count_tokens
+
+
+def test_registered_name_keeps_function_name():
+    """등록 이름은 별도 속성에 두고 함수 이름은 바꾸지 않음"""
+    tokenizer = TOKENIZERS["ko_bigram"]
+    assert tokenizer_name(tokenizer) == "ko_bigram"
+    assert tokenizer.__name__ == "ko_bigram_tokenize"
+
+
+def test_counts_cached(tmp_path):
+    cache = TokenCache(str(tmp_path / "tokens.db"))
+    tokenizer = TOKENIZERS["ko_bigram"]
+    texts = ["예산을 집행한다", "계약서 검토"]
+    first = cache.counts_many(tokenizer, texts)
+    assert first == [count_tokens(tokenizer(t)) for t in texts]
+    assert cache.counts_many(tokenizer, texts) == first
+    assert (cache.hits, cache.misses) == (2, 2)
+
+
+def test_evicts_least_recently_used(tmp_path):
+    """용량을 넘으면 오래 안 쓴 항목부터 삭제"""
+    db_path = str(tmp_path / "tokens.db")
+    tokenizer = TOKENIZERS["simple"]
+    texts = [" ".join(f"단어{i}_{j}" for j in range(50)) for i in range(4)]
+    probe = TokenCache(str(tmp_path / "probe.db"))
+    probe.counts_many(tokenizer, texts[:1])
+    with sqlite3.connect(probe.db_path) as conn:
+        entry_bytes = conn.execute("SELECT nbytes FROM tokens").fetchone()[0]
+
+    cache = TokenCache(db_path, max_bytes=entry_bytes * 3)
+    cache.counts_many(tokenizer, texts[:3])
+    cache.counts_many(tokenizer, texts[:1])   # 0번을 최근 사용으로
+    cache.counts_many(tokenizer, texts[3:])   # 한도 초과 → 1번부터 정리
+
+    with sqlite3.connect(db_path) as conn:
+        stored = {key for (key,) in conn.execute("SELECT key FROM tokens")}
+    keys = [TokenCache.key("simple", t) for t in texts]
+    assert keys[0] in stored and keys[3] in stored
+    assert keys[1] not in stored
+
+
+def test_migrates_old_table(tmp_path):
+    """크기·접근 시각 컬럼이 없던 캐시 파일도 그대로 열림"""
+    db_path = str(tmp_path / "tokens.db")
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("CREATE TABLE tokens (key BLOB PRIMARY KEY, terms BLOB NOT NULL, freqs BLOB NOT NULL)")
+        conn.execute("INSERT INTO tokens VALUES (?, ?, ?)", (b"k" * 16, b"abc", b"de"))
+    TokenCache(db_path)
+    with sqlite3.connect(db_path) as conn:
+        assert conn.execute("SELECT nbytes, last_access FROM tokens").fetchone() == (5, 0)
@@ -2,11 +2,98 @@ import olefile
 import zipfile
 import zlib
 import re
+import struct
 from pathlib import Path
 
 
+# ===== HWP 5.0 레코드 스트림 파서 =====
+# BodyText/SectionN 스트림은 [태그 헤더(4바이트) + 데이터] 레코드의 연속이다.
+#   헤더 비트: TagID(0~9) | Level(10~19) | Size(20~31), Size == 0xFFF 이면 다음 4바이트가 실제 크기
+# 본문 글자는 HWPTAG_PARA_TEXT 레코드에만 들어 있으므로 나머지 레코드는 건너뛴다.
+HWPTAG_BEGIN = 0x010
+HWPTAG_PARA_TEXT = HWPTAG_BEGIN + 51
+
+# PARA_TEXT 안의 제어 문자 (WCHAR 단위)
+#   - char 컨트롤: 1 WCHAR (0, 10 줄바꿈, 13 문단끝, 24~31 하이픈/공백류)
+#   - inline/extended 컨트롤: 8 WCHAR (코드 + 부가정보 6 WCHAR + 같은 코드)
+#     부가정보 안에 같은 코드 값이 나올 수 있으므로 정규식으로 짝을 찾지 않고 위치로 건너뛴다
+_HWP_CTRL = re.compile(rb'[\x00-\x1f]\x00')
+_HWP_WIDE_CTRL = frozenset([*range(1, 10), 11, 12, *range(14, 24)])
+_HWP_CTRL_REPLACE = {9: b' \x00', 10: b' \x00', 13: b'\n\x00', 30: b' \x00', 31: b' \x00'}
+_SURROGATES = re.compile(r'[\ud800-\udfff]+')
+_MULTI_SPACE = re.compile(' {2,}')
+_BLANK_LINES = re.compile(r' \n[ \n]*|\n[ \n]+')
+_RECORD_HEADER = struct.Struct('<I')
+
+
+def _para_text_payloads(data: bytes) -> list:
+    """HWPTAG_PARA_TEXT 레코드의 페이로드만 수집 (나머지 레코드는 슬라이싱 없이 건너뜀)"""
+    unpack = _RECORD_HEADER.unpack_from
+    payloads = []
+    pos, total = 0, len(data)
+    while pos + 4 <= total:
+        header, = unpack(data, pos)
+        pos += 4
+        size = header >> 20
+        if size == 0xFFF:
+            if pos + 4 > total:
+                break
+            size, = unpack(data, pos)
+            pos += 4
+        if header & 0x3FF == HWPTAG_PARA_TEXT:
+            payloads.append(data[pos:pos + (size & ~1)])
+        pos += size
+    return payloads
+
+
+def _strip_para_controls(raw: bytes, out: list) -> None:
+    """PARA_TEXT 페이로드 하나에서 제어 문자를 폭만큼 건너뛰며 글자 구간만 out 에 모음"""
+    search = _HWP_CTRL.search
+    start = pos = 0
+    while True:
+        m = search(raw, pos)
+        if m is None:
+            break
+        i = m.start()
+        if i & 1:
+            # WCHAR 경계가 아닌 위치 (앞 글자의 상위 바이트와 겹친 매치)
+            pos = i + 1
+            continue
+        code = raw[i]
+        out.append(raw[start:i])
+        replacement = _HWP_CTRL_REPLACE.get(code)
+        if replacement:
+            out.append(replacement)
+        start = pos = i + (16 if code in _HWP_WIDE_CTRL else 2)
+    out.append(raw[start:])
+
+
+def _decode_para_text(payloads: list) -> str:
+    """PARA_TEXT 페이로드들의 제어 문자를 제거하고 한 번에 디코딩 (문단끝 → 개행)"""
+    parts = []
+    for raw in payloads:
+        _strip_para_controls(raw, parts)
+        parts.append(b'\n\x00')
+    text = b''.join(parts).decode('utf-16-le', errors='surrogatepass')
+    return _SURROGATES.sub('', text)
+
+
+def _extract_section_text(data: bytes) -> str:
+    """압축 해제된 BodyText 섹션에서 문단 텍스트 추출 (문단당 한 줄)"""
+    # 문단마다 개행을 붙여 섹션 전체를 한 번에 디코딩한다
+    text = _decode_para_text(_para_text_payloads(data))
+    text = _MULTI_SPACE.sub(' ', text)
+    return _BLANK_LINES.sub('\n', text).strip()
+
+
+def _section_sort_key(entry) -> int:
+    """BodyText/Section10 이 Section2 뒤에 오도록 번호 순 정렬"""
+    digits = entry[-1][len('Section'):]
+    return int(digits) if digits.isdigit() else 0
+
+
 def extract_text_from_hwp(file_path: str) -> str:
-    """HWP 파일에서 텍스트 추출"""
+    """HWP 파일에서 텍스트 추출 (HWPTAG_PARA_TEXT 레코드만 디코딩)"""
     try:
         ole = olefile.OleFileIO(file_path)
         extracted_text = []
@@ -18,7 +105,10 @@ def extract_text_from_hwp(file_path: str) -> str:
                 if len(header) > 36:
                     is_compressed = bool(header[36] & 1)
 
-        sections = [e for e in ole.listdir() if 'BodyText/Section' in '/'.join(e)]
+        sections = sorted(
+            (e for e in ole.listdir() if len(e) == 2 and e[0] == 'BodyText' and e[1].startswith('Section')),
+            key=_section_sort_key,
+        )
         
         for entry in sections:
             with ole.openstream(entry) as s:
@@ -30,37 +120,8 @@ def extract_text_from_hwp(file_path: str) -> str:
                     except Exception as e:
                         continue
                 
-                try:
-                    text = data.decode('utf-16le', errors='ignore')
-                except:
-                    continue
-                
-                cleaned = ''
-                for char in text:
-                    code = ord(char)
-                    if code == 0:
-                        continue
-                    elif 1 <= code <= 8 or 11 <= code <= 12 or 14 <= code <= 31:
-                        cleaned += ' '
-                    else:
-                        cleaned += char
-                
-                final = ''
-                for char in cleaned:
-                    if (
-                        '\uAC00' <= char <= '\uD7A3' or
-                        char.isalnum() or
-                        char in ' .,-()[]{}원%년월일\t\n\r'
-                    ):
-                        final += char
-                    else:
-                        final += ' '
-                
-                final = re.sub(r' +', ' ', final)
-                final = re.sub(r'\n+', '\n', final)
-                final = final.strip()
-                
-                if final and len(final) > 20:
+                final = _extract_section_text(data)
+                if final:
                     extracted_text.append(final)
         
         ole.close()
@@ -1,8 +1,44 @@
 import re
+from collections import Counter
 from datetime import datetime
 from typing import List, Dict, Optional
 
 
+# ===== 단일 패스 스캐너 =====
+# 날짜/금액/한글 단어를 정규식 하나로 한 번에 훑는다.
+# - 한글 단어 분기를 맨 앞에 두고 숫자 분기는 공통 접두사 \d 로 묶어
+#   정규식 엔진이 첫 글자만 보고 대부분의 위치를 건너뛸 수 있게 함
+# - 한글 날짜의 마지막 '일'은 소비하지 않아(lookahead) '일까지' 같은 단어 빈도가
+#   extract_keywords 와 같게 유지됨
+_FACT_SCANNER = re.compile(
+    r'(?P<word>[가-힣]{2,6})'
+    r'|\d(?:'
+    r'(?P<kdate>(?P<ky>\d{3})년\s*(?P<km>\d{1,2})월\s*(?P<kd>\d{1,2})(?=일))'
+    r'|(?P<date>\d{3}(?P<sep>[.-])\d{1,2}(?P=sep)\d{1,2})'
+    r'|(?P<num>\d{0,2}(?:,\d{3})+)'
+    r')'
+)
+
+# 업체명: 표지('(주)', '주식회사')가 있는 구간에서만 extract_parties 패턴 적용
+# 업체명에 들어갈 수 없는 글자(문장부호 등)로 구간을 끊으므로 전체 텍스트에 적용한 것과 결과가 같음
+_PARTY_PATTERNS = [
+    re.compile(r'\(주\)\s*[가-힣A-Za-z0-9]+'),
+    re.compile(r'[가-힣A-Za-z0-9]+\(주\)'),
+    re.compile(r'주식회사\s*[가-힣A-Za-z0-9]+'),
+    re.compile(r'[가-힣A-Za-z0-9]+\s*주식회사'),
+]
+_PARTY_BREAK = re.compile(r'[^가-힣A-Za-z0-9\s()]')
+_PARTY_WINDOW = 512  # 표지 앞뒤로 구간을 찾는 최대 글자 수
+
+_AMOUNT_EXCLUDE_UNITS = frozenset('명개회호건일월년')
+
+_KEYWORD_STOPWORDS = frozenset({
+    '있다', '없다', '하다', '되다', '이다', '것', '수', '등', '및', '또는',
+    '위해', '대한', '관련', '따라', '대하여', '위하여', '있는', '없는',
+    '하는', '되는', '같은', '위한', '통해', '에서', '으로', '부터',
+})
+
+
 def extract_dates(text: str) -> List[str]:
     """
     텍스트에서 날짜 추출
@@ -208,6 +244,107 @@ def extract_keywords(text: str, max_keywords: int = 5) -> List[str]:
     return [w for w, _ in sorted_words[:max_keywords]]
 
 
+def _find_parties(text: str) -> List[str]:
+    """'(주)'/'주식회사' 표지 주변 구간에만 업체명 패턴 적용 (extract_parties 와 같은 결과)"""
+    spans = []
+    for marker in ('(주)', '주식회사'):
+        pos = text.find(marker)
+        while pos != -1:
+            lo = max(0, pos - _PARTY_WINDOW)
+            before = _PARTY_BREAK.search(text[lo:pos][::-1])
+            start = pos - before.start() if before else lo
+            hi = min(len(text), pos + len(marker) + _PARTY_WINDOW)
+            after = _PARTY_BREAK.search(text, pos, hi)
+            end = after.start() if after else hi
+            spans.append((start, end))
+            pos = text.find(marker, end)
+
+    # 겹치는 구간 병합
+    merged = []
+    for start, end in sorted(spans):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+
+    if not merged:
+        return []
+    # 구간 사이를 업체명에 올 수 없는 글자로 이어 붙여 패턴당 한 번만 실행
+    segments = '\x00'.join(text[start:end] for start, end in merged)
+    parties = []
+    for pattern in _PARTY_PATTERNS:
+        parties.extend(pattern.findall(segments))
+    return list(dict.fromkeys(parties))
+
+
+def scan_document_facts(text: str, max_keywords: int = 5) -> Dict:
+    """
+    날짜/금액/업체명/키워드를 한 번의 스캔으로 추출
+
+    extract_dates, extract_amounts, extract_parties, extract_keywords 를
+    각각 호출한 것과 같은 값을 돌려준다 (목록은 처음 등장한 순서).
+    단, 날짜와 금액이 구분자 없이 붙어 있으면(예: '2024.03.011,000,000원')
+    먼저 시작하는 쪽 하나만 인식한다.
+
+    Returns:
+        {
+            "dates": ["2024.03.01", ...],
+            "amounts": [{"text": "50,000,000원", "amount": 50000000, "start": 120, "end": 130}],
+            "parties": ["(주)축제나라"],
+            "keywords": ["축제", ...],
+            "keyword_counts": Counter({"축제": 12, ...})
+        }
+    """
+    dates = {}
+    amounts = []
+    seen_amounts = set()
+    recorded = set()
+    words = []
+    add_word = words.append
+
+    for m in _FACT_SCANNER.finditer(text):
+        # 대부분의 토큰은 한글 단어 → 그룹 번호(1)로 먼저 걸러 분기 비용 최소화
+        if m.lastindex == 1:
+            add_word(m[0])
+            continue
+        kind = m.lastgroup
+        if kind == 'kdate':
+            dates[f"{text[m.start()]}{m.group('ky')}.{m.group('km').zfill(2)}.{m.group('kd').zfill(2)}"] = None
+        elif kind == 'date':
+            dates[m.group()] = None
+        else:
+            token = m[0]
+            if token in recorded:
+                continue  # 이미 기록한 금액 (반복 등장)
+            start, end = m.span()
+            # 숫자 바로 뒤 2글자에 인원/횟수/연도 등의 단위가 있으면 제외
+            if not _AMOUNT_EXCLUDE_UNITS.isdisjoint(text[end:end + 2].strip()):
+                continue
+            amount = int(token.replace(',', ''))
+            if amount >= 1000 and amount not in seen_amounts:
+                seen_amounts.add(amount)
+                recorded.add(token)
+                has_won = '원' in text[end:end + 3]
+                amounts.append({
+                    "text": token + ("원" if has_won else ""),
+                    "amount": amount,
+                    "start": start,
+                    "end": end,
+                })
+
+    keyword_counts = Counter(words)
+    for stopword in _KEYWORD_STOPWORDS.intersection(keyword_counts):
+        del keyword_counts[stopword]
+
+    return {
+        "dates": list(dates),
+        "amounts": amounts,
+        "parties": _find_parties(text),
+        "keywords": [w for w, _ in keyword_counts.most_common(max_keywords)],
+        "keyword_counts": keyword_counts,
+    }
+
+
 def process_document(file_path: str, text: str) -> Dict:
     """
     문서 전체 처리
@@ -228,14 +365,15 @@ def process_document(file_path: str, text: str) -> Dict:
     from pathlib import Path
     
     filename = Path(file_path).name
+    facts = scan_document_facts(text)
     
     return {
         "filename": filename,
         "type": classify_document_type(filename),
-        "dates": extract_dates(text),
-        "amounts": extract_amounts(text),
-        "parties": extract_parties(text),
-        "keywords": extract_keywords(text),
+        "dates": facts["dates"],
+        "amounts": [{"text": a["text"], "amount": a["amount"]} for a in facts["amounts"]],
+        "parties": facts["parties"],
+        "keywords": facts["keywords"],
         "raw_text": text
     }
 
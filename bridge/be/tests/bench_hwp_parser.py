@@ -0,0 +1,159 @@
+"""
+HWP 본문 파서 벤치마크
+기존 UTF-16 전체 디코딩 + 글자 단위 루프 방식과 레코드 스트림 파서를 비교
+
+사용법:
+    python tests/bench_hwp_parser.py                  # 합성 섹션 1/5/10/25/50 MB
+    python tests/bench_hwp_parser.py --sizes 1 10     # 크기 지정 (MB)
+    python tests/bench_hwp_parser.py a.hwp b.hwp      # 실제 HWP 파일 비교
+"""
+import sys
+import re
+import time
+import zlib
+import argparse
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import olefile
+from core.parser import extract_text_from_hwp, _extract_section_text, HWPTAG_PARA_TEXT
+
+
+# ===== 기존 구현 (비교 기준) =====
+
+def legacy_clean_section(data: bytes) -> str:
+    """기존 extract_text_from_hwp 의 섹션 처리 루프"""
+    text = data.decode('utf-16le', errors='ignore')
+
+    cleaned = ''
+    for char in text:
+        code = ord(char)
+        if code == 0:
+            continue
+        elif 1 <= code <= 8 or 11 <= code <= 12 or 14 <= code <= 31:
+            cleaned += ' '
+        else:
+            cleaned += char
+
+    final = ''
+    for char in cleaned:
+        if (
+            '가' <= char <= '힣' or
+            char.isalnum() or
+            char in ' .,-()[]{}원%년월일\t\n\r'
+        ):
+            final += char
+        else:
+            final += ' '
+
+    final = re.sub(r' +', ' ', final)
+    final = re.sub(r'\n+', '\n', final)
+    return final.strip()
+
+
+def legacy_extract_text_from_hwp(file_path: str) -> str:
+    """기존 extract_text_from_hwp (파일 단위 비교용)"""
+    ole = olefile.OleFileIO(file_path)
+    extracted_text = []
+    is_compressed = False
+    if ole.exists('FileHeader'):
+        with ole.openstream('FileHeader') as s:
+            header = s.read()
+            if len(header) > 36:
+                is_compressed = bool(header[36] & 1)
+    sections = [e for e in ole.listdir() if 'BodyText/Section' in '/'.join(e)]
+    for entry in sections:
+        with ole.openstream(entry) as s:
+            data = s.read()
+            if is_compressed:
+                try:
+                    data = zlib.decompress(data, -15)
+                except Exception:
+                    continue
+            final = legacy_clean_section(data)
+            if final and len(final) > 20:
+                extracted_text.append(final)
+    ole.close()
+    return "\n".join(extracted_text)
+
+
+# ===== 합성 섹션 생성 =====
+
+SAMPLE_PARAGRAPHS = [
+    "벚꽃축제 기본계획 수립(안)",
+    "총 사업비는 금 50,000,000원(부가세 포함)이며 2024년 4월 10일까지 완료한다.",
+    "계약상대자: (주)축제나라, 계약기간: 2024.03.05 ~ 2024.04.30",
+    "「국가를 당사자로 하는 계약에 관한 법률」 제7조에 따라 수의계약을 체결한다.",
+]
+
+
+def _record(tag_id: int, payload: bytes, level: int = 0) -> bytes:
+    size = len(payload)
+    if size >= 0xFFF:
+        header = tag_id | (level << 10) | (0xFFF << 20)
+        return header.to_bytes(4, 'little') + size.to_bytes(4, 'little') + payload
+    return (tag_id | (level << 10) | (size << 20)).to_bytes(4, 'little') + payload
+
+
+def build_section(target_bytes: int) -> bytes:
+    """문단 헤더/글자모양/표 컨트롤이 섞인 합성 BodyText 섹션 생성"""
+    ctrl = (11).to_bytes(2, 'little') + b'lbt ' + b'\x8f' * 8 + (11).to_bytes(2, 'little')
+    para_end = (13).to_bytes(2, 'little')
+    unit = b''
+    for i, para in enumerate(SAMPLE_PARAGRAPHS):
+        payload = para.encode('utf-16-le')
+        if i % 2:
+            payload = payload + ctrl
+        unit += _record(0x42, b'\x00' * 22)
+        unit += _record(HWPTAG_PARA_TEXT, payload + para_end, level=1)
+        unit += _record(0x44, bytes(range(16)) * 2, level=1)
+        unit += _record(0x45, b'\x7f' * 36, level=1)
+    repeat = max(1, target_bytes // len(unit))
+    return unit * repeat
+
+
+def _timeit(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - start, result
+
+
+def bench_synthetic(sizes_mb):
+    print("=" * 70)
+    print("합성 섹션 벤치마크 (압축 해제된 BodyText 기준)")
+    print("=" * 70)
+    print(f"{'크기':>8} | {'기존(s)':>10} | {'레코드(s)':>10} | {'배속':>8} | {'기존 글자':>12} | {'레코드 글자':>12}")
+    print("-" * 70)
+    for mb in sizes_mb:
+        data = build_section(int(mb * 1024 * 1024))
+        legacy_time, legacy_text = _timeit(legacy_clean_section, data)
+        new_time, new_text = _timeit(_extract_section_text, data)
+        speedup = legacy_time / new_time if new_time > 0 else float('inf')
+        print(f"{len(data) / 1048576:>6.1f}MB | {legacy_time:>10.3f} | {new_time:>10.3f} | {speedup:>7.1f}x | {len(legacy_text):>12,} | {len(new_text):>12,}")
+
+
+def bench_files(paths):
+    print("=" * 70)
+    print("실제 HWP 파일 벤치마크")
+    print("=" * 70)
+    for path in paths:
+        size_mb = Path(path).stat().st_size / 1048576
+        legacy_time, legacy_text = _timeit(legacy_extract_text_from_hwp, path)
+        new_time, new_text = _timeit(extract_text_from_hwp, path)
+        speedup = legacy_time / new_time if new_time > 0 else float('inf')
+        print(f"📄 {Path(path).name} ({size_mb:.1f}MB)")
+        print(f"   기존: {legacy_time:.3f}s ({len(legacy_text):,}자) / 레코드: {new_time:.3f}s ({len(new_text):,}자) → {speedup:.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="HWP 본문 파서 벤치마크")
+    parser.add_argument("files", nargs="*", help="비교할 실제 .hwp 파일")
+    parser.add_argument("--sizes", nargs="*", type=float, default=[1, 5, 10, 25, 50], help="합성 섹션 크기 (MB)")
+    args = parser.parse_args()
+
+    if args.files:
+        bench_files(args.files)
+    else:
+        bench_synthetic(args.sizes)
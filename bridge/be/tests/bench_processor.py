@@ -0,0 +1,80 @@
+"""
+정보 추출(processor) 벤치마크
+extract_dates/amounts/parties/keywords 를 따로 호출하는 기존 방식과
+scan_document_facts 단일 패스 스캐너를 비교
+
+사용법:
+    python tests/bench_processor.py                 # 합성 텍스트 1 MB
+    python tests/bench_processor.py --sizes 1 5     # 크기 지정 (MB, UTF-8 기준)
+    python tests/bench_processor.py a.hwp b.txt     # 실제 문서로 비교
+"""
+import sys
+import time
+import argparse
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from core.parser import parse_hwp_file
+from core.processor import (
+    extract_dates, extract_amounts, extract_parties, extract_keywords, scan_document_facts
+)
+
+
+SAMPLE_TEXT = """벚꽃축제 기본계획 수립(안)
+1. 추진 배경: 지역 관광 활성화 및 주민 화합을 위한 봄꽃 축제 개최
+2. 일시: 2024.04.05 ~ 2024.04.07 (3일간), 준비기간 2024-03-01 ~ 2024-04-04
+3. 장소: 시민공원 일원, 참가 예상 인원 12,000명
+4. 소요 예산: 금 50,000,000원(부가세 포함) - 무대 설치 20,377,728원, 홍보물 6,294,179원
+5. 계약 방법: 「국가를 당사자로 하는 계약에 관한 법률」 제7조에 따른 수의계약
+6. 계약상대자: (주)축제나라, 하도급 꽃길 주식회사
+7. 2024년 4월 10일까지 결과보고 및 정산 완료 예정
+"""
+
+
+def legacy_extract(text: str):
+    """기존 process_document 의 추출 순서 그대로"""
+    return (extract_dates(text), extract_amounts(text), extract_parties(text), extract_keywords(text))
+
+
+def _best_of(fn, text, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _compare(label: str, text: str):
+    legacy_time = _best_of(legacy_extract, text)
+    new_time = _best_of(scan_document_facts, text)
+    speedup = legacy_time / new_time if new_time > 0 else float('inf')
+    size_mb = len(text.encode('utf-8')) / 1048576
+    print(f"{label:<24} | {size_mb:>6.2f}MB | {legacy_time * 1000:>9.1f} | {new_time * 1000:>9.1f} | {speedup:>6.1f}x")
+
+
+def _header():
+    print("=" * 70)
+    print(f"{'입력':<24} | {'크기':>8} | {'기존(ms)':>9} | {'단일(ms)':>9} | {'배속':>7}")
+    print("-" * 70)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="processor 정보 추출 벤치마크")
+    parser.add_argument("files", nargs="*", help="비교할 실제 문서 (.hwp/.hwpx/.pdf/.txt)")
+    parser.add_argument("--sizes", nargs="*", type=float, default=[1], help="합성 텍스트 크기 (MB)")
+    args = parser.parse_args()
+
+    _header()
+    if args.files:
+        for path in args.files:
+            result = parse_hwp_file(path)
+            if result['success']:
+                _compare(Path(path).name, result['text'])
+    else:
+        unit = len(SAMPLE_TEXT.encode('utf-8'))
+        for mb in args.sizes:
+            text = SAMPLE_TEXT * max(1, int(mb * 1048576 / unit))
+            _compare(f"합성 {mb:g}MB", text)
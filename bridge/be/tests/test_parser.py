@@ -8,7 +8,9 @@ sys.path.insert(0, str(project_root))
 
 # 모든 import를 여기서 한번에!
 from core.parser import extract_text_from_hwp, parse_hwp_file, extract_text_from_txt
+from core.parser import _extract_section_text, HWPTAG_PARA_TEXT
 from core.processor import extract_dates, extract_amounts, process_document
+from core.processor import extract_parties, extract_keywords, scan_document_facts
 
 
 def test_extract_text():
@@ -276,6 +278,67 @@ def test_hwpx_structure():
             import traceback
             traceback.print_exc()
 
+def _hwp_record(tag_id: int, payload: bytes, level: int = 0) -> bytes:
+    """HWP 레코드 1개 직렬화 (테스트용)"""
+    size = len(payload)
+    if size >= 0xFFF:
+        header = tag_id | (level << 10) | (0xFFF << 20)
+        return header.to_bytes(4, 'little') + size.to_bytes(4, 'little') + payload
+    header = tag_id | (level << 10) | (size << 20)
+    return header.to_bytes(4, 'little') + payload
+
+
+def test_hwp_record_parser():
+    """HWP 레코드 스트림 파서 테스트 (PARA_TEXT만 디코딩)"""
+    
+    print("\n" + "=" * 50)
+    print("HWP 레코드 파서 테스트")
+    print("=" * 50)
+    
+    # 문단 1: 본문 + 표 컨트롤(extended, 8 WCHAR) + 탭(inline, 8 WCHAR) + 문단끝
+    table_ctrl = (11).to_bytes(2, 'little') + b'lbt ' + b'\xff' * 8 + (11).to_bytes(2, 'little')
+    tab_ctrl = (9).to_bytes(2, 'little') + b'\x00' * 12 + (9).to_bytes(2, 'little')
+    para1 = (
+        "벚꽃축제 기본계획".encode('utf-16-le') + table_ctrl
+        + "예산:".encode('utf-16-le') + tab_ctrl
+        + "50,000,000원".encode('utf-16-le') + (13).to_bytes(2, 'little')
+    )
+    # 문단 2: 4095바이트 이상 → 확장 크기 헤더
+    long_text = "가" * 3000
+    para2 = long_text.encode('utf-16-le') + (13).to_bytes(2, 'little')
+    
+    data = (
+        _hwp_record(0x42, b'\x00' * 22)                  # PARA_HEADER (건너뜀)
+        + _hwp_record(HWPTAG_PARA_TEXT, para1, level=1)
+        + _hwp_record(0x44, b'\x01\x02\x03\x04' * 3)     # PARA_CHAR_SHAPE (건너뜀)
+        + _hwp_record(HWPTAG_PARA_TEXT, para2, level=1)
+    )
+    
+    text = _extract_section_text(data)
+    lines = text.split('\n')
+    print(f"\n추출된 문단: {len(lines)}개")
+    print(f"  1: {lines[0]}")
+    
+    assert lines[0] == "벚꽃축제 기본계획예산: 50,000,000원"
+    assert lines[1] == long_text
+    assert len(lines) == 2
+
+
+def test_hwp_control_payload_with_ctrl_codes():
+    """컨트롤 부가정보 안에 제어 코드 값이 있어도 8 WCHAR 만큼만 건너뛰는지 확인"""
+    # 필드 컨트롤(16) 부가정보에 탭(9) 코드가 있으면 뒤따르는 탭 컨트롤과 짝이 맞아
+    # 코드 짝 맞추기 방식에서는 부가정보 'es', 'dc' 가 본문에 섞여 나온다
+    w = lambda code: code.to_bytes(2, 'little')
+    field_ctrl = w(16) + w(0) + w(0) + w(9) + b'es' + w(17) + b'dc' + w(16)
+    tab_ctrl = w(9) + b'es' + w(0) + b'dc' + w(9) + w(0) + w(0) + w(9)
+    para = (
+        field_ctrl + "본문".encode('utf-16-le') + tab_ctrl
+        + "끝".encode('utf-16-le') + w(13)
+    )
+    text = _extract_section_text(_hwp_record(HWPTAG_PARA_TEXT, para))
+    assert text == "본문 끝"
+
+
 def test_amount_extraction():
     """표 안의 금액 추출 테스트"""
     
@@ -304,6 +367,38 @@ def test_amount_extraction():
         print(f"  - {amt['text']:20s} → {amt['amount']:>12,}원")
 
 
+def test_scan_document_facts():
+    """단일 패스 스캐너가 개별 extract_* 함수와 같은 결과를 내는지 확인"""
+    
+    print("\n" + "=" * 50)
+    print("단일 패스 스캐너 테스트")
+    print("=" * 50)
+    
+    test_text = """
+    벚꽃축제 기본계획 수립(안)
+    일시: 2024.03.01 ~ 2024-04-30, 2024년 4월 10일까지 완료
+    계약상대자: (주)축제나라, 대표 홍길동 / 하도급: 꽃길 주식회사
+    총 사업비는 금 50,000,000원(부가세 포함)이며 참가인원 1,200명, 2,421,586원
+    80,000원×2명×9일
+    """
+    
+    facts = scan_document_facts(test_text)
+    print(f"날짜: {facts['dates']}")
+    print(f"금액: {facts['amounts']}")
+    print(f"업체: {facts['parties']}")
+    print(f"키워드: {facts['keywords']}")
+    
+    assert set(facts['dates']) == set(extract_dates(test_text))
+    assert [(a['text'], a['amount']) for a in facts['amounts']] == \
+        [(a['text'], a['amount']) for a in extract_amounts(test_text)]
+    assert set(facts['parties']) == set(extract_parties(test_text))
+    assert facts['keywords'] == extract_keywords(test_text)
+    
+    # 금액 위치(offset)가 원문과 일치
+    for amt in facts['amounts']:
+        assert test_text[amt['start']:amt['end']] in amt['text']
+
+
 if __name__ == "__main__":
     # 현재 작업 디렉토리 출력 (디버깅용)
     print(f"현재 작업 디렉토리: {Path.cwd()}")
@@ -316,5 +411,7 @@ if __name__ == "__main__":
     test_data_types()
     test_real_hwp_files()
     test_hwpx_structure()
+    test_hwp_record_parser()
     test_amount_extraction()
+    test_scan_document_facts()
     
\ No newline at end of file
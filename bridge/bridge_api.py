@@ -1,25 +1,38 @@
 import os
 import sys
+import json
+import time
+import uuid
+import hashlib
 import threading
-import glob
 import requests
 from datetime import datetime
 from typing import List, Optional
 
 # 중앙 설정 및 코어 모듈 로드
 import config
-from core.analyzer import analyze_folder_interface
+from core.analyzer import analyze_files, collect_files
+from core.manifest import ProjectManifest
+from core.watcher import FolderWatcher
 from core.adapter import adapt_be_list_to_fe
+from performance import global_monitor
 
 class BridgeAPI:
     """
     Frontend(React)와 Backend(Python)를 연결하는 핵심 브릿지 클래스
     Local Logic과 Remote AI Server를 통합
     """
+    _client_id_value = None  # _client_id() 캐시
+
     def __init__(self):
         self.is_processing = False
         self._projects_cache = {}  # 분석 결과 캐시 {project_id: project_data}
         self._analysis_status = {}  # {project_id: 'pending'|'analyzing'|'done'|'error'}
+        self._be_results = {}  # BE 분석 결과 {project_id: {file_path: BEParserOutput}}
+        self._analysis_lock = threading.Lock()  # 프로젝트 파일 목록·ID 갱신 직렬화 (수동 분석, 폴더 감시, AI 결과 병합)
+        self._watchers = {}  # {project_id: FolderWatcher}
+        self._ai_id_maps = {}  # AI fileId → 로컬 fileId {project_id: {ai_id: local_id}}
+        self._last_project_id = None  # 마지막으로 분석한 프로젝트 (프로젝트 없이 부르는 search_documents 용)
         print(f"[Bridge] 초기화 완료 (Server: {config.BRIDGE_API_URL})")
 
     def _safe_json(self, data):
@@ -27,17 +40,153 @@ class BridgeAPI:
         import json
         return json.loads(json.dumps(data, default=str, ensure_ascii=False))
 
-    def _upload_files_to_remote(self, path: str):
-        """폴더 내 파일을 원격 서버로 업로드"""
+    @classmethod
+    def _client_id(cls) -> str:
+        """
+        이 PC 의 고정 id (config.CLIENT_ID_PATH 에 저장)
+        uuid.getnode() 는 MAC 을 못 읽으면 실행마다 무작위라 그대로 쓰면 재시작할 때마다 서버 프로젝트가 바뀐다.
+        처음 만들 때 실제 MAC 이 있으면 그 값을 써서 기존에 올린 프로젝트 id 를 유지
+        """
+        if cls._client_id_value:
+            return cls._client_id_value
+        client_id = ""
+        try:
+            with open(config.CLIENT_ID_PATH, "r", encoding="utf-8") as f:
+                client_id = f.read().strip()
+        except OSError:
+            pass
+        if not client_id:
+            node = uuid.getnode()
+            # 멀티캐스트 비트가 서 있으면 getnode() 가 지어낸 무작위 값
+            client_id = f"{node:x}" if not (node >> 40) & 1 else uuid.uuid4().hex
+            os.makedirs(os.path.dirname(config.CLIENT_ID_PATH), exist_ok=True)
+            tmp_path = config.CLIENT_ID_PATH + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(client_id)
+            os.replace(tmp_path, config.CLIENT_ID_PATH)
+        cls._client_id_value = client_id
+        return client_id
+
+    @staticmethod
+    def _remote_project_id(project_id: str) -> str:
+        """
+        AI 서버 쪽 프로젝트 id — 서버는 프로젝트마다 업로드 폴더·색인을 따로 둔다.
+        폴더 이름은 한글·공백이 섞일 수 있고 다른 PC 의 같은 이름 폴더와도 구분해야 하므로 (이 PC, 폴더 이름) 해시
+        """
+        digest = hashlib.sha256(f"{BridgeAPI._client_id()}:{project_id}".encode("utf-8")).hexdigest()
+        return f"p{digest[:20]}"
+
+    def _upload_files_to_remote(self, path: str, project_id: str):
+        """폴더 내 파일을 원격 서버의 프로젝트로 업로드 — 서버에 없는 파일만 청크 단위로 전송"""
         print(f"[Bridge] Remote Upload 시작: {path}")
-        files_to_upload = []
-        for ext in config.SUPPORTED_EXTENSIONS:
-            files_to_upload.extend(glob.glob(os.path.join(path, ext)))
-        
+        params = {"project_id": self._remote_project_id(project_id)}
+        files_to_upload = collect_files(path)
+
         if not files_to_upload:
             print("[Bridge] 업로드할 파일 없음")
             return
 
+        try:
+            # 1. 핸드셰이크: 파일 해시 목록을 보내고 서버에 없는 파일만 받음
+            hashes = self._file_hashes(path, files_to_upload)
+            skipped = [f for f in files_to_upload if f not in hashes]
+            if skipped:
+                # 스캔 도중 삭제·잠긴 파일 → 이번 업로드에서만 제외 (다음 분석 때 다시 시도)
+                print(f"[Bridge] 해시 계산 실패로 업로드 제외: {', '.join(os.path.basename(f) for f in skipped)}")
+            by_name = {os.path.basename(f): f for f in files_to_upload if f in hashes}
+            manifest = [
+                {"name": name, "sha256": hashes[f], "size": os.path.getsize(f)}
+                for name, f in by_name.items()
+            ]
+            response = requests.post(
+                f"{config.BRIDGE_API_URL}/upload/manifest",
+                params=params,
+                json={"files": manifest},
+                timeout=60,
+            )
+            if response.status_code in (404, 405):
+                # 구버전 서버: 핸드셰이크 미지원
+                print("[Bridge] 서버가 업로드 핸드셰이크를 지원하지 않음 → 전체 업로드")
+                self._upload_files_legacy(files_to_upload, params)
+                return
+            response.raise_for_status()
+            missing = response.json().get("missing", [])
+
+            # 2. 없는 파일만 청크 업로드 (중단된 업로드는 서버가 알려준 offset부터 이어서)
+            for item in missing:
+                self._upload_file_chunked(by_name[item["name"]], item, params)
+            print(f"[Bridge] Upload 완료: {len(missing)}개 전송, {len(manifest) - len(missing)}개 생략 (변경 없음)")
+
+        except Exception as e:
+            print(f"[Bridge] Upload 중 오류: {e}")
+
+    @staticmethod
+    def _file_hashes(path: str, files: List[str]) -> dict:
+        """파일별 sha256 (업로드용 매니페스트의 size/mtime 빠른 경로로 재계산 최소화)"""
+        manifest = ProjectManifest.load(path, namespace="upload")
+        diff = manifest.diff(files)
+        for file_path in diff['added'] + diff['modified']:
+            manifest.record(file_path)
+        for file_path in diff['removed']:
+            manifest.forget(file_path)
+        manifest.save()
+        return {f: manifest.entries[f]["hash"] for f in files if f in manifest.entries}
+
+    def _upload_file_chunked(self, file_path: str, item: dict, params: Optional[dict] = None):
+        """
+        PUT /upload/{sha256} 로 청크 단위 전송. 실패 시 서버 offset 을 다시 받아 이어서 전송
+        해시 계산 뒤 파일이 줄었거나 서버 위치가 계속 어긋나 진행이 없으면 IOError (무한 반복 방지)
+        """
+        url = f"{config.BRIDGE_API_URL}/upload/{item['sha256']}"
+        total = item["size"]
+        offset = item.get("offset", 0)
+        failures = 0
+        conflicts = 0  # 진행 없이 연속으로 받은 409 횟수
+        resync = False
+
+        with open(file_path, 'rb') as f:
+            while True:
+                try:
+                    if resync:
+                        offset = requests.get(url, params=params, timeout=10).json()["offset"]
+                        resync = False
+                    f.seek(offset)
+                    chunk = f.read(config.UPLOAD_CHUNK_SIZE)
+                    if not chunk and offset < total:
+                        raise IOError(f"{item['name']}: 해시 계산 후 파일이 바뀌었습니다 ({offset:,} / {total:,} bytes)")
+                    response = requests.put(
+                        url,
+                        params={**(params or {}), "name": item["name"], "offset": offset, "total": total},
+                        data=chunk,
+                        timeout=120,
+                    )
+                except requests.exceptions.RequestException as e:
+                    failures += 1
+                    if failures > config.UPLOAD_MAX_RETRIES:
+                        raise
+                    print(f"[Bridge] 청크 전송 실패 ({item['name']} @ {offset:,}), {2 * failures}초 후 재시도: {e}")
+                    time.sleep(2 * failures)
+                    resync = True
+                    continue
+
+                if response.status_code == 409:
+                    # 서버가 가진 위치와 다름 → 서버 offset 부터 다시
+                    conflicts += 1
+                    if conflicts > config.UPLOAD_MAX_RETRIES:
+                        raise IOError(f"{item['name']}: 서버 업로드 위치가 계속 어긋납니다 (offset {offset:,})")
+                    offset = response.json()["offset"]
+                    continue
+                response.raise_for_status()
+                data = response.json()
+                if data.get("complete"):
+                    return
+                if data["offset"] <= offset:
+                    raise IOError(f"{item['name']}: 업로드가 진행되지 않습니다 (offset {offset:,})")
+                offset = data["offset"]
+                failures = conflicts = 0
+
+    def _upload_files_legacy(self, files_to_upload: List[str], params: Optional[dict] = None):
+        """구버전 서버용 multipart 일괄 업로드"""
         files = []
         try:
             for file_path in files_to_upload:
@@ -47,6 +196,7 @@ class BridgeAPI:
             # verify=False는 개발 단계에서 SSL 문제 회피용
             response = requests.post(
                 f"{config.BRIDGE_API_URL}/upload", 
+                params=params,
                 files=files, 
                 timeout=300
             ) 
@@ -64,49 +214,87 @@ class BridgeAPI:
 
     def _merge_remote_result(self, project_id, ai_result):
         """원격 AI 분석 결과를 캐시된 프로젝트에 병합"""
-        project = self._projects_cache.get(project_id)
-        if not project:
-            return
+        with self._analysis_lock:
+            project = self._projects_cache.get(project_id)
+            if not project:
+                return
+
+            # AI가 생성한 summary(타임라인, 이슈, 총금액 등) 병합
+            summary = ai_result.get("summary", {})
+
+            ai_name = ai_result.get("name")
+            if ai_name:
+                project["name"] = ai_name
+
+            # AI가 생성한 파일별 정보(요약, 키워드 등) 병합
+            # + AI fileId → 로컬 fileId 매핑 테이블 구축
+            ai_files = {}          # name → ai_file_data
+            ai_id_to_local = dict(self._ai_id_maps.get(project_id, {}))  # ai_file_id → local_file_id (스트리밍 중 쌓인 매핑 포함)
 
-        # AI가 생성한 summary(타임라인, 이슈, 총금액 등) 병합
-        summary = ai_result.get("summary", {})
-
-        ai_name = ai_result.get("name")
-        if ai_name:
-            project["name"] = ai_name
-
-        # AI가 생성한 파일별 정보(요약, 키워드 등) 병합
-        # + AI fileId → 로컬 fileId 매핑 테이블 구축
-        ai_files = {}          # name → ai_file_data
-        ai_id_to_local = {}    # ai_file_id → local_file_id
-
-        for folder in ai_result.get("files", []):
-            if isinstance(folder, dict):
-                for f in folder.get("children", []):
-                    if isinstance(f, dict) and "name" in f:
-                        ai_files[f["name"]] = f
-                if "name" in folder and "children" not in folder:
-                    ai_files[folder["name"]] = folder
-
-        # 로컬 파일과 이름으로 매칭하여 ID 매핑
-        for fe_file in project.get("files", []):
-            ai_file = ai_files.get(fe_file.get("name"))
-            if ai_file:
-                if ai_file.get("id"):
-                    ai_id_to_local[ai_file["id"]] = fe_file["id"]
-                if ai_file.get("summary"):
-                    fe_file["summary"] = ai_file["summary"]
-                if ai_file.get("keywords"):
-                    fe_file["keywords"] = ai_file["keywords"]
-                if ai_file.get("parties"):
-                    fe_file["parties"] = ai_file["parties"]
-
-        # summary 내 모든 fileId 참조를 로컬 ID로 변환
-        if ai_id_to_local:
-            self._remap_file_ids(summary, ai_id_to_local)
-
-        project["summary"] = summary
-        print(f"[Bridge] 원격 결과 병합 완료 (project: {project_id}, ID매핑: {len(ai_id_to_local)}건)")
+            for folder in ai_result.get("files", []):
+                if isinstance(folder, dict):
+                    for f in folder.get("children", []):
+                        if isinstance(f, dict) and "name" in f:
+                            ai_files[f["name"]] = f
+                    if "name" in folder and "children" not in folder:
+                        ai_files[folder["name"]] = folder
+
+            # 로컬 파일과 이름으로 매칭하여 ID 매핑
+            for fe_file in project.get("files", []):
+                ai_file = ai_files.get(fe_file.get("name"))
+                if ai_file:
+                    if ai_file.get("id"):
+                        ai_id_to_local[ai_file["id"]] = fe_file["id"]
+                    self._apply_ai_file(fe_file, ai_file)
+            self._ai_id_maps[project_id] = ai_id_to_local
+
+            # summary 내 모든 fileId 참조를 로컬 ID로 변환
+            if ai_id_to_local:
+                self._remap_file_ids(summary, ai_id_to_local)
+
+            project["summary"] = summary
+            print(f"[Bridge] 원격 결과 병합 완료 (project: {project_id}, ID매핑: {len(ai_id_to_local)}건)")
+
+    @staticmethod
+    def _apply_ai_file(fe_file: dict, ai_file: dict):
+        """AI가 만든 파일 정보(요약, 키워드, 당사자)를 로컬 파일에 덮어쓰기"""
+        for key in ("summary", "keywords", "parties"):
+            if ai_file.get(key):
+                fe_file[key] = ai_file[key]
+
+    def _merge_remote_file(self, project_id: str, ai_file: dict) -> Optional[dict]:
+        """
+        스트리밍 중 도착한 AI 파일 정보 하나를 바로 병합
+
+        Returns:
+            병합된 로컬 파일 (이름이 같은 로컬 파일이 없으면 None)
+        """
+        with self._analysis_lock:
+            project = self._projects_cache.get(project_id)
+            if not project:
+                return None
+            for fe_file in project.get("files", []):
+                if fe_file.get("name") == ai_file.get("name"):
+                    if ai_file.get("id"):
+                        self._ai_id_maps.setdefault(project_id, {})[ai_file["id"]] = fe_file["id"]
+                    self._apply_ai_file(fe_file, ai_file)
+                    return fe_file
+            return None
+
+    def _merge_remote_section(self, project_id: str, key: str, value):
+        """
+        스트리밍 중 완성된 summary 항목(timeline, issues, overview 등) 하나를 바로 병합
+
+        Returns:
+            로컬 fileId 로 변환된 값
+        """
+        with self._analysis_lock:
+            project = self._projects_cache.get(project_id)
+            if not project:
+                return value
+            self._remap_file_ids(value, self._ai_id_maps.get(project_id, {}))
+            project["summary"] = {**(project.get("summary") or {}), key: value}
+            return value
 
     @staticmethod
     def _remap_file_ids(obj, id_map):
@@ -136,6 +324,75 @@ class BridgeAPI:
 
         return self._safe_json(result)
 
+    def _analyze_incremental(self, project_id: str, path: str):
+        """
+        매니페스트 비교 후 추가/수정된 파일만 BE 분석하고 나머지는 이전 결과 재사용
+
+        파싱은 잠금 밖에서, 이전 결과를 읽고 새 결과로 바꾸는 부분만 self._analysis_lock 안에서 한다.
+
+        Returns:
+            (폴더 전체의 BE 분석 결과 (파일 경로 순), ManifestDiff)
+        """
+        manifest = ProjectManifest.load(path)
+        files = collect_files(path)
+        diff = manifest.diff(files)
+        changed = set(diff['added']) | set(diff['modified'])
+        with self._analysis_lock:
+            previous = self._be_results.get(project_id, {})
+
+        # 앱 재시작 직후처럼 이전 결과가 메모리에 없으면 파싱 캐시에서 다시 채운다
+        targets = [f for f in files if f in changed or f not in previous]
+        print(f"[Bridge] 매니페스트 비교: 추가 {len(diff['added'])}, 수정 {len(diff['modified'])}, "
+              f"삭제 {len(diff['removed'])}, 유지 {len(diff['unchanged'])} → 분석 {len(targets)}개")
+        fresh = analyze_files(targets) if targets else {}
+
+        target_set = set(targets)
+        with self._analysis_lock:
+            # 파싱하는 동안 다른 분석이 결과를 갱신했을 수 있으므로 최신 결과 위에 병합
+            previous = self._be_results.get(project_id, previous)
+            merged = {}
+            for file_path in files:
+                result = fresh.get(file_path) if file_path in target_set else previous.get(file_path)
+                if result is not None:
+                    merged[file_path] = result
+            self._be_results[project_id] = merged
+
+        for file_path in diff['removed']:
+            manifest.forget(file_path)
+        for file_path in changed:
+            if file_path in fresh:
+                manifest.record(file_path)  # 실패한 파일은 기록하지 않아 다음에 재시도
+        manifest.save()
+
+        return list(merged.values()), diff
+
+    def _validate_and_adapt(self, be_results: list):
+        """BE 결과 → FE 파일 목록 변환 + 검증 경고 병합. (fe_results, validation) 반환"""
+        fe_results = adapt_be_list_to_fe(be_results)
+
+        validation = {"status": "ok", "warnings": [], "errors": [], "summary": ""}
+        try:
+            from be.core.rules import DocumentValidator
+            validator = DocumentValidator(be_results)
+            validation = validator.validate_all()
+            print(f"[Bridge] 검증 결과: {validation['summary']}")
+
+            # 검증 경고를 관련 파일의 status/message에 병합
+            for warning in validation.get('warnings', []) + validation.get('errors', []):
+                msg = warning.get('message', '')
+                severity = warning.get('severity', 'warning')
+                # 모든 파일에 프로젝트 레벨 경고 표시 (첫 번째 파일에 부착)
+                if fe_results:
+                    fe_results[0]['status'] = 'warning'
+                    existing = fe_results[0].get('message', '')
+                    prefix = '🚨' if severity == 'error' else '⚠️'
+                    new_msg = f"{prefix} {msg}"
+                    fe_results[0]['message'] = f"{existing}\n{new_msg}".strip() if existing else new_msg
+        except ImportError:
+            print("[Bridge] DocumentValidator 로드 실패 - 검증 생략")
+
+        return fe_results, validation
+
     def analyze_folder(self, path: str) -> dict:
         """폴더를 분석하고 결과를 FE에 반환"""
         if self.is_processing:
@@ -145,34 +402,15 @@ class BridgeAPI:
         print(f"[Bridge] 폴더 분석 요청: {path}")
         
         try:
-            # 1. 문서 분석 (BE 로컬 파서) - UI 즉각 반응용
-            be_results = analyze_folder_interface(path)
-            fe_results = adapt_be_list_to_fe(be_results)
+            # 1. 문서 분석 (BE 로컬 파서) - UI 즉각 반응용, 바뀐 파일만 분석
+            project_id = os.path.basename(path)
+            self._last_project_id = project_id
+            be_results, _ = self._analyze_incremental(project_id, path)
 
-            # 2. 문서 검증 (Rule Engine - 누락 탐지)
-            validation = {"status": "ok", "warnings": [], "errors": [], "summary": ""}
-            try:
-                from be.core.rules import DocumentValidator
-                validator = DocumentValidator(be_results)
-                validation = validator.validate_all()
-                print(f"[Bridge] 검증 결과: {validation['summary']}")
-
-                # 검증 경고를 관련 파일의 status/message에 병합
-                for warning in validation.get('warnings', []) + validation.get('errors', []):
-                    msg = warning.get('message', '')
-                    severity = warning.get('severity', 'warning')
-                    # 모든 파일에 프로젝트 레벨 경고 표시 (첫 번째 파일에 부착)
-                    if fe_results:
-                        fe_results[0]['status'] = 'warning'
-                        existing = fe_results[0].get('message', '')
-                        prefix = '🚨' if severity == 'error' else '⚠️'
-                        new_msg = f"{prefix} {msg}"
-                        fe_results[0]['message'] = f"{existing}\n{new_msg}".strip() if existing else new_msg
-            except ImportError:
-                print("[Bridge] DocumentValidator 로드 실패 - 검증 생략")
+            # 2. 문서 검증 (Rule Engine - 누락 탐지) + FE 형식 변환
+            fe_results, validation = self._validate_and_adapt(be_results)
 
             # 3. 프로젝트 데이터 구성 및 캐시 (1차: 로컬 파싱 결과)
-            project_id = os.path.basename(path)
             project_data = {
                 "id": project_id,
                 "name": project_id,
@@ -182,32 +420,38 @@ class BridgeAPI:
                 "validation": validation,
                 "summary": None,  # AI 분석 전이므로 null
             }
-            self._projects_cache[project_id] = project_data
-            self._analysis_status[project_id] = 'pending'
+            with self._analysis_lock:
+                self._projects_cache[project_id] = project_data
+                self._analysis_status[project_id] = 'pending'
 
-            # 4. Remote AI Sync (백그라운드 비동기 + 서버 폴링)
+            # 4. Remote AI Sync (백그라운드 비동기 + 진행 이벤트 수신)
             def background_analyze():
                 self._analysis_status[project_id] = 'analyzing'
+                self._ai_id_maps[project_id] = {}
                 try:
                     # 4-1. 파일 업로드
-                    self._upload_files_to_remote(path)
+                    self._upload_files_to_remote(path, project_id)
 
                     # 4-2. 분석 요청 → 신버전: task_id 즉시 반환 / 구버전: 동기 응답
                     #       524(Cloudflare timeout) 등 프록시 오류 시 재시도
+                    #       재시도는 같은 Idempotency-Key 로 → 앞선 요청이 서버에 닿았으면 그 작업에 연결
                     import time as _time
                     max_analyze_retries = 3
+                    idempotency_key = uuid.uuid4().hex
                     response = None
                     for attempt in range(max_analyze_retries):
                         try:
                             print(f"[Bridge] Remote Analyze 요청 (project: {project_id}, 시도 {attempt+1}/{max_analyze_retries})...")
                             response = requests.post(
                                 f"{config.BRIDGE_API_URL}/analyze",
+                                params={"project_id": self._remote_project_id(project_id)},
+                                headers={"Idempotency-Key": idempotency_key},
                                 timeout=60,
                             )
                             if response.status_code == 200:
                                 break
-                            # 524(프록시 타임아웃), 502, 503 등은 재시도
-                            if response.status_code in (502, 503, 504, 524) and attempt < max_analyze_retries - 1:
+                            # 524(프록시 타임아웃), 502, 503 등과 429(서버 작업 대기열 가득)는 재시도
+                            if response.status_code in (429, 502, 503, 504, 524) and attempt < max_analyze_retries - 1:
                                 print(f"[Bridge] AI 분석 요청 {response.status_code}, {10*(attempt+1)}초 후 재시도...")
                                 _time.sleep(10 * (attempt + 1))
                                 continue
@@ -243,47 +487,20 @@ class BridgeAPI:
                     if not task_id:
                         # 서버가 동기 방식으로 직접 결과 반환한 경우 (구버전 호환)
                         if resp_data.get("success") and resp_data.get("result"):
-                            self._merge_remote_result(project_id, resp_data["result"])
-                            self._analysis_status[project_id] = 'done'
+                            self._finish_remote_analysis(project_id, 'done', resp_data["result"])
                             print(f"[Bridge] AI 분석 완료 — 동기 응답 (project: {project_id})")
                         else:
                             self._analysis_status[project_id] = 'error'
                         return
 
-                    # 4-3. 서버 폴링: /analyze/status/{task_id}
-                    import time
-                    print(f"[Bridge] AI 분석 작업 시작됨 (task: {task_id}), 폴링 시작...")
-                    max_polls = 120  # 최대 10분 (5초 × 120)
-                    for i in range(max_polls):
-                        time.sleep(5)
-                        try:
-                            status_resp = requests.get(
-                                f"{config.BRIDGE_API_URL}/analyze/status/{task_id}",
-                                timeout=10,
-                            )
-                            if status_resp.status_code != 200:
-                                continue
-
-                            status_data = status_resp.json()
-                            status = status_data.get("status")
-
-                            if status == "done":
-                                ai_result = status_data.get("result", {})
-                                self._merge_remote_result(project_id, ai_result)
-                                self._analysis_status[project_id] = 'done'
-                                print(f"[Bridge] AI 분석 완료 (project: {project_id}, poll: {i+1})")
-                                return
-                            elif status == "error":
-                                self._analysis_status[project_id] = 'error'
-                                print(f"[Bridge] AI 분석 서버 오류: {status_data.get('error')}")
-                                return
-                            # pending / running → 계속 폴링
-                        except Exception as poll_err:
-                            print(f"[Bridge] 폴링 오류 (재시도): {poll_err}")
-
-                    # 폴링 제한 초과
-                    self._analysis_status[project_id] = 'error'
-                    print(f"[Bridge] AI 분석 시간 초과 (project: {project_id})")
+                    # 4-3. 진행 상황 수신: SSE 스트림 우선, 실패 시 /analyze/status 폴링
+                    if resp_data.get("attached"):
+                        print(f"[Bridge] 같은 파일 구성의 기존 AI 분석 작업에 연결됨 (task: {task_id})")
+                    else:
+                        print(f"[Bridge] AI 분석 작업 시작됨 (task: {task_id})")
+                    if config.ANALYZE_EVENTS_ENABLED and self._stream_analyze_events(project_id, task_id):
+                        return
+                    self._poll_analyze_status(project_id, task_id)
 
                 except Exception as e:
                     self._analysis_status[project_id] = 'error'
@@ -302,10 +519,238 @@ class BridgeAPI:
         finally:
             self.is_processing = False
 
-    def search_documents(self, query: str) -> dict:
-        """AI 엔진에 질문 쿼리 (Remote) — 재시도 포함"""
+    def _finish_remote_analysis(self, project_id: str, status: str, ai_result: Optional[dict] = None):
+        """원격 분석 종료 처리: 결과 병합 후 FE에 완료 이벤트 전달"""
+        if status == 'done':
+            self._merge_remote_result(project_id, ai_result or {})
+        self._analysis_status[project_id] = status
+        detail = {"projectId": project_id, "status": status}
+        if status == 'done':
+            detail["project"] = self._projects_cache.get(project_id)
+        self._push_event('bridge:analysis-status', detail)
+
+    def _on_remote_progress(self, project_id: str, data: dict):
+        """진행 이벤트 처리: 파일 요약·summary 항목은 즉시 병합하고 로컬 ID 기준으로 FE에 전달"""
+        detail = {"projectId": project_id, **data}
+        if data.get("stage") == "file" and data.get("file"):
+            merged = self._merge_remote_file(project_id, data["file"])
+            if merged is None:
+                detail.pop("file")
+            else:
+                detail["file"] = merged
+        elif data.get("stage") == "section":
+            detail["value"] = self._merge_remote_section(project_id, data["key"], data["value"])
+        self._push_event('bridge:analysis-progress', detail)
+
+    @staticmethod
+    def _iter_sse(resp):
+        """SSE 응답 → (id, event, data dict) 를 이벤트 하나씩 (id 가 없으면 None)"""
+        event_id, event_type, data_lines = None, "message", []
+        for raw in resp.iter_lines(chunk_size=1024):
+            line = raw.decode('utf-8')
+            if line:
+                field, _, value = line.partition(':')
+                value = value[1:] if value.startswith(' ') else value
+                if field == 'id':
+                    event_id = value
+                elif field == 'event':
+                    event_type = value
+                elif field == 'data':
+                    data_lines.append(value)
+                continue
+
+            # 빈 줄 = 이벤트 하나 끝
+            if data_lines:
+                yield event_id, event_type, json.loads('\n'.join(data_lines))
+            event_id, event_type, data_lines = None, "message", []
+
+    def _stream_analyze_events(self, project_id: str, task_id: str) -> bool:
+        """
+        /analyze/events/{task_id} SSE 스트림을 읽어 진행 상황을 FE에 바로 전달
+
+        Returns:
+            작업이 끝났으면(done/error) True,
+            서버가 SSE를 지원하지 않거나 재연결 한도를 넘으면 False (폴링으로 전환)
+        """
+        last_event_id = None
+        for attempt in range(config.ANALYZE_STREAM_RECONNECTS + 1):
+            headers = {"Accept": "text/event-stream"}
+            if last_event_id:
+                headers["Last-Event-ID"] = last_event_id
+            try:
+                with requests.get(
+                    f"{config.BRIDGE_API_URL}/analyze/events/{task_id}",
+                    headers=headers, stream=True,
+                    timeout=(10, config.ANALYZE_STREAM_READ_TIMEOUT),
+                ) as resp:
+                    if resp.status_code != 200:
+                        # 구버전 서버(404) 등 → 폴링
+                        print(f"[Bridge] 진행 스트림 사용 불가 ({resp.status_code}) → 폴링으로 전환")
+                        return False
+
+                    for event_id, event_type, data in self._iter_sse(resp):
+                        if event_id:
+                            last_event_id = event_id
+                        if event_type == 'progress':
+                            self._on_remote_progress(project_id, data)
+                        elif event_type == 'done':
+                            self._finish_remote_analysis(project_id, 'done', data.get("result"))
+                            print(f"[Bridge] AI 분석 완료 (project: {project_id}, stream)")
+                            return True
+                        elif event_type == 'error':
+                            self._finish_remote_analysis(project_id, 'error')
+                            print(f"[Bridge] AI 분석 서버 오류: {data.get('error')}")
+                            return True
+            except (requests.exceptions.RequestException, ValueError) as e:
+                print(f"[Bridge] 진행 스트림 끊김 (재연결 {attempt + 1}/{config.ANALYZE_STREAM_RECONNECTS}): {e}")
+                continue
+            # 종료 이벤트 없이 스트림이 닫힘 (프록시 타임아웃 등) → Last-Event-ID로 이어서 재연결
+            print(f"[Bridge] 진행 스트림 종료됨, 재연결 ({attempt + 1}/{config.ANALYZE_STREAM_RECONNECTS})")
+        return False
+
+    def _poll_analyze_status(self, project_id: str, task_id: str):
+        """/analyze/status/{task_id} 폴링 (SSE 미지원 서버용 fallback)"""
+        print(f"[Bridge] 폴링 시작 (task: {task_id})")
+        max_polls = 120  # 최대 10분 (5초 × 120)
+        for i in range(max_polls):
+            time.sleep(5)
+            try:
+                status_resp = requests.get(
+                    f"{config.BRIDGE_API_URL}/analyze/status/{task_id}",
+                    timeout=10,
+                )
+                if status_resp.status_code != 200:
+                    continue
+
+                status_data = status_resp.json()
+                status = status_data.get("status")
+
+                if status == "done":
+                    self._finish_remote_analysis(project_id, 'done', status_data.get("result", {}))
+                    print(f"[Bridge] AI 분석 완료 (project: {project_id}, poll: {i+1})")
+                    return
+                elif status in ("error", "cancelled"):
+                    self._finish_remote_analysis(project_id, 'error')
+                    print(f"[Bridge] AI 분석 서버 오류: {status_data.get('error')}")
+                    return
+                # pending / running → 계속 폴링
+            except Exception as poll_err:
+                print(f"[Bridge] 폴링 오류 (재시도): {poll_err}")
+
+        # 폴링 제한 초과
+        self._finish_remote_analysis(project_id, 'error')
+        print(f"[Bridge] AI 분석 시간 초과 (project: {project_id})")
+
+    # ===== 폴더 감시 (Watch Mode) =====
+
+    def watch_folder(self, path: str) -> dict:
+        """분석된 폴더 감시 시작 — 파일이 바뀌면 해당 파일만 재분석 후 FE에 delta 전송"""
+        if not config.WATCH_FOLDER_ENABLED:
+            return {"watching": False, "reason": "disabled"}
+
+        project_id = os.path.basename(path)
+        if project_id not in self._projects_cache:
+            return {"error": "분석되지 않은 폴더입니다.", "projectId": project_id}
+
+        watcher = self._watchers.get(project_id)
+        if watcher is None:
+            watcher = FolderWatcher(path, lambda changed: self._on_folder_change(project_id, path, changed))
+            watcher.start()
+            self._watchers[project_id] = watcher
+        return {"watching": True, "projectId": project_id, "backend": watcher.backend}
+
+    def unwatch_folder(self, project_id: str) -> dict:
+        """폴더 감시 종료"""
+        watcher = self._watchers.pop(project_id, None)
+        if watcher:
+            watcher.stop()
+        return {"watching": False, "projectId": project_id}
+
+    def _on_folder_change(self, project_id: str, path: str, changed_paths: set):
+        """감시 스레드 콜백: 바뀐 파일만 재분석하고 캐시된 프로젝트를 제자리에서 갱신"""
+        if project_id not in self._projects_cache:
+            return
+        print(f"[Bridge] 폴더 변경 감지 (project: {project_id}, {len(changed_paths)}개 파일)")
+
+        # 재분석·검증은 잠금 밖에서 (그동안 AI 결과 병합이나 다른 프로젝트 분석을 막지 않도록)
+        be_results, diff = self._analyze_incremental(project_id, path)
+        touched = {os.path.basename(p) for p in diff['added'] + diff['modified']}
+        if not touched and not diff['removed']:
+            return  # 내용 변화 없음 (저장만 다시 한 경우 등)
+
+        fe_results, validation = self._validate_and_adapt(be_results)
+
+        # 캐시된 프로젝트를 읽고 고쳐 쓰는 부분만 잠금 안에서
+        with self._analysis_lock:
+            project = self._projects_cache.get(project_id)
+            if project is None:
+                return
+
+            # 기존 파일은 ID와 AI 병합 정보(요약 등)를 유지, 새 파일은 다음 번호 부여
+            old_files = {f['name']: f for f in project['files']}
+            next_idx = len(old_files)
+            for f in old_files.values():
+                try:
+                    next_idx = max(next_idx, int(f['id'].rsplit('_', 1)[1]) + 1)
+                except (ValueError, IndexError):
+                    pass
+            for f in fe_results:
+                old = old_files.get(f['name'])
+                if old is None:
+                    f['id'] = f"doc_{next_idx:02d}"
+                    next_idx += 1
+                    continue
+                f['id'] = old['id']
+                if f['name'] not in touched:
+                    for key in ('summary', 'keywords', 'parties'):
+                        f[key] = old.get(key, f[key])
+
+            new_names = {f['name'] for f in fe_results}
+            delta = {
+                "projectId": project_id,
+                "added": [f for f in fe_results if f['name'] not in old_files],
+                "updated": [
+                    f for f in fe_results
+                    if f['name'] in old_files and (
+                        f['name'] in touched
+                        or f['status'] != old_files[f['name']]['status']
+                        or f['message'] != old_files[f['name']]['message']
+                    )
+                ],
+                "removed": [f['id'] for name, f in old_files.items() if name not in new_names],
+                "fileCount": len(fe_results),
+                "warnings": sum(1 for d in fe_results if d['status'] == 'warning'),
+                "validation": validation,
+            }
+
+            project['files'][:] = fe_results
+            project['fileCount'] = delta['fileCount']
+            project['warnings'] = delta['warnings']
+            project['validation'] = validation
+
+            print(f"[Bridge] 프로젝트 갱신: 추가 {len(delta['added'])}, 변경 {len(delta['updated'])}, 삭제 {len(delta['removed'])}")
+        self._push_event('bridge:folder-delta', delta)
+
+    def _push_event(self, name: str, detail: dict):
+        """FE(window)에 CustomEvent 전달 — 창이 없으면(테스트 등) 무시"""
+        window = getattr(self, '_window', None)
+        if window is None:
+            return
+        payload = json.dumps(self._safe_json(detail), ensure_ascii=False)
+        try:
+            window.evaluate_js(
+                f"window.dispatchEvent(new CustomEvent({json.dumps(name)}, {{ detail: {payload} }}))"
+            )
+        except Exception as e:
+            print(f"[Bridge] FE 이벤트 전달 실패 ({name}): {e}")
+
+    def search_documents(self, query: str, project_id: Optional[str] = None) -> dict:
+        """AI 엔진에 질문 쿼리 (Remote) — 재시도 포함, project_id 가 없으면 마지막으로 분석한 프로젝트"""
         import time
 
+        project_id = project_id or self._last_project_id
+        params = {"project_id": self._remote_project_id(project_id)} if project_id else None
+
         max_retries = 2
         timeout_secs = 180  # RAG 엔진 첫 초기화 시 시간이 오래 걸림
 
@@ -329,6 +774,7 @@ class BridgeAPI:
 
                 response = requests.post(
                     f"{config.BRIDGE_API_URL}/chat",
+                    params=params,
                     json={"question": query},
                     timeout=timeout_secs
                 )
@@ -409,7 +855,85 @@ class BridgeAPI:
         })
 
     def chat_query(self, project_id: str, query: str) -> dict:
-        return self.search_documents(query)
+        return self.search_documents(query, project_id)
+
+    def chat_query_stream(self, project_id: str, query: str) -> dict:
+        """
+        스트리밍 채팅 시작 — 즉시 {requestId} 반환, 답변은 'bridge:chat-stream' 이벤트로 전달
+        (start → meta → field... → done/error, detail.requestId 로 구분)
+        """
+        request_id = uuid.uuid4().hex[:8]
+        if not config.CHAT_STREAM_ENABLED:
+            return {"requestId": None, "streaming": False}
+        threading.Thread(
+            target=self._stream_chat, args=(project_id, request_id, query), daemon=True
+        ).start()
+        return {"requestId": request_id, "streaming": True}
+
+    def _chat_sources(self, project_id: str, names: List[str]) -> list:
+        """AI 응답의 출처 파일명 → FE 근거 문서 ({fileId, fileName}, 로컬 파일과 이름이 같으면 로컬 ID)"""
+        project = self._projects_cache.get(project_id) or {}
+        local_ids = {f.get("name"): f.get("id") for f in project.get("files", [])}
+        return [{"fileId": local_ids.get(name, name), "fileName": name} for name in dict.fromkeys(names)]
+
+    def _stream_chat(self, project_id: str, request_id: str, query: str):
+        """/chat/stream SSE 를 읽어 FE 에 부분 답변 전달 (서버가 스트림을 지원하지 않으면 /chat 으로 대체)"""
+        def push(event_type: str, **detail):
+            self._push_event('bridge:chat-stream', {"requestId": request_id, "type": event_type, **detail})
+
+        started = time.perf_counter()
+        first_partial = False
+        print(f"[Bridge] Chat 스트림 요청: {query}")
+        try:
+            with requests.post(
+                f"{config.BRIDGE_API_URL}/chat/stream",
+                params={"project_id": self._remote_project_id(project_id)},
+                json={"question": query},
+                headers={"Accept": "text/event-stream"},
+                stream=True,
+                timeout=(10, config.CHAT_STREAM_READ_TIMEOUT),
+            ) as resp:
+                if resp.status_code == 404:
+                    # 구버전 서버 → 한 번에 받기
+                    print("[Bridge] 채팅 스트림 미지원 서버 → /chat 사용")
+                    push('done', **self.search_documents(query, project_id))
+                    return
+                if resp.status_code != 200:
+                    push('error', answer=f"서버 오류가 발생했습니다. (HTTP {resp.status_code})", sources=[])
+                    return
+
+                for _, event_type, data in self._iter_sse(resp):
+                    if event_type == 'start':
+                        # 질문 전송 ~ 첫 토큰 (네트워크 포함, 서버 측 값은 serverTtftMs)
+                        ttft = time.perf_counter() - started
+                        global_monitor.record("CHAT_TTFT", ttft)
+                        push('start', ttftMs=round(ttft * 1000, 1), serverTtftMs=data.get("ttftMs"))
+                    elif event_type == 'meta':
+                        push('meta', sources=self._chat_sources(project_id, data.get("sources", [])))
+                    elif event_type == 'field':
+                        if not data.get("text"):
+                            continue
+                        if not first_partial:
+                            first_partial = True
+                            global_monitor.record("CHAT_FIRST_PARTIAL", time.perf_counter() - started)
+                        push('field', key=data.get("key"), text=data["text"])
+                    elif event_type == 'done':
+                        global_monitor.record("CHAT_TOTAL", time.perf_counter() - started)
+                        push('done', answer=data.get("answerText") or "응답 없음",
+                             sources=self._chat_sources(project_id, data.get("sources", [])),
+                             timing=data.get("timing"))
+                        return
+                    elif event_type == 'error':
+                        push('error', answer=f"오류가 발생했습니다: {data.get('error')}", sources=[])
+                        return
+            push('error', answer="AI 서버 응답이 중간에 끊겼습니다.\n다시 시도해주세요.", sources=[])
+
+        except requests.exceptions.ReadTimeout:
+            push('error', answer="AI 서버 응답 시간이 초과되었습니다.\n잠시 후 다시 시도해주세요. (서버에서 모델을 로딩 중일 수 있습니다)", sources=[])
+        except requests.exceptions.ConnectionError:
+            push('error', answer="AI 서버에 연결할 수 없습니다.\nRunPod 인스턴스가 실행 중인지 확인해주세요.", sources=[])
+        except Exception as e:
+            push('error', answer=f"오류가 발생했습니다: {e}", sources=[])
 
     def open_folder_dialog(self) -> Optional[str]:
         """네이티브 폴더 브라우저 열기"""
@@ -30,4 +30,33 @@ if not os.path.exists(DEFAULT_DATA_DIR):
 # --- 파싱 설정 ---
 SUPPORTED_EXTENSIONS = ['*.hwp', '*.hwpx', '*.pdf', '*.txt', '*.docx', '*.xlsx', '*.md']
 
+# --- 병렬 분석 설정 ---
+ANALYZE_PARALLEL = True          # False면 항상 순차 처리
+ANALYZE_MAX_WORKERS = None       # None이면 물리 코어 수 기준 자동 (최대 8)
+ANALYZE_PARALLEL_MIN_FILES = 16  # 파일이 이보다 적으면 프로세스 기동 비용이 더 커서 순차 처리
+
+# --- 파싱 결과 캐시 설정 ---
+PARSE_CACHE_ENABLED = True
+PARSE_CACHE_PATH = os.path.join(ROOT_DIR, "cache", "parse_cache.db")
+PARSE_CACHE_MAX_MB = 512         # 초과 시 오래 안 쓴 결과부터 삭제
+
+# --- 폴더 감시 설정 ---
+WATCH_FOLDER_ENABLED = False     # True면 분석한 폴더의 파일 변경을 감지해 자동 반영
+WATCH_DEBOUNCE_SEC = 1.5         # 마지막 변경 후 이 시간 동안 조용하면 재분석
+WATCH_POLL_INTERVAL_SEC = 2.0    # watchdog 미설치 시 폴링 주기
+
+# --- 원격 업로드 설정 ---
+UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024  # 청크 하나의 크기 (RunPod 프록시 요청 크기 제한 고려)
+UPLOAD_MAX_RETRIES = 3               # 청크 전송 실패 시 재시도 횟수 (이어받기)
+CLIENT_ID_PATH = os.path.join(ROOT_DIR, "cache", "client_id")  # 이 PC 의 고정 id (서버 프로젝트 id 구분용)
+
+# --- 원격 분석 진행 수신 설정 ---
+ANALYZE_EVENTS_ENABLED = True        # False면 SSE 대신 /analyze/status 5초 폴링
+ANALYZE_STREAM_READ_TIMEOUT = 60     # 서버 heartbeat(15초)보다 길게
+ANALYZE_STREAM_RECONNECTS = 3        # 스트림이 끊겼을 때 Last-Event-ID로 재연결 횟수
+
+# --- 채팅 스트리밍 설정 ---
+CHAT_STREAM_ENABLED = True           # False면 /chat 한 번에 받기 (기존 방식)
+CHAT_STREAM_READ_TIMEOUT = 180       # 토큰 사이 최대 대기 (RAG 엔진 첫 초기화 시 첫 이벤트까지 오래 걸림)
+
 print(f"[Config] 설정 로드 완료 (ROOT: {ROOT_DIR})")
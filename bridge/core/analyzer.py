@@ -1,7 +1,9 @@
 import os
 import glob
 import sys
-from typing import List
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Optional
 import config
 
 # 상대 경로를 위한 절대 경로 보정
@@ -11,9 +13,11 @@ if root_dir not in sys.path:
     sys.path.insert(0, root_dir)
 
 from core.schemas import BEParserOutput
+from core.parse_cache import get_parse_cache
 
-def analyze_folder_interface(folder_path: str) -> List[BEParserOutput]:
-    """폴더 내의 문서를 분석하여 구조화된 데이터 반환"""
+
+def _load_be():
+    """BE 파서/프로세서 Lazy Import (워커 프로세스에서도 호출됨)"""
     try:
         from be.core.parser import parse_hwp_file
         from be.core.processor import process_document
@@ -24,43 +28,175 @@ def analyze_folder_interface(folder_path: str) -> List[BEParserOutput]:
             sys.path.insert(0, be_path)
         from be.core.parser import parse_hwp_file
         from be.core.processor import process_document
+    return parse_hwp_file, process_document
 
-    print(f"[Analyzer] 분석 시작: {folder_path}")
-    results = []
-    
-    files = []
-    for ext in config.SUPPORTED_EXTENSIONS:
-        files.extend(glob.glob(os.path.join(folder_path, ext)))
-        
-    print(f"[Analyzer] 발견된 파일: {len(files)}개")
-    
-    for file_path in files:
+
+def _analyze_file(file_path: str) -> dict:
+    """
+    단일 파일 파싱 + 정보 추출 (프로세스 풀 워커)
+
+    예외를 밖으로 던지지 않고 {'ok': bool, 'result'|'error': ...} 로 돌려주어
+    한 파일의 실패가 다른 파일 결과에 영향을 주지 않도록 한다.
+    """
+    parse_hwp_file, process_document = _load_be()
+    try:
+        # 1. 텍스트 추출
+        parse_result = parse_hwp_file(file_path)
+        if not parse_result['success']:
+            return {'ok': False, 'error': parse_result.get('error', 'Unknown Error')}
+
+        # 2. 정보 추출
+        processed_data = process_document(file_path, parse_result['text'])
+        return {'ok': True, 'result': {
+            'filename': processed_data['filename'],
+            'type': processed_data['type'],
+            'dates': processed_data['dates'],
+            'amounts': processed_data['amounts'],
+            'parties': processed_data.get('parties', []),
+            'keywords': processed_data.get('keywords', []),
+            'raw_text': processed_data['raw_text']
+        }}
+    except Exception as e:
+        return {'ok': False, 'error': str(e)}
+
+
+def _is_low_spec() -> bool:
+    """저사양 PC 판별 (verify_low_spec.get_system_info 와 같은 기준: RAM 6GB 이하)"""
+    try:
+        import psutil
+        return psutil.virtual_memory().total / (1024**3) <= 6
+    except Exception:
+        return True
+
+
+def _resolve_workers(file_count: int, parallel: Optional[bool], max_workers: Optional[int]) -> int:
+    """사용할 워커 수 결정 (1이면 순차 처리)"""
+    if parallel is False or (parallel is None and not config.ANALYZE_PARALLEL):
+        return 1
+    if parallel is None and file_count < config.ANALYZE_PARALLEL_MIN_FILES:
+        return 1
+
+    workers = max_workers or config.ANALYZE_MAX_WORKERS
+    if not workers:
+        # 명시적인 워커 수가 없으면 저사양 PC는 순차 처리
+        if _is_low_spec():
+            print("[Analyzer] 저사양 환경 감지 → 순차 처리")
+            return 1
         try:
+            import psutil
+            cores = psutil.cpu_count(logical=False) or os.cpu_count() or 1
+        except ImportError:
+            cores = os.cpu_count() or 1
+        workers = min(cores, 8)
+    return max(1, min(workers, file_count))
+
+
+def collect_files(folder_path: str) -> List[str]:
+    """폴더 내 지원 확장자 파일 목록 (경로 순 정렬)"""
+    files = set()
+    for ext in config.SUPPORTED_EXTENSIONS:
+        files.update(glob.glob(os.path.join(folder_path, ext)))
+    return sorted(files)
+
+
+def analyze_files(files: List[str], parallel: Optional[bool] = None,
+                  max_workers: Optional[int] = None,
+                  use_cache: bool = True) -> Dict[str, BEParserOutput]:
+    """
+    주어진 파일들만 분석 (증분 재분석용)
+
+    Args:
+        files: 분석할 파일 경로 목록
+        parallel: True/False로 강제, None이면 파일 수·PC 사양에 따라 자동 선택
+        max_workers: 프로세스 풀 워커 수 (None이면 config.ANALYZE_MAX_WORKERS 또는 코어 수)
+        use_cache: 파싱 결과 캐시 사용 여부 (config.PARSE_CACHE_ENABLED 가 꺼져 있으면 무시)
+
+    Returns:
+        {파일 경로: 분석 결과} (실패한 파일은 제외, files 순서 유지)
+    """
+    # 1. 캐시 조회 (내용이 바뀌지 않은 파일은 파싱 생략)
+    cache = get_parse_cache() if use_cache else None
+    if cache:
+        cached, pending, hashes = cache.lookup(files)
+        print(f"[Analyzer] 캐시 적중: {len(cached)}개 / 분석 대상: {len(pending)}개")
+    else:
+        cached, pending, hashes = {}, files, {}
+
+    # 2. 캐시에 없는 파일만 분석
+    workers = _resolve_workers(len(pending), parallel, max_workers)
+    if workers > 1:
+        print(f"[Analyzer] 병렬 분석 (워커 {workers}개)")
+        outcomes = _analyze_parallel(pending, workers)
+    else:
+        outcomes = []
+        for file_path in pending:
             print(f"   + 파싱 중: {os.path.basename(file_path)}")
-            # 1. 텍스트 추출
-            parse_result = parse_hwp_file(file_path)
-            if not parse_result['success']:
-                print(f"   ! 실패: {parse_result.get('error', 'Unknown Error')}")
-                continue
-            
-            # 2. 정보 추출
-            processed_data = process_document(file_path, parse_result['text'])
-            
-            results.append({
-                'filename': processed_data['filename'],
-                'type': processed_data['type'],
-                'dates': processed_data['dates'],
-                'amounts': processed_data['amounts'],
-                'parties': processed_data.get('parties', []),
-                'keywords': processed_data.get('keywords', []),
-                'raw_text': processed_data['raw_text']
-            })
-        except Exception as e:
-            print(f"   ! 오류 ({os.path.basename(file_path)}): {e}")
+            outcomes.append(_analyze_file(file_path))
+
+    fresh = {}
+    for file_path, outcome in zip(pending, outcomes):
+        if outcome['ok']:
+            fresh[file_path] = outcome['result']
+        else:
+            print(f"   ! 실패 ({os.path.basename(file_path)}): {outcome['error']}")
+    if cache and fresh:
+        cache.store(fresh, hashes)
+
+    # 3. 원래 파일 순서대로 합치기
+    results = {}
+    for file_path in files:
+        result = cached.get(file_path) or fresh.get(file_path)
+        if result is not None:
+            results[file_path] = result
+    return results
+
+
+def analyze_folder_interface(folder_path: str, parallel: Optional[bool] = None,
+                             max_workers: Optional[int] = None,
+                             use_cache: bool = True) -> List[BEParserOutput]:
+    """
+    폴더 내의 문서를 분석하여 구조화된 데이터 반환
+
+    Args:
+        folder_path: 분석할 폴더
+        parallel, max_workers, use_cache: analyze_files 참고
+
+    Returns:
+        파일 경로 순으로 정렬된 분석 결과 (실패한 파일은 제외)
+    """
+    print(f"[Analyzer] 분석 시작: {folder_path}")
+
+    files = collect_files(folder_path)
+    print(f"[Analyzer] 발견된 파일: {len(files)}개")
+
+    results = list(analyze_files(files, parallel, max_workers, use_cache).values())
 
     print(f"[Analyzer] 분석 완료: {len(results)}개 성공")
     return results
 
+
+def _analyze_parallel(files: List[str], workers: int) -> List[dict]:
+    """프로세스 풀로 분석 (입력 순서 유지). 풀이 깨지면 남은 파일은 순차 처리"""
+    outcomes = []
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(_analyze_file, file_path) for file_path in files]
+            for file_path, future in zip(files, futures):
+                try:
+                    outcomes.append(future.result())
+                except BrokenProcessPool:
+                    print(f"   ! 워커 프로세스 종료됨 → 순차 처리로 전환: {os.path.basename(file_path)}")
+                    outcomes.append(_analyze_file(file_path))
+                except Exception as e:
+                    outcomes.append({'ok': False, 'error': str(e)})
+    except (OSError, RuntimeError) as e:
+        # 프로세스 생성 자체가 불가능한 환경 (권한, 리소스 부족 등)
+        print(f"[Analyzer] 프로세스 풀 사용 불가 ({e}) → 순차 처리")
+        for file_path in files[len(outcomes):]:
+            outcomes.append(_analyze_file(file_path))
+    return outcomes
+
+
 if __name__ == "__main__":
     if len(sys.argv) > 1:
         analyze_folder_interface(sys.argv[1])
@@ -0,0 +1,127 @@
+"""
+프로젝트 매니페스트
+폴더별 파일 상태(path, size, mtime, content hash, chunk ids, 분석 결과)를 저장해두고
+재분석 시 추가/수정/삭제된 파일만 골라낸다.
+
+- 사용처(BE 로컬 분석, 업로드 동기화 등)는 namespace 로 구분된 각자의 매니페스트를 사용
+- 저장 위치: config.ROOT_DIR/cache/manifests/<namespace>_<경로 해시>.json
+"""
+import os
+import json
+import hashlib
+from typing import Dict, List, Optional, TypedDict
+
+import config
+from core.parse_cache import file_content_hash
+
+MANIFEST_DIR = os.path.join(os.path.dirname(config.PARSE_CACHE_PATH), "manifests")
+
+
+class ManifestEntry(TypedDict):
+    size: int
+    mtime_ns: int
+    hash: str
+    chunk_ids: List[str]  # 이 파일이 색인에 쓴 청크 id (수정/삭제 시 이것만 지움)
+    info: Optional[Dict]  # 파일 단위 분석 결과 (바뀌지 않은 파일은 다시 분석하지 않고 재사용)
+
+
+class ManifestDiff(TypedDict):
+    added: List[str]
+    modified: List[str]
+    removed: List[str]
+    unchanged: List[str]
+
+
+class ProjectManifest:
+    """폴더 하나에 대한 파일 상태 기록"""
+
+    def __init__(self, project_path: str, namespace: str = "be"):
+        self.project_path = os.path.abspath(project_path)
+        self.namespace = namespace
+        key = hashlib.sha1(self.project_path.encode('utf-8')).hexdigest()[:16]
+        self.manifest_path = os.path.join(MANIFEST_DIR, f"{namespace}_{key}.json")
+        self.entries: Dict[str, ManifestEntry] = {}
+        self._stats: Dict[str, tuple] = {}  # diff() 중 계산한 (size, mtime_ns, hash)
+
+    @classmethod
+    def load(cls, project_path: str, namespace: str = "be") -> "ProjectManifest":
+        manifest = cls(project_path, namespace)
+        try:
+            with open(manifest.manifest_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get("project_path") == manifest.project_path:
+                manifest.entries = data.get("entries", {})
+        except (OSError, ValueError):
+            pass  # 처음 여는 프로젝트이거나 손상된 매니페스트 → 전체 재분석
+        return manifest
+
+    def save(self):
+        os.makedirs(MANIFEST_DIR, exist_ok=True)
+        tmp_path = self.manifest_path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"project_path": self.project_path, "entries": self.entries}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.manifest_path)
+
+    def diff(self, files: List[str]) -> ManifestDiff:
+        """
+        현재 파일 목록과 매니페스트 비교
+
+        size/mtime 이 같으면 해시 계산 없이 unchanged 로 판단하고,
+        다르면 해시를 비교해 내용이 실제로 바뀐 경우만 modified 로 분류한다.
+        """
+        result: ManifestDiff = {"added": [], "modified": [], "removed": [], "unchanged": []}
+        current = set()
+        for path in files:
+            current.add(path)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entry = self.entries.get(path)
+            if entry and entry["size"] == st.st_size and entry["mtime_ns"] == st.st_mtime_ns:
+                result["unchanged"].append(path)
+                continue
+
+            try:
+                content_hash = file_content_hash(path)
+            except OSError:
+                continue
+            self._stats[path] = (st.st_size, st.st_mtime_ns, content_hash)
+            if entry is None:
+                result["added"].append(path)
+            elif entry["hash"] != content_hash:
+                result["modified"].append(path)
+            else:
+                # 내용은 같고 mtime 만 바뀐 경우 (복사, touch 등)
+                entry["size"], entry["mtime_ns"] = st.st_size, st.st_mtime_ns
+                result["unchanged"].append(path)
+
+        result["removed"] = sorted(p for p in self.entries if p not in current)
+        return result
+
+    def record(self, path: str, chunk_ids: Optional[List[str]] = None, info: Optional[Dict] = None):
+        """처리 완료된 파일 상태 기록 (diff() 에서 계산한 값이 있으면 재사용)"""
+        stat = self._stats.pop(path, None)
+        if stat is None:
+            st = os.stat(path)
+            stat = (st.st_size, st.st_mtime_ns, file_content_hash(path))
+        self.entries[path] = {
+            "size": stat[0],
+            "mtime_ns": stat[1],
+            "hash": stat[2],
+            "chunk_ids": list(chunk_ids or []),
+            "info": info,
+        }
+
+    def forget(self, path: str) -> List[str]:
+        """파일 기록 삭제 후 해당 파일의 chunk id 반환"""
+        entry = self.entries.pop(path, None)
+        return entry["chunk_ids"] if entry else []
+
+    def chunk_ids(self, path: str) -> List[str]:
+        entry = self.entries.get(path)
+        return entry["chunk_ids"] if entry else []
+
+    def info(self, path: str) -> Optional[Dict]:
+        entry = self.entries.get(path)
+        return entry.get("info") if entry else None
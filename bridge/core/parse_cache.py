@@ -0,0 +1,194 @@
+"""
+BE 파싱 결과 영구 캐시
+파일 내용 해시 + 파서 버전을 키로 parse_hwp_file/process_document 결과를 SQLite에 저장
+
+- 빠른 경로: 경로별 (size, mtime_ns)가 같으면 해시 계산 없이 바로 조회
+- 파서 버전: be/core/parser.py, processor.py 코드 지문 → 코드가 바뀌면 자동 무효화
+- 용량 제한: 전체 크기가 config.PARSE_CACHE_MAX_MB를 넘으면 오래 안 쓴 항목부터 삭제 (LRU)
+  결과가 지워진 내용 해시의 경로 기록(files)도 함께 정리
+"""
+import os
+import json
+import time
+import zlib
+import hashlib
+import inspect
+import marshal
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import config
+from sqlite_lru import evict_lru, wal_connection
+
+# 결과 포맷이 바뀌면 올려서 기존 캐시를 무효화
+CACHE_SCHEMA_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    content_hash TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS entries (
+    content_hash TEXT NOT NULL,
+    version TEXT NOT NULL,
+    result BLOB NOT NULL,
+    nbytes INTEGER NOT NULL,
+    last_access REAL NOT NULL,
+    PRIMARY KEY (content_hash, version)
+);
+CREATE INDEX IF NOT EXISTS idx_entries_access ON entries(last_access);
+"""
+
+# 결과가 지워진(LRU 정리·버전 변경) 내용 해시의 경로 기록은 빠른 경로에 쓸모가 없으므로 함께 정리
+_PRUNE_FILES = "DELETE FROM files WHERE content_hash NOT IN (SELECT content_hash FROM entries)"
+
+
+def file_content_hash(path: str) -> str:
+    """파일 내용 SHA-256 (1MB 단위 스트리밍)"""
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _module_fingerprint(module) -> bytes:
+    """모듈 소스(없으면 컴파일된 코드 객체)의 바이트 — PyInstaller 빌드에서도 동작"""
+    try:
+        with open(module.__file__, 'rb') as f:
+            return f.read()
+    except (OSError, TypeError, AttributeError):
+        return marshal.dumps(module.__loader__.get_code(module.__name__))
+
+
+def compute_parser_version() -> str:
+    """BE 파서/프로세서 코드 지문으로 캐시 버전 계산"""
+    from core.analyzer import _load_be
+    parse_hwp_file, process_document = _load_be()
+    h = hashlib.sha256(str(CACHE_SCHEMA_VERSION).encode())
+    for fn in (parse_hwp_file, process_document):
+        h.update(_module_fingerprint(inspect.getmodule(fn)))
+    return h.hexdigest()[:16]
+
+
+class ParseCache:
+    """content-hash 기반 BE 분석 결과 캐시"""
+
+    def __init__(self, db_path: str, version: str, max_bytes: int):
+        self.db_path = db_path
+        self.version = version
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+            # 다른 파서 버전의 결과는 다시 쓰일 일이 없으므로 정리
+            conn.execute("DELETE FROM entries WHERE version != ?", (self.version,))
+            conn.execute(_PRUNE_FILES)
+
+    def _connect(self):
+        return wal_connection(self.db_path, timeout=10)
+
+    def lookup(self, paths: List[str]) -> Tuple[Dict[str, dict], List[str], Dict[str, str]]:
+        """
+        캐시 조회
+
+        Returns:
+            (hits {path: result}, misses [path], hashes {path: content_hash})
+            hashes 에는 이번에 계산했거나 확인된 해시가 들어가며 store()에 그대로 넘긴다.
+        """
+        hits, misses, hashes = {}, [], {}
+        now = time.time()
+        touched = []
+        with self._lock, self._connect() as conn:
+            for path in paths:
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    misses.append(path)
+                    continue
+
+                row = conn.execute(
+                    "SELECT size, mtime_ns, content_hash FROM files WHERE path = ?", (path,)
+                ).fetchone()
+                if row and row[0] == st.st_size and row[1] == st.st_mtime_ns:
+                    content_hash = row[2]
+                else:
+                    # 느린 경로: 내용이 바뀌었을 수 있으므로 해시 재계산
+                    try:
+                        content_hash = file_content_hash(path)
+                    except OSError:
+                        misses.append(path)
+                        continue
+                    conn.execute(
+                        "INSERT OR REPLACE INTO files (path, size, mtime_ns, content_hash) VALUES (?, ?, ?, ?)",
+                        (path, st.st_size, st.st_mtime_ns, content_hash),
+                    )
+                hashes[path] = content_hash
+
+                entry = conn.execute(
+                    "SELECT result FROM entries WHERE content_hash = ? AND version = ?",
+                    (content_hash, self.version),
+                ).fetchone()
+                if entry is None:
+                    misses.append(path)
+                    continue
+                hits[path] = json.loads(zlib.decompress(entry[0]))
+                touched.append((now, content_hash, self.version))
+
+            if touched:
+                conn.executemany(
+                    "UPDATE entries SET last_access = ? WHERE content_hash = ? AND version = ?", touched
+                )
+        return hits, misses, hashes
+
+    def store(self, results: Dict[str, dict], hashes: Dict[str, str]):
+        """분석 결과 저장 후 용량 초과 시 LRU 정리"""
+        now = time.time()
+        rows = []
+        for path, result in results.items():
+            content_hash = hashes.get(path)
+            if content_hash is None:
+                continue
+            blob = zlib.compress(json.dumps(result, ensure_ascii=False).encode('utf-8'), 1)
+            rows.append((content_hash, self.version, blob, len(blob), now))
+        if not rows:
+            return
+        with self._lock, self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO entries (content_hash, version, result, nbytes, last_access) "
+                "VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+            if evict_lru(conn, "entries", ("content_hash", "version"), self.max_bytes, "ParseCache"):
+                conn.execute(_PRUNE_FILES)
+
+    def clear(self):
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM entries")
+            conn.execute("DELETE FROM files")
+
+
+_cache: Optional[ParseCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_parse_cache() -> Optional[ParseCache]:
+    """프로세스 전역 캐시 (비활성화되었거나 열 수 없으면 None)"""
+    global _cache
+    if not config.PARSE_CACHE_ENABLED:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            try:
+                _cache = ParseCache(
+                    config.PARSE_CACHE_PATH,
+                    compute_parser_version(),
+                    int(config.PARSE_CACHE_MAX_MB * 1024 * 1024),
+                )
+            except Exception as e:
+                print(f"[ParseCache] 캐시 사용 불가: {e}")
+                return None
+        return _cache
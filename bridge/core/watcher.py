@@ -0,0 +1,163 @@
+"""
+폴더 감시 (Watch Mode)
+분석한 폴더에 문서가 추가/수정/삭제되면 잠잠해질 때까지 기다렸다가(debounce) 콜백 호출
+
+- watchdog 설치 시: OS 파일 이벤트 사용 (Linux inotify, Windows ReadDirectoryChangesW)
+- 미설치 시: 주기적 stat 비교 (폴링)
+- 대기 중에는 이벤트가 올 때까지 스레드가 블록되므로 CPU를 거의 쓰지 않음
+"""
+import os
+import time
+import fnmatch
+import threading
+from typing import Callable, Dict, Optional, Set
+
+import config
+
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+    WATCHDOG_AVAILABLE = True
+except ImportError:
+    WATCHDOG_AVAILABLE = False
+
+
+def _is_supported(path: str) -> bool:
+    name = os.path.basename(path)
+    # 한글/오피스 임시 잠금 파일(~$...) 제외
+    if name.startswith('~$') or name.startswith('.'):
+        return False
+    return any(fnmatch.fnmatch(name.lower(), ext) for ext in config.SUPPORTED_EXTENSIONS)
+
+
+if WATCHDOG_AVAILABLE:
+    class _EventHandler(FileSystemEventHandler):
+        def __init__(self, watcher: "FolderWatcher"):
+            self.watcher = watcher
+
+        def on_any_event(self, event):
+            if event.is_directory:
+                return
+            self.watcher.notify(event.src_path)
+            dest = getattr(event, 'dest_path', None)
+            if dest:
+                self.watcher.notify(dest)
+
+
+class FolderWatcher:
+    """
+    단일 폴더 감시기 (하위 폴더 제외 — collect_files 와 같은 범위)
+
+    Args:
+        path: 감시할 폴더
+        on_change: 변경된 파일 경로 집합을 받는 콜백 (감시 스레드에서 호출)
+        debounce: 마지막 이벤트 후 이 시간(초) 동안 조용하면 콜백 호출
+        poll_interval: 폴링 모드 stat 비교 주기(초)
+    """
+
+    def __init__(self, path: str, on_change: Callable[[Set[str]], None],
+                 debounce: Optional[float] = None, poll_interval: Optional[float] = None,
+                 use_polling: bool = False):
+        self.path = os.path.abspath(path)
+        self.on_change = on_change
+        self.debounce = config.WATCH_DEBOUNCE_SEC if debounce is None else debounce
+        self.poll_interval = config.WATCH_POLL_INTERVAL_SEC if poll_interval is None else poll_interval
+        self.backend = 'polling' if use_polling or not WATCHDOG_AVAILABLE else 'watchdog'
+
+        self._lock = threading.Lock()
+        self._pending: Set[str] = set()
+        self._last_event = 0.0
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._threads = []
+        self._observer = None
+
+    # ===== 수명 주기 =====
+
+    def start(self):
+        dispatcher = threading.Thread(target=self._dispatch_loop, name='FolderWatcher-dispatch', daemon=True)
+        self._threads.append(dispatcher)
+
+        if self.backend == 'watchdog':
+            self._observer = Observer()
+            self._observer.schedule(_EventHandler(self), self.path, recursive=False)
+            self._observer.daemon = True
+            self._observer.start()
+        else:
+            poller = threading.Thread(target=self._poll_loop, name='FolderWatcher-poll', daemon=True)
+            self._threads.append(poller)
+
+        for t in self._threads:
+            t.start()
+        print(f"[Watcher] 감시 시작 ({self.backend}): {self.path}")
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        if self._observer:
+            self._observer.stop()
+            self._observer.join(timeout=2)
+        for t in self._threads:
+            t.join(timeout=2)
+        print(f"[Watcher] 감시 종료: {self.path}")
+
+    # ===== 이벤트 수집 =====
+
+    def notify(self, path: str):
+        """파일 변경 이벤트 등록 (지원 확장자만)"""
+        if os.path.dirname(os.path.abspath(path)) != self.path or not _is_supported(path):
+            return
+        with self._lock:
+            self._pending.add(os.path.join(self.path, os.path.basename(path)))
+            self._last_event = time.monotonic()
+        self._wake.set()
+
+    def _snapshot(self) -> Dict[str, tuple]:
+        snapshot = {}
+        try:
+            with os.scandir(self.path) as it:
+                for entry in it:
+                    if entry.is_file() and _is_supported(entry.name):
+                        st = entry.stat()
+                        snapshot[entry.path] = (st.st_size, st.st_mtime_ns)
+        except OSError:
+            pass
+        return snapshot
+
+    def _poll_loop(self):
+        previous = self._snapshot()
+        while not self._stop.wait(self.poll_interval):
+            current = self._snapshot()
+            if current == previous:
+                continue
+            for path in set(previous) | set(current):
+                if previous.get(path) != current.get(path):
+                    self.notify(path)
+            previous = current
+
+    # ===== debounce 후 콜백 =====
+
+    def _dispatch_loop(self):
+        while not self._stop.is_set():
+            self._wake.wait()
+            if self._stop.is_set():
+                return
+
+            # 마지막 이벤트 이후 debounce 만큼 조용해질 때까지 대기
+            while True:
+                with self._lock:
+                    remaining = self._last_event + self.debounce - time.monotonic()
+                if remaining <= 0:
+                    break
+                if self._stop.wait(remaining):
+                    return
+
+            with self._lock:
+                changed, self._pending = self._pending, set()
+                self._wake.clear()
+            if not changed:
+                continue
+            try:
+                self.on_change(changed)
+            except Exception as e:
+                print(f"[Watcher] 변경 처리 중 오류: {e}")
@@ -3,3 +3,58 @@ import { apiCall } from '@/shared/lib/mockApi'
 export function queryChatBot(projectId, query) {
   return apiCall('chat_query', projectId, query)
 }
+
+/**
+ * 스트리밍 채팅 — bridge 가 'bridge:chat-stream' 이벤트로 완성된 답변 필드를 차례로 보냄
+ * onPartial(text, sources) 는 필드가 도착할 때마다 지금까지의 답변 전체로 호출
+ * 스트리밍을 쓸 수 없으면 queryChatBot 결과를 그대로 반환
+ */
+export function streamChatBot(projectId, query, onPartial) {
+  return new Promise((resolve, reject) => {
+    let requestId = null
+    const early = [] // requestId 를 받기 전에 도착한 이벤트
+    const parts = []
+    let sources = null
+
+    const stop = () => window.removeEventListener('bridge:chat-stream', onEvent)
+
+    function handle(detail) {
+      if (detail.type === 'meta') {
+        sources = detail.sources
+      } else if (detail.type === 'field') {
+        parts.push(detail.text)
+        onPartial?.(parts.join('\n\n'), sources)
+      } else if (detail.type === 'done' || detail.type === 'error') {
+        stop()
+        resolve({
+          answer: detail.answer,
+          sources: detail.sources ?? sources ?? [],
+          isError: detail.type === 'error',
+        })
+      }
+    }
+
+    function onEvent(e) {
+      if (requestId === null) {
+        early.push(e.detail)
+      } else if (e.detail.requestId === requestId) {
+        handle(e.detail)
+      }
+    }
+
+    window.addEventListener('bridge:chat-stream', onEvent)
+    apiCall('chat_query_stream', projectId, query)
+      .then(res => {
+        if (!res?.streaming) {
+          stop()
+          return queryChatBot(projectId, query).then(resolve)
+        }
+        requestId = res.requestId
+        early.splice(0).filter(d => d.requestId === requestId).forEach(handle)
+      })
+      .catch(err => {
+        stop()
+        reject(err)
+      })
+  })
+}
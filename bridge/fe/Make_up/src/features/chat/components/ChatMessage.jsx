@@ -17,6 +17,9 @@ export default function ChatMessage({ message, onSourceClick }) {
         )}
       >
         <p className="whitespace-pre-line">{message.content}</p>
+        {message.streaming && (
+          <p className="mt-1 text-[11px] text-gray-400">답변 작성 중...</p>
+        )}
 
         {message.sources?.length > 0 && (
           <div className="mt-2 pt-2 border-t border-gray-100">
@@ -41,7 +41,7 @@ export default function ChatPanel({ projectId }) {
             onSourceClick={handleSourceClick}
           />
         ))}
-        {isLoading && (
+        {isLoading && !messages.some(m => m.streaming) && (
           <div className="flex justify-start">
             <div className="bg-white border border-gray-200 rounded-lg px-3 py-2 text-sm text-gray-400">
               답변 생성 중...
@@ -1,5 +1,5 @@
 import { useState, useCallback, useEffect, useRef } from 'react'
-import { queryChatBot } from '@/features/chat/api/chatApi'
+import { streamChatBot } from '@/features/chat/api/chatApi'
 
 let msgId = 0
 function nextId() {
@@ -45,21 +45,41 @@ export function useChat(projectId) {
     setMessages(prev => [...prev, userMsg])
     setIsLoading(true)
 
+    // 답변 메시지는 첫 부분 답변이 도착할 때 추가하고 이후 같은 id 로 갱신
+    const assistantId = nextId()
+    const upsertAssistant = (patch) => setMessages(prev => {
+      const idx = prev.findIndex(m => m.id === assistantId)
+      if (idx === -1) {
+        return [...prev, {
+          id: assistantId,
+          role: 'assistant',
+          content: '',
+          sources: null,
+          isError: false,
+          timestamp: Date.now(),
+          ...patch,
+        }]
+      }
+      const next = prev.slice()
+      next[idx] = { ...next[idx], ...patch }
+      return next
+    })
+
     try {
-      const res = await queryChatBot(projectId, trimmed)
+      const res = await streamChatBot(projectId, trimmed, (partial, sources) => {
+        upsertAssistant({ content: partial, sources: sources ?? null, streaming: true })
+      })
       const answer = res?.answer ?? '응답을 받지 못했습니다.'
-      const isError = answer.includes('연결할 수 없습니다') ||
+      const isError = res?.isError ||
+                      answer.includes('연결할 수 없습니다') ||
                       answer.includes('시간이 초과') ||
                       answer.includes('오류가 발생')
-      const assistantMsg = {
-        id: nextId(),
-        role: 'assistant',
+      upsertAssistant({
         content: answer,
         sources: res?.sources ?? null,
         isError,
-        timestamp: Date.now(),
-      }
-      setMessages(prev => [...prev, assistantMsg])
+        streaming: false,
+      })
     } catch {
       const errorMsg = {
         id: nextId(),
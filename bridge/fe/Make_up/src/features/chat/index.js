@@ -1,3 +1,3 @@
 export { useChat } from './hooks/useChat'
-export { queryChatBot } from './api/chatApi'
+export { queryChatBot, streamChatBot } from './api/chatApi'
 export { generateMockResponse } from './lib/mockResponses'
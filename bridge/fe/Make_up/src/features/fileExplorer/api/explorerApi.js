@@ -19,3 +19,11 @@ export function openFolderDialog() {
 export function fetchAnalysisStatus(projectId) {
   return apiCall('get_analysis_status', projectId)
 }
+
+export function watchFolder(folderPath) {
+  return apiCall('watch_folder', folderPath)
+}
+
+export function unwatchFolder(projectId) {
+  return apiCall('unwatch_folder', projectId)
+}
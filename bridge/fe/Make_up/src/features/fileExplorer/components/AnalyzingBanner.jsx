@@ -1,6 +1,6 @@
 import { cn } from '@/shared/utils/cn'
 
-export default function AnalyzingBanner({ stage = 'local' }) {
+export default function AnalyzingBanner({ stage = 'local', progress = null }) {
   const isAi = stage === 'ai'
 
   return (
@@ -14,10 +14,15 @@ export default function AnalyzingBanner({ stage = 'local' }) {
       )} />
       <p className="text-sm font-medium">
         {isAi ? 'AI 분석 진행 중' : '문서 분석 중'}
+        {isAi && progress?.stage === 'file' && ` (${progress.index}/${progress.total})`}
       </p>
       <span className={cn('text-xs', isAi ? 'text-amber-200' : 'text-primary-200')}>|</span>
       <p className={cn('text-xs', isAi ? 'text-amber-100' : 'text-primary-100')}>
-        {isAi
+        {isAi && progress?.stage === 'file'
+          ? `${progress.name} 분석 완료`
+          : isAi && (progress?.stage === 'build' || progress?.stage === 'section')
+          ? '타임라인과 이슈를 정리하고 있습니다.'
+          : isAi
           ? 'AI가 문서 요약, 타임라인, 이슈를 분석하고 있습니다. 완료되면 자동으로 업데이트됩니다.'
           : '파일을 파싱하고 업무를 분류하고 있습니다. 완료되면 자동으로 결과가 표시됩니다.'
         }
@@ -133,7 +133,7 @@ export default function ExplorerLayout() {
   return (
     <div className="flex flex-col h-screen bg-gray-50">
       {isAnalyzing && <AnalyzingBanner stage="local" />}
-      {!isAnalyzing && aiInProgress && <AnalyzingBanner stage="ai" />}
+      {!isAnalyzing && aiInProgress && <AnalyzingBanner stage="ai" progress={state.aiProgress} />}
 
       <div className="flex flex-1 overflow-hidden">
         {/* ── 사이드바 ── */}
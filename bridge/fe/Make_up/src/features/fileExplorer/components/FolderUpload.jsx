@@ -2,7 +2,7 @@ import { useRef, useState, useEffect } from 'react'
 import { cn } from '@/shared/utils/cn'
 import { isDev } from '@/shared/lib/env'
 import { useExplorer } from '@/features/fileExplorer/hooks/useExplorer'
-import { analyzeFolder, openFolderDialog } from '@/features/fileExplorer/api/explorerApi'
+import { analyzeFolder, openFolderDialog, watchFolder } from '@/features/fileExplorer/api/explorerApi'
 
 const RECENT_KEY = 'handover-recent-projects'
 
@@ -38,6 +38,8 @@ export default function FolderUpload() {
     try {
       const result = await analyzeFolder(folderPath)
       dispatch({ type: 'ANALYZE_SUCCESS', projects: result.projects })
+      // 폴더 감시 (설정에서 꺼져 있으면 서버가 무시)
+      watchFolder(folderPath).catch(() => {})
     } catch (err) {
       console.error('[FolderUpload] 분석 실패:', err)
       dispatch({ type: 'ANALYZE_FAIL' })
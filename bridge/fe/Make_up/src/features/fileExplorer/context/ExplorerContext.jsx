@@ -10,6 +10,7 @@ const initialState = {
   expandedFolders: new Set(),
   aiStatus: null,           // null | 'pending' | 'analyzing' | 'done' | 'error'
   analysisProjectId: null,  // 현재 AI 분석 중인 프로젝트 ID
+  aiProgress: null,         // 마지막 'bridge:analysis-progress' 이벤트 (stage, index, total, name)
 }
 
 function explorerReducer(state, action) {
@@ -26,12 +27,29 @@ function explorerReducer(state, action) {
         projects: action.projects,
         aiStatus: 'pending',
         analysisProjectId: projectId,
+        aiProgress: null,
       }
     }
 
     case 'ANALYZE_FAIL':
       return { ...state, isAnalyzing: false, phase: 'upload', aiStatus: null, analysisProjectId: null }
 
+    case 'AI_ANALYSIS_PROGRESS': {
+      const progress = action.progress
+      if (progress.projectId !== state.analysisProjectId || state.aiStatus === 'done') return state
+      // 파일 요약·summary 항목은 도착하는 대로 반영 (최종 결과는 AI_ANALYSIS_COMPLETE 에서 덮어씀)
+      const projects = (progress.file || progress.stage === 'section')
+        ? state.projects.map((p) => {
+          if (p.id !== progress.projectId) return p
+          if (progress.file) {
+            return { ...p, files: p.files.map(f => (f.id === progress.file.id ? progress.file : f)) }
+          }
+          return { ...p, summary: { ...(p.summary ?? {}), [progress.key]: progress.value } }
+        })
+        : state.projects
+      return { ...state, projects, aiStatus: 'analyzing', aiProgress: progress }
+    }
+
     case 'AI_ANALYSIS_COMPLETE': {
       const updated = action.project
       if (!updated) return { ...state, aiStatus: 'done' }
@@ -44,6 +62,30 @@ function explorerReducer(state, action) {
       }
     }
 
+    case 'FOLDER_DELTA': {
+      const delta = action.delta
+      return {
+        ...state,
+        projects: state.projects.map((p) => {
+          if (p.id !== delta.projectId) return p
+          const removed = new Set(delta.removed)
+          const updated = new Map(delta.updated.map(f => [f.id, f]))
+          const files = p.files
+            .filter(f => !removed.has(f.id))
+            .map(f => updated.get(f.id) ?? f)
+            .concat(delta.added)
+          return {
+            ...p,
+            files,
+            fileCount: delta.fileCount,
+            warnings: delta.warnings,
+            validation: delta.validation,
+          }
+        }),
+        selectedFileId: delta.removed.includes(state.selectedFileId) ? null : state.selectedFileId,
+      }
+    }
+
     case 'AI_ANALYSIS_ERROR':
       return { ...state, aiStatus: 'error' }
 
@@ -117,6 +159,31 @@ export function ExplorerProvider({ children }) {
     return () => clearInterval(pollingRef.current)
   }, [state.analysisProjectId, state.aiStatus])
 
+  // AI 분석 진행/완료 이벤트 수신 (bridge_api SSE 중계) — 위 폴링은 이벤트를 못 받은 경우의 fallback
+  useEffect(() => {
+    const onProgress = (e) => dispatch({ type: 'AI_ANALYSIS_PROGRESS', progress: e.detail })
+    const onStatus = (e) => {
+      if (e.detail.status === 'done') {
+        dispatch({ type: 'AI_ANALYSIS_COMPLETE', project: e.detail.project })
+      } else if (e.detail.status === 'error') {
+        dispatch({ type: 'AI_ANALYSIS_ERROR' })
+      }
+    }
+    window.addEventListener('bridge:analysis-progress', onProgress)
+    window.addEventListener('bridge:analysis-status', onStatus)
+    return () => {
+      window.removeEventListener('bridge:analysis-progress', onProgress)
+      window.removeEventListener('bridge:analysis-status', onStatus)
+    }
+  }, [])
+
+  // 폴더 감시 delta 수신 (bridge_api._push_event)
+  useEffect(() => {
+    const onDelta = (e) => dispatch({ type: 'FOLDER_DELTA', delta: e.detail })
+    window.addEventListener('bridge:folder-delta', onDelta)
+    return () => window.removeEventListener('bridge:folder-delta', onDelta)
+  }, [])
+
   const selectedProject = useMemo(
     () => state.projects.find(p => p.id === state.selectedProjectId) ?? null,
     [state.projects, state.selectedProjectId],
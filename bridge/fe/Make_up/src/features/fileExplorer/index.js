@@ -1,3 +1,3 @@
 export { ExplorerProvider } from './context/ExplorerContext'
 export { useExplorer } from './hooks/useExplorer'
-export { fetchProjects, fetchProjectFiles, analyzeFolder, fetchAnalysisStatus, openFolderDialog } from './api/explorerApi'
+export { fetchProjects, fetchProjectFiles, analyzeFolder, fetchAnalysisStatus, openFolderDialog, watchFolder, unwatchFolder } from './api/explorerApi'
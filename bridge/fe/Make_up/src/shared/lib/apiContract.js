@@ -90,6 +90,19 @@
  *      }
  */
 
+/**
+ * 4-1. chat_query_stream(projectId: string, query: string)
+ *    - 답변을 기다리지 않고 즉시 반환: { requestId: string, streaming: boolean }
+ *      (streaming 이 false 면 서버/설정이 스트리밍 미지원 → chat_query 사용)
+ *    - 답변은 window 의 'bridge:chat-stream' CustomEvent 로 전달, detail:
+ *        { requestId, type: 'start', ttftMs: number, serverTtftMs: number }   // 첫 토큰 도착
+ *      | { requestId, type: 'meta', sources: Array<{ fileId, fileName }> }  // 검색 완료
+ *      | { requestId, type: 'field', key: string, text: string }           // 답변 항목 하나 완성 (greeting, summary, details ...)
+ *      | { requestId, type: 'done', answer: string, sources: Array<{ fileId, fileName }>, timing?: object }
+ *      | { requestId, type: 'error', answer: string, sources: [] }
+ *    - field 의 text 를 순서대로 이어붙이면 지금까지의 답변, done 의 answer 가 최종 답변
+ */
+
 /**
  * 5. generate_draft(referenceFile: FileNode, formData: object)
  *    - 인자: 참고 문서 객체, 사용자 입력 폼 데이터
@@ -105,4 +118,32 @@
  *      }
  */
 
+/**
+ * 6. watch_folder(folderPath: string) / unwatch_folder(projectId: string)
+ *    - 분석한 폴더의 파일 변경 감시 시작/종료 (config.WATCH_FOLDER_ENABLED 필요)
+ *    - 반환: { watching: boolean, projectId?: string, backend?: 'watchdog'|'polling', reason?: string }
+ *    - 변경 시 window 에 'bridge:folder-delta' CustomEvent 발생, detail: {
+ *        projectId: string,
+ *        added: FileNode[],       // 새로 생긴 파일
+ *        updated: FileNode[],     // 내용 또는 경고 상태가 바뀐 파일
+ *        removed: string[],       // 삭제된 파일 ID
+ *        fileCount: number,
+ *        warnings: number,
+ *        validation: object
+ *      }
+ */
+
+/**
+ * 7. AI 분석 진행 이벤트 (analyze_folder 이후 원격 분석 중 bridge 가 push)
+ *    - 'bridge:analysis-progress' CustomEvent, detail:
+ *        { projectId, stage: 'file', index: number, total: number, name: string, ok: boolean,
+ *          file?: FileNode }        // AI 요약·키워드·당사자가 병합된 파일 (로컬 ID)
+ *      | { projectId, stage: 'build', fileCount: number }
+ *      | { projectId, stage: 'section', key: 'timeline'|'issues'|'decisions'|'guidelines'|'keyFiles'|'overview',
+ *          value: any }             // 완성된 summary 항목 하나 (fileId 는 로컬 ID)
+ *    - 'bridge:analysis-status' CustomEvent, detail:
+ *        { projectId, status: 'done'|'error', project?: Project }   // project 는 done 일 때만
+ *    - 이벤트를 받지 못하는 환경에서는 get_analysis_status 폴링으로 동일한 결과 확인 가능
+ */
+
 export {}
@@ -23,6 +23,24 @@ const mockHandlers = {
     return delay(generateMockResponse(project, query), 800)
   },
 
+  // 답변을 문단 단위로 나눠 'bridge:chat-stream' 이벤트로 흘려보냄 (bridge_api._stream_chat 흉내)
+  chat_query_stream: async (projectId, query) => {
+    const project = MOCK_PROJECTS.find(p => p.id === projectId)
+    const res = project
+      ? generateMockResponse(project, query)
+      : { answer: '업무를 찾을 수 없습니다.', sources: [] }
+    const requestId = `mock-${Date.now()}`
+    const emit = (detail) => window.dispatchEvent(
+      new CustomEvent('bridge:chat-stream', { detail: { requestId, ...detail } }),
+    )
+    const paragraphs = res.answer.split('\n\n')
+    paragraphs.forEach((text, i) => {
+      setTimeout(() => emit({ type: 'field', key: `part${i}`, text }), 300 * (i + 1))
+    })
+    setTimeout(() => emit({ type: 'done', ...res }), 300 * (paragraphs.length + 1))
+    return delay({ requestId, streaming: true }, 50)
+  },
+
   generate_draft: async (referenceFile, formData) => {
     return delay(generateMockDraft(referenceFile, formData), 1000)
   },
@@ -31,6 +49,14 @@ const mockHandlers = {
     return delay('C:\\mock\\sample_folder', 500)
   },
 
+  watch_folder: async () => {
+    return delay({ watching: false, reason: 'disabled' })
+  },
+
+  unwatch_folder: async (projectId) => {
+    return delay({ watching: false, projectId })
+  },
+
   get_analysis_status: async (projectId) => {
     const project = MOCK_PROJECTS.find(p => p.id === projectId) || MOCK_PROJECTS[0]
     return delay({
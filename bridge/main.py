@@ -5,6 +5,7 @@ React + Python 통합
 import webview
 import os
 import sys
+import multiprocessing
 from bridge_api import BridgeAPI
 
 
@@ -302,4 +303,6 @@ def main():
 
 
 if __name__ == '__main__':
+    # PyInstaller EXE에서 폴더 분석 프로세스 풀(core.analyzer)이 동작하도록 필요
+    multiprocessing.freeze_support()
     main()
@@ -3,6 +3,7 @@
 각 작업의 실행 시간 측정 및 리포트 생성
 """
 import time
+import threading
 from contextlib import contextmanager
 from typing import Dict
 from datetime import datetime
@@ -13,7 +14,11 @@ class PerformanceMonitor:
     
     def __init__(self):
         self.metrics: Dict[str, float] = {}
+        self.throughput: Dict[str, Dict[str, float]] = {}  # {작업: {'count': 처리 개수, 'seconds': 누적 시간}}
+        self.caches: Dict[str, Dict[str, int]] = {}  # {캐시: {'hits': 적중, 'misses': 미스}}
+        self.gauges: Dict[str, Dict[str, float]] = {}  # {지표: {'value': 현재값, 'peak': 최댓값}}
         self.start_time = time.time()
+        self._lock = threading.Lock()
     
     @contextmanager
     def measure(self, operation: str):
@@ -46,6 +51,63 @@ class PerformanceMonitor:
         self.metrics[operation] = elapsed
         print(f"[Performance] {operation}: {elapsed:.2f}s")
     
+    def record_throughput(self, operation: str, count: int, elapsed: float, unit: str = "items"):
+        """
+        처리량 기록 (여러 번 호출하면 개수와 시간을 누적)
+        
+        Args:
+            operation: 작업 이름 (예: "INDEX_UPSERT")
+            count: 이번에 처리한 개수
+            elapsed: 이번 처리에 걸린 시간 (초)
+            unit: 출력용 단위 (예: "chunks")
+        """
+        with self._lock:
+            stat = self.throughput.setdefault(operation, {'count': 0, 'seconds': 0.0, 'unit': unit})
+            stat['count'] += count
+            stat['seconds'] += elapsed
+            rate = stat['count'] / stat['seconds'] if stat['seconds'] > 0 else 0.0
+        print(f"[Performance] {operation}: {count} {unit} / {elapsed:.2f}s "
+              f"(누적 {stat['count']} {unit}, {rate:.1f} {unit}/s)")
+    
+    def get_rate(self, operation: str) -> float:
+        """누적 처리량 (개수/초)"""
+        stat = self.throughput.get(operation)
+        if not stat or stat['seconds'] <= 0:
+            return 0.0
+        return stat['count'] / stat['seconds']
+    
+    def record_cache(self, cache: str, hit: bool):
+        """
+        캐시 조회 결과 기록 (질의마다 호출되므로 출력하지 않음)
+        
+        Args:
+            cache: 캐시 이름 (예: "QUERY_EMBEDDING")
+            hit: 적중 여부
+        """
+        with self._lock:
+            stat = self.caches.setdefault(cache, {'hits': 0, 'misses': 0})
+            stat['hits' if hit else 'misses'] += 1
+    
+    def get_hit_rate(self, cache: str) -> float:
+        """누적 적중률 (0~1)"""
+        stat = self.caches.get(cache)
+        if not stat or not (stat['hits'] + stat['misses']):
+            return 0.0
+        return stat['hits'] / (stat['hits'] + stat['misses'])
+    
+    def record_gauge(self, gauge: str, value: float):
+        """
+        현재값 지표 기록 (대기열 길이처럼 자주 바뀌므로 출력하지 않음, 최댓값도 함께 유지)
+        
+        Args:
+            gauge: 지표 이름 (예: "JOB_QUEUE_DEPTH")
+            value: 현재값
+        """
+        with self._lock:
+            stat = self.gauges.setdefault(gauge, {'value': value, 'peak': value})
+            stat['value'] = value
+            stat['peak'] = max(stat['peak'], value)
+    
     def get_report(self) -> dict:
         """
         성능 리포트 생성
@@ -55,6 +117,9 @@ class PerformanceMonitor:
                 'total_time': 전체 소요 시간,
                 'breakdown': 작업별 소요 시간,
                 'slowest': 가장 느린 작업,
+                'throughput': 작업별 처리량 {count, seconds, rate},
+                'caches': 캐시별 적중률 {hits, misses, hitRate},
+                'gauges': 지표별 현재값·최댓값 {value, peak},
                 'timestamp': 리포트 생성 시각
             }
         """
@@ -70,6 +135,20 @@ class PerformanceMonitor:
                 'operation': slowest[0],
                 'time': round(slowest[1], 2)
             },
+            'throughput': {
+                k: {
+                    'count': v['count'],
+                    'seconds': round(v['seconds'], 2),
+                    'rate': round(self.get_rate(k), 1),
+                    'unit': v['unit'],
+                }
+                for k, v in self.throughput.items()
+            },
+            'caches': {
+                k: {**v, 'hitRate': round(self.get_hit_rate(k), 3)}
+                for k, v in self.caches.items()
+            },
+            'gauges': {k: dict(v) for k, v in self.gauges.items()},
             'timestamp': datetime.now().isoformat()
         }
     
@@ -86,11 +165,26 @@ class PerformanceMonitor:
             percentage = (t / report['total_time'] * 100) if report['total_time'] > 0 else 0
             print(f"  - {op}: {t}초 ({percentage:.1f}%)")
         print(f"\n가장 느린 작업: {report['slowest']['operation']} ({report['slowest']['time']}초)")
+        if report['throughput']:
+            print(f"\n처리량:")
+            for op, t in report['throughput'].items():
+                print(f"  - {op}: {t['count']} {t['unit']} / {t['seconds']}초 ({t['rate']} {t['unit']}/s)")
+        if report['caches']:
+            print(f"\n캐시 적중률:")
+            for name, c in report['caches'].items():
+                print(f"  - {name}: {c['hitRate'] * 100:.1f}% (적중 {c['hits']}, 미스 {c['misses']})")
+        if report['gauges']:
+            print(f"\n현재 지표:")
+            for name, g in report['gauges'].items():
+                print(f"  - {name}: {g['value']} (최대 {g['peak']})")
         print("=" * 60)
     
     def reset(self):
         """메트릭 초기화"""
         self.metrics.clear()
+        self.throughput.clear()
+        self.caches.clear()
+        self.gauges.clear()
         self.start_time = time.time()
 
 
@@ -0,0 +1,60 @@
+"""
+SQLite 저장소 공용 도우미 (연결 + LRU 정리)
+BE 파싱 캐시(core/parse_cache), LLM 응답 캐시(ai/llm_cache), BM25 토큰 캐시(ai/bm25_tokenizer),
+임베딩 캐시(ai/embedding_cache), 작업 큐(ai/job_queue)가 같이 쓴다.
+
+- wal_connection: 트랜잭션 하나짜리 WAL 연결 (정상 종료 시 커밋, 예외 시 롤백, 어느 쪽이든 닫음)
+  sqlite3.Connection 의 with 는 커밋만 하고 닫지 않으므로 GC 에 맡기지 않도록 이걸 쓴다
+- evict_lru: 전체 크기가 한도를 넘으면 last_access 가 오래된 항목부터 한도의 90%까지 삭제
+  (여유를 두어 한도 근처에서 저장할 때마다 정리가 반복되지 않게)
+  테이블에 nbytes(항목 크기), last_access(마지막 사용 시각) 컬럼이 있어야 한다
+"""
+import sqlite3
+from contextlib import contextmanager
+from typing import Iterator, Sequence
+
+# 정리 후 목표 크기 (한도 대비)
+_TARGET_RATIO = 0.9
+
+
+@contextmanager
+def wal_connection(db_path: str, timeout: float = 10) -> Iterator[sqlite3.Connection]:
+    """with 블록 동안만 쓰는 연결 (블록이 끝나면 커밋/롤백 후 닫음)"""
+    conn = sqlite3.connect(db_path, timeout=timeout)
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        with conn:
+            yield conn
+    finally:
+        conn.close()
+
+
+def evict_lru(conn: sqlite3.Connection, table: str, key_columns: Sequence[str],
+              max_bytes: int, label: str) -> int:
+    """
+    용량 초과 시 오래 안 쓴 항목부터 삭제 (호출자의 트랜잭션 안에서)
+
+    Args:
+        table: 캐시 테이블 이름
+        key_columns: 행을 지울 때 쓸 기본 키 컬럼
+        label: 로그 접두어 (예: "ParseCache")
+
+    Returns:
+        삭제한 항목 수
+    """
+    total = conn.execute(f"SELECT COALESCE(SUM(nbytes), 0) FROM {table}").fetchone()[0]
+    if total <= max_bytes:
+        return 0
+    target = int(max_bytes * _TARGET_RATIO)
+    keys = ", ".join(key_columns)
+    freed, victims = 0, []
+    for row in conn.execute(f"SELECT {keys}, nbytes FROM {table} ORDER BY last_access ASC"):
+        if total - freed <= target:
+            break
+        victims.append(row[:-1])
+        freed += row[-1]
+    where = " AND ".join(f"{column} = ?" for column in key_columns)
+    conn.executemany(f"DELETE FROM {table} WHERE {where}", victims)
+    print(f"[{label}] LRU 정리: {len(victims)}개 항목, {freed / 1048576:.1f}MB")
+    return len(victims)
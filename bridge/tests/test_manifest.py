@@ -0,0 +1,72 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# bridge 폴더를 Python path에 추가 (be/core 와 이름이 같은 core 패키지)
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from core import manifest as manifest_module
+from core.manifest import ProjectManifest
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    """파일 세 개가 있는 프로젝트 폴더 (매니페스트는 tmp_path 아래에 저장)"""
+    monkeypatch.setattr(manifest_module, "MANIFEST_DIR", str(tmp_path / "manifests"))
+    folder = tmp_path / "project"
+    folder.mkdir()
+    for name in ("a.txt", "b.txt", "c.txt"):
+        (folder / name).write_text(f"{name} 내용", encoding="utf-8")
+    return folder
+
+
+def files(folder):
+    return sorted(str(p) for p in folder.iterdir())
+
+
+def recorded(folder, namespace="be") -> ProjectManifest:
+    manifest = ProjectManifest.load(str(folder), namespace)
+    for path in files(folder):
+        manifest.record(path, chunk_ids=[f"{os.path.basename(path)}_chunk_0"], info={"name": path})
+    manifest.save()
+    return ProjectManifest.load(str(folder), namespace)
+
+
+def test_first_run_all_added(project):
+    diff = ProjectManifest.load(str(project)).diff(files(project))
+    assert diff == {"added": files(project), "modified": [], "removed": [], "unchanged": []}
+
+
+def test_classifies_changes(project):
+    manifest = recorded(project)
+    a, b, c = (str(project / n) for n in ("a.txt", "b.txt", "c.txt"))
+    (project / "b.txt").write_text("수정된 내용입니다", encoding="utf-8")
+    os.remove(c)
+    (project / "d.txt").write_text("새 파일", encoding="utf-8")
+
+    diff = manifest.diff(files(project))
+    assert diff == {"added": [str(project / "d.txt")], "modified": [b], "removed": [c], "unchanged": [a]}
+
+
+def test_touched_file_with_same_content_is_unchanged(project):
+    manifest = recorded(project)
+    a = str(project / "a.txt")
+    st = os.stat(a)
+    os.utime(a, ns=(st.st_atime_ns, st.st_mtime_ns + 5_000_000_000))
+    assert manifest.diff(files(project))["unchanged"] == files(project)
+
+
+def test_forget_returns_chunk_ids_and_info_round_trips(project):
+    manifest = recorded(project)
+    a = str(project / "a.txt")
+    assert manifest.info(a) == {"name": a}
+    assert manifest.forget(a) == ["a.txt_chunk_0"]
+    assert manifest.chunk_ids(a) == [] and manifest.info(a) is None
+
+
+def test_namespaces_are_separate(project):
+    recorded(project, namespace="ai_project")
+    assert ProjectManifest.load(str(project)).entries == {}
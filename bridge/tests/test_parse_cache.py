@@ -0,0 +1,69 @@
+import sqlite3
+import sys
+from pathlib import Path
+
+# bridge 폴더를 Python path에 추가 (be/core 와 이름이 같은 core 패키지)
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from core import parse_cache
+from core.parse_cache import ParseCache, compute_parser_version
+
+
+def make_file(tmp_path, name="a.hwp", text="본문"):
+    path = tmp_path / name
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+
+def test_hit_after_store(tmp_path):
+    path = make_file(tmp_path)
+    cache = ParseCache(str(tmp_path / "cache" / "parse.db"), "v1", 1 << 20)
+    hits, misses, hashes = cache.lookup([path])
+    assert (hits, misses) == ({}, [path])
+
+    cache.store({path: {"text": "본문"}}, hashes)
+    hits, misses, _ = cache.lookup([path])
+    assert (hits, misses) == ({path: {"text": "본문"}}, [])
+
+
+def test_content_change_misses(tmp_path):
+    path = make_file(tmp_path)
+    cache = ParseCache(str(tmp_path / "cache" / "parse.db"), "v1", 1 << 20)
+    _, _, hashes = cache.lookup([path])
+    cache.store({path: {"text": "본문"}}, hashes)
+
+    make_file(tmp_path, text="바뀐 본문입니다")
+    hits, misses, _ = cache.lookup([path])
+    assert (hits, misses) == ({}, [path])
+
+
+def test_parser_version_change_invalidates(tmp_path):
+    """파서 버전이 바뀌면 기존 결과는 조회되지 않고 열 때 삭제됨"""
+    db_path = str(tmp_path / "cache" / "parse.db")
+    path = make_file(tmp_path)
+    old = ParseCache(db_path, "v1", 1 << 20)
+    _, _, hashes = old.lookup([path])
+    old.store({path: {"text": "본문"}}, hashes)
+
+    new = ParseCache(db_path, "v2", 1 << 20)
+    hits, misses, _ = new.lookup([path])
+    assert (hits, misses) == ({}, [path])
+    with sqlite3.connect(db_path) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM entries WHERE version = 'v1'").fetchone()[0] == 0
+
+
+def test_compute_parser_version_tracks_schema(monkeypatch):
+    version = compute_parser_version()
+    assert version == compute_parser_version()
+    monkeypatch.setattr(parse_cache, "CACHE_SCHEMA_VERSION", parse_cache.CACHE_SCHEMA_VERSION + 1)
+    assert compute_parser_version() != version
+
+
+def test_compute_parser_version_tracks_parser_code(monkeypatch):
+    """BE 파서 코드가 바뀌면 버전도 바뀜"""
+    version = compute_parser_version()
+    fingerprint = parse_cache._module_fingerprint
+    monkeypatch.setattr(parse_cache, "_module_fingerprint",
+                        lambda module: fingerprint(module) + b"# changed")
+    assert compute_parser_version() != version